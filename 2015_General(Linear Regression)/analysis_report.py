@@ -14,8 +14,13 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
 import warnings
+import sys
+from pathlib import Path
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # Depo kökü (election_common)
+from election_common.numeric import parse_count, parse_percent
+
 class AdvancedElectionAnalysis:
     """
     Gelişmiş Türk Seçim Analizi - Çoklu Model Karşılaştırması
@@ -63,14 +68,14 @@ class AdvancedElectionAnalysis:
         party_columns = ['AK Parti', 'CHP', 'MHP', 'HDP', 'BDP', 'SP', 'BBP', 'AP']
         for col in party_columns:
             if col in self.data.columns:
-                self.data[col] = pd.to_numeric(self.data[col], errors='coerce').fillna(0)
+                self.data[col] = parse_percent(self.data[col]).fillna(0)
         
         # HDP ve BDP birleştir
         if 'BDP' in self.data.columns:
             self.data['HDP'] = self.data['HDP'] + self.data['BDP'].fillna(0)
         
         # Gelişmiş özellikler
-        self.data['Katılımcı sayısı'] = pd.to_numeric(self.data['Katılımcı sayısı'], errors='coerce').fillna(1000)
+        self.data['Katılımcı sayısı'] = parse_count(self.data['Katılımcı sayısı']).fillna(1000)
         self.data['Sample_Size_Log'] = np.log(self.data['Katılımcı sayısı'])
         
         # Anket şirketi kategorileri
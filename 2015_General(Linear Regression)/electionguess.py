@@ -15,8 +15,14 @@ import seaborn as sns
 from datetime import datetime
 import re
 import warnings
+import sys
+from pathlib import Path
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # Depo kökü (election_common)
+from election_common.numeric import parse_count, parse_percent
+from election_common.report_templates import blank, heading, line, table, title, write_report
+
 class TurkishElectionPredictor:
     """
     Türk seçim verilerini kullanarak lineer regresyon ile parti oylarını tahmin eden kapsamlı model
@@ -77,14 +83,14 @@ class TurkishElectionPredictor:
         party_columns = ['AK Parti', 'CHP', 'MHP', 'HDP', 'BDP', 'SP', 'BBP', 'AP']
         for col in party_columns:
             if col in self.data.columns:
-                self.data[col] = pd.to_numeric(self.data[col], errors='coerce').fillna(0)
+                self.data[col] = parse_percent(self.data[col]).fillna(0)
         
         # HDP ve BDP birleştir (aynı partinin farklı dönemlerdeki isimleri)
         if 'BDP' in self.data.columns:
             self.data['HDP'] = self.data['HDP'].fillna(0) + self.data['BDP'].fillna(0)
         
         # Katılımcı sayısını numeric yap
-        self.data['Katılımcı sayısı'] = pd.to_numeric(self.data['Katılımcı sayısı'], errors='coerce')
+        self.data['Katılımcı sayısı'] = parse_count(self.data['Katılımcı sayısı'])
         
         # Anket şirketlerini kategorize et
         self.data['Anketi Yapan'] = self.data['Anketi Yapan'].fillna('Bilinmeyen')
@@ -406,49 +412,52 @@ class TurkishElectionPredictor:
         print("📄 Raporlar: outputs/reports/ klasöründe")
         print("🤖 Modeller: outputs/models/ klasöründe")
     
-    def save_analysis_report(self, results, predictions, comparison):
+    def build_report_blocks(self, results, predictions, comparison):
         """
-        Analiz raporunu dosyaya kaydet
+        Rapor blokları: model performansları, tahminler ve karşılaştırma tabloları
+        (bkz. election_common.report_templates)
+        """
+        generated_at = datetime.now()
+        blocks = [
+            title(["TÜRKİYE 2015 SEÇİM TAHMİN RAPORU", "Linear Regression Analizi",
+                   generated_at.strftime('%d.%m.%Y %H:%M')], top="=" * 60, bottom="=" * 60),
+            blank(),
+            heading("MODEL PERFORMANSLARI", 2),
+            table(['Parti', 'R²', 'RMSE'], [16, 8, 8],
+                  [[party, f"{metrics['R2']:.3f}", f"{metrics['RMSE']:.2f}"] for party, metrics in results.items()]),
+            blank(),
+            heading("2015 KASIM SEÇİM TAHMİNLERİ", 2),
+            table(['Parti', 'Tahmin (%)'], [16, 12],
+                  [[party, f"{pred:.1f}"] for party, pred in (predictions or {}).items()]),
+        ]
+        if comparison is not None:
+            blocks += [
+                blank(),
+                heading("TAHMİN vs GERÇEK KARŞILAŞTIRMA", 2),
+                table(['Parti', 'Tahmin (%)', 'Gerçek (%)', 'Fark'], [16, 12, 12, 8],
+                      [[row['Parti'], f"{row['Tahmin']:.1f}", f"{row['Gerçek']:.1f}", f"{row['Fark']:+.1f}"]
+                       for _, row in comparison.iterrows()]),
+                blank(),
+                line(f"Ortalama Mutlak Hata: {comparison['Mutlak_Fark'].mean():.2f} puan"),
+            ]
+        blocks += [blank(), line(f"Rapor oluşturma zamanı: {generated_at.strftime('%d.%m.%Y %H:%M:%S')}")]
+        return blocks
+    
+    def save_analysis_report(self, results, predictions, comparison, formats=('txt',)):
+        """
+        Analiz raporunu dosyaya kaydet (formats: 'txt', 'markdown', 'html')
         """
-        from datetime import datetime
-        
         script_dir = os.path.dirname(os.path.abspath(__file__))
         report_dir = os.path.join(script_dir, 'outputs', 'reports')
-        os.makedirs(report_dir, exist_ok=True)
         
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        report_filename = f'linear_regression_analysis_report_{timestamp}.txt'
-        report_path = os.path.join(report_dir, report_filename)
-        
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write("="*60 + "\n")
-            f.write("         TÜRKİYE 2015 SEÇİM TAHMİN RAPORU\n")
-            f.write("              Linear Regression Analizi\n")
-            f.write(f"                {datetime.now().strftime('%d.%m.%Y %H:%M')}\n")
-            f.write("="*60 + "\n\n")
-            
-            # Model performansları
-            f.write("MODEL PERFORMANSLARI:\n")
-            f.write("-" * 30 + "\n")
-            for party, metrics in results.items():
-                f.write(f"{party:15s}: R² = {metrics['R2']:6.3f}, RMSE = {metrics['RMSE']:5.2f}\n")
-            
-            f.write("\n2015 KASIM SEÇİM TAHMİNLERİ:\n")
-            f.write("-" * 30 + "\n")
-            if predictions:
-                for party, pred in predictions.items():
-                    f.write(f"{party:15s}: %{pred:5.1f}\n")
-            
-            f.write("\nTAHMİN vs GERÇEK KARŞILAŞTIRMA:\n")
-            f.write("-" * 40 + "\n")
-            if comparison is not None:
-                for _, row in comparison.iterrows():
-                    f.write(f"{row['Parti']:15s}: Tahmin=%{row['Tahmin']:5.1f}, Gerçek=%{row['Gerçek']:5.1f}, Fark={row['Fark']:+5.1f}\n")
-                f.write(f"\nOrtalama Mutlak Hata: {comparison['Mutlak_Fark'].mean():.2f} puan\n")
-            
-            f.write(f"\nRapor oluşturma zamanı: {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}\n")
+        blocks = self.build_report_blocks(results, predictions, comparison)
         
-        print(f"📄 Analiz raporu kaydedildi: {report_path}")
+        # Raporda önbelleğe alınacak bölüm yok; bölüm önbelleği kullanılmaz
+        paths = write_report(blocks, report_dir, f'linear_regression_analysis_report_{timestamp}',
+                             name='linear_regression_analysis_report', formats=formats, cache_dir=None)
+        for report_path in paths:
+            print(f"📄 Analiz raporu kaydedildi: {report_path}")
 
 # Ana program
 if __name__ == "__main__":
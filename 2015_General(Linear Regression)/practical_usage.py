@@ -11,8 +11,13 @@ from sklearn.preprocessing import StandardScaler
 import os
 import pickle
 import warnings
+import sys
+from pathlib import Path
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # Depo kökü (election_common)
+from election_common.numeric import parse_count, parse_percent
+
 class ElectionPredictor:
     """
     Eğitilmiş modelleri kullanarak yeni anket verilerinden tahmin yapan sınıf
@@ -53,13 +58,13 @@ class ElectionPredictor:
         party_columns = ['AK Parti', 'CHP', 'MHP', 'HDP', 'BDP', 'SP', 'BBP', 'AP']
         for col in party_columns:
             if col in data.columns:
-                data[col] = pd.to_numeric(data[col], errors='coerce').fillna(0)
+                data[col] = parse_percent(data[col]).fillna(0)
         
         if 'BDP' in data.columns:
             data['HDP'] = data['HDP'] + data['BDP'].fillna(0)
         
         # Özellik mühendisliği
-        data['Katılımcı sayısı'] = pd.to_numeric(data['Katılımcı sayısı'], errors='coerce').fillna(1000)
+        data['Katılımcı sayısı'] = parse_count(data['Katılımcı sayısı']).fillna(1000)
         data['Sample_Size_Log'] = np.log(data['Katılımcı sayısı'])
         data['Is_Election'] = data['Anketi Yapan'].str.contains('Genel seçimler', na=False)
         data['Total_Major_Parties'] = data[self.parties].sum(axis=1)
@@ -11,8 +11,13 @@ matplotlib.use('Agg')  # GUI olmayan backend kullan
 import matplotlib.pyplot as plt
 import seaborn as sns
 import warnings
+import sys
+from pathlib import Path
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # Depo kökü (election_common)
+from election_common.numeric import parse_count, parse_percent
+
 class TurkeyElectionPredictor:
     """
     Türkiye Seçim Tahmini için Gelişmiş Random Forest Modeli
@@ -43,14 +48,8 @@ class TurkeyElectionPredictor:
                 if col in df.columns:
                     print(f"\n{col} sütunu işleniyor...")
                     
-                    # Virgülleri nokta ile değiştir ve tırnak işaretlerini temizle
-                    df[col] = df[col].astype(str).str.replace('"', '').str.replace(',', '.')
-                    
-                    # Range değerleri (50-52 gibi) ortalama al
-                    df[col] = df[col].apply(self._process_range_values)
-                    
-                    # Sayısal olmayan değerleri NaN yap
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
+                    # Virgül/nokta ondalık, tırnak ve aralık değerleri (50-52 -> 51) tek vektörel adımda
+                    df[col] = parse_percent(df[col])
                     
                     # Boş değerleri doldurmak için komşu değerlerin ortalamasını al
                     df[col] = df[col].fillna(df[col].mean())
@@ -60,14 +59,12 @@ class TurkeyElectionPredictor:
             
             # Katılımcı sayısını temizle
             if 'Katılımcı sayısı' in df.columns:
-                df['Katılımcı sayısı'] = df['Katılımcı sayısı'].astype(str).str.replace('.', '').str.replace(',', '').str.replace('"', '')
-                df['Katılımcı sayısı'] = pd.to_numeric(df['Katılımcı sayısı'], errors='coerce')
+                df['Katılımcı sayısı'] = parse_count(df['Katılımcı sayısı'])
                 df['Katılımcı sayısı'] = df['Katılımcı sayısı'].fillna(2500)  # Ortalama değer
             
             # Kararsız sütununu temizle
             if 'Kararsız' in df.columns:
-                df['Kararsız'] = df['Kararsız'].astype(str).str.replace(',', '.').str.replace('"', '')
-                df['Kararsız'] = pd.to_numeric(df['Kararsız'], errors='coerce')
+                df['Kararsız'] = parse_percent(df['Kararsız'])
                 df['Kararsız'] = df['Kararsız'].fillna(8.0)  # Ortalama kararsız oranı
             
             # Tarih sütununu işle
@@ -91,19 +88,6 @@ class TurkeyElectionPredictor:
             print(f"Veri yükleme hatası: {e}")
             return None
     
-    def _process_range_values(self, value):
-        """
-        Range değerleri (50-52 gibi) ortalama değerle değiştirir
-        """
-        if isinstance(value, str) and '-' in value:
-            try:
-                parts = value.split('-')
-                if len(parts) == 2:
-                    return (float(parts[0]) + float(parts[1])) / 2
-            except:
-                pass
-        return value
-    
     def create_features(self, df):
         """
         Gelişmiş özellikler oluşturur
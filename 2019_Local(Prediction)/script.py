@@ -1,24 +1,20 @@
 import argparse
 import re
+import sys
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
 
-DEFAULT_URL = "https://tr.wikipedia.org/wiki/2019_T%C3%BCrkiye_yerel_se%C3%A7imleri_i%C3%A7in_yap%C4%B1lan_anketler"
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # Depo kökü (election_common)
+from election_common.http_cache import SourceStamp
+from election_common.numeric import parse_percent_frame
+from election_common.provinces import PROVINCES, classify_provinces, find_province, province_file_key
+from election_common.scraping import (
+    add_fetch_arguments, default_fetcher, fetcher_from_args, parse_source, read_table, slugify, write_csv_atomic,
+)
 
-TR_PROVINCES = [
-    "Adana","Adıyaman","Afyonkarahisar","Ağrı","Aksaray","Amasya","Ankara","Antalya","Ardahan","Artvin",
-    "Aydın","Balıkesir","Bartın","Batman","Bayburt","Bilecik","Bingöl","Bitlis","Bolu","Burdur","Bursa",
-    "Çanakkale","Çankırı","Çorum","Denizli","Diyarbakır","Düzce","Edirne","Elazığ","Erzincan","Erzurum",
-    "Eskişehir","Gaziantep","Giresun","Gümüşhane","Hakkâri","Hatay","Iğdır","Isparta","İstanbul","İzmir",
-    "Kahramanmaraş","Karabük","Karaman","Kars","Kastamonu","Kayseri","Kırıkkale","Kırklareli","Kırşehir",
-    "Kilis","Kocaeli","Konya","Kütahya","Malatya","Manisa","Mardin","Mersin","Muğla","Muş","Nevşehir",
-    "Niğde","Ordu","Osmaniye","Rize","Sakarya","Samsun","Siirt","Sinop","Sivas","Şanlıurfa","Şırnak",
-    "Tekirdağ","Tokat","Trabzon","Tunceli","Uşak","Van","Yalova","Yozgat","Zonguldak"
-]
+DEFAULT_URL = "https://tr.wikipedia.org/wiki/2019_T%C3%BCrkiye_yerel_se%C3%A7imleri_i%C3%A7in_yap%C4%B1lan_anketler"
 
 # 2019 dönemi için yaygın parti eşadları (alias)
 PARTY_ALIASES = {
@@ -46,53 +42,6 @@ UNDECIDED_ALIASES = [
 
 # --- Yardımcılar ---
 
-def polite_get(url: str) -> str:
-    headers = {"User-Agent": "Mozilla/5.0 (compatible; AnketScraper/2.0; +https://example.com/)"}
-    r = requests.get(url, headers=headers, timeout=30)
-    r.raise_for_status()
-    return r.text
-
-def slugify(text: str) -> str:
-    text = (text or "").strip()
-    text = re.sub(r"\s+", "_", text, flags=re.UNICODE)
-    text = re.sub(r"[^\w\-.]+", "", text, flags=re.UNICODE)
-    return text[:80] or "cikti"
-
-def flatten_columns(df: pd.DataFrame) -> pd.DataFrame:
-    if isinstance(df.columns, pd.MultiIndex):
-        new_cols = []
-        for tpl in df.columns.values:
-            parts = [str(x) for x in tpl if str(x) != "nan"]
-            new_cols.append(" ".join(parts).strip())
-        df.columns = new_cols
-    df.columns = [re.sub(r"\s+", " ", str(c)).strip() for c in df.columns]
-    # benzersizleştir
-    seen, out = {}, []
-    for c in df.columns:
-        if c in seen:
-            seen[c] += 1
-            out.append(f"{c}.{seen[c]}")
-        else:
-            seen[c] = 0
-            out.append(c)
-    df.columns = out
-    return df
-
-def parse_pct(x):
-    if x is None or (isinstance(x, float) and np.isnan(x)):
-        return np.nan
-    s = str(x).strip()
-    if s in {"", "—", "–", "-", "N/A", "NaN"}:
-        return np.nan
-    s = s.replace("%", "").replace(" ", "")
-    s = s.replace(",", ".")
-    # "34.5±2.1" gibi değerleri kırp
-    s = re.split(r"[±\(\[]", s)[0]
-    try:
-        return float(s)
-    except Exception:
-        return np.nan
-
 def any_regex(patterns):
     return re.compile("|".join(f"(?:{p})" for p in patterns), flags=re.IGNORECASE | re.UNICODE)
 
@@ -119,42 +68,14 @@ def detect_party_from_header(h: str):
 def is_undecided_header(h: str):
     return bool(UNDECIDED_REGEX.search(h or ""))
 
-def map_tables_to_headings(soup: BeautifulSoup):
-    content = soup.find("div", id="mw-content-text")
-    if not content:
-        return []
-    pairs, last_heading = [], "Genel"
-    for el in content.descendants:
-        name = getattr(el, "name", None)
-        if name in {"h2", "h3", "h4"}:
-            title = el.get_text(" ", strip=True)
-            title = re.sub(r"\s*\[.*?düzenle.*?\]\s*", "", title, flags=re.IGNORECASE)
-            last_heading = title or last_heading
-        elif name == "table" and "wikitable" in (el.get("class") or []):
-            pairs.append((last_heading, el))
-    return pairs
-
-def find_province_in_text(text: str):
-    if not text:
-        return None
-    for p in TR_PROVINCES:
-        if re.search(rf"\b{re.escape(p)}\b", text, flags=re.IGNORECASE | re.UNICODE):
-            return p
-    return None
-
 def split_df_by_province_from_column(df: pd.DataFrame):
-    """Tablonun içindeki herhangi bir sütundan il adı yakalanırsa o değerlere göre böler."""
+    """Tablonun içindeki herhangi bir sütundan il adı yakalanırsa satırları o illere göre böler."""
     buckets = {}
-    for col in df.columns:
-        ser = df[col].astype(str)
-        # hızlıca benzersiz değerlere bakıp il var mı kontrol et
-        for v in pd.unique(ser.dropna()):
-            prov = find_province_in_text(str(v))
-            if prov:
-                mask = ser.str.contains(rf"\b{re.escape(prov)}\b", case=False, regex=True)
-                part = df[mask].copy()
-                if not part.empty:
-                    buckets.setdefault(prov, []).append(part)
+    for _, values in df.items():
+        # Sütun başına tek vektörel eşleştirme; satırlar ilk geçen ile göre gruplanır
+        provinces = classify_provinces(values.astype(str))
+        for prov, part in df.groupby(provinces.to_numpy(), sort=False):
+            buckets.setdefault(prov, []).append(part.copy())
     return buckets
 
 def reduce_to_party_and_undecided(df: pd.DataFrame) -> pd.DataFrame:
@@ -180,12 +101,12 @@ def reduce_to_party_and_undecided(df: pd.DataFrame) -> pd.DataFrame:
 
     # Partiler: aynı partiye denk gelen birden çok sütun varsa topla (örn. 1. tur / 2. tur vb. karışık tablolar)
     for canon, cols in party_cols.items():
-        vals = df[cols].applymap(parse_pct)
+        vals = parse_percent_frame(df[cols])
         out[canon] = vals.sum(axis=1, skipna=True, min_count=1)
 
     # Kararsız: tüm kaynakları topla
     if undecided_sources:
-        vals_u = df[undecided_sources].applymap(parse_pct)
+        vals_u = parse_percent_frame(df[undecided_sources])
         out["Kararsız"] = vals_u.sum(axis=1, skipna=True, min_count=1)
     else:
         out["Kararsız"] = np.nan
@@ -197,27 +118,29 @@ def reduce_to_party_and_undecided(df: pd.DataFrame) -> pd.DataFrame:
 
 # --- Ana akış ---
 
-def scrape_and_write(url: str, outdir: Path):
-    html = polite_get(url)
-    soup = BeautifulSoup(html, "lxml")
+def scrape_and_write(url: str, outdir: Path, fetcher=None, force: bool = False):
+    source = (fetcher or default_fetcher()).get(url)
+    stamp = SourceStamp(outdir)
+    if not force and stamp.is_current(source):
+        print(f"[=] Sayfa değişmedi ({source.status}); çıktılar güncel: {outdir}")
+        return
 
-    pairs = map_tables_to_headings(soup)
+    pairs = parse_source(source).table_elements(levels=("h2", "h3", "h4"))
     if not pairs:
         raise RuntimeError("Bu sayfada 'wikitable' bulunamadı.")
 
     outdir.mkdir(parents=True, exist_ok=True)
 
-    buckets = {p: [] for p in TR_PROVINCES}
+    buckets = {p: [] for p in PROVINCES}
     unknown = []
 
     for heading, tbl in pairs:
-        dfs = pd.read_html(str(tbl), flavor="lxml")
-        if not dfs:
+        raw = read_table(tbl)
+        if raw.empty:
             continue
-        raw = flatten_columns(dfs[0])
 
         # İli başlıktan yakala; yoksa tablo içinden böl
-        prov = find_province_in_text(heading)
+        prov = find_province(heading)
         if prov:
             reduced = reduce_to_party_and_undecided(raw)
             if not reduced.empty:
@@ -245,19 +168,21 @@ def scrape_and_write(url: str, outdir: Path):
         combined = combined.dropna(axis=1, how="all")
         if combined.empty:
             continue
-        path = outdir / f"{slugify(p).lower()}_2019_oy_oranlari.csv"
-        combined.to_csv(path, index=False, encoding="utf-8-sig")
+        path = outdir / f"{slugify(province_file_key(p), max_length=80)}_2019_oy_oranlari.csv"
+        write_csv_atomic(combined, path, index=False, encoding="utf-8-sig")
         print(f"[✓] {p}: {path}")
 
     # İl tespit edilemeyenler atlanıyor (sadece il bazlı veriler kaydediliyor)
+    stamp.update(source)
 
 def main():
     ap = argparse.ArgumentParser(description="2019 yerel anketler: il il CSV (sadece parti oy oranları + Kararsız).")
-    ap.add_argument("-u", "--url", default=DEFAULT_URL, help="Wikipedia sayfa URL'si")
+    ap.add_argument("-u", "--url", default=DEFAULT_URL, help="Wikipedia sayfa URL'si veya yerel HTML dosyası")
     ap.add_argument("-o", "--outdir", default="anketler", help="Çıktı klasörü")
+    add_fetch_arguments(ap)
     args = ap.parse_args()
 
-    scrape_and_write(args.url, Path(args.outdir))
+    scrape_and_write(args.url, Path(args.outdir), fetcher_from_args(args), args.force)
 
 if __name__ == "__main__":
     main()
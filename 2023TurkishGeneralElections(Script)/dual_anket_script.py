@@ -1,10 +1,16 @@
 import argparse
-import re
+import sys
 from pathlib import Path
+from typing import Optional
 
-import requests
 import pandas as pd
-from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # Depo kökü (election_common)
+from election_common.http_cache import SourceStamp
+from election_common.batch import DEFAULT_WORKERS, run_parallel
+from election_common.scraping import (
+    add_fetch_arguments, default_fetcher, fetcher_from_args, parse_source, read_table, slugify, write_csv_atomic,
+)
 
 DEFAULT_URLS = [
     # 2023 Cumhurbaşkanlığı anketleri
@@ -13,84 +19,28 @@ DEFAULT_URLS = [
     "https://tr.wikipedia.org/wiki/%C3%9Clke_%C3%A7ap%C4%B1nda_2023_T%C3%BCrkiye_genel_se%C3%A7imleri_i%C3%A7in_yap%C4%B1lan_anketler",
 ]
 
-def polite_get(url: str) -> str:
-    headers = {
-        "User-Agent": "Mozilla/5.0 (compatible; AnketScraper/1.0; +https://example.com/)"
-    }
-    r = requests.get(url, headers=headers, timeout=30)
-    r.raise_for_status()
-    return r.text
-
-def slugify_filename(text: str) -> str:
-    # Dosya adı için güvenli, kısa bir slug
-    text = text.strip()
-    text = re.sub(r"\s+", "_", text)
-    text = re.sub(r"[^\w\-.]+", "", text, flags=re.UNICODE)
-    return (text or "cikti")[:120]
-
-def make_unique_columns(cols):
-    seen = {}
-    out = []
-    for c in cols:
-        key = str(c)
-        if key not in seen:
-            seen[key] = 0
-            out.append(key)
-        else:
-            seen[key] += 1
-            out.append(f"{key}.{seen[key]}")
-    return out
-
-def flatten_columns(df: pd.DataFrame) -> pd.DataFrame:
-    if isinstance(df.columns, pd.MultiIndex):
-        new_cols = []
-        for tpl in df.columns.values:
-            parts = [str(x) for x in tpl if str(x) != "nan"]
-            new_cols.append(" ".join(parts).strip())
-        df.columns = new_cols
-    df.columns = [re.sub(r"\s+", " ", str(c)).strip() for c in df.columns]
-    df.columns = make_unique_columns(df.columns)
-    return df
-
-def map_tables_to_headings(soup: BeautifulSoup):
-    """mw-content-text içindeki wikitable tablolarını, en yakın önceki h2/h3 başlığıyla eşleştir."""
-    content = soup.find("div", id="mw-content-text")
-    if not content:
-        return []
-    pairs = []
-    last_heading = "Genel"
-    for el in content.descendants:
-        if getattr(el, "name", None) in {"h2", "h3"}:
-            title = el.get_text(" ", strip=True)
-            title = re.sub(r"\s*\[.*?düzenle.*?\]\s*", "", title, flags=re.IGNORECASE)
-            last_heading = title or last_heading
-        elif getattr(el, "name", None) == "table" and "wikitable" in (el.get("class") or []):
-            pairs.append((last_heading, el))
-    return pairs
-
-def scrape_page_to_csv(url: str, outdir: Path) -> Path:
-    html = polite_get(url)
-    soup = BeautifulSoup(html, "lxml")
+def scrape_page_to_csv(url: str, outdir: Path, fetcher=None, force: bool = False) -> Optional[Path]:
+    """Sayfanın tablolarını tek CSV'ye yazar; sayfa son çalıştırmadan beri değişmediyse None döner"""
+    source = (fetcher or default_fetcher()).get(url)
+    stamp = SourceStamp(outdir)
+    if not force and stamp.is_current(source):
+        return None
+    page = parse_source(source)
 
     # Başlık -> tablo eşleşmeleri
-    pairs = map_tables_to_headings(soup)
+    pairs = page.table_elements(levels=("h2", "h3"))
     if not pairs:
         raise RuntimeError("Bu sayfada 'wikitable' bulunamadı.")
 
     # Sayfa başlığından dosya adı üret
-    title_tag = soup.find("h1", id="firstHeading")
-    page_title = title_tag.get_text(" ", strip=True) if title_tag else "wikipedia_sayfa"
-    csv_name = slugify_filename(page_title) + ".csv"
+    csv_name = slugify(page.title or "wikipedia_sayfa") + ".csv"
     csv_path = outdir / csv_name
 
     all_frames = []
     for heading, table_el in pairs:
-        # Tek tabloyu pandas ile oku
-        dfs = pd.read_html(str(table_el), flavor="lxml")
-        if not dfs:
+        df = read_table(table_el)
+        if df.empty:
             continue
-        df = dfs[0]
-        df = flatten_columns(df)
         # Ek bağlam sütunları
         df.insert(0, "Bölüm", heading)
         df.insert(1, "KaynakURL", url)
@@ -101,25 +51,34 @@ def scrape_page_to_csv(url: str, outdir: Path) -> Path:
 
     combined = pd.concat(all_frames, ignore_index=True)
     csv_path.parent.mkdir(parents=True, exist_ok=True)
-    combined.to_csv(csv_path, index=False, encoding="utf-8-sig")
+    write_csv_atomic(combined, csv_path, index=False, encoding="utf-8-sig")
+    stamp.update(source)
     return csv_path
 
 def main():
     ap = argparse.ArgumentParser(description="Wikipedia anket tablolarını iki sayfa için ayrı CSV'lere dök.")
     ap.add_argument("-o", "--outdir", default="output", help="Çıktı klasörü")
-    ap.add_argument("-u", "--urls", nargs="*", default=DEFAULT_URLS, help="İşlenecek sayfa URL listesi")
+    ap.add_argument("-u", "--urls", nargs="*", default=DEFAULT_URLS, help="İşlenecek sayfa URL'leri veya yerel HTML dosyaları")
+    ap.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Eşzamanlı işlenecek sayfa sayısı")
+    add_fetch_arguments(ap)
     args = ap.parse_args()
 
     outdir = Path(args.outdir)
     outdir.mkdir(parents=True, exist_ok=True)
-
-    for url in args.urls:
-        print(f"[i] İşleniyor: {url}")
-        try:
-            path = scrape_page_to_csv(url, outdir)
-            print(f"[✓] Kaydedildi: {path}")
-        except Exception as e:
-            print(f"[!] Hata ({url}): {e}")
+    fetcher = fetcher_from_args(args)  # Sayfalar aynı oturumu, önbelleği ve hız sınırını paylaşır
+
+    print(f"[i] İşleniyor: {len(args.urls)} sayfa ({args.workers} eşzamanlı)")
+    outcomes = run_parallel(
+        {url: (lambda url=url: scrape_page_to_csv(url, outdir, fetcher, args.force)) for url in args.urls},
+        args.workers,
+    )
+    for url, outcome in outcomes.items():
+        if outcome['error'] is not None:
+            print(f"[!] Hata ({url}): {outcome['error']}")
+        elif outcome['result'] is None:
+            print(f"[=] Sayfa değişmedi; çıktı güncel: {url}")
+        else:
+            print(f"[✓] Kaydedildi: {outcome['result']}")
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,11 @@
 from random import randrange
-import csv
-from statistics import mean
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # Depo kökü (election_common)
+from election_common.poll_schema import PollSchema
 
 # Anket tabanlı tahmin için flag (True = anket verisi, False = rastgele)
 USE_POLL_PREDICTION = True
@@ -46,49 +51,36 @@ def get_poll_averages():
     csv_path = os.path.join(script_dir, 'Genel_secim_anket.csv')
     
     try:
-        with open(csv_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            poll_data = []
-            
-            for row in reader:
-                try:
-                    # Tarih sütunu boş değilse ve geçerli veri varsa ekle
-                    if row['Tarih'] and row['Tarih'].strip():
-                        poll_data.append(row)
-                except:
-                    continue
-            
-            if not poll_data:
-                print("❌ CSV dosyasında geçerli anket verisi bulunamadı")
-                return None
-            
-            # Son 10 anketin ortalamasını al (daha güvenilir)
-            recent_data = poll_data[:10]
-            averages = {}
-            
-            parties = ['AKP', 'MHP', 'BBP', 'YRP', 'CHP', 'İYİ', 'YSGP', 'TİP', 'ZP', 'MP']
-            
-            for party in parties:
-                values = []
-                for poll in recent_data:
-                    try:
-                        value_str = poll.get(party, '').strip()
-                        if value_str and value_str != '':
-                            # Boş değerler yerine 0 yazılmış olabilir
-                            value = float(value_str)
-                            if value > 0:
-                                values.append(value / 10)  # 1000'lik sistemden yüzdeye çevir
-                    except (ValueError, TypeError):
-                        continue
-                
-                if values:
-                    averages[party] = mean(values)
-                else:
-                    averages[party] = 0
-            
-            print(f"✅ {len(recent_data)} anketin ortalaması hesaplandı")
-            return averages
-            
+        df = pd.read_csv(csv_path, dtype=str, keep_default_na=False, encoding='utf-8')
+        # Tarih sütunu boş olmayan satırlar geçerli anket sayılır
+        poll_data = df[df['Tarih'].str.strip() != '']
+
+        if poll_data.empty:
+            print("❌ CSV dosyasında geçerli anket verisi bulunamadı")
+            return None
+
+        # Son 10 anketin ortalamasını al (daha güvenilir)
+        recent_data = poll_data.head(10)
+        averages = {}
+
+        parties = ['AKP', 'MHP', 'BBP', 'YRP', 'CHP', 'İYİ', 'YSGP', 'TİP', 'ZP', 'MP']
+
+        # Ortak şema birimi satır bazında belirler: 1000'lik satırlar ("383", "04") yüzdeye çevrilir
+        schema = PollSchema({party: [party] for party in parties})
+        canonical, _ = schema.canonical_frame(recent_data)
+
+        for party in parties:
+            if party not in canonical.columns:
+                averages[party] = 0
+                continue
+            # Boş değerler yerine 0 yazılmış olabilir
+            values = canonical[party]
+            values = values[values > 0]
+            averages[party] = float(values.mean()) if len(values) else 0
+
+        print(f"✅ {len(recent_data)} anketin ortalaması hesaplandı")
+        return averages
+
     except FileNotFoundError:
         print(f"❌ Anket CSV dosyası bulunamadı: {csv_path}")
         print("� Lütfen scripti doğru dizinden çalıştırdığınızdan emin olun")
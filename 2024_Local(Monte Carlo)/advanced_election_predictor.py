@@ -16,16 +16,187 @@ import os
 import glob
 from typing import Dict, List, Tuple, Optional
 import json
+import hashlib
+import sys
+from pathlib import Path
+from chart_pipeline import ChartJob, ChartPipeline
+from summary_table import MAJORITY_THRESHOLD, SummaryTable
+from province_map import ProvinceGeometry, geometry_cache_path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # Depo kökü (election_common)
+from election_common.report_templates import Section, blank, heading, items, line, title, write_report
+from turnout_model import NEUTRAL_TURNOUT, TURNOUT_BAND_EDGES, TURNOUT_BAND_LABELS, turnout_modifiers
+from outputs_catalog import DEFAULT_CATALOG_PATH, OutputsCatalog
+from results_stream import ResultsStreamWriter, export_pretty_json
+from results_artifact import (
+    DEFAULT_RUNS_DIR, ResultsArtifact, columns_to_predictions, hash_input_files, predictions_to_columns
+)
 
 warnings.filterwarnings('ignore')
 
+# Simülasyon matrisleri (~40 MB/çalıştırma) yalnızca istenirse artefakta yazılır: SAVE_DRAWS=1
+SAVE_DRAWS_ENV_VAR = 'SAVE_DRAWS'
+
+def _plot_win_probabilities(data: Dict, path: str, dpi: int):
+    """Genel kazanma olasılıkları (il bazında çubuk grafik)"""
+    cities, winning_parties, win_probs = data['cities'], data['winning_parties'], data['win_probs']
+    plt.figure(figsize=(15, 10))
+    
+    # Renk haritası
+    unique_parties = sorted(set(winning_parties))
+    colors = plt.cm.Set1(np.linspace(0, 1, len(unique_parties)))
+    party_colors = dict(zip(unique_parties, colors))
+    
+    city_colors = [party_colors[party] for party in winning_parties]
+    
+    # Bar chart
+    plt.barh(range(len(cities)), win_probs, color=city_colors)
+    plt.yticks(range(len(cities)), cities)
+    plt.xlabel('Kazanma Olasılığı (%)')
+    plt.title('İl Bazında Kazanma Olasılıkları - 2024 Yerel Seçimler')
+    plt.grid(axis='x', alpha=0.3)
+    
+    # Efsane
+    legend_elements = [plt.Rectangle((0,0),1,1, facecolor=party_colors[party], label=party) 
+                      for party in unique_parties]
+    plt.legend(handles=legend_elements, loc='lower right')
+    
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def _plot_win_probability_map(data: Dict, path: str, dpi: int):
+    """İl sınırlarıyla kazanma olasılıkları haritası (renk: önde olan parti, doygunluk: olasılık)"""
+    from matplotlib.collections import PolyCollection
+    
+    geometry = ProvinceGeometry.from_cache(data['geometry_cache'])
+    provinces = data['provinces']
+    
+    unique_parties = sorted({party for party, _ in provinces.values()})
+    colors = plt.cm.Set1(np.linspace(0, 1, len(unique_parties)))
+    party_colors = dict(zip(unique_parties, colors))
+    
+    # Olasılık düştükçe parti rengi beyaza karışır (%30 -> açık, %100 -> tam renk)
+    province_colors = np.tile([0.85, 0.85, 0.85, 1.0], (len(geometry.names), 1))
+    for city, index in geometry.match(provinces).items():
+        party, prob = provinces[city]
+        strength = np.clip((prob - 30) / 70, 0.15, 1.0)
+        province_colors[index, :3] = 1 - strength * (1 - party_colors[party][:3])
+    
+    fig, ax = plt.subplots(figsize=(18, 9))
+    collection = PolyCollection(geometry.rings(), facecolors=province_colors[geometry.ring_province],
+                                edgecolors='white', linewidths=0.4)
+    ax.add_collection(collection)
+    ax.autoscale_view()
+    ax.set_aspect('equal')
+    ax.axis('off')
+    ax.set_title('İl Bazında Kazanma Olasılıkları Haritası - 2024 Yerel Seçimler', fontsize=16)
+    
+    legend_elements = [plt.Rectangle((0,0),1,1, facecolor=party_colors[party], label=party)
+                      for party in unique_parties]
+    legend_elements.append(plt.Rectangle((0,0),1,1, facecolor=(0.85, 0.85, 0.85), label='Veri yok'))
+    ax.legend(handles=legend_elements, loc='lower left', ncol=len(legend_elements))
+    
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def _plot_party_distribution(data: Dict, path: str, dpi: int):
+    """Parti bazında il kazanım oranları"""
+    party_total_wins = data['party_total_wins']
+    plt.figure(figsize=(12, 8))
+    
+    if party_total_wins:
+        plt.pie(list(party_total_wins.values()), labels=list(party_total_wins.keys()),
+                autopct='%1.1f%%', startangle=90)
+        plt.title('Parti Bazında İl Kazanım Oranları')
+    
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def _province_report_record(city: str, result: Dict) -> Dict:
+    """Rapor için il kaydı: ilk üç parti sıralaması, çekişme durumu, katılım bantları"""
+    ranked = sorted(result['win_probabilities'].items(), key=lambda x: x[1], reverse=True)[:3]
+    top_parties = [
+        {'party': party, 'win_probability': prob, 'mean_vote': result['mean_votes'][party],
+         'ci_95': list(result['confidence_intervals'][party]['95%'])}
+        for party, prob in ranked
+    ]
+    
+    verdict = None
+    if len(ranked) >= 2:
+        first_prob = ranked[0][1]
+        if first_prob < 60:
+            verdict = 'competitive'
+        elif first_prob > 80:
+            verdict = 'safe'
+        else:
+            verdict = 'undecided'
+    
+    turnout = None
+    turnout_analysis = result.get('turnout_analysis')
+    if turnout_analysis:
+        turnout = {
+            'mean_turnout': turnout_analysis['mean_turnout'],
+            'band_winners': [
+                [label, *max(band['win_probabilities'].items(), key=lambda x: x[1])]
+                for label, band in turnout_analysis['bands'].items()
+            ],
+        }
+    
+    return {
+        'city': city,
+        'top_parties': top_parties,
+        'verdict': verdict,
+        'turnout': turnout,
+        'poll_count': result['poll_stats']['poll_count'],
+    }
+
+
+def _province_report_blocks(record: Dict) -> List[tuple]:
+    """İl kaydını rapor bloklarına çevirir"""
+    notes = [
+        f"{i}. {entry['party']}: %{entry['win_probability']:.1f} kazanma | Oy: %{entry['mean_vote']:.1f} "
+        f"(95% GA: %{entry['ci_95'][0]:.1f}-%{entry['ci_95'][1]:.1f})"
+        for i, entry in enumerate(record['top_parties'], 1)
+    ]
+    
+    # Çekişme analizi
+    if record['verdict'] == 'competitive':
+        notes.append("⚡ ÇEKİŞMELİ YARIŞ: İlk iki parti arasında fark az!")
+    elif record['verdict'] == 'safe':
+        notes.append(f"🏆 NET ÖNDE: {record['top_parties'][0]['party']} güçlü favoride")
+    elif record['verdict'] == 'undecided':
+        notes.append("📊 KARARSIZ: Sonuç belirsiz, kampanya önemli")
+    
+    # Katılım bantlarına göre favori (aynı simülasyonlardan)
+    turnout = record['turnout']
+    if turnout:
+        band_winners = ' | '.join(f"{label}: {winner} %{prob:.0f}" for label, winner, prob in turnout['band_winners'])
+        notes.append(f"Katılım (ort. %{turnout['mean_turnout']*100:.1f}): {band_winners}")
+    
+    # Anket güvenilirliği
+    poll_count = record['poll_count']
+    if poll_count < 3:
+        notes.append(f"⚠️  Az anket verisi ({poll_count} anket) - sonuçlar dikkatli yorumlanmalı")
+    elif poll_count > 10:
+        notes.append(f"✅ Yeterli anket verisi ({poll_count} anket) - güvenilir tahmin")
+    
+    return [heading(record['city'], 3), line("Kazanma Olasılıkları:"), items(notes), blank()]
+
+
 class AdvancedElectionPredictor:
     """Gelişmiş Monte Carlo tabanlı seçim tahmin sistemi"""
     
-    def __init__(self, data_path: str = "data/processed_data/iller/"):
+    def __init__(self, data_path: str = "data/processed_data/iller/", random_seed: Optional[int] = None):
         self.data_path = data_path
+        self.random_seed = random_seed  # Tekrarlanabilir çalıştırmalar için (katalogda saklanır)
         self.city_data = {}
         self.prediction_results = {}
+        self.simulation_draws = {}  # il -> (simülasyon x parti) oy oranı matrisi
+        self.turnout_draws = {}  # il -> simülasyon başına katılım oranı
+        self.expected_turnout = NEUTRAL_TURNOUT  # Katılım dağılımının merkezi
         self.uncertainty_factors = {
             'poll_error': 0.03,  # Anket hatası (±3%)
             'turnout_variation': 0.05,  # Katılım değişkenliği (±5%)
@@ -62,8 +233,22 @@ class AdvancedElectionPredictor:
         print(f"\nToplam {len(self.city_data)} il verisi başarıyla yüklendi.")
         return self.city_data
     
+    def poll_data_hash(self, city_name: str) -> Optional[str]:
+        """İlin temizlenmiş anket verisinin içerik özeti (veri yoksa None)"""
+        if city_name not in self.city_data:
+            return None
+        df = self.city_data[city_name]
+        # Ağırlık sütunları calculate_weighted_averages tarafından eklenir, veriye dahil değildir
+        df = df.drop(columns=[col for col in df.columns if col.endswith('_weight')])
+        row_hashes = pd.util.hash_pandas_object(df, index=True)
+        return hashlib.sha256(row_hashes.to_numpy().tobytes()).hexdigest()
+    
     def _clean_poll_data(self, df: pd.DataFrame, city_name: str) -> pd.DataFrame:
-        """Anket verilerini temizler ve standardize eder"""
+        """
+        İl verisini simülasyon için hazırlar. Parti sütunları ve birimleri anket
+        temizleyicide (scripts/anket_veri_düzenleyici.py) başlıklardan eşlenip
+        yüzde cinsinden yazıldığı için burada yeniden düzeltilmez.
+        """
         
         # Gerekli sütunları kontrol et
         required_columns = ['AKP', 'CHP', 'İYİ', 'MHP']
@@ -73,36 +258,7 @@ class AdvancedElectionPredictor:
             return pd.DataFrame()
         
         # Tarih sütununu parse et
-        if 'Tarih' in df.columns:
-            df = self._parse_dates(df)
-        
-        # Parti verilerini sayısal formata çevir ve temizle
-        for col in party_columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-            df[col] = df[col].fillna(0)
-        
-        # Anormal değerleri temizle (1000'den büyük değerler /10 ile böl)
-        for col in party_columns:
-            df.loc[df[col] > 100, col] = df.loc[df[col] > 100, col] / 10
-        
-        # Satır toplamı 100'den çok farklıysa normalize et
-        df_clean = df.copy()
-        for idx, row in df.iterrows():
-            party_total = sum([row[col] for col in party_columns if not pd.isna(row[col])])
-            if party_total > 0 and (party_total < 50 or party_total > 150):
-                # Normalleştir
-                factor = 100 / party_total
-                for col in party_columns:
-                    if not pd.isna(row[col]):
-                        df_clean.loc[idx, col] = row[col] * factor
-        
-        # Eksik parti verilerini sıfır ile doldur
-        all_parties = ['AKP', 'CHP', 'İYİ', 'MHP', 'HDP', 'DEM', 'YRP', 'ZP']
-        for party in all_parties:
-            if party not in df_clean.columns:
-                df_clean[party] = 0
-            else:
-                df_clean[party] = df_clean[party].fillna(0)
+        df_clean = self._parse_dates(df) if 'Tarih' in df.columns else df
         
         # Son 6 ay içindeki anketleri öncelikle al
         if 'parsed_date' in df_clean.columns:
@@ -156,7 +312,8 @@ class AdvancedElectionPredictor:
     def calculate_weighted_averages(self, city_name: str) -> Dict:
         """Ağırlıklı anket ortalamalarını hesaplar"""
         if city_name not in self.city_data:
-            return {}
+            # Artefakttan yüklenen çalıştırmalarda istatistikler sonuçlarla birlikte gelir
+            return self.prediction_results.get(city_name, {}).get('poll_stats', {})
         
         df = self.city_data[city_name]
         parties = ['AKP', 'CHP', 'İYİ', 'MHP', 'HDP', 'DEM', 'YRP', 'ZP']
@@ -224,69 +381,80 @@ class AdvancedElectionPredictor:
             'last_poll_date': df['parsed_date'].max() if 'parsed_date' in df.columns else None
         }
     
-    def run_monte_carlo_simulation(self, city_name: str, n_simulations: int = 50000) -> Dict:
-        """Gelişmiş Monte Carlo simülasyonu çalıştırır"""
-        
-        stats = self.calculate_weighted_averages(city_name)
-        if not stats:
-            return {}
-        
+    def _simulate_vote_draws(self, stats: Dict, n_simulations: int) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        Tüm simülasyonları parti başına tek seferde çeker.
+        (simülasyon x parti) oy matrisi ve simülasyon başına katılım oranını döndürür.
+        """
         averages = stats['averages']
         std_devs = stats['std_deviations']
-        
         parties = list(averages.keys())
-        simulations = []
         
-        for _ in range(n_simulations):
-            simulation = {}
+        draws = np.empty((n_simulations, len(parties)))
+        
+        for j, party in enumerate(parties):
+            base_vote = averages[party]
+            uncertainty = std_devs[party]
             
-            # Her parti için oy oranı simüle et
-            for party in parties:
-                base_vote = averages[party]
-                uncertainty = std_devs[party]
+            # Çoklu belirsizlik faktörlerini ekle
+            total_uncertainty = np.sqrt(
+                uncertainty**2 +
+                (base_vote * self.uncertainty_factors['poll_error'])**2 +
+                (base_vote * self.uncertainty_factors['sampling_bias'])**2 +
+                (self.uncertainty_factors['undecided_allocation'] * 10)**2 +
+                (base_vote * self.uncertainty_factors['late_swing'])**2
+            )
+            
+            # Beta dağılımı kullan (0-100 arası sınırlı)
+            if base_vote > 0:
+                mean_scaled = base_vote / 100
+                var_scaled = (total_uncertainty / 100) ** 2
+                alpha = beta = 0
                 
-                # Çoklu belirsizlik faktörlerini ekle
-                total_uncertainty = np.sqrt(
-                    uncertainty**2 +
-                    (base_vote * self.uncertainty_factors['poll_error'])**2 +
-                    (base_vote * self.uncertainty_factors['sampling_bias'])**2 +
-                    (self.uncertainty_factors['undecided_allocation'] * 10)**2 +
-                    (base_vote * self.uncertainty_factors['late_swing'])**2
-                )
+                if var_scaled > 0 and mean_scaled > 0 and mean_scaled < 1:
+                    alpha = mean_scaled * (mean_scaled * (1 - mean_scaled) / var_scaled - 1)
+                    beta = (1 - mean_scaled) * (mean_scaled * (1 - mean_scaled) / var_scaled - 1)
                 
-                # Beta dağılımı kullan (0-100 arası sınırlı)
-                if base_vote > 0:
-                    # Beta dağılımı parametreleri
-                    mean_scaled = base_vote / 100
-                    var_scaled = (total_uncertainty / 100) ** 2
-                    
-                    if var_scaled > 0 and mean_scaled > 0 and mean_scaled < 1:
-                        alpha = mean_scaled * (mean_scaled * (1 - mean_scaled) / var_scaled - 1)
-                        beta = (1 - mean_scaled) * (mean_scaled * (1 - mean_scaled) / var_scaled - 1)
-                        
-                        if alpha > 0 and beta > 0:
-                            simulated_vote = np.random.beta(alpha, beta) * 100
-                        else:
-                            simulated_vote = np.random.normal(base_vote, total_uncertainty)
-                    else:
-                        simulated_vote = np.random.normal(base_vote, total_uncertainty)
+                if alpha > 0 and beta > 0:
+                    draws[:, j] = np.random.beta(alpha, beta, n_simulations) * 100
                 else:
-                    simulated_vote = abs(np.random.normal(0, 2))
-                
-                simulation[party] = max(0, simulated_vote)
-            
-            # Toplam %100'e normalize et
-            total = sum(simulation.values())
-            if total > 0:
-                simulation = {party: (vote/total)*100 for party, vote in simulation.items()}
-                simulations.append(simulation)
+                    draws[:, j] = np.random.normal(base_vote, total_uncertainty, n_simulations)
+            else:
+                draws[:, j] = np.abs(np.random.normal(0, 2, n_simulations))
+        
+        draws = np.maximum(draws, 0)
+        
+        # Katılım: her simülasyonda örneklenen gizli değişken, partilere esnekliklerle yansır
+        turnout = np.clip(
+            np.random.normal(self.expected_turnout, self.uncertainty_factors['turnout_variation'], n_simulations),
+            0.3, 1.0
+        )
+        draws = draws * turnout_modifiers(turnout, parties)
+        
+        # Toplam %100'e normalize et
+        totals = draws.sum(axis=1)
+        valid = totals > 0
+        draws = draws[valid] / totals[valid, None] * 100
+        
+        return parties, draws, turnout[valid]
+    
+    def run_monte_carlo_simulation(self, city_name: str, n_simulations: int = 50000) -> Dict:
+        """Gelişmiş Monte Carlo simülasyonu çalıştırır"""
+        
+        stats = self.calculate_weighted_averages(city_name)
+        if not stats:
+            return {}
+        
+        parties, draws, turnout = self._simulate_vote_draws(stats, n_simulations)
+        self.simulation_draws[city_name] = draws.astype(np.float32)
+        self.turnout_draws[city_name] = turnout.astype(np.float32)
         
         # Sonuçları analiz et
-        results_df = pd.DataFrame(simulations)
+        results_df = pd.DataFrame(draws, columns=parties)
         
         analysis = {
             'city': city_name,
-            'simulations_count': len(simulations),
+            'simulations_count': len(results_df),
             'mean_votes': results_df.mean().to_dict(),
             'std_votes': results_df.std().to_dict(),
             'confidence_intervals': {},
@@ -332,14 +500,69 @@ class AdvancedElectionPredictor:
                     'close_race_prob': (abs(margins) <= 3).mean() * 100
                 }
         
+        analysis['turnout_analysis'] = self._analyze_turnout_bands(parties, draws, turnout)
+        
         return analysis
     
-    def predict_all_cities(self, n_simulations: int = 50000) -> Dict:
-        """Tüm iller için tahmin yapar"""
+    def _analyze_turnout_bands(self, parties: List[str], draws: np.ndarray, turnout: np.ndarray,
+                               edges: List[float] = TURNOUT_BAND_EDGES,
+                               labels: List[str] = TURNOUT_BAND_LABELS) -> Dict:
+        """Katılım bantlarına koşullu kazanma olasılıkları ve ortalama oylar (aynı simülasyonlardan)"""
+        n_bands, n_parties = len(labels), len(parties)
+        bands = np.digitize(turnout, edges)
+        winners = draws.argmax(axis=1)
+        
+        band_counts = np.bincount(bands, minlength=n_bands)
+        win_counts = np.bincount(bands * n_parties + winners, minlength=n_bands * n_parties)
+        win_counts = win_counts.reshape(n_bands, n_parties)
+        vote_sums = np.zeros((n_bands, n_parties))
+        np.add.at(vote_sums, bands, draws)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            win_probs = win_counts / band_counts[:, None] * 100
+            mean_votes = vote_sums / band_counts[:, None]
+        
+        turnout_analysis = {
+            'mean_turnout': float(turnout.mean()),
+            'bands': {}
+        }
+        for b, label in enumerate(labels):
+            if band_counts[b] == 0:
+                continue
+            turnout_analysis['bands'][label] = {
+                'probability': band_counts[b] / len(turnout) * 100,
+                'mean_turnout': float(turnout[bands == b].mean()),
+                'win_probabilities': {p: win_probs[b, j] for j, p in enumerate(parties) if win_counts[b, j] > 0},
+                'mean_votes': dict(zip(parties, mean_votes[b].tolist()))
+            }
+        
+        return turnout_analysis
+    
+    def analyze_turnout_rates(self, city_name: str, rates: List[float]) -> Optional[Dict]:
+        """
+        Verilen katılım oranları için bantlar: her simülasyon katılımı en yakın orana
+        atanır ("%70" bandı 0.65-0.75 arası). İlin simülasyonları bellekte yoksa None.
+        """
+        if city_name not in self.simulation_draws:
+            return None
+        rates = sorted(set(float(rate) for rate in rates))
+        edges = [(low + high) / 2 for low, high in zip(rates, rates[1:])]
+        labels = [f"%{rate * 100:g}" for rate in rates]
+        parties = list(self.prediction_results[city_name]['mean_votes'])
+        return self._analyze_turnout_bands(parties, self.simulation_draws[city_name],
+                                           self.turnout_draws[city_name], edges, labels)
+    
+    def predict_all_cities(self, n_simulations: int = 50000, on_city_complete=None) -> Dict:
+        """
+        Tüm iller için tahmin yapar.
+        on_city_complete: her il bittiğinde (il, sonuç) ile çağrılır (canlı dashboard için)
+        """
         print(f"\n🚀 {len(self.city_data)} il için Monte Carlo simülasyonu başlıyor...")
         print(f"Simülasyon sayısı: {n_simulations:,}")
         
         all_results = {}
+        if self.random_seed is not None:
+            np.random.seed(self.random_seed)
         
         for i, city_name in enumerate(self.city_data.keys(), 1):
             print(f"[{i}/{len(self.city_data)}] {city_name} analiz ediliyor...")
@@ -347,6 +570,8 @@ class AdvancedElectionPredictor:
             result = self.run_monte_carlo_simulation(city_name, n_simulations)
             if result:
                 all_results[city_name] = result
+                if on_city_complete is not None:
+                    on_city_complete(city_name, result)
                 
                 # İlk üç parti ve kazanma olasılıkları
                 top_parties = sorted(
@@ -363,185 +588,168 @@ class AdvancedElectionPredictor:
         self.prediction_results = all_results
         return all_results
     
-    def generate_comprehensive_report(self, output_dir: str = "outputs/") -> str:
-        """Kapsamlı analiz raporu oluşturur"""
+    def generate_comprehensive_report(self, output_dir: str = "outputs/", formats: List[str] = ('txt',)) -> str:
+        """
+        Kapsamlı analiz raporu oluşturur. formats: 'txt', 'markdown', 'html'
+        (ilk biçimin dosya yolu döndürülür). Değişmeyen il bölümleri önbellekten gelir.
+        """
         if not self.prediction_results:
             print("❌ Önce tahminleri çalıştırın!")
             return ""
         
-        os.makedirs(output_dir, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Rapor dosyası
-        report_file = os.path.join(output_dir, f"secim_tahmin_raporu_{timestamp}.txt")
-        
-        with open(report_file, 'w', encoding='utf-8') as f:
-            f.write("=" * 80 + "\n")
-            f.write("2024 TÜRKİYE YEREL SEÇİMLERİ TAHMİN RAPORU\n")
-            f.write("Gelişmiş Monte Carlo Simülasyon Analizi\n")
-            f.write("=" * 80 + "\n")
-            f.write(f"Oluşturulma Tarihi: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
-            f.write(f"Analiz Edilen İl Sayısı: {len(self.prediction_results)}\n")
-            f.write(f"Toplam Simülasyon: {50000:,} (il başına)\n\n")
-            
-            # Genel özet
-            f.write("GENEL ÖZET\n")
-            f.write("-" * 40 + "\n")
-            
-            # Parti kazanım sayıları
-            party_wins = {}
-            total_cities = len(self.prediction_results)
-            
-            for city, result in self.prediction_results.items():
-                top_party = max(result['win_probabilities'].items(), key=lambda x: x[1])
-                if top_party[1] > 50:  # %50'den fazla kazanma olasılığı
-                    party = top_party[0]
-                    party_wins[party] = party_wins.get(party, 0) + 1
-            
-            f.write("Parti Bazında Kazanım Projeksiyonu:\n")
-            for party, count in sorted(party_wins.items(), key=lambda x: x[1], reverse=True):
-                f.write(f"  {party}: {count} il (%{count/total_cities*100:.1f})\n")
-            
-            uncertain_count = total_cities - sum(party_wins.values())
-            f.write(f"  Belirsiz/Çekişmeli: {uncertain_count} il (%{uncertain_count/total_cities*100:.1f})\n\n")
-            
-            # İl bazında detaylar
-            f.write("İL BAZINDA DETAYLI ANALİZ\n")
-            f.write("=" * 80 + "\n\n")
-            
-            for city in sorted(self.prediction_results.keys()):
-                result = self.prediction_results[city]
-                f.write(f"{city.upper()}\n")
-                f.write("-" * len(city) + "\n")
-                
-                # En yüksek kazanma olasılıklı üç parti
-                top_parties = sorted(
-                    result['win_probabilities'].items(), 
-                    key=lambda x: x[1], 
-                    reverse=True
-                )[:3]
-                
-                f.write("Kazanma Olasılıkları:\n")
-                for i, (party, prob) in enumerate(top_parties, 1):
-                    mean_vote = result['mean_votes'][party]
-                    ci_95 = result['confidence_intervals'][party]['95%']
-                    f.write(f"  {i}. {party}: %{prob:.1f} kazanma | Oy: %{mean_vote:.1f} (95% GA: %{ci_95[0]:.1f}-%{ci_95[1]:.1f})\n")
-                
-                # Çekişme analizi
-                if len(top_parties) >= 2:
-                    first_prob = top_parties[0][1]
-                    second_prob = top_parties[1][1]
-                    
-                    if first_prob < 60:
-                        f.write(f"  ⚡ ÇEKİŞMELİ YARIŞ: İlk iki parti arasında fark az!\n")
-                    elif first_prob > 80:
-                        f.write(f"  🏆 NET ÖNDE: {top_parties[0][0]} güçlü favoride\n")
-                    else:
-                        f.write(f"  📊 KARARSIZ: Sonuç belirsiz, kampanya önemli\n")
-                
-                # Anket güvenilirliği
-                poll_count = result['poll_stats']['poll_count']
-                if poll_count < 3:
-                    f.write(f"  ⚠️  Az anket verisi ({poll_count} anket) - sonuçlar dikkatli yorumlanmalı\n")
-                elif poll_count > 10:
-                    f.write(f"  ✅ Yeterli anket verisi ({poll_count} anket) - güvenilir tahmin\n")
-                
-                f.write("\n")
-        
-        print(f"📄 Detaylı rapor oluşturuldu: {report_file}")
+        total_cities = len(self.prediction_results)
+        
+        # Parti kazanım sayıları (%50'den fazla kazanma olasılığı)
+        party_wins = SummaryTable(self.prediction_results).party_wins(MAJORITY_THRESHOLD)
+        uncertain_count = total_cities - sum(party_wins.values())
+        projection = [
+            f"{party}: {count} il (%{count/total_cities*100:.1f})"
+            for party, count in sorted(party_wins.items(), key=lambda x: x[1], reverse=True)
+        ]
+        projection.append(f"Belirsiz/Çekişmeli: {uncertain_count} il (%{uncertain_count/total_cities*100:.1f})")
+        
+        parts = [
+            title(["2024 TÜRKİYE YEREL SEÇİMLERİ TAHMİN RAPORU", "Gelişmiş Monte Carlo Simülasyon Analizi"]),
+            line(f"Oluşturulma Tarihi: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}"),
+            line(f"Analiz Edilen İl Sayısı: {total_cities}"),
+            line(f"Toplam Simülasyon: {50000:,} (il başına)"),
+            blank(),
+            heading("GENEL ÖZET"),
+            line("Parti Bazında Kazanım Projeksiyonu:"),
+            items(projection),
+            blank(),
+            heading("İL BAZINDA DETAYLI ANALİZ", 1),
+        ]
+        parts += [
+            Section(_province_report_record(city, self.prediction_results[city]), _province_report_blocks)
+            for city in sorted(self.prediction_results)
+        ]
+        
+        report_files = write_report(parts, output_dir, f"secim_tahmin_raporu_{timestamp}",
+                                    'secim_tahmin_raporu', formats)
+        report_file = report_files[0]
+        print(f"📄 Detaylı rapor oluşturuldu: {', '.join(report_files)}")
         return report_file
     
-    def create_visualizations(self, output_dir: str = "outputs/graphs/"):
-        """Görsel analizler oluşturur"""
+    def create_visualizations(self, output_dir: str = "outputs/graphs/", charts: List[str] = None,
+                              profile: str = None) -> Dict[str, str]:
+        """Görsel analizler oluşturur (charts: yalnızca istenen grafik adları, profile: çizim profili)"""
         if not self.prediction_results:
             print("❌ Önce tahminleri çalıştırın!")
-            return
-        
-        os.makedirs(output_dir, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # 1. Genel kazanma olasılıkları haritası
-        plt.figure(figsize=(15, 10))
-        
-        # Şehir isimleri ve en yüksek olasılıklı parti
-        cities = []
-        winning_parties = []
-        win_probs = []
-        
-        for city, result in self.prediction_results.items():
-            top_party = max(result['win_probabilities'].items(), key=lambda x: x[1])
-            cities.append(city)
-            winning_parties.append(top_party[0])
-            win_probs.append(top_party[1])
-        
-        # Renk haritası
-        unique_parties = list(set(winning_parties))
-        colors = plt.cm.Set1(np.linspace(0, 1, len(unique_parties)))
-        party_colors = dict(zip(unique_parties, colors))
-        
-        city_colors = [party_colors[party] for party in winning_parties]
-        
-        # Bar chart
-        plt.barh(range(len(cities)), win_probs, color=city_colors)
-        plt.yticks(range(len(cities)), cities)
-        plt.xlabel('Kazanma Olasılığı (%)')
-        plt.title('İl Bazında Kazanma Olasılıkları - 2024 Yerel Seçimler')
-        plt.grid(axis='x', alpha=0.3)
-        
-        # Efsane
-        legend_elements = [plt.Rectangle((0,0),1,1, facecolor=party_colors[party], label=party) 
-                          for party in unique_parties]
-        plt.legend(handles=legend_elements, loc='lower right')
-        
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, f'kazanma_olasiliklari_{timestamp}.png'), 
-                   dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        # 2. Parti bazında genel durum
-        plt.figure(figsize=(12, 8))
-        
-        party_total_wins = {}
-        for result in self.prediction_results.values():
-            for party, prob in result['win_probabilities'].items():
-                if prob > 50:  # %50'den fazla kazanma olasılığı
-                    party_total_wins[party] = party_total_wins.get(party, 0) + 1
-        
-        if party_total_wins:
-            parties = list(party_total_wins.keys())
-            win_counts = list(party_total_wins.values())
-            
-            plt.pie(win_counts, labels=parties, autopct='%1.1f%%', startangle=90)
-            plt.title('Parti Bazında İl Kazanım Oranları')
+            return {}
         
-        plt.savefig(os.path.join(output_dir, f'parti_dagilimi_{timestamp}.png'), 
-                   dpi=300, bbox_inches='tight')
-        plt.close()
+        # Şehir isimleri, en yüksek olasılıklı parti ve parti bazında il kazanımları
+        table = SummaryTable(self.prediction_results)
+        
+        # Sınır dosyası varsa gerçek il haritası; geometri önbellekten okunur, yalnızca renkler değişir
+        geometry_cache = geometry_cache_path()
+        if geometry_cache is None:
+            print("ℹ️  İl sınır dosyası bulunamadı (data/geo/turkiye_iller.geojson); harita çizilmedi "
+                  "(indirmek için: python province_map.py download)")
+        
+        jobs = [
+            ChartJob('win_probabilities', _plot_win_probabilities,
+                     {'cities': table.provinces.index.tolist(),
+                      'winning_parties': table.provinces['leading_party'].tolist(),
+                      'win_probs': table.provinces['top_win_prob'].tolist()},
+                     'kazanma_olasiliklari'),
+            ChartJob('party_distribution', _plot_party_distribution,
+                     {'party_total_wins': table.party_wins(MAJORITY_THRESHOLD)}, 'parti_dagilimi'),
+        ]
+        if geometry_cache is not None:
+            jobs.append(ChartJob('win_probability_map', _plot_win_probability_map, {
+                'geometry_cache': geometry_cache,
+                'provinces': {city: (row.leading_party, row.top_win_prob)
+                              for city, row in table.provinces.iterrows()},
+            }, 'kazanma_olasiliklari_haritasi'))
+        paths = ChartPipeline(output_dir, profile=profile).run(jobs, only=charts)
         
         print(f"📊 Görsel analizler oluşturuldu: {output_dir}")
+        return paths
     
-    def save_detailed_results(self, output_dir: str = "outputs/data/"):
-        """Detaylı sonuçları JSON formatında kaydeder"""
-        os.makedirs(output_dir, exist_ok=True)
+    def save_detailed_results(self, output_dir: str = "outputs/data/", pretty: bool = False) -> str:
+        """
+        Detaylı sonuçları il başına bir satır olarak JSON Lines formatında kaydeder.
+        pretty=True ise insanlar için girintili JSON kopyası da yazılır.
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_file = os.path.join(output_dir, f'detayli_sonuclar_{timestamp}.jsonl')
         
-        # JSON serileştirme için datetime objelerini string'e çevir
-        serializable_results = {}
-        for city, result in self.prediction_results.items():
-            serializable_result = result.copy()
-            if 'poll_stats' in serializable_result and 'last_poll_date' in serializable_result['poll_stats']:
-                last_date = serializable_result['poll_stats']['last_poll_date']
-                if last_date and not pd.isna(last_date):
-                    serializable_result['poll_stats']['last_poll_date'] = last_date.strftime('%Y-%m-%d')
-                else:
-                    serializable_result['poll_stats']['last_poll_date'] = None
-            serializable_results[city] = serializable_result
+        with ResultsStreamWriter(output_file) as writer:
+            writer.write_all(self.prediction_results)
         
-        output_file = os.path.join(output_dir, f'detayli_sonuclar_{timestamp}.json')
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(serializable_results, f, ensure_ascii=False, indent=2)
+        if pretty:
+            export_pretty_json(output_file, output_file[:-len('.jsonl')] + '.json')
         
         print(f"💾 Detaylı sonuçlar kaydedildi: {output_file}")
+        return output_file
+
+    def draw_matrix(self) -> Tuple[List[str], List[str], np.ndarray, np.ndarray]:
+        """
+        İl simülasyonlarını ortak eksenlere dizer: (il, simülasyon, parti) oy oranları ve
+        (il, simülasyon) katılım. İllerde geçersiz simülasyon elenmiş olabileceğinden
+        ortak (en küçük) simülasyon sayısına kırpılır; ilde olmayan partinin oyu 0'dır.
+        """
+        provinces = [city for city in self.prediction_results if city in self.simulation_draws]
+        parties = list(dict.fromkeys(
+            party for city in provinces for party in self.prediction_results[city]['mean_votes']))
+        n_sims = min((len(self.simulation_draws[city]) for city in provinces), default=0)
+        
+        vote_shares = np.zeros((len(provinces), n_sims, len(parties)), dtype=np.float32)
+        turnout = np.zeros((len(provinces), n_sims), dtype=np.float32)
+        for i, city in enumerate(provinces):
+            columns = [parties.index(party) for party in self.prediction_results[city]['mean_votes']]
+            vote_shares[i][:, columns] = self.simulation_draws[city][:n_sims]
+            turnout[i] = self.turnout_draws[city][:n_sims]
+        return provinces, parties, vote_shares, turnout
+    
+    def save_results_artifact(self, runs_dir: str = DEFAULT_RUNS_DIR, tags: List[str] = (),
+                              catalog_path: str = DEFAULT_CATALOG_PATH, save_draws: Optional[bool] = None) -> ResultsArtifact:
+        """
+        Tahmin sonuçlarını sürümlü çalıştırma artefaktına ('predictions' aşaması) yazar
+        ve çalıştırmayı çıktı kataloğuna kaydeder. save_draws: simülasyon matrisleri de
+        ('draws' aşaması) yazılır; sonradan sorgu yapılabilmesi için gereklidir. Verilmezse
+        SAVE_DRAWS ortam değişkeni ('1') belirler; varsayılan olarak yazılmaz.
+        """
+        if not self.prediction_results:
+            print("❌ Önce tahminleri çalıştırın!")
+            return None
+        
+        csv_files = glob.glob(os.path.join(self.data_path, "*.csv"))
+        config = {
+            'n_simulations': max(r['simulations_count'] for r in self.prediction_results.values()),
+            'uncertainty_factors': self.uncertainty_factors,
+            'data_path': self.data_path,
+            'random_seed': self.random_seed,
+        }
+        
+        artifact = ResultsArtifact.create(runs_dir, config=config, input_hash=hash_input_files(csv_files))
+        artifact.write_stage(
+            'predictions',
+            predictions_to_columns(self.prediction_results),
+            producer='advanced_election_predictor'
+        )
+        if save_draws is None:
+            save_draws = os.environ.get(SAVE_DRAWS_ENV_VAR) == '1'
+        if save_draws and self.simulation_draws:
+            provinces, parties, vote_shares, turnout = self.draw_matrix()
+            artifact.write_draws(provinces, parties, vote_shares, turnout, producer='advanced_election_predictor')
+        artifact.mark_latest()
+        
+        catalog = OutputsCatalog(catalog_path)
+        catalog.register_run(artifact, tags=tags)
+        catalog.close()
+        
+        print(f"💾 Sonuç artefaktı kaydedildi: {artifact.run_dir} (run: {artifact.run_id})")
+        return artifact
+    
+    def load_results_artifact(self, run_id: str = None, runs_dir: str = DEFAULT_RUNS_DIR) -> ResultsArtifact:
+        """Kayıtlı bir çalıştırmanın tahminlerini yeniden hesaplamadan yükler"""
+        artifact = ResultsArtifact.open(run_id, runs_dir)
+        self.prediction_results = columns_to_predictions(artifact.read_stage('predictions'))
+        print(f"✓ Tahminler artefakttan yüklendi: {artifact.run_id} ({len(self.prediction_results)} il)")
+        return artifact
 
 def main():
     """Ana çalıştırma fonksiyonu"""
@@ -559,9 +767,12 @@ def main():
         print("❌ Hiç veri yüklenemedi! Veri dosyalarını kontrol edin.")
         return
     
-    # Tahminleri çalıştır
+    # Tahminleri çalıştır (iller tamamlandıkça detaylı sonuçlara yazılır)
     print("\n🎯 Monte Carlo simülasyonları başlıyor...")
-    results = predictor.predict_all_cities(n_simulations=50000)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    results_file = os.path.join("outputs/data/", f'detayli_sonuclar_{timestamp}.jsonl')
+    with ResultsStreamWriter(results_file) as writer:
+        results = predictor.predict_all_cities(n_simulations=50000, on_city_complete=writer.write)
     
     if not results:
         print("❌ Tahmin hesaplanamadı!")
@@ -572,10 +783,20 @@ def main():
     report_file = predictor.generate_comprehensive_report()
     
     print("\n📊 Görsel analizler oluşturuluyor...")
-    predictor.create_visualizations()
+    chart_files = predictor.create_visualizations()
     
     print("\n💾 Detaylı sonuçlar kaydediliyor...")
-    predictor.save_detailed_results()
+    print(f"💾 Detaylı sonuçlar kaydedildi: {results_file}")
+    artifact = predictor.save_results_artifact()
+    
+    # Üretilen dosyaları çalıştırmayla birlikte kataloğa ekle
+    catalog = OutputsCatalog()
+    catalog.add_artifacts(artifact.run_id, {
+        'report': report_file,
+        'detailed_results': results_file,
+        **{f'chart:{name}': path for name, path in chart_files.items()}
+    })
+    catalog.close()
     
     print("\n✅ Analiz tamamlandı!")
     print(f"📁 Sonuçlar 'outputs/' klasöründe")
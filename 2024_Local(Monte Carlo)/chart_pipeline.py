@@ -0,0 +1,182 @@
+"""
+Paralel ve Tembel Grafik Üretim Hattı
+2024 Türkiye Yerel Seçimleri için
+
+Her grafik, girdi verisi ve çizim fonksiyonuyla bir iş (ChartJob) olarak
+tanımlanır. Girdi özeti önceki üretimle aynı olan grafikler yeniden
+çizilmez; kalan işler süreç havuzunda paralel çizilir. Çağıran taraf
+yalnızca istediği grafikleri seçebilir.
+
+Çözünürlük ve dosya biçimi çalıştırma başına bir çizim profiliyle seçilir
+(CHART_PROFILE ortam değişkeni veya `profile` parametresi):
+
+    draft        72 DPI PNG önizleme; tablo gibi ağır grafikler atlanır
+    publication  300 DPI PNG (varsayılan)
+    svg          vektörel SVG
+
+    <output_dir>/.chart_manifest.json   # grafik adı:profil -> girdi özeti ve dosya yolu
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Çizim mantığı değiştiğinde artırılır; eski grafikler yeniden üretilir
+CHART_PIPELINE_VERSION = 2
+MANIFEST_NAME = '.chart_manifest.json'
+PROFILE_ENV_VAR = 'CHART_PROFILE'
+DEFAULT_PROFILE = 'publication'
+
+
+class RenderProfile:
+    """Çizim profili: çözünürlük, dosya biçimi ve ağır grafiklerin atlanıp atlanmayacağı"""
+
+    def __init__(self, name: str, dpi: int, file_format: str = 'png', skip_heavy: bool = False):
+        self.name = name
+        self.dpi = dpi
+        self.file_format = file_format
+        self.skip_heavy = skip_heavy
+
+
+RENDER_PROFILES = {
+    'draft': RenderProfile('draft', 72, 'png', skip_heavy=True),
+    'publication': RenderProfile('publication', 300, 'png'),
+    # SVG'de DPI yalnızca gömülü raster öğeleri (ör. ısı haritası hücreleri) etkiler
+    'svg': RenderProfile('svg', 100, 'svg'),
+}
+
+
+def get_profile(profile: Optional[str] = None) -> RenderProfile:
+    """Profil adı verilmezse CHART_PROFILE ortam değişkeni, o da yoksa 'publication' kullanılır"""
+    name = profile or os.environ.get(PROFILE_ENV_VAR) or DEFAULT_PROFILE
+    if name not in RENDER_PROFILES:
+        raise ValueError(f"Bilinmeyen çizim profili: {name} (seçenekler: {', '.join(RENDER_PROFILES)})")
+    return RENDER_PROFILES[name]
+
+
+class ChartJob:
+    """
+    Tek bir grafik işi.
+
+    render: modül düzeyinde `render(data, path, dpi)` fonksiyonu (süreçler arası taşınabilmeli)
+    data: grafiğin tüm girdileri (yalnızca bu veri değişirse grafik yeniden çizilir)
+    filename: dosya adı öneki; çıktı `<filename>_<zaman damgası>.<biçim>` olur
+    dpi: verilirse profilin çözünürlüğü yerine kullanılır
+    heavy: çizimi yavaş grafik (ör. matplotlib tablosu); taslak profilde atlanır
+    """
+
+    def __init__(self, name: str, render: Callable, data: Dict, filename: str,
+                 dpi: Optional[int] = None, heavy: bool = False):
+        self.name = name
+        self.render = render
+        self.data = data
+        self.filename = filename
+        self.dpi = dpi
+        self.heavy = heavy
+
+    def input_hash(self, dpi: int, file_format: str) -> str:
+        """Çizim fonksiyonu, çözünürlük, biçim ve girdi verisinin içerik özeti"""
+        digest = hashlib.sha256()
+        digest.update(f"{CHART_PIPELINE_VERSION}:{self.render.__module__}.{self.render.__qualname__}:"
+                      f"{dpi}:{file_format}".encode('utf-8'))
+        digest.update(pickle.dumps(self.data, protocol=4))
+        return digest.hexdigest()
+
+
+def _render_job(render: Callable, data: Dict, path: str, dpi: int) -> str:
+    """Süreç havuzunda tek bir grafiği çizer"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    try:
+        render(data, path, dpi)
+    finally:
+        plt.close('all')
+    return path
+
+
+class ChartPipeline:
+    """Grafik işlerini girdi özetine göre atlayan, kalanları paralel çizen hat"""
+
+    def __init__(self, output_dir: str = "outputs/graphs/", max_workers: Optional[int] = None,
+                 profile: Optional[str] = None):
+        self.output_dir = output_dir
+        self.max_workers = max_workers
+        self.profile = get_profile(profile)
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+
+    def _load_manifest(self) -> Dict:
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, manifest: Dict):
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def run(self, jobs: Iterable[ChartJob], only: Optional[List[str]] = None, force: bool = False,
+            skip_heavy: Optional[bool] = None) -> Dict[str, str]:
+        """
+        İşleri çalıştırır ve grafik adı -> dosya yolu sözlüğü döndürür.
+
+        only: yalnızca bu adlardaki grafikler (None ise hepsi)
+        force: girdi değişmemiş olsa da yeniden çiz
+        skip_heavy: ağır grafikleri atla (None ise profile göre; `only` ile açıkça istenenler çizilir)
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        profile = self.profile
+        if skip_heavy is None:
+            skip_heavy = profile.skip_heavy
+
+        jobs = [job for job in jobs if only is None or job.name in only]
+        heavy_skipped = [job.name for job in jobs if skip_heavy and job.heavy and only is None]
+        jobs = [job for job in jobs if job.name not in heavy_skipped]
+        manifest = self._load_manifest()
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        paths, pending = {}, []
+        for job in jobs:
+            dpi = job.dpi or profile.dpi
+            input_hash = job.input_hash(dpi, profile.file_format)
+            # Her profilin çıktısı ayrı tutulur; profil değiştirmek diğerini geçersiz kılmaz
+            key = f"{job.name}:{profile.name}"
+            entry = manifest.get(key)
+            if not force and entry and entry['input_hash'] == input_hash and os.path.exists(entry['path']):
+                paths[job.name] = entry['path']
+                continue
+            path = os.path.join(self.output_dir, f"{job.filename}_{timestamp}.{profile.file_format}")
+            pending.append((job, key, input_hash, path, dpi))
+
+        workers = min(len(pending), self.max_workers or os.cpu_count() or 1)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_render_job, job.render, job.data, path, dpi)
+                           for job, _, _, path, dpi in pending]
+                for future in futures:
+                    future.result()
+        else:
+            for job, _, _, path, dpi in pending:
+                _render_job(job.render, job.data, path, dpi)
+
+        for job, key, input_hash, path, _ in pending:
+            manifest[key] = {'input_hash': input_hash, 'path': path}
+            paths[job.name] = path
+
+        if pending:
+            self._save_manifest(manifest)
+
+        skipped = len(jobs) - len(pending)
+        if skipped:
+            print(f"♻️  {skipped} grafik değişmedi, yeniden çizilmedi")
+        if heavy_skipped:
+            print(f"⏭️  Ağır grafikler atlandı ({profile.name} profili): {', '.join(heavy_skipped)}")
+        return paths
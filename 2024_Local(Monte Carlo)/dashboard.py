@@ -12,10 +12,165 @@ import seaborn as sns
 from datetime import datetime
 import json
 import os
+import sys
 from pathlib import Path
 import warnings
+from chart_pipeline import ChartJob, ChartPipeline
+from draw_query import DrawQuery
+from risk_scoring import build_risk_metrics, score_risk
+from summary_table import MAJORITY_THRESHOLD, SAFE_THRESHOLD, SummaryTable
+from outputs_catalog import OutputsCatalog
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # Depo kökü (election_common)
+from election_common.report_templates import blank, heading, items, line, table, title, write_report
+from run_history import DEFAULT_HISTORY_LIMIT, RunHistory
+from results_stream import read_results
+from results_artifact import ArtifactError, ResultsArtifact, columns_to_predictions, columns_to_risk_table
 warnings.filterwarnings('ignore')
 
+def _plot_national_overview(data: dict, path: str, dpi: int):
+    """Parti bazında il dağılımı (pasta grafiği)"""
+    plt.figure(figsize=(12, 8))
+    
+    party_wins = dict(data['party_wins'])
+    total_analyzed = data['total_analyzed']
+    if party_wins:
+        # Belirsiz iller
+        certain_wins = sum(party_wins.values())
+        uncertain = total_analyzed - certain_wins
+        
+        if uncertain > 0:
+            party_wins['Belirsiz/Çekişmeli'] = uncertain
+        
+        # Pasta grafiği
+        colors = plt.cm.Set3(np.linspace(0, 1, len(party_wins)))
+        wedges, texts, autotexts = plt.pie(party_wins.values(), labels=party_wins.keys(), 
+                                          autopct='%1.1f%%', colors=colors, startangle=90)
+        
+        plt.title('2024 Yerel Seçimler - Parti Bazında İl Dağılımı Projeksiyonu', fontsize=14, pad=20)
+        
+        # İstatistikleri ekle
+        plt.figtext(0.02, 0.02, f'Toplam {total_analyzed} il analiz edildi', fontsize=10)
+        plt.figtext(0.02, 0.05, f'Kesin sonuç: {certain_wins} il (%{certain_wins/total_analyzed*100:.1f})', fontsize=10)
+    
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def _plot_probability_distribution(data: dict, path: str, dpi: int):
+    """İllerdeki en yüksek kazanma olasılıkları histogramı"""
+    plt.figure(figsize=(14, 8))
+    
+    plt.hist(data['probabilities'], bins=20, alpha=0.7, color='skyblue', edgecolor='black')
+    plt.xlabel('En Yüksek Kazanma Olasılığı (%)')
+    plt.ylabel('İl Sayısı')
+    plt.title('İllerdeki Kazanma Olasılıkları Dağılımı')
+    plt.grid(axis='y', alpha=0.3)
+    
+    # Kritik eşik çizgileri
+    plt.axvline(x=50, color='red', linestyle='--', alpha=0.7, label='Çekişmeli Eşik (%50)')
+    plt.axvline(x=70, color='green', linestyle='--', alpha=0.7, label='Güvenli Eşik (%70)')
+    plt.legend()
+    
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def _plot_competitive_table(data: dict, path: str, dpi: int):
+    """En çekişmeli 20 il tablosu"""
+    table_data = data['table_data']
+    fig, ax = plt.subplots(figsize=(16, 10))
+    ax.axis('tight')
+    ax.axis('off')
+    
+    if table_data:
+        table = ax.table(cellText=table_data,
+                        colLabels=['İl', 'Önde Olan Parti', 'Kazanma Olasılığı', 'Fark'],
+                        cellLoc='center',
+                        loc='center')
+        
+        table.auto_set_font_size(False)
+        table.set_fontsize(9)
+        table.scale(1.2, 1.5)
+        
+        # Başlık çizgileri renklendir
+        for i in range(len(table_data[0])):
+            table[(0, i)].set_facecolor('#4CAF50')
+            table[(0, i)].set_text_props(weight='bold', color='white')
+    
+    plt.title('En Çekişmeli 20 İl - Detaylı Analiz', fontsize=16, pad=20)
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def _plot_party_comparison(data: dict, path: str, dpi: int):
+    """Parti bazında il kazanım projeksiyonu"""
+    plt.figure(figsize=(16, 10))
+    
+    parties, prediction_2024 = data['parties'], data['prediction_2024']
+    x = np.arange(len(parties))
+    width = 0.35
+    
+    plt.bar(x, prediction_2024, width, label='2024 Tahmin', alpha=0.8)
+    plt.xlabel('Partiler')
+    plt.ylabel('Kazanılan İl Sayısı')
+    plt.title('2024 Yerel Seçimler - Parti Bazında İl Kazanım Projeksiyonu')
+    plt.xticks(x, parties, rotation=45)
+    plt.legend()
+    plt.grid(axis='y', alpha=0.3)
+    
+    # Değerleri grafiğin üstüne ekle
+    for i, v in enumerate(prediction_2024):
+        plt.text(i, v + 0.5, str(v), ha='center', va='bottom', fontweight='bold')
+    
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def _plot_run_drift(data: dict, path: str, dpi: int):
+    """Çalıştırmalar boyunca parti bazında il kazanımı ve ortalama oy oranı"""
+    fig, (ax_seats, ax_votes) = plt.subplots(2, 1, figsize=(16, 12), sharex=True)
+    
+    x = np.arange(len(data['run_ids']))
+    for party in data['parties']:
+        ax_seats.plot(x, data['seats'][party], marker='o', label=party)
+        ax_votes.plot(x, data['vote_share'][party], marker='o', label=party)
+    
+    ax_seats.set_ylabel('Kazanılan İl Sayısı (olasılık > %50)')
+    ax_seats.set_title('Çalıştırmalar Arası Sapma - Parti Bazında Projeksiyon')
+    ax_seats.legend(ncol=4)
+    ax_seats.grid(alpha=0.3)
+    
+    ax_votes.set_ylabel('Ortalama Oy Oranı (%)')
+    ax_votes.grid(alpha=0.3)
+    ax_votes.set_xticks(x)
+    ax_votes.set_xticklabels(data['run_ids'], rotation=45, ha='right', fontsize=8)
+    ax_votes.set_xlabel('Çalıştırma')
+    
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def _plot_province_drift(data: dict, path: str, dpi: int):
+    """En çok değişen illerde ilk ve son çalıştırma arası kazanma olasılığı farkı"""
+    deltas = pd.DataFrame(data['deltas'], index=data['provinces'], columns=data['parties'])
+    plt.figure(figsize=(14, max(6, len(deltas) * 0.45)))
+    
+    limit = max(float(np.nanmax(np.abs(deltas.to_numpy()))), 1.0) if deltas.size else 1.0
+    sns.heatmap(deltas, cmap='RdBu_r', center=0, vmin=-limit, vmax=limit,
+                annot=True, fmt='+.1f', cbar_kws={'label': 'Kazanma olasılığı farkı (puan)'})
+    plt.title(f"En Çok Değişen İller: {data['baseline']} → {data['target']}", fontsize=14, pad=20)
+    plt.xlabel('Parti')
+    plt.ylabel('İl')
+    
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
 class ElectionDashboard:
     """Seçim sonuçları için kapsamlı dashboard ve rapor sistemi"""
     
@@ -23,73 +178,123 @@ class ElectionDashboard:
         self.outputs_dir = outputs_dir
         self.results = {}
         self.scenarios = {}
-        
-    def load_analysis_results(self):
-        """Tüm analiz sonuçlarını yükler"""
+        self.risk_table = None
+        self.artifact = None
+        self.summary_table = None
+        self._summary_source = None
+        self.run_history = None
+        self.draw_query = None
+        
+    def load_analysis_results(self, run_id: str = None, tag: str = None):
+        """
+        Tüm analiz sonuçlarını yükler. Çalıştırma çıktı kataloğundan bulunur
+        (kimlik, etiket veya en yeni); artefakt yoksa katalogdaki en yeni JSON okunur.
+        """
+        
+        catalog = OutputsCatalog(os.path.join(self.outputs_dir, "catalog.sqlite"))
+        explicit_run = run_id is not None
+        if run_id is None:
+            run = catalog.latest_run(tag)
+            if run is not None:
+                run_id = run['run_id']
+            elif tag is not None:
+                catalog.close()
+                raise ArtifactError(f"'{tag}' etiketli çalıştırma bulunamadı")
+        
+        try:
+            self.artifact = ResultsArtifact.open(run_id, os.path.join(self.outputs_dir, "runs"))
+            self.results = columns_to_predictions(self.artifact.read_stage('predictions'))
+            print(f"✓ Ana sonuçlar yüklendi: run {self.artifact.run_id}")
+            
+            if self.artifact.has_stage('scenarios'):
+                self.scenarios = {'risk_table': columns_to_risk_table(self.artifact.read_stage('scenarios'))}
+                print(f"✓ Senaryo analizi bulundu: run {self.artifact.run_id}")
+            catalog.close()
+            return
+        except ArtifactError as e:
+            if explicit_run:
+                catalog.close()
+                raise
+            print(f"⚠ {e} - JSON sonuçlarına geri dönülüyor")
+        
+        # Katalog öncesi çıktılar bir kez indekslenir, sonrası klasör taramadan bulunur
+        if catalog.latest_artifact('detailed_results') is None:
+            catalog.reindex(os.path.join(self.outputs_dir, "runs"), self.outputs_dir)
         
         # Ana tahmin sonuçlarını yükle
-        data_files = list(Path(self.outputs_dir + "data/").glob("detayli_sonuclar_*.json"))
-        if data_files:
-            latest_results = max(data_files, key=os.path.getctime)
-            with open(latest_results, 'r', encoding='utf-8') as f:
-                self.results = json.load(f)
-            print(f"✓ Ana sonuçlar yüklendi: {latest_results.name}")
+        latest_results = (catalog.latest_artifact('detailed_results')
+                          or catalog.latest_artifact('legacy:detayli_sonuclar'))
+        if latest_results:
+            if latest_results.endswith('.jsonl'):
+                self.results = read_results(latest_results)
+            else:
+                with open(latest_results, 'r', encoding='utf-8') as f:
+                    self.results = json.load(f)
+            print(f"✓ Ana sonuçlar yüklendi: {os.path.basename(latest_results)}")
         
         # Senaryo sonuçlarını yükle (varsa)
-        scenario_files = list(Path(self.outputs_dir).glob("senaryo_analizi_raporu_*.txt"))
-        if scenario_files:
-            latest_scenario = max(scenario_files, key=os.path.getctime)
-            print(f"✓ Senaryo analizi bulundu: {latest_scenario.name}")
+        latest_scenario = (catalog.latest_artifact('scenario_report')
+                           or catalog.latest_artifact('legacy:senaryo_analizi_raporu'))
+        if latest_scenario:
+            print(f"✓ Senaryo analizi bulundu: {os.path.basename(latest_scenario)}")
+        catalog.close()
+    
+    def query(self, expression: str, given: str = None) -> dict:
+        """
+        Yüklenen çalıştırmanın simülasyon matrisi üzerinde sorgu, ör.
+        query("wins('CHP', 'Ankara') & wins('CHP', 'İstanbul')")
+        """
+        if self.artifact is None:
+            raise ArtifactError("Sorgu için önce bir çalıştırma artefaktı yüklenmeli")
+        if self.draw_query is None or self.draw_query.run_id != self.artifact.run_id:
+            self.draw_query = DrawQuery.from_artifact(self.artifact)
+        return self.draw_query.evaluate(expression, given)
+    
+    def get_summary_table(self) -> SummaryTable:
+        """İl x parti kazanma olasılığı tablosu (sonuçlar değişmedikçe bir kez oluşturulur)"""
+        if self.summary_table is None or self._summary_source is not self.results:
+            self.summary_table = SummaryTable(self.results)
+            self._summary_source = self.results
+        return self.summary_table
+    
+    def build_risk_table(self):
+        """Yüklü sonuçlardan il x risk metriği tablosunu oluşturur (senaryo analizi ile aynı skorlama)"""
+        
+        metrics = build_risk_metrics(self.results, summary=self.get_summary_table())
+        
+        # Senaryo analizi yapılmış illerde senaryo duyarlılığı artefakttan gelir
+        scenario_table = self.scenarios.get('risk_table')
+        if scenario_table is not None:
+            counts = scenario_table['scenario_winner_count'].reindex(metrics.index)
+            metrics['scenario_winner_count'] = counts.fillna(metrics['scenario_winner_count'])
+        
+        self.risk_table = score_risk(metrics)
+        return self.risk_table
     
     def create_executive_summary(self) -> dict:
-        """Üst düzey yönetici özeti oluşturur"""
+        """Üst düzey yönetici özeti oluşturur (tüm metrikler özet tablosundan)"""
         
         if not self.results:
             return {}
         
+        table = self.get_summary_table()
+        
+        # Parti performansı: güçlü favoriler (%60 üstü) ve çekişmeli yarışlar (%40-60)
+        party_wins = table.party_wins(SAFE_THRESHOLD)
+        competitive_cities = table.competitive_races()
+        
         summary = {
-            'total_cities': len(self.results),
+            'total_cities': len(table),
             'analysis_date': datetime.now().strftime('%d/%m/%Y'),
-            'party_performance': {},
-            'competitive_races': [],
-            'safe_seats': [],
+            'party_performance': party_wins,
+            'competitive_races': competitive_cities[:10],
+            'safe_seats': table.safe_seats(),
             'key_insights': [],
             'risk_alerts': []
         }
         
-        # Parti performansı
-        party_wins = {}
-        competitive_cities = []
-        safe_cities = []
-        
-        for city, result in self.results.items():
-            # En yüksek kazanma olasılığı
-            top_party = max(result['win_probabilities'].items(), key=lambda x: x[1])
-            party = top_party[0]
-            probability = top_party[1]
-            
-            # Parti kazanımları
-            if probability > 60:  # Güçlü favoriler
-                party_wins[party] = party_wins.get(party, 0) + 1
-                safe_cities.append({
-                    'city': city,
-                    'party': party,
-                    'probability': probability
-                })
-            elif probability > 40:  # Çekişmeli
-                competitive_cities.append({
-                    'city': city,
-                    'leading_party': party,
-                    'probability': probability,
-                    'margin': probability - sorted(result['win_probabilities'].values(), reverse=True)[1]
-                })
-        
-        summary['party_performance'] = party_wins
-        summary['competitive_races'] = sorted(competitive_cities, key=lambda x: x['margin'])[:10]
-        summary['safe_seats'] = safe_cities
-        
         # Ana bulgular
-        total_cities = len(self.results)
+        total_cities = len(table)
         competitive_count = len(competitive_cities)
         
         summary['key_insights'] = [
@@ -100,244 +305,121 @@ class ElectionDashboard:
         ]
         
         # Risk uyarıları
-        high_risk_cities = []
-        low_poll_cities = []
-        
-        for city, result in self.results.items():
-            poll_count = result['poll_stats']['poll_count']
-            top_prob = max(result['win_probabilities'].values())
-            
-            if poll_count < 5:
-                low_poll_cities.append(city)
-            
-            if top_prob < 45:
-                high_risk_cities.append(city)
+        risk_table = self.build_risk_table()
         
         summary['risk_alerts'] = [
-            f"{len(low_poll_cities)} ilde yetersiz anket verisi",
-            f"{len(high_risk_cities)} ilde yüksek belirsizlik",
+            f"{len(table.low_poll_cities())} ilde yetersiz anket verisi",
+            f"{len(table.uncertain_cities())} ilde yüksek belirsizlik",
+            f"{int((risk_table['risk_level'] == 'Yüksek').sum())} il yüksek risk seviyesinde",
             "Son dakika gelişmeleri sonuçları değiştirebilir"
         ]
         
         return summary
     
-    def create_national_overview(self, output_dir: str = "outputs/graphs/"):
-        """Ulusal genel bakış görselleri"""
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # 1. Parti bazında il dağılımı (pasta grafiği)
-        plt.figure(figsize=(12, 8))
-        
-        party_wins = {}
-        for city, result in self.results.items():
-            top_party = max(result['win_probabilities'].items(), key=lambda x: x[1])
-            if top_party[1] > 50:  # %50'den fazla kazanma olasılığı
-                party = top_party[0]
-                party_wins[party] = party_wins.get(party, 0) + 1
-        
-        if party_wins:
-            # Belirsiz iller
-            total_analyzed = len(self.results)
-            certain_wins = sum(party_wins.values())
-            uncertain = total_analyzed - certain_wins
-            
-            if uncertain > 0:
-                party_wins['Belirsiz/Çekişmeli'] = uncertain
-            
-            # Pasta grafiği
-            colors = plt.cm.Set3(np.linspace(0, 1, len(party_wins)))
-            wedges, texts, autotexts = plt.pie(party_wins.values(), labels=party_wins.keys(), 
-                                              autopct='%1.1f%%', colors=colors, startangle=90)
-            
-            plt.title('2024 Yerel Seçimler - Parti Bazında İl Dağılımı Projeksiyonu', fontsize=14, pad=20)
-            
-            # İstatistikleri ekle
-            plt.figtext(0.02, 0.02, f'Toplam {total_analyzed} il analiz edildi', fontsize=10)
-            plt.figtext(0.02, 0.05, f'Kesin sonuç: {certain_wins} il (%{certain_wins/total_analyzed*100:.1f})', fontsize=10)
-        
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, f'ulusal_genel_bakis_{timestamp}.png'), 
-                   dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        # 2. Kazanma olasılıkları histogram
-        plt.figure(figsize=(14, 8))
-        
-        all_probabilities = []
-        party_colors = {}
-        color_map = plt.cm.Set1(np.linspace(0, 1, 8))
-        
-        for i, party in enumerate(['AKP', 'CHP', 'İYİ', 'MHP', 'HDP', 'DEM', 'YRP', 'ZP']):
-            party_colors[party] = color_map[i]
-        
-        for city, result in self.results.items():
-            top_party = max(result['win_probabilities'].items(), key=lambda x: x[1])
-            all_probabilities.append(top_party[1])
-        
-        plt.hist(all_probabilities, bins=20, alpha=0.7, color='skyblue', edgecolor='black')
-        plt.xlabel('En Yüksek Kazanma Olasılığı (%)')
-        plt.ylabel('İl Sayısı')
-        plt.title('İllerdeki Kazanma Olasılıkları Dağılımı')
-        plt.grid(axis='y', alpha=0.3)
-        
-        # Kritik eşik çizgileri
-        plt.axvline(x=50, color='red', linestyle='--', alpha=0.7, label='Çekişmeli Eşik (%50)')
-        plt.axvline(x=70, color='green', linestyle='--', alpha=0.7, label='Güvenli Eşik (%70)')
-        plt.legend()
-        
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, f'olasilik_dagilimi_{timestamp}.png'), 
-                   dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        # 3. İl bazında detaylı tablo (top 20 most competitive)
-        fig, ax = plt.subplots(figsize=(16, 10))
-        ax.axis('tight')
-        ax.axis('off')
-        
-        # En çekişmeli 20 şehir
-        competitive_data = []
-        for city, result in self.results.items():
-            probs = sorted(result['win_probabilities'].values(), reverse=True)
-            if len(probs) >= 2:
-                margin = probs[0] - probs[1]
-                top_party = max(result['win_probabilities'].items(), key=lambda x: x[1])
-                competitive_data.append({
-                    'city': city,
-                    'leading_party': top_party[0],
-                    'probability': top_party[1],
-                    'margin': margin
-                })
-        
-        competitive_data.sort(key=lambda x: x['margin'])
-        top_competitive = competitive_data[:20]
-        
-        table_data = []
-        for item in top_competitive:
-            table_data.append([
-                item['city'],
-                item['leading_party'],
-                f"{item['probability']:.1f}%",
-                f"{item['margin']:.1f}%"
-            ])
+    def create_national_overview(self, output_dir: str = "outputs/graphs/", charts: list = None,
+                                 profile: str = None) -> dict:
+        """Ulusal genel bakış görselleri (charts: yalnızca istenen grafik adları, profile: çizim profili)"""
         
-        table = ax.table(cellText=table_data,
-                        colLabels=['İl', 'Önde Olan Parti', 'Kazanma Olasılığı', 'Fark'],
-                        cellLoc='center',
-                        loc='center')
+        table = self.get_summary_table()
         
-        table.auto_set_font_size(False)
-        table.set_fontsize(9)
-        table.scale(1.2, 1.5)
-        
-        # Başlık çizgileri renklendir
-        for i in range(len(table_data[0])):
-            table[(0, i)].set_facecolor('#4CAF50')
-            table[(0, i)].set_text_props(weight='bold', color='white')
+        # 3. En çekişmeli 20 şehir
+        table_data = [
+            [item['city'], item['leading_party'], f"{item['probability']:.1f}%", f"{item['margin']:.1f}%"]
+            for item in table.closest_races(20)
+        ]
         
-        plt.title('En Çekişmeli 20 İl - Detaylı Analiz', fontsize=16, pad=20)
-        plt.savefig(os.path.join(output_dir, f'cekismeli_iller_tablosu_{timestamp}.png'), 
-                   dpi=300, bbox_inches='tight')
-        plt.close()
+        jobs = [
+            ChartJob('national_overview', _plot_national_overview,
+                     {'party_wins': table.party_wins(MAJORITY_THRESHOLD), 'total_analyzed': len(table)},
+                     'ulusal_genel_bakis'),
+            ChartJob('probability_distribution', _plot_probability_distribution,
+                     {'probabilities': table.provinces['top_win_prob'].tolist()}, 'olasilik_dagilimi'),
+            ChartJob('competitive_table', _plot_competitive_table,
+                     {'table_data': table_data}, 'cekismeli_iller_tablosu', heavy=True),
+        ]
+        paths = ChartPipeline(output_dir, profile=profile).run(jobs, only=charts)
         
         print(f"📊 Ulusal genel bakış görselleri oluşturuldu: {output_dir}")
+        return paths
     
-    def generate_executive_report(self, output_dir: str = "outputs/reports/") -> str:
-        """Üst düzey yönetici raporu oluşturur"""
+    def generate_executive_report(self, output_dir: str = "outputs/reports/", formats: list = ('txt',)) -> str:
+        """Üst düzey yönetici raporu oluşturur (formats: 'txt', 'markdown', 'html'; ilk biçimin yolu döner)"""
         
-        os.makedirs(output_dir, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_file = os.path.join(output_dir, f"yonetici_ozet_raporu_{timestamp}.txt")
-        
         summary = self.create_executive_summary()
+        total_cities = summary.get('total_cities', 0)
         
-        with open(report_file, 'w', encoding='utf-8') as f:
-            f.write("🗳️  " + "=" * 70 + "\n")
-            f.write("2024 TÜRKİYE YEREL SEÇİMLERİ\n")
-            f.write("YÖNETİCİ ÖZET RAPORU\n")
-            f.write("Gelişmiş Monte Carlo Analizi Sonuçları\n")
-            f.write("=" * 76 + "\n\n")
-            
-            f.write(f"📅 Rapor Tarihi: {summary.get('analysis_date', 'Bilinmiyor')}\n")
-            f.write(f"📊 Analiz Kapsamı: {summary.get('total_cities', 0)} İl\n")
-            f.write(f"🔬 Metodoloji: Monte Carlo Simülasyonu (50,000 iterasyon/il)\n\n")
-            
-            # Anahtar Bulgular
-            f.write("🔍 ANAHTAR BULGULAR\n")
-            f.write("-" * 40 + "\n")
-            for insight in summary.get('key_insights', []):
-                f.write(f"• {insight}\n")
-            f.write("\n")
-            
-            # Parti Performansı
-            f.write("🏆 PARTİ PERFORMANS TABLOSU\n")
-            f.write("-" * 40 + "\n")
-            party_performance = summary.get('party_performance', {})
-            if party_performance:
-                sorted_parties = sorted(party_performance.items(), key=lambda x: x[1], reverse=True)
-                for i, (party, count) in enumerate(sorted_parties, 1):
-                    percentage = count / summary.get('total_cities', 1) * 100
-                    f.write(f"{i:2d}. {party:>8s}: {count:2d} il (%{percentage:4.1f})\n")
-            f.write("\n")
-            
-            # En Çekişmeli Yarışlar
-            f.write("⚡ EN ÇEKİŞMELİ 10 YARIŞ\n")
-            f.write("-" * 40 + "\n")
-            competitive_races = summary.get('competitive_races', [])[:10]
-            if competitive_races:
-                f.write(f"{'İl':<15} {'Öndeki Parti':<10} {'Olasılık':<10} {'Fark':<8}\n")
-                f.write("-" * 43 + "\n")
-                for race in competitive_races:
-                    city = race['city'][:14]  # İl adını kısalt
-                    party = race['leading_party'][:9]
-                    prob = f"{race['probability']:.1f}%"
-                    margin = f"{race['margin']:.1f}%"
-                    f.write(f"{city:<15} {party:<10} {prob:<10} {margin:<8}\n")
-            f.write("\n")
-            
-            # Risk Değerlendirmesi
-            f.write("⚠️  RİSK DEĞERLENDİRMESİ\n")
-            f.write("-" * 40 + "\n")
-            for alert in summary.get('risk_alerts', []):
-                f.write(f"🔴 {alert}\n")
-            f.write("\n")
-            
-            # Stratejik Öneriler
-            f.write("💡 STRATEJİK ÖNERİLER\n")
-            f.write("-" * 40 + "\n")
-            f.write("1. Çekişmeli şehirlerde yoğun saha çalışması yapılmalı\n")
-            f.write("2. Yetersiz anket verisi olan illerde ek araştırma gerekli\n")
-            f.write("3. Son 2 hafta kritik - günlük izleme önerilir\n")
-            f.write("4. Katılım oranı stratejileri gözden geçirilmeli\n")
-            f.write("5. Kararsız seçmen profili detaylı analiz edilmeli\n\n")
-            
-            # Metodoloji Notu
-            f.write("📋 METODOLOJİ NOTU\n")
-            f.write("-" * 40 + "\n")
-            f.write("Bu analiz, mevcut anket verilerini kullanarak Monte Carlo\n")
-            f.write("simülasyon tekniği ile gerçekleştirilmiştir. Sonuçlar:\n")
-            f.write("• Anket hatası, örnekleme yanlılığı ve belirsizlik faktörleri\n")
-            f.write("• Kararsız seçmen dağılımı senaryoları\n")
-            f.write("• Katılım oranı değişkenleri\n")
-            f.write("• Son dakika oy değişimi olasılıkları\n")
-            f.write("parametreleri ile hesaplanmıştır.\n\n")
-            
-            f.write("⚖️  Yasal Uyarı: Bu analiz akademik amaçlıdır ve kesin\n")
-            f.write("sonuç garantisi vermez. Gerçek seçim sonuçları farklılık\n")
-            f.write("gösterebilir.\n")
+        # Parti performansı (il sayısına göre sıralı)
+        party_performance = sorted(summary.get('party_performance', {}).items(), key=lambda x: x[1], reverse=True)
+        performance_lines = [
+            f"{i:2d}. {party:>8s}: {count:2d} il (%{count / (total_cities or 1) * 100:4.1f})"
+            for i, (party, count) in enumerate(party_performance, 1)
+        ]
+        
+        # En çekişmeli yarışlar (il ve parti adları kısaltılır)
+        race_rows = [
+            [race['city'][:14], race['leading_party'][:9], f"{race['probability']:.1f}%", f"{race['margin']:.1f}%"]
+            for race in summary.get('competitive_races', [])[:10]
+        ]
         
-        print(f"📋 Yönetici özet raporu oluşturuldu: {report_file}")
+        parts = [
+            title(["2024 TÜRKİYE YEREL SEÇİMLERİ", "YÖNETİCİ ÖZET RAPORU", "Gelişmiş Monte Carlo Analizi Sonuçları"],
+                  top="🗳️  " + "=" * 70, bottom="=" * 76),
+            blank(),
+            line(f"📅 Rapor Tarihi: {summary.get('analysis_date', 'Bilinmiyor')}"),
+            line(f"📊 Analiz Kapsamı: {total_cities} İl"),
+            line("🔬 Metodoloji: Monte Carlo Simülasyonu (50,000 iterasyon/il)"),
+            blank(),
+            heading("🔍 ANAHTAR BULGULAR"),
+            items(summary.get('key_insights', []), marker="• "),
+            blank(),
+            heading("🏆 PARTİ PERFORMANS TABLOSU"),
+            items(performance_lines, marker=""),
+            blank(),
+            heading("⚡ EN ÇEKİŞMELİ 10 YARIŞ"),
+        ]
+        if race_rows:
+            parts.append(table(['İl', 'Öndeki Parti', 'Olasılık', 'Fark'], [15, 10, 10, 8], race_rows))
+        parts += [
+            blank(),
+            heading("⚠️  RİSK DEĞERLENDİRMESİ"),
+            items(summary.get('risk_alerts', []), marker="🔴 "),
+            blank(),
+            heading("💡 STRATEJİK ÖNERİLER"),
+            items([
+                "1. Çekişmeli şehirlerde yoğun saha çalışması yapılmalı",
+                "2. Yetersiz anket verisi olan illerde ek araştırma gerekli",
+                "3. Son 2 hafta kritik - günlük izleme önerilir",
+                "4. Katılım oranı stratejileri gözden geçirilmeli",
+                "5. Kararsız seçmen profili detaylı analiz edilmeli",
+            ], marker=""),
+            blank(),
+            heading("📋 METODOLOJİ NOTU"),
+            line("Bu analiz, mevcut anket verilerini kullanarak Monte Carlo"),
+            line("simülasyon tekniği ile gerçekleştirilmiştir. Sonuçlar:"),
+            items([
+                "Anket hatası, örnekleme yanlılığı ve belirsizlik faktörleri",
+                "Kararsız seçmen dağılımı senaryoları",
+                "Katılım oranı değişkenleri",
+                "Son dakika oy değişimi olasılıkları",
+            ], marker="• "),
+            line("parametreleri ile hesaplanmıştır."),
+            blank(),
+            line("⚖️  Yasal Uyarı: Bu analiz akademik amaçlıdır ve kesin"),
+            line("sonuç garantisi vermez. Gerçek seçim sonuçları farklılık"),
+            line("gösterebilir."),
+        ]
+        
+        report_files = write_report(parts, output_dir, f"yonetici_ozet_raporu_{timestamp}",
+                                    'yonetici_ozet_raporu', formats)
+        report_file = report_files[0]
+        print(f"📋 Yönetici özet raporu oluşturuldu: {', '.join(report_files)}")
         return report_file
     
-    def create_comparison_analysis(self, output_dir: str = "outputs/graphs/"):
+    def create_comparison_analysis(self, output_dir: str = "outputs/graphs/", charts: list = None,
+                                   profile: str = None) -> dict:
         """2019 seçimleri ile karşılaştırma analizi"""
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # 2019 sonuçları vs 2024 tahminleri karşılaştırması
-        plt.figure(figsize=(16, 10))
-        
         # Her parti için beklenen değişim
         party_changes = {
             'AKP': {'2019_estimate': 35, '2024_prediction': 0, 'cities_won': 0},
@@ -348,40 +430,63 @@ class ElectionDashboard:
         }
         
         # 2024 tahminlerini hesapla
-        total_cities = len(self.results)
-        for city, result in self.results.items():
-            top_party = max(result['win_probabilities'].items(), key=lambda x: x[1])
-            if top_party[1] > 50:
-                if top_party[0] in party_changes:
-                    party_changes[top_party[0]]['cities_won'] += 1
-                elif top_party[0] in ['HDP', 'DEM']:
-                    party_changes['HDP/DEM']['cities_won'] += 1
-        
-        # Karşılaştırma grafiği
-        parties = list(party_changes.keys())
-        prediction_2024 = [party_changes[party]['cities_won'] for party in parties]
-        
-        x = np.arange(len(parties))
-        width = 0.35
-        
-        plt.bar(x, prediction_2024, width, label='2024 Tahmin', alpha=0.8)
-        plt.xlabel('Partiler')
-        plt.ylabel('Kazanılan İl Sayısı')
-        plt.title('2024 Yerel Seçimler - Parti Bazında İl Kazanım Projeksiyonu')
-        plt.xticks(x, parties, rotation=45)
-        plt.legend()
-        plt.grid(axis='y', alpha=0.3)
-        
-        # Değerleri grafiğin üstüne ekle
-        for i, v in enumerate(prediction_2024):
-            plt.text(i, v + 0.5, str(v), ha='center', va='bottom', fontweight='bold')
-        
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, f'parti_karsilastirma_{timestamp}.png'), 
-                   dpi=300, bbox_inches='tight')
-        plt.close()
+        for party, count in self.get_summary_table().party_wins(MAJORITY_THRESHOLD).items():
+            if party in party_changes:
+                party_changes[party]['cities_won'] += count
+            elif party in ['HDP', 'DEM']:
+                party_changes['HDP/DEM']['cities_won'] += count
+        
+        jobs = [
+            ChartJob('party_comparison', _plot_party_comparison, {
+                'parties': list(party_changes.keys()),
+                'prediction_2024': [change['cities_won'] for change in party_changes.values()],
+            }, 'parti_karsilastirma'),
+        ]
+        paths = ChartPipeline(output_dir, profile=profile).run(jobs, only=charts)
         
         print(f"📊 Karşılaştırma analizi oluşturuldu: {output_dir}")
+        return paths
+
+    def create_run_comparison(self, run_ids: list = None, tag: str = None, limit: int = DEFAULT_HISTORY_LIMIT,
+                              top: int = 20, output_dir: str = "outputs/graphs/", charts: list = None,
+                              profile: str = None) -> dict:
+        """
+        Katalogdaki geçmiş çalıştırmalar arası sapma grafikleri. run_ids verilmezse
+        (etikete göre) en yeni `limit` çalıştırma karşılaştırılır; en az iki çalıştırma gerekir.
+        """
+        
+        history = RunHistory.load(run_ids, tag, limit, self.outputs_dir)
+        if len(history) < 2:
+            print("ℹ️  Sapma takibi için katalogda en az iki çalıştırma gerekli")
+            return {}
+        self.run_history = history
+        
+        seats = history.seat_projection()
+        vote_share = history.national_vote_share()
+        drift = history.drift_table().head(top)
+        deltas = history.province_deltas().loc[drift.index]
+        
+        jobs = [
+            ChartJob('run_drift', _plot_run_drift, {
+                'run_ids': history.run_ids,
+                'parties': history.parties,
+                'seats': {party: seats[party].tolist() for party in history.parties},
+                'vote_share': {party: vote_share[party].round(3).tolist() for party in history.parties},
+            }, 'calistirma_sapmasi'),
+            ChartJob('province_drift', _plot_province_drift, {
+                'provinces': drift.index.tolist(),
+                'parties': history.parties,
+                'deltas': deltas.round(3).to_numpy().tolist(),
+                'baseline': history.run_ids[0],
+                'target': history.run_ids[-1],
+            }, 'il_sapmasi'),
+        ]
+        paths = ChartPipeline(output_dir, profile=profile).run(jobs, only=charts)
+        
+        changed = int(drift['leader_changed'].sum())
+        print(f"📉 {len(history)} çalıştırma karşılaştırıldı ({history.run_ids[0]} → {history.run_ids[-1]}), "
+              f"ilk {len(drift)} ilde {changed} lider değişimi")
+        return paths
 
 def main():
     """Ana dashboard çalıştırma fonksiyonu"""
@@ -401,15 +506,28 @@ def main():
     
     # Üst düzey özeti oluştur
     print("\n📋 Yönetici özet raporu oluşturuluyor...")
-    dashboard.generate_executive_report()
+    report_file = dashboard.generate_executive_report()
     
     # Ulusal genel bakış görselleri
     print("\n📊 Ulusal genel bakış görselleri oluşturuluyor...")
-    dashboard.create_national_overview()
+    chart_files = dashboard.create_national_overview()
     
     # Karşılaştırma analizi
     print("\n📈 Karşılaştırma analizi oluşturuluyor...")
-    dashboard.create_comparison_analysis()
+    chart_files.update(dashboard.create_comparison_analysis())
+    
+    # Geçmiş çalıştırmalarla sapma takibi
+    print("\n📉 Çalıştırma geçmişi karşılaştırılıyor...")
+    chart_files.update(dashboard.create_run_comparison())
+    
+    # Çıktıları çalıştırmayla birlikte kataloğa ekle
+    if dashboard.artifact is not None:
+        catalog = OutputsCatalog(os.path.join(dashboard.outputs_dir, "catalog.sqlite"))
+        catalog.add_artifacts(dashboard.artifact.run_id, {
+            'executive_report': report_file,
+            **{f'chart:{name}': path for name, path in chart_files.items()}
+        })
+        catalog.close()
     
     # Özet istatistikler
     summary = dashboard.create_executive_summary()
@@ -0,0 +1,315 @@
+"""
+Simülasyon Sonuçları Üzerinde Ayrıntılı Sorgular
+2024 Türkiye Yerel Seçimleri için
+
+Çalıştırma artefaktındaki 'draws' aşaması (il x simülasyon x parti oy oranları)
+üzerinde birleşik ve koşullu olasılıklar vektörel olarak hesaplanır. Her
+koşul simülasyon başına bir boolean dizisidir; & (ve), | (veya), ~ (değil)
+ile birleştirilir, olasılık bu dizinin ortalamasıdır. Bellek eşlemeli
+diziden yalnızca sorguda geçen iller okunur.
+
+İller birbirinden bağımsız simüle edildiğinden, farklı illeri içeren birleşik
+olasılıklar bu bağımsızlık varsayımını taşır (ulusal ortak kayma yoktur).
+
+    python draw_query.py "wins('CHP', 'Ankara') & wins('CHP', 'İstanbul')"
+    python draw_query.py "seats('AKP')" --given "wins('AKP', 'Bursa')"
+    python draw_query.py "margin('CHP', 'İzmir')" --run-id ID
+
+Sorgu fonksiyonları (oy, fark ve katılım yüzde puanı olarak):
+    wins(parti, il, fark=0)      partinin ili en az `fark` puanla kazandığı simülasyonlar
+    margin(parti, il)            parti oyu - en yüksek rakip oyu
+    share(parti, il)             partinin oy oranı
+    turnout(il)                  katılım oranı
+    seats(parti, fark=0)         partinin kazandığı il sayısı
+"""
+
+import argparse
+import ast
+import operator
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from province_map import province_key
+from results_artifact import DEFAULT_RUNS_DIR, ArtifactError, ResultsArtifact
+
+DESCRIBE_PERCENTILES = (5, 50, 95)
+MAX_DISTRIBUTION_BINS = 100  # Tam sayı dağılımı bu kadar farklı değere kadar verilir
+
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.BitAnd: operator.and_,
+    ast.BitOr: operator.or_,
+}
+_COMPARE_OPERATORS = {
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+
+
+class QueryError(ValueError):
+    """Geçersiz sorgu ifadesi, bilinmeyen il/parti veya boş koşul"""
+
+
+class DrawQuery:
+    """
+    İl x simülasyon x parti oy oranı matrisi üzerinde sorgu motoru.
+
+    vote_shares: (il, simülasyon, parti) dizisi (bellek eşlemeli olabilir);
+    turnout: (il, simülasyon) katılım oranı (0-1). İl satırları ilk erişimde
+    float32'ye çevrilip önbelleğe alınır.
+    """
+
+    def __init__(self, provinces: List[str], parties: List[str], vote_shares: np.ndarray,
+                 turnout: Optional[np.ndarray] = None, run_id: str = None):
+        self.provinces = [str(p) for p in provinces]
+        self.parties = [str(p) for p in parties]
+        self.vote_shares = vote_shares
+        self.turnout_draws = turnout
+        self.run_id = run_id
+        self.n_simulations = vote_shares.shape[1]
+        self._province_index = {province_key(city): i for i, city in enumerate(self.provinces)}
+        self._party_index = {party.upper(): k for k, party in enumerate(self.parties)}
+        self._rows = {}
+        self._margins = {}
+
+    @classmethod
+    def from_artifact(cls, artifact: ResultsArtifact) -> 'DrawQuery':
+        if not artifact.has_stage('draws'):
+            raise ArtifactError(f"Çalıştırmada simülasyon matrisi yok: {artifact.run_id} "
+                                f"(SAVE_DRAWS=1 ile çalıştırın)")
+        draws = artifact.read_draws()
+        return cls(draws['provinces'], draws['parties'], draws['vote_shares'], draws.get('turnout'),
+                   run_id=artifact.run_id)
+
+    @classmethod
+    def from_predictor(cls, predictor) -> 'DrawQuery':
+        provinces, parties, vote_shares, turnout = predictor.draw_matrix()
+        return cls(provinces, parties, vote_shares, turnout)
+
+    # Eksenler
+
+    def _province(self, city: str) -> int:
+        index = self._province_index.get(province_key(str(city)))
+        if index is None:
+            raise QueryError(f"Bilinmeyen il: {city}")
+        return index
+
+    def _party(self, party: str) -> int:
+        index = self._party_index.get(str(party).upper())
+        if index is None:
+            raise QueryError(f"Bilinmeyen parti: {party} (seçenekler: {', '.join(self.parties)})")
+        return index
+
+    def _row(self, i: int) -> np.ndarray:
+        if i not in self._rows:
+            self._rows[i] = np.asarray(self.vote_shares[i], dtype=np.float32)
+        return self._rows[i]
+
+    def _margin_matrix(self, i: int) -> np.ndarray:
+        """(simülasyon, parti): her partinin en yüksek rakibine göre farkı"""
+        if i not in self._margins:
+            row = self._row(i)
+            if row.shape[1] < 2:
+                self._margins[i] = row.copy()
+            else:
+                top_two = -np.partition(-row, 1, axis=1)[:, :2]
+                best_other = np.where(row == top_two[:, [0]], top_two[:, [1]], top_two[:, [0]])
+                self._margins[i] = row - best_other
+        return self._margins[i]
+
+    # Sorgu fonksiyonları
+
+    def wins(self, party: str, province: str, margin: float = 0) -> np.ndarray:
+        """Partinin ili kazandığı simülasyonlar (fark > margin; eşitlik kazanım sayılmaz)"""
+        return self.margin(party, province) > margin
+
+    def margin(self, party: str, province: str) -> np.ndarray:
+        return self._margin_matrix(self._province(province))[:, self._party(party)]
+
+    def vote_share(self, party: str, province: str) -> np.ndarray:
+        return self._row(self._province(province))[:, self._party(party)]
+
+    def turnout(self, province: str) -> np.ndarray:
+        if self.turnout_draws is None:
+            raise QueryError("Katılım simülasyonları bu çalıştırmada yok")
+        return np.asarray(self.turnout_draws[self._province(province)], dtype=np.float32) * 100
+
+    def seats(self, party: str, margin: float = 0, provinces: List[str] = None) -> np.ndarray:
+        """Simülasyon başına partinin kazandığı il sayısı"""
+        k = self._party(party)
+        indices = [self._province(city) for city in provinces] if provinces else range(len(self.provinces))
+        counts = np.zeros(self.n_simulations, dtype=np.int32)
+        for i in indices:
+            counts += self._margin_matrix(i)[:, k] > margin
+        return counts
+
+    # Özetler
+
+    def _per_simulation(self, values, message: str) -> np.ndarray:
+        """İfade veya diziyi simülasyon başına bir değer olarak döndürür (ör. "1+1" reddedilir)"""
+        if isinstance(values, str):
+            values = self._eval(values)
+        values = np.asarray(values)
+        if values.shape != (self.n_simulations,):
+            raise QueryError(message)
+        return values
+
+    def _condition(self, given) -> Optional[np.ndarray]:
+        if given is None:
+            return None
+        given = self._per_simulation(given, "Koşul simülasyon başına doğru/yanlış değeri vermeli")
+        if given.dtype != bool:
+            raise QueryError("Koşul simülasyon başına doğru/yanlış değeri vermeli")
+        if not given.any():
+            raise QueryError("Koşul hiçbir simülasyonda sağlanmıyor")
+        return given
+
+    def probability(self, event, given=None) -> float:
+        """P(event | given) yüzde olarak; event ve given boolean dizi veya ifade olabilir"""
+        event = self._per_simulation(event, "Olasılık için simülasyon başına doğru/yanlış değerli bir ifade gerekli")
+        if event.dtype != bool:
+            raise QueryError("Olasılık için doğru/yanlış değerli bir ifade gerekli")
+        condition = self._condition(given)
+        selected = event if condition is None else event[condition]
+        return float(selected.mean() * 100)
+
+    def describe(self, values, given=None) -> Dict:
+        """Sayısal bir sorgunun (koşullu) dağılım özeti"""
+        values = self._per_simulation(values, "Sorgu simülasyon başına bir değer vermeli (ör. margin('CHP', 'Ankara'))")
+        condition = self._condition(given)
+        if condition is not None:
+            values = values[condition]
+        p5, p50, p95 = np.percentile(values, DESCRIBE_PERCENTILES)
+        summary = {
+            'mean': float(values.mean()),
+            'std': float(values.std()),
+            'p5': float(p5),
+            'p50': float(p50),
+            'p95': float(p95),
+            'simulations': int(len(values)),
+        }
+        if np.issubdtype(values.dtype, np.integer):
+            counts = np.bincount(values - values.min())
+            if len(counts) <= MAX_DISTRIBUTION_BINS:
+                summary['distribution'] = {
+                    int(values.min()) + v: float(c / len(values) * 100) for v, c in enumerate(counts) if c
+                }
+        return summary
+
+    def evaluate(self, expression: str, given: str = None) -> Dict:
+        """
+        İfadeyi değerlendirir: doğru/yanlış sonuç için olasılık, sayısal sonuç
+        için dağılım özeti döndürür.
+        """
+        value = np.asarray(self._eval(expression))
+        result = {'query': expression, 'given': given}
+        if value.dtype == bool:
+            result['probability'] = self.probability(value, given)
+        else:
+            result['summary'] = self.describe(value, given)
+        if given is not None:
+            result['given_probability'] = self.probability(given)
+        return result
+
+    # İfade değerlendirici
+
+    def _functions(self) -> Dict:
+        return {
+            'wins': self.wins,
+            'margin': self.margin,
+            'share': self.vote_share,
+            'vote_share': self.vote_share,
+            'turnout': self.turnout,
+            'seats': self.seats,
+        }
+
+    def _eval(self, expression: str):
+        try:
+            tree = ast.parse(expression.strip(), mode='eval')
+        except SyntaxError as e:
+            raise QueryError(f"Sorgu ayrıştırılamadı: {e.msg}") from None
+        return self._eval_node(tree.body, self._functions())
+
+    def _eval_node(self, node, functions: Dict):
+        if isinstance(node, ast.Constant) and isinstance(node.value, (str, int, float)):
+            return node.value
+        if isinstance(node, (ast.List, ast.Tuple)):
+            return [self._eval_node(item, functions) for item in node.elts]
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+            if node.func.id not in functions:
+                raise QueryError(f"Bilinmeyen fonksiyon: {node.func.id} (seçenekler: {', '.join(functions)})")
+            args = [self._eval_node(arg, functions) for arg in node.args]
+            kwargs = {kw.arg: self._eval_node(kw.value, functions) for kw in node.keywords}
+            try:
+                return functions[node.func.id](*args, **kwargs)
+            except TypeError as e:
+                raise QueryError(f"{node.func.id}: {e}") from None
+        if isinstance(node, ast.UnaryOp):
+            operand = self._eval_node(node.operand, functions)
+            if isinstance(node.op, (ast.Invert, ast.Not)):
+                return ~np.asarray(operand, dtype=bool)
+            if isinstance(node.op, ast.USub):
+                return -operand
+        if isinstance(node, ast.BoolOp):
+            values = [np.asarray(self._eval_node(v, functions), dtype=bool) for v in node.values]
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            return combine.reduce(values)
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+            left = self._eval_node(node.left, functions)
+            right = self._eval_node(node.right, functions)
+            if not isinstance(node.op, (ast.BitAnd, ast.BitOr)):
+                # Doğru/yanlış dizilerin toplamı sayım olmalı (numpy'de + mantıksal veyadır)
+                left, right = (np.asarray(v, dtype=np.int32) if np.asarray(v).dtype == bool else v
+                               for v in (left, right))
+            return _BINARY_OPERATORS[type(node.op)](left, right)
+        if isinstance(node, ast.Compare) and all(type(op) in _COMPARE_OPERATORS for op in node.ops):
+            left = self._eval_node(node.left, functions)
+            result = None
+            for op, comparator in zip(node.ops, node.comparators):
+                right = self._eval_node(comparator, functions)
+                step = np.asarray(_COMPARE_OPERATORS[type(op)](left, right))
+                result = step if result is None else result & step
+                left = right
+            return result
+        raise QueryError(f"Desteklenmeyen ifade: {ast.dump(node)[:60]}")
+
+
+def main():
+    """Sorgu komut satırı arayüzü"""
+    parser = argparse.ArgumentParser(description='Simülasyon sonuçları üzerinde olasılık sorguları')
+    parser.add_argument('expression', help="Örn. \"wins('CHP', 'Ankara') & wins('CHP', 'İstanbul')\"")
+    parser.add_argument('--given', help='Koşul ifadesi (koşullu olasılık için)')
+    parser.add_argument('--run-id', default=None, help='Sorgulanacak çalıştırma (varsayılan: son çalıştırma)')
+    parser.add_argument('--runs-dir', default=DEFAULT_RUNS_DIR)
+    args = parser.parse_args()
+
+    try:
+        engine = DrawQuery.from_artifact(ResultsArtifact.open(args.run_id, args.runs_dir))
+        result = engine.evaluate(args.expression, args.given)
+    except (ArtifactError, QueryError) as e:
+        print(f"❌ {e}")
+        return
+
+    print(f"🔎 Çalıştırma {engine.run_id}: {engine.n_simulations:,} simülasyon x {len(engine.provinces)} il")
+    if args.given:
+        print(f"   Koşul: {args.given} (P = %{result['given_probability']:.2f})")
+    if 'probability' in result:
+        print(f"   P({args.expression}) = %{result['probability']:.2f}")
+        return
+    summary = result['summary']
+    print(f"   Ortalama {summary['mean']:.2f} ± {summary['std']:.2f} "
+          f"(%5: {summary['p5']:.2f}, medyan: {summary['p50']:.2f}, %95: {summary['p95']:.2f})")
+    for value, share in summary.get('distribution', {}).items():
+        print(f"   {value:>4}: %{share:5.2f}")
+
+
+if __name__ == "__main__":
+    main()
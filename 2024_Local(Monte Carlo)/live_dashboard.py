@@ -0,0 +1,445 @@
+"""
+Canlı Yerel Dashboard Sunucusu
+2024 Türkiye Yerel Seçimleri için
+
+Yalnızca localhost üzerinde çalışan, dış bağımlılığı olmayan (standart
+kütüphane http.server) hafif bir web arayüzü. Yönetici özeti, çekişmeli
+yarışlar ve il detayları JSON olarak sunulur; iller simüle edildikçe
+güncellemeler Server-Sent Events (SSE) ile tarayıcıya iletilir. Simülasyon
+matrisi üzerinde olasılık sorguları /api/query?q=<ifade>&given=<koşul> ile yapılır.
+
+    python live_dashboard.py                # Son artefaktı sunar
+    python live_dashboard.py --run-id ID    # Belirli bir çalıştırmayı sunar
+    python live_dashboard.py --live         # Simülasyonu başlatır, illeri bittikçe yayınlar
+"""
+
+import argparse
+import json
+import threading
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+import numpy as np
+import pandas as pd
+
+from advanced_election_predictor import AdvancedElectionPredictor
+from dashboard import ElectionDashboard
+from draw_query import DrawQuery, QueryError
+from results_artifact import DEFAULT_RUNS_DIR, ArtifactError, ResultsArtifact, columns_to_predictions
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8050
+HEARTBEAT_SECONDS = 15
+
+
+def _json_default(value):
+    """numpy/pandas değerlerini JSON'a çevirir"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.strftime('%Y-%m-%d')
+    return str(value)
+
+
+def to_json(payload) -> str:
+    return json.dumps(payload, ensure_ascii=False, default=_json_default)
+
+
+def province_overview(city: str, result: Dict) -> Dict:
+    """İl listesi ve SSE olayları için kısa özet satırı"""
+    probs = sorted(result['win_probabilities'].items(), key=lambda x: x[1], reverse=True)
+    leader, probability = probs[0]
+    margin = probability - probs[1][1] if len(probs) > 1 else probability
+    return {
+        'city': city,
+        'leading_party': leader,
+        'probability': probability,
+        'margin': margin,
+        'poll_count': result['poll_stats']['poll_count'],
+    }
+
+
+def province_detail(city: str, result: Dict) -> Dict:
+    """Tek bir il için detay görünümü"""
+    detail = province_overview(city, result)
+    detail.update({
+        'simulations_count': result['simulations_count'],
+        'win_probabilities': result['win_probabilities'],
+        'mean_votes': result['mean_votes'],
+        'confidence_95': {party: ci['95%'] for party, ci in result['confidence_intervals'].items()},
+        'poll_averages': result['poll_stats']['averages'],
+        'last_poll_date': result['poll_stats'].get('last_poll_date'),
+    })
+    if 'turnout_analysis' in result:
+        detail['turnout_analysis'] = result['turnout_analysis']
+    return detail
+
+
+class LiveDashboardState:
+    """İl sonuçlarını ve olay günlüğünü tutan, iş parçacığı güvenli durum"""
+
+    def __init__(self, expected_total: int = 0):
+        self.results = {}
+        self.expected_total = expected_total
+        self.run_id = None
+        self.finished = False
+        self.error = None  # Simülasyon hata ile biterse mesajı
+        self.query_engine = None  # DrawQuery; simülasyon matrisi varsa
+        self._events = []  # (olay no, olay türü, JSON metni)
+        self._condition = threading.Condition()
+
+    def _append_event(self, event_type: str, payload: Dict):
+        self._events.append((len(self._events) + 1, event_type, to_json(payload)))
+
+    def _progress(self) -> Dict:
+        return {'completed': len(self.results), 'total': self.expected_total or len(self.results)}
+
+    def publish_province(self, city: str, result: Dict, announce_summary: bool = True):
+        """Tamamlanan bir ili kaydeder ve abonelere duyurur"""
+        with self._condition:
+            self.results[city] = result
+            self._append_event('province', {**province_overview(city, result), **self._progress()})
+            if announce_summary:
+                self._append_event('summary', self._summary_locked())
+            self._condition.notify_all()
+
+    def publish_summary(self):
+        with self._condition:
+            self._append_event('summary', self._summary_locked())
+            self._condition.notify_all()
+
+    def finish(self, run_id: Optional[str] = None, error: Optional[str] = None):
+        """Simülasyon bittiğinde (veya hata ile durduğunda) çağrılır"""
+        with self._condition:
+            self.finished = True
+            self.run_id = run_id
+            self.error = error
+            self._append_event('done', {'run_id': run_id, 'error': error, **self._progress()})
+            self._condition.notify_all()
+
+    def wait_events(self, last_id: int, timeout: float) -> List[Tuple[int, str, str]]:
+        """last_id'den sonraki olayları döndürür; yoksa timeout kadar bekler"""
+        with self._condition:
+            if len(self._events) <= last_id:
+                self._condition.wait(timeout)
+            return self._events[last_id:]
+
+    def _summary_locked(self) -> Dict:
+        dashboard = ElectionDashboard()
+        dashboard.results = dict(self.results)
+        summary = dashboard.create_executive_summary()
+        summary.update(self._progress())
+        summary['run_id'] = self.run_id
+        summary['finished'] = self.finished
+        summary['error'] = self.error
+        return summary
+
+    def summary(self) -> Dict:
+        with self._condition:
+            return self._summary_locked()
+
+    def provinces(self) -> List[Dict]:
+        with self._condition:
+            return [province_overview(city, result) for city, result in self.results.items()]
+
+    def province(self, city: str) -> Optional[Dict]:
+        with self._condition:
+            result = self.results.get(city)
+        return province_detail(city, result) if result else None
+
+    def query(self, expression: str, given: Optional[str] = None) -> Optional[Dict]:
+        """Simülasyon matrisi üzerinde sorgu (matris henüz yoksa None)"""
+        engine = self.query_engine
+        return engine.evaluate(expression, given) if engine is not None else None
+
+
+class LiveDashboardHandler(BaseHTTPRequestHandler):
+    """HTTP istek işleyici; durum sunucu nesnesinde (server.state) tutulur"""
+
+    server_version = 'SecimDashboard/1.0'
+
+    def log_message(self, format, *args):
+        pass  # Konsolu istek günlükleriyle doldurma
+
+    def _send(self, status: int, body: str, content_type: str):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, payload, status: int = 200):
+        self._send(status, to_json(payload), 'application/json')
+
+    def do_GET(self):
+        state = self.server.state
+        url = urlparse(self.path)
+        path = unquote(url.path)
+
+        if path in ('/', '/index.html'):
+            self._send(200, INDEX_HTML, 'text/html')
+        elif path == '/api/summary':
+            self._send_json(state.summary())
+        elif path == '/api/competitive':
+            self._send_json(state.summary().get('competitive_races', []))
+        elif path == '/api/provinces':
+            self._send_json(state.provinces())
+        elif path.startswith('/api/province/'):
+            detail = state.province(path[len('/api/province/'):])
+            if detail is None:
+                self._send_json({'error': 'İl bulunamadı'}, status=404)
+            else:
+                self._send_json(detail)
+        elif path == '/api/query':
+            self._send_query(state, parse_qs(url.query))
+        elif path == '/events':
+            self._stream_events(state)
+        else:
+            self._send_json({'error': 'Bulunamadı'}, status=404)
+
+    def _send_query(self, state: LiveDashboardState, params: Dict[str, List[str]]):
+        """/api/query?q=<ifade>&given=<koşul>"""
+        expression = params.get('q', [''])[0]
+        if not expression:
+            self._send_json({'error': "Sorgu ifadesi (q) gerekli"}, status=400)
+            return
+        try:
+            result = state.query(expression, params.get('given', [None])[0])
+        except QueryError as e:
+            self._send_json({'error': str(e)}, status=400)
+            return
+        if result is None:
+            self._send_json({'error': 'Simülasyon matrisi henüz hazır değil'}, status=503)
+        else:
+            self._send_json(result)
+
+    def _stream_events(self, state: LiveDashboardState):
+        """SSE akışı: yeniden bağlanan istemci Last-Event-ID'den devam eder"""
+        try:
+            last_id = int(self.headers.get('Last-Event-ID', 0))
+        except ValueError:
+            last_id = 0
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+
+        try:
+            while not self.server.stopping:
+                events = state.wait_events(last_id, HEARTBEAT_SECONDS)
+                if not events:
+                    self.wfile.write(b': heartbeat\n\n')
+                for event_id, event_type, data in events:
+                    self.wfile.write(f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n".encode('utf-8'))
+                    last_id = event_id
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class LiveDashboardServer(ThreadingHTTPServer):
+    """Yalnızca localhost'a bağlanan canlı dashboard sunucusu"""
+
+    daemon_threads = True
+
+    def __init__(self, state: LiveDashboardState, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        super().__init__((host, port), LiveDashboardHandler)
+        self.state = state
+        self.stopping = False
+
+    def shutdown(self):
+        self.stopping = True
+        super().shutdown()
+
+
+def load_artifact_state(run_id: str = None, runs_dir: str = DEFAULT_RUNS_DIR) -> LiveDashboardState:
+    """Kayıtlı bir çalıştırmanın sonuçlarıyla durumu doldurur"""
+    artifact = ResultsArtifact.open(run_id, runs_dir)
+    results = columns_to_predictions(artifact.read_stage('predictions'))
+    state = LiveDashboardState(expected_total=len(results))
+    for city, result in results.items():
+        state.publish_province(city, result, announce_summary=False)
+    if artifact.has_stage('draws'):
+        state.query_engine = DrawQuery.from_artifact(artifact)
+    state.finish(artifact.run_id)
+    state.publish_summary()
+    return state
+
+
+def start_live_simulation(state: LiveDashboardState, n_simulations: int = 50000) -> threading.Thread:
+    """Simülasyonu arka planda başlatır; her il bittiğinde duruma yayınlanır"""
+    predictor = AdvancedElectionPredictor()
+    predictor.load_city_data()
+    state.expected_total = len(predictor.city_data)
+
+    def worker():
+        # Hata olsa da 'done' olayı yayınlanır; aksi halde SSE istemcileri sonsuza dek bekler
+        try:
+            predictor.predict_all_cities(n_simulations, on_city_complete=state.publish_province)
+            artifact = predictor.save_results_artifact(save_draws=True)  # Yeniden açılışta sorgular için
+            state.query_engine = DrawQuery.from_predictor(predictor)
+        except Exception as e:
+            print(f"❌ Canlı simülasyon hatası: {e}")
+            state.finish(error=str(e))
+            return
+        state.finish(artifact.run_id if artifact else None)
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    return thread
+
+
+INDEX_HTML = """<!DOCTYPE html>
+<html lang="tr">
+<head>
+<meta charset="utf-8">
+<title>2024 Yerel Seçimler - Canlı Dashboard</title>
+<style>
+  body { font-family: sans-serif; margin: 20px; background: #f7f7f7; }
+  h1 { font-size: 20px; }
+  #progress { font-weight: bold; margin-bottom: 10px; }
+  .panels { display: flex; gap: 20px; align-items: flex-start; }
+  .panel { background: white; padding: 12px; border-radius: 6px; flex: 1; }
+  table { border-collapse: collapse; width: 100%; font-size: 13px; }
+  th, td { border-bottom: 1px solid #ddd; padding: 4px 6px; text-align: left; }
+  th { background: #4CAF50; color: white; }
+  tr.row:hover { background: #eef; cursor: pointer; }
+  pre { font-size: 12px; white-space: pre-wrap; }
+</style>
+</head>
+<body>
+<h1>🗳️ 2024 Türkiye Yerel Seçimleri - Canlı Dashboard</h1>
+<div id="progress">Bağlanıyor...</div>
+<div class="panels">
+  <div class="panel">
+    <h2>Yönetici Özeti</h2>
+    <ul id="insights"></ul>
+    <h3>Risk Uyarıları</h3>
+    <ul id="alerts"></ul>
+    <h3>Çekişmeli Yarışlar</h3>
+    <table><thead><tr><th>İl</th><th>Önde</th><th>Olasılık</th><th>Fark</th></tr></thead>
+    <tbody id="competitive"></tbody></table>
+  </div>
+  <div class="panel">
+    <h2>İller</h2>
+    <table><thead><tr><th>İl</th><th>Önde</th><th>Olasılık</th><th>Fark</th><th>Anket</th></tr></thead>
+    <tbody id="provinces"></tbody></table>
+  </div>
+  <div class="panel">
+    <h2 id="detail-title">İl Detayı</h2>
+    <pre id="detail">Bir il seçin.</pre>
+    <h3>Sorgu</h3>
+    <form id="query-form">
+      <input id="query" size="40" placeholder="wins('CHP', 'Ankara') &amp; wins('CHP', 'İstanbul')">
+      <input id="given" size="40" placeholder="Koşul (isteğe bağlı)">
+      <button type="submit">Hesapla</button>
+    </form>
+    <pre id="query-result"></pre>
+  </div>
+</div>
+<script>
+const fmt = v => (v === null || v === undefined) ? '-' : '%' + Number(v).toFixed(1);
+const rows = {};
+function fillList(id, items) {
+  const el = document.getElementById(id);
+  el.replaceChildren();
+  (items || []).forEach(t => { const li = document.createElement('li'); li.textContent = t; el.appendChild(li); });
+}
+function setCells(tr, values) {
+  tr.replaceChildren(...values.map(v => { const td = document.createElement('td'); td.textContent = v; return td; }));
+}
+function showSummary(s) {
+  const status = s.error ? ` ❌ Hata: ${s.error}` : (s.finished ? ` ✅ (run: ${s.run_id})` : ' ⏳');
+  document.getElementById('progress').textContent = `${s.completed}/${s.total} il tamamlandı` + status;
+  fillList('insights', s.key_insights);
+  fillList('alerts', s.risk_alerts);
+  const body = document.getElementById('competitive');
+  body.replaceChildren();
+  (s.competitive_races || []).forEach(r => {
+    const tr = document.createElement('tr');
+    tr.className = 'row';
+    setCells(tr, [r.city, r.leading_party, fmt(r.probability), fmt(r.margin)]);
+    tr.onclick = () => showDetail(r.city);
+    body.appendChild(tr);
+  });
+}
+function upsertProvince(p) {
+  let tr = rows[p.city];
+  if (!tr) {
+    tr = document.createElement('tr');
+    tr.className = 'row';
+    tr.onclick = () => showDetail(p.city);
+    document.getElementById('provinces').appendChild(tr);
+    rows[p.city] = tr;
+  }
+  setCells(tr, [p.city, p.leading_party, fmt(p.probability), fmt(p.margin), p.poll_count]);
+}
+function showDetail(city) {
+  fetch('/api/province/' + encodeURIComponent(city)).then(r => r.json()).then(d => {
+    document.getElementById('detail-title').textContent = city;
+    document.getElementById('detail').textContent = JSON.stringify(d, null, 2);
+  });
+}
+document.getElementById('query-form').onsubmit = e => {
+  e.preventDefault();
+  const params = new URLSearchParams({q: document.getElementById('query').value});
+  const given = document.getElementById('given').value;
+  if (given) params.set('given', given);
+  fetch('/api/query?' + params).then(r => r.json()).then(d => {
+    document.getElementById('query-result').textContent = d.error ? '❌ ' + d.error : JSON.stringify(d, null, 2);
+  });
+};
+fetch('/api/provinces').then(r => r.json()).then(list => list.forEach(upsertProvince));
+fetch('/api/summary').then(r => r.json()).then(showSummary);
+const events = new EventSource('/events');
+events.addEventListener('province', e => upsertProvince(JSON.parse(e.data)));
+events.addEventListener('summary', e => showSummary(JSON.parse(e.data)));
+events.addEventListener('done', () => fetch('/api/summary').then(r => r.json()).then(showSummary));
+</script>
+</body>
+</html>
+"""
+
+
+def main():
+    """Canlı dashboard sunucusunu başlatır"""
+    parser = argparse.ArgumentParser(description='2024 Yerel Seçimler - Canlı Dashboard')
+    parser.add_argument('--live', action='store_true', help='Simülasyonu başlat ve illeri bittikçe yayınla')
+    parser.add_argument('--run-id', default=None, help='Sunulacak çalıştırma (varsayılan: son çalıştırma)')
+    parser.add_argument('--simulations', type=int, default=50000, help='Canlı modda il başına simülasyon sayısı')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    print("📡 2024 Yerel Seçimler - Canlı Dashboard")
+    print("=" * 70)
+
+    if args.live:
+        state = LiveDashboardState()
+        start_live_simulation(state, args.simulations)
+    else:
+        try:
+            state = load_artifact_state(args.run_id)
+        except ArtifactError as e:
+            print(f"❌ {e} - Önce tahminleri çalıştırın veya --live kullanın.")
+            return
+
+    server = LiveDashboardServer(state, port=args.port)
+    print(f"🌐 Dashboard: http://{DEFAULT_HOST}:{args.port}/ (durdurmak için Ctrl+C)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Sunucu durduruldu.")
+    finally:
+        server.stopping = True
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
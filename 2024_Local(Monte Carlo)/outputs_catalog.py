@@ -0,0 +1,380 @@
+"""
+Çıktı Kataloğu
+2024 Türkiye Yerel Seçimleri için
+
+Her çalıştırmanın (run) yapılandırmasını, rastgele tohumunu, girdi
+özetini, etiketlerini ve ürettiği dosyaları (raporlar, grafikler, JSON)
+SQLite veritabanında indeksler. Dashboard doğru çalıştırmayı klasör
+taramadan bulur; saklama politikası eski çalıştırmaları temizler.
+
+    python outputs_catalog.py list [--tag T] [--date YYYY-MM-DD]
+    python outputs_catalog.py show RUN_ID
+    python outputs_catalog.py tag RUN_ID ETIKET
+    python outputs_catalog.py reindex
+    python outputs_catalog.py gc --keep-last 20 [--keep-draws-last 3] [--max-age-days 30] [--dry-run]
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from results_artifact import DEFAULT_RUNS_DIR, ArtifactError, ResultsArtifact
+
+DEFAULT_CATALOG_PATH = "outputs/catalog.sqlite"
+LEGACY_RUN_PREFIX = 'legacy_'
+
+# Katalog öncesi zaman damgalı çıktı dosyaları: <önek>_<YYYYMMDD_HHMMSS>.<uzantı>
+LEGACY_FILE_PATTERN = re.compile(r'^(?P<prefix>.+)_(?P<timestamp>\d{8}_\d{6})\.(txt|json|jsonl|png|svg)$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    run_dir TEXT,
+    input_hash TEXT,
+    seed INTEGER,
+    config TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_created_at ON runs (created_at);
+CREATE TABLE IF NOT EXISTS run_tags (
+    run_id TEXT NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (run_id, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_run_tags_tag ON run_tags (tag);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id TEXT NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, kind, path)
+);
+CREATE INDEX IF NOT EXISTS idx_artifacts_kind ON artifacts (kind, created_at);
+"""
+
+
+class OutputsCatalog:
+    """Çalıştırmalar ve ürettikleri dosyalar için SQLite kataloğu"""
+
+    def __init__(self, db_path: str = DEFAULT_CATALOG_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(db_path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA foreign_keys = ON')
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    # Kayıt
+
+    def register_run(self, artifact: ResultsArtifact, tags: Iterable[str] = ()):
+        """Bir sonuç artefaktını (çalıştırmayı) kataloğa ekler veya günceller"""
+        manifest = artifact.manifest
+        config = manifest.get('config', {})
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, created_at, run_dir, input_hash, seed, config) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (artifact.run_id, manifest['created_at'], str(artifact.run_dir),
+                 manifest.get('input_hash'), config.get('random_seed'),
+                 json.dumps(config, ensure_ascii=False))
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO run_tags (run_id, tag) VALUES (?, ?)",
+                [(artifact.run_id, tag) for tag in tags]
+            )
+
+    def add_tag(self, run_id: str, tag: str):
+        with self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO run_tags (run_id, tag) VALUES (?, ?)", (run_id, tag))
+
+    def add_artifacts(self, run_id: str, files: Dict[str, Optional[str]]):
+        """Çalıştırmanın ürettiği dosyaları (tür -> yol) kaydeder"""
+        now = datetime.now().isoformat(timespec='seconds')
+        rows = [(run_id, kind, str(path), now) for kind, path in files.items() if path]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO artifacts (run_id, kind, path, created_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+
+    # Sorgular
+
+    def _run_dict(self, row: sqlite3.Row) -> Dict:
+        run = dict(row)
+        run['config'] = json.loads(run['config']) if run['config'] else {}
+        run['tags'] = [r['tag'] for r in self._conn.execute(
+            "SELECT tag FROM run_tags WHERE run_id = ? ORDER BY tag", (run['run_id'],))]
+        return run
+
+    def get_run(self, run_id: str) -> Optional[Dict]:
+        row = self._conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return self._run_dict(row) if row else None
+
+    def find_runs(self, tag: str = None, date: str = None, since: str = None,
+                  until: str = None, limit: int = None, include_legacy: bool = True) -> List[Dict]:
+        """Etikete, güne (YYYY-MM-DD) veya tarih aralığına göre çalıştırmalar (yeniden eskiye)"""
+        query = "SELECT runs.* FROM runs"
+        conditions, params = [], []
+        if tag is not None:
+            query += " JOIN run_tags ON run_tags.run_id = runs.run_id"
+            conditions.append("run_tags.tag = ?")
+            params.append(tag)
+        if date is not None:
+            conditions.append("runs.created_at >= ? AND runs.created_at < ?")
+            day = datetime.strptime(date, '%Y-%m-%d')
+            params += [day.isoformat(), (day + timedelta(days=1)).isoformat()]
+        if since is not None:
+            conditions.append("runs.created_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("runs.created_at < ?")
+            params.append(until)
+        if not include_legacy:
+            conditions.append("runs.run_id NOT LIKE ?")
+            params.append(LEGACY_RUN_PREFIX + '%')
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY runs.created_at DESC, runs.run_id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [self._run_dict(row) for row in self._conn.execute(query, params)]
+
+    def latest_run(self, tag: str = None) -> Optional[Dict]:
+        """Sonuç artefaktı olan en yeni çalıştırma (isteğe bağlı etiketle)"""
+        runs = self.find_runs(tag=tag, limit=1, include_legacy=False)
+        return runs[0] if runs else None
+
+    def artifacts(self, run_id: str) -> List[Dict]:
+        return [dict(row) for row in self._conn.execute(
+            "SELECT kind, path, created_at FROM artifacts WHERE run_id = ? ORDER BY kind", (run_id,))]
+
+    def latest_artifact(self, kind: str) -> Optional[str]:
+        """Belirli türdeki en yeni dosyanın yolu (ör. 'detailed_results')"""
+        row = self._conn.execute(
+            "SELECT path FROM artifacts WHERE kind = ? ORDER BY created_at DESC, path DESC LIMIT 1", (kind,)
+        ).fetchone()
+        return row['path'] if row else None
+
+    # Bakım
+
+    def reindex(self, runs_dir: str = DEFAULT_RUNS_DIR, outputs_dir: str = "outputs/") -> int:
+        """
+        Katalogda olmayan çalıştırma klasörlerini ve katalog öncesi zaman damgalı
+        çıktı dosyalarını ekler. Eski dosyalar zaman damgasına göre 'legacy_' ön ekli
+        sözde çalıştırmalarda gruplanır. Eklenen kayıt sayısını döndürür.
+        """
+        added = 0
+        runs_path = Path(runs_dir)
+        if runs_path.exists():
+            for manifest_path in sorted(runs_path.glob('*/manifest.json')):
+                run_id = manifest_path.parent.name
+                if self.get_run(run_id):
+                    continue
+                try:
+                    self.register_run(ResultsArtifact.open(run_id, runs_dir))
+                    added += 1
+                except ArtifactError:
+                    continue
+
+        known = {row['path'] for row in self._conn.execute("SELECT path FROM artifacts")}
+        for path in sorted(Path(outputs_dir).rglob('*')):
+            match = LEGACY_FILE_PATTERN.match(path.name)
+            if not match or str(path) in known or runs_path in path.parents:
+                continue
+            timestamp = match.group('timestamp')
+            run_id = LEGACY_RUN_PREFIX + timestamp
+            created_at = datetime.strptime(timestamp, '%Y%m%d_%H%M%S').isoformat()
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO runs (run_id, created_at) VALUES (?, ?)", (run_id, created_at)
+                )
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO artifacts (run_id, kind, path, created_at) VALUES (?, ?, ?, ?)",
+                    (run_id, 'legacy:' + match.group('prefix'), str(path), created_at)
+                )
+            added += 1
+        return added
+
+    def drop_draws(self, keep_last: int = 3, keep_tagged: bool = True, dry_run: bool = False) -> List[str]:
+        """
+        Çalıştırmaları silmeden önceki ilk kademe: en yeni `keep_last` çalıştırma
+        dışındakilerin büyük simülasyon matrisleri ('draws' aşaması) silinir, özet
+        aşamaları kalır. Etiketli ve LATEST çalıştırmalar korunur. Matrisi silinen
+        çalıştırma kimliklerini döndürür.
+        """
+        dropped = []
+        for position, run in enumerate(self.find_runs(include_legacy=False)):
+            if position < keep_last or not run['run_dir'] or not os.path.isdir(run['run_dir']):
+                continue
+            if keep_tagged and run['tags']:
+                continue
+            if _is_latest(run['run_dir']):
+                continue
+            run_dir = Path(run['run_dir'])
+            try:
+                artifact = ResultsArtifact.open(run_dir.name, str(run_dir.parent))
+            except ArtifactError:
+                continue
+            if not artifact.has_stage('draws'):
+                continue
+            dropped.append(run['run_id'])
+            if not dry_run:
+                artifact.drop_draws()
+        return dropped
+
+    def gc(self, keep_last: int = 20, max_age_days: Optional[int] = None,
+           keep_tagged: bool = True, dry_run: bool = False) -> List[str]:
+        """
+        Saklama politikası: en yeni `keep_last` çalıştırma ve (verilirse) son
+        `max_age_days` gündeki çalıştırmalar tutulur; etiketli çalıştırmalar,
+        LATEST ile işaretli çalıştırma, reindex ile eklenen 'legacy_' kayıtları ve
+        git'te izlenen dosyası olan çalıştırmalar silinmez. Bir dosya, tutulan bir
+        çalıştırma da ona başvuruyorsa (ör. değişmeyen grafik) diskte bırakılır.
+        Silinen çalıştırma kimliklerini döndürür.
+        """
+        runs = self.find_runs()
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat() if max_age_days is not None else None
+
+        candidates = []
+        for position, run in enumerate(runs):
+            if position < keep_last:
+                continue
+            if cutoff is not None and run['created_at'] >= cutoff:
+                continue
+            if keep_tagged and run['tags']:
+                continue
+            if run['run_id'].startswith(LEGACY_RUN_PREFIX):
+                continue
+            if run['run_dir'] and _is_latest(run['run_dir']):
+                continue
+            candidates.append((run, self.artifacts(run['run_id'])))
+
+        directories = [os.path.dirname(a['path']) or '.' for _, artifacts in candidates for a in artifacts]
+        directories += [run['run_dir'] for run, _ in candidates if run['run_dir']]
+        tracked = _git_tracked_files(directories)
+
+        removed = []
+        for run, artifacts in candidates:
+            run_dir = os.path.realpath(run['run_dir']) + os.sep if run['run_dir'] else None
+            if any(os.path.realpath(a['path']) in tracked for a in artifacts) or \
+                    (run_dir and any(path.startswith(run_dir) for path in tracked)):
+                continue
+            removed.append(run)
+
+        removed_ids = {run['run_id'] for run in removed}
+        referenced = {os.path.realpath(row['path']) for row in self._conn.execute("SELECT run_id, path FROM artifacts")
+                      if row['run_id'] not in removed_ids}
+
+        if not dry_run:
+            for run in removed:
+                for artifact in self.artifacts(run['run_id']):
+                    path = artifact['path']
+                    if os.path.realpath(path) not in referenced and os.path.exists(path):
+                        os.remove(path)
+                if run['run_dir'] and os.path.isdir(run['run_dir']):
+                    shutil.rmtree(run['run_dir'])
+                with self._conn:
+                    self._conn.execute("DELETE FROM runs WHERE run_id = ?", (run['run_id'],))
+        return [run['run_id'] for run in removed]
+
+
+def _git_tracked_files(directories: Iterable[str]) -> set:
+    """Verilen klasörlerde git'in izlediği dosyaların mutlak yolları (git yoksa boş)"""
+    tracked = set()
+    for directory in set(directories):
+        if not os.path.isdir(directory):
+            continue
+        try:
+            result = subprocess.run(['git', '-C', directory, 'ls-files', '-z'], capture_output=True)
+        except OSError:
+            break
+        if result.returncode != 0:
+            continue
+        tracked.update(os.path.realpath(os.path.join(directory, name))
+                       for name in os.fsdecode(result.stdout).split('\0') if name)
+    return tracked
+
+
+def _is_latest(run_dir: str) -> bool:
+    latest = Path(run_dir).parent / 'LATEST'
+    return latest.exists() and latest.read_text(encoding='utf-8').strip() == Path(run_dir).name
+
+
+def main():
+    """Katalog komut satırı arayüzü"""
+    parser = argparse.ArgumentParser(description='Çıktı kataloğu ve saklama politikası')
+    parser.add_argument('--db', default=DEFAULT_CATALOG_PATH)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    list_cmd = commands.add_parser('list', help='Çalıştırmaları listele')
+    list_cmd.add_argument('--tag')
+    list_cmd.add_argument('--date', help='YYYY-MM-DD')
+    list_cmd.add_argument('--limit', type=int, default=20)
+
+    show_cmd = commands.add_parser('show', help='Çalıştırma detayı')
+    show_cmd.add_argument('run_id')
+
+    tag_cmd = commands.add_parser('tag', help='Çalıştırmayı etiketle')
+    tag_cmd.add_argument('run_id')
+    tag_cmd.add_argument('tag')
+
+    commands.add_parser('reindex', help='Katalogda olmayan çıktıları ekle')
+
+    gc_cmd = commands.add_parser('gc', help='Eski çalıştırmaları temizle')
+    gc_cmd.add_argument('--keep-last', type=int, default=20)
+    gc_cmd.add_argument('--keep-draws-last', type=int, default=3,
+                        help='Simülasyon matrisleri tutulacak en yeni çalıştırma sayısı')
+    gc_cmd.add_argument('--max-age-days', type=int)
+    gc_cmd.add_argument('--include-tagged', action='store_true', help='Etiketli çalıştırmaları da sil')
+    gc_cmd.add_argument('--dry-run', action='store_true')
+
+    args = parser.parse_args()
+    catalog = OutputsCatalog(args.db)
+
+    if args.command == 'list':
+        for run in catalog.find_runs(tag=args.tag, date=args.date, limit=args.limit):
+            tags = f" [{', '.join(run['tags'])}]" if run['tags'] else ''
+            print(f"{run['run_id']}  {run['created_at']}  seed={run['seed']}{tags}")
+    elif args.command == 'show':
+        run = catalog.get_run(args.run_id)
+        if run is None:
+            print(f"❌ Çalıştırma bulunamadı: {args.run_id}")
+            return
+        print(json.dumps(run, ensure_ascii=False, indent=2))
+        for artifact in catalog.artifacts(args.run_id):
+            print(f"  {artifact['kind']}: {artifact['path']}")
+    elif args.command == 'tag':
+        if catalog.get_run(args.run_id) is None:
+            print(f"❌ Çalıştırma bulunamadı: {args.run_id}")
+            return
+        catalog.add_tag(args.run_id, args.tag)
+        print(f"🏷️  {args.run_id} -> {args.tag}")
+    elif args.command == 'reindex':
+        print(f"📇 {catalog.reindex()} kayıt kataloğa eklendi")
+    elif args.command == 'gc':
+        trimmed = catalog.drop_draws(args.keep_draws_last, keep_tagged=not args.include_tagged,
+                                     dry_run=args.dry_run)
+        removed = catalog.gc(args.keep_last, args.max_age_days,
+                             keep_tagged=not args.include_tagged, dry_run=args.dry_run)
+        action = 'silinecek' if args.dry_run else 'silindi'
+        print(f"🧹 {len(set(trimmed) - set(removed))} çalıştırmanın simülasyon matrisi {action}")
+        print(f"🧹 {len(removed)} çalıştırma {action}")
+        for run_id in removed:
+            print(f"  {run_id}")
+
+    catalog.close()
+
+
+if __name__ == "__main__":
+    main()
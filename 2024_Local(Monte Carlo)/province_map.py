@@ -0,0 +1,276 @@
+"""
+İl Sınırları ve Harita Geometrisi
+2024 Türkiye Yerel Seçimleri için
+
+İl sınırları çevrimdışı bir GeoJSON dosyasından (data/geo/turkiye_iller.geojson)
+bir kez okunur, Douglas-Peucker ile sadeleştirilir, düzlemsel koordinatlara
+izdüşürülür ve sıkıştırılmış .npz olarak önbelleğe alınır. Sonraki
+çalıştırmalar yalnızca önbelleği okuyup poligonları yeniden renklendirir;
+kaynak dosyanın özeti boyut ve değişiklik zamanıyla birlikte saklandığından
+dosya değişmedikçe yeniden okunmaz.
+
+Sınır dosyası depoyla gelmez; kamu malı Natural Earth il sınırlarından
+bir kez indirilir:
+
+    python province_map.py download
+
+    outputs/cache/geometry/<kaynak özeti>.npz
+        names         il adları (GeoJSON'daki yazımıyla)
+        ring_province her halkanın il indeksi
+        ring_offsets  halkaların vertices içindeki başlangıçları (+ son)
+        vertices      float32 (x, y) köşe noktaları
+    outputs/cache/geometry/kaynaklar.json   # sınır dosyası -> boyut, değişiklik zamanı, özet
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Sadeleştirme veya izdüşüm değiştiğinde artırılır; eski önbellek kullanılmaz
+GEOMETRY_CACHE_VERSION = 1
+DEFAULT_BOUNDARY_PATH = "data/geo/turkiye_iller.geojson"
+DEFAULT_GEOMETRY_CACHE_DIR = "outputs/cache/geometry/"
+DEFAULT_TOLERANCE = 0.01  # derece (~1 km)
+SOURCE_INDEX_NAME = "kaynaklar.json"
+
+# Natural Earth 1:10m birinci düzey idari sınırlar (kamu malı); indirilirken Türkiye süzülür
+NATURAL_EARTH_ADMIN1_URL = ("https://raw.githubusercontent.com/nvkelso/natural-earth-vector/master/"
+                            "geojson/ne_10m_admin_1_states_provinces.geojson")
+NATURAL_EARTH_ATTRIBUTION = "Made with Natural Earth. Free vector and raster map data @ naturalearthdata.com."
+
+# İl adının bulunabileceği GeoJSON özellikleri (sırayla denenir)
+NAME_PROPERTIES = ['name_tr', 'name', 'NAME_1', 'shapeName', 'il_adi', 'ad', 'NAME', 'province']
+
+_ASCII_FOLD = str.maketrans('çğıöşüâîû', 'cgiosuaiu')
+
+
+def province_key(name: str) -> str:
+    """İl adını eşleştirme anahtarına çevirir (Türkçe küçük harf, ASCII, boşluksuz)"""
+    lowered = name.strip().replace('İ', 'i').replace('I', 'ı').lower()
+    return ''.join(lowered.translate(_ASCII_FOLD).split())
+
+
+def _simplify(ring: np.ndarray, tolerance: float) -> np.ndarray:
+    """Douglas-Peucker sadeleştirmesi (kapalı halka; en az 4 nokta korunur)"""
+    if len(ring) <= 4 or tolerance <= 0:
+        return ring
+    keep = np.zeros(len(ring), dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(ring) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = ring[end] - ring[start]
+        points = ring[start + 1:end] - ring[start]
+        length = np.hypot(*segment)
+        if length == 0:
+            distances = np.hypot(points[:, 0], points[:, 1])
+        else:
+            distances = np.abs(segment[0] * points[:, 1] - segment[1] * points[:, 0]) / length
+        index = int(distances.argmax())
+        if distances[index] > tolerance:
+            split = start + 1 + index
+            keep[split] = True
+            stack += [(start, split), (split, end)]
+    simplified = ring[keep]
+    return simplified if len(simplified) >= 4 else ring
+
+
+def _exterior_rings(geometry: Dict) -> List[np.ndarray]:
+    """Polygon/MultiPolygon dış halkaları (delikler haritada çizilmez)"""
+    if geometry is None:
+        return []
+    if geometry['type'] == 'Polygon':
+        polygons = [geometry['coordinates']]
+    elif geometry['type'] == 'MultiPolygon':
+        polygons = geometry['coordinates']
+    else:
+        return []
+    return [np.asarray(polygon[0], dtype=float)[:, :2] for polygon in polygons if polygon]
+
+
+def _feature_name(properties: Dict) -> Optional[str]:
+    for key in NAME_PROPERTIES:
+        if properties.get(key):
+            return str(properties[key])
+    return None
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_digest(boundary_path: str, cache_dir: str) -> str:
+    """
+    Sınır dosyasının içerik özeti. Boyut ve değişiklik zamanı kayıtlı özetle
+    eşleşirse dosya okunmaz; aksi halde özet hesaplanıp kaydedilir.
+    """
+    stat = os.stat(boundary_path)
+    index_path = Path(cache_dir) / SOURCE_INDEX_NAME
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+
+    key = os.path.abspath(boundary_path)
+    entry = index.get(key)
+    if entry and entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+        return entry['sha256']
+
+    digest = _file_sha256(boundary_path)
+    index[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_path.with_name(index_path.name + f'.{os.getpid()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, index_path)
+    return digest
+
+
+class ProvinceGeometry:
+    """Önbellekten okunan sadeleştirilmiş, izdüşürülmüş il poligonları"""
+
+    def __init__(self, names: np.ndarray, ring_province: np.ndarray,
+                 ring_offsets: np.ndarray, vertices: np.ndarray):
+        self.names = [str(name) for name in names]
+        self.ring_province = ring_province
+        self.ring_offsets = ring_offsets
+        self.vertices = vertices
+
+    @classmethod
+    def from_cache(cls, cache_path: str) -> 'ProvinceGeometry':
+        with np.load(cache_path, allow_pickle=False) as data:
+            return cls(data['names'], data['ring_province'], data['ring_offsets'], data['vertices'])
+
+    def rings(self) -> List[np.ndarray]:
+        offsets = self.ring_offsets
+        return [self.vertices[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+    def match(self, provinces) -> Dict[str, int]:
+        """Sonuçlardaki il adı -> geometri indeksi (eşleşmeyen iller sözlükte yer almaz)"""
+        index = {province_key(name): i for i, name in enumerate(self.names)}
+        return {city: index[province_key(city)] for city in provinces if province_key(city) in index}
+
+
+def geometry_cache_path(boundary_path: str = DEFAULT_BOUNDARY_PATH, tolerance: float = DEFAULT_TOLERANCE,
+                        cache_dir: str = DEFAULT_GEOMETRY_CACHE_DIR) -> Optional[str]:
+    """
+    Sınır dosyasının sadeleştirilmiş geometri önbelleğini döndürür; yoksa bir kez
+    oluşturur. Sınır dosyası bulunamazsa None döndürür.
+    """
+    if not os.path.exists(boundary_path):
+        return None
+
+    key = hashlib.sha256(
+        f"{GEOMETRY_CACHE_VERSION}:{tolerance}:{_source_digest(boundary_path, cache_dir)}".encode('utf-8')
+    ).hexdigest()[:32]
+    cache_path = Path(cache_dir) / f"{key}.npz"
+    if cache_path.exists():
+        return str(cache_path)
+
+    with open(boundary_path, 'r', encoding='utf-8') as f:
+        features = json.load(f).get('features', [])
+
+    names, ring_province, rings = [], [], []
+    for feature in features:
+        name = _feature_name(feature.get('properties') or {})
+        feature_rings = _exterior_rings(feature.get('geometry'))
+        if name is None or not feature_rings:
+            continue
+        names.append(name)
+        for ring in feature_rings:
+            rings.append(_simplify(ring, tolerance))
+            ring_province.append(len(names) - 1)
+
+    if not rings:
+        return None
+
+    # Eşit dikdörtgen izdüşüm: boylam, ortalama enlemin kosinüsüyle ölçeklenir
+    all_points = np.concatenate(rings)
+    scale = np.cos(np.radians(all_points[:, 1].mean()))
+    vertices = np.concatenate(rings).astype(np.float32)
+    vertices[:, 0] *= scale
+    ring_offsets = np.concatenate([[0], np.cumsum([len(ring) for ring in rings])]).astype(np.int64)
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(cache_path.stem + f'.{os.getpid()}.tmp.npz')
+    np.savez_compressed(
+        tmp_path,
+        names=np.array(names, dtype=str),
+        ring_province=np.array(ring_province, dtype=np.int32),
+        ring_offsets=ring_offsets,
+        vertices=vertices,
+    )
+    os.replace(tmp_path, cache_path)
+    print(f"🗺️  İl geometrisi önbelleğe alındı: {len(names)} il, {len(vertices):,} nokta")
+    return str(cache_path)
+
+
+def download_boundaries(boundary_path: str = DEFAULT_BOUNDARY_PATH, url: str = NATURAL_EARTH_ADMIN1_URL,
+                        timeout: float = 120) -> int:
+    """
+    Natural Earth birinci düzey idari sınırlarını indirir, Türkiye illerini süzüp
+    (ad + geometri) sınır dosyasına yazar. Yazılan il sayısını döndürür.
+    """
+    import requests
+
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+
+    features = []
+    for feature in response.json().get('features', []):
+        properties = feature.get('properties') or {}
+        if properties.get('adm0_a3') != 'TUR' and properties.get('iso_a2') != 'TR':
+            continue
+        name = properties.get('name_tr') or properties.get('name')
+        if not name or not feature.get('geometry'):
+            continue
+        features.append({
+            'type': 'Feature',
+            'properties': {'name': name, 'iso_3166_2': properties.get('iso_3166_2')},
+            'geometry': feature['geometry'],
+        })
+    if not features:
+        raise ValueError(f"Kaynakta Türkiye ili bulunamadı: {url}")
+
+    path = Path(boundary_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'type': 'FeatureCollection', 'source': url, 'attribution': NATURAL_EARTH_ATTRIBUTION,
+                   'features': features}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return len(features)
+
+
+def main():
+    """İl sınırı komut satırı arayüzü"""
+    parser = argparse.ArgumentParser(description='İl sınırları ve harita geometrisi')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    download_cmd = commands.add_parser('download', help='Natural Earth il sınırlarını indir')
+    download_cmd.add_argument('--url', default=NATURAL_EARTH_ADMIN1_URL)
+    download_cmd.add_argument('--output', default=DEFAULT_BOUNDARY_PATH)
+
+    args = parser.parse_args()
+    if args.command == 'download':
+        count = download_boundaries(args.output, args.url)
+        print(f"🗺️  {count} il sınırı kaydedildi: {args.output}")
+        cache_path = geometry_cache_path(args.output)
+        if cache_path:
+            print(f"🗺️  Geometri önbelleği: {cache_path}")
+
+
+if __name__ == "__main__":
+    main()
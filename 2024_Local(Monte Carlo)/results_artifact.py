@@ -0,0 +1,442 @@
+"""
+Sürümlü Sonuç Artefaktı
+2024 Türkiye Yerel Seçimleri için
+
+Tahmin motoru, senaryo analizi ve dashboard arasında paylaşılan çalıştırma
+(run) klasörü. Her aşama sütun bazlı bir .npz dosyası yazar; manifest.json
+çalıştırma kimliğini, şema sürümünü, yapılandırmayı ve dosya özetlerini tutar.
+
+    outputs/runs/<run_id>/manifest.json
+    outputs/runs/<run_id>/predictions.npz
+    outputs/runs/<run_id>/scenarios.npz
+    outputs/runs/<run_id>/draws.npz              # isteğe bağlı: il ve parti ekseni
+    outputs/runs/<run_id>/draws.vote_shares.npy  # (il, simülasyon, parti) float16, bellek eşlemeli okunur
+    outputs/runs/<run_id>/draws.turnout.npy      # (il, simülasyon) float16
+    outputs/runs/LATEST
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from turnout_model import TURNOUT_BAND_LABELS
+
+ARTIFACT_FORMAT = 'turkiye-yerel-secim-sonuclari'
+ARTIFACT_VERSION = 2
+DEFAULT_RUNS_DIR = "outputs/runs/"
+
+CONFIDENCE_LEVELS = ['95%', '90%', '80%']
+MARGIN_FIELDS = ['average_margin', 'prob_win_5plus', 'prob_win_10plus', 'close_race_prob']
+
+# Aşama başına sütun şeması: sütun adı -> (numpy dtype türü, boyut sayısı)
+STAGE_SCHEMAS = {
+    'predictions': {
+        'provinces': ('U', 1),
+        'parties': ('U', 1),
+        'simulations_count': ('i', 1),
+        'poll_count': ('i', 1),
+        'last_poll_date': ('U', 1),
+        'poll_averages': ('f', 2),
+        'poll_std_deviations': ('f', 2),
+        'mean_votes': ('f', 2),
+        'std_votes': ('f', 2),
+        'win_probabilities': ('f', 2),
+        'confidence_intervals': ('f', 4),
+        'margin_analysis': ('f', 3),
+        'turnout_bands': ('U', 1),
+        'mean_turnout': ('f', 1),
+        'turnout_band_probabilities': ('f', 2),
+        'turnout_band_mean_turnout': ('f', 2),
+        'turnout_band_win_probabilities': ('f', 3),
+        'turnout_band_mean_votes': ('f', 3),
+    },
+    'draws': {
+        'provinces': ('U', 1),
+        'parties': ('U', 1),
+    },
+    'scenarios': {
+        'provinces': ('U', 1),
+        'risk_columns': ('U', 1),
+        'risk_values': ('f', 2),
+        'risk_levels': ('U', 1),
+        'critical_factors': ('U', 1),
+    },
+}
+
+
+class ArtifactError(Exception):
+    """Artefakt bulunamadığında veya şema/sürüm uyuşmadığında fırlatılır"""
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _atomic_write_text(path: Path, text: str):
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def hash_input_files(paths: List[str]) -> str:
+    """Girdi CSV dosyalarının içerik özeti (çalıştırmanın hangi veriyle yapıldığını belirler)"""
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(os.path.basename(path).encode('utf-8'))
+        digest.update(_file_sha256(Path(path)).encode('ascii'))
+    return digest.hexdigest()
+
+
+def predictions_to_columns(results: Dict) -> Dict[str, np.ndarray]:
+    """İl sonuç sözlüklerini 'predictions' aşamasının sütunlarına çevirir"""
+    provinces = list(results.keys())
+    parties = list(next(iter(results.values()))['mean_votes'].keys()) if results else []
+    n_prov, n_party = len(provinces), len(parties)
+    n_band = len(TURNOUT_BAND_LABELS)
+
+    columns = {
+        'provinces': np.array(provinces, dtype=str),
+        'parties': np.array(parties, dtype=str),
+        'simulations_count': np.zeros(n_prov, dtype=np.int64),
+        'poll_count': np.zeros(n_prov, dtype=np.int64),
+        'last_poll_date': np.array([''] * n_prov, dtype='U10'),
+        'poll_averages': np.zeros((n_prov, n_party)),
+        'poll_std_deviations': np.zeros((n_prov, n_party)),
+        'mean_votes': np.zeros((n_prov, n_party)),
+        'std_votes': np.zeros((n_prov, n_party)),
+        'win_probabilities': np.zeros((n_prov, n_party)),
+        'confidence_intervals': np.zeros((n_prov, n_party, len(CONFIDENCE_LEVELS), 2)),
+        'margin_analysis': np.zeros((n_prov, n_party, len(MARGIN_FIELDS))),
+        'turnout_bands': np.array(TURNOUT_BAND_LABELS, dtype=str),
+        'mean_turnout': np.full(n_prov, np.nan),
+        'turnout_band_probabilities': np.zeros((n_prov, n_band)),
+        'turnout_band_mean_turnout': np.full((n_prov, n_band), np.nan),
+        'turnout_band_win_probabilities': np.zeros((n_prov, n_band, n_party)),
+        'turnout_band_mean_votes': np.full((n_prov, n_band, n_party), np.nan),
+    }
+
+    for i, city in enumerate(provinces):
+        result = results[city]
+        stats = result['poll_stats']
+        columns['simulations_count'][i] = result['simulations_count']
+        columns['poll_count'][i] = stats['poll_count']
+        last_date = stats.get('last_poll_date')
+        if last_date is not None and not pd.isna(last_date):
+            columns['last_poll_date'][i] = pd.Timestamp(last_date).strftime('%Y-%m-%d')
+
+        for j, party in enumerate(parties):
+            columns['poll_averages'][i, j] = stats['averages'].get(party, 0)
+            columns['poll_std_deviations'][i, j] = stats['std_deviations'].get(party, 0)
+            columns['mean_votes'][i, j] = result['mean_votes'].get(party, 0)
+            columns['std_votes'][i, j] = result['std_votes'].get(party, 0)
+            columns['win_probabilities'][i, j] = result['win_probabilities'].get(party, 0)
+            for k, level in enumerate(CONFIDENCE_LEVELS):
+                columns['confidence_intervals'][i, j, k] = result['confidence_intervals'][party][level]
+            for k, field in enumerate(MARGIN_FIELDS):
+                columns['margin_analysis'][i, j, k] = result['margin_analysis'][party][field]
+
+        turnout_analysis = result.get('turnout_analysis')
+        if turnout_analysis:
+            columns['mean_turnout'][i] = turnout_analysis['mean_turnout']
+            for b, label in enumerate(TURNOUT_BAND_LABELS):
+                band = turnout_analysis['bands'].get(label)
+                if band is None:
+                    continue
+                columns['turnout_band_probabilities'][i, b] = band['probability']
+                columns['turnout_band_mean_turnout'][i, b] = band['mean_turnout']
+                for j, party in enumerate(parties):
+                    columns['turnout_band_win_probabilities'][i, b, j] = band['win_probabilities'].get(party, 0)
+                    columns['turnout_band_mean_votes'][i, b, j] = band['mean_votes'].get(party, np.nan)
+
+    return columns
+
+
+def _columns_to_turnout_analysis(columns: Dict[str, np.ndarray], i: int, parties: List[str]) -> Optional[Dict]:
+    """Bir ilin katılım bandı sütunlarından turnout_analysis sözlüğünü kurar"""
+    if np.isnan(columns['mean_turnout'][i]):
+        return None
+    bands = {}
+    for b, label in enumerate(columns['turnout_bands']):
+        probability = float(columns['turnout_band_probabilities'][i, b])
+        if probability <= 0:
+            continue
+        win_row = columns['turnout_band_win_probabilities'][i, b]
+        bands[str(label)] = {
+            'probability': probability,
+            'mean_turnout': float(columns['turnout_band_mean_turnout'][i, b]),
+            'win_probabilities': {parties[j]: float(win_row[j]) for j in range(len(parties)) if win_row[j] > 0},
+            'mean_votes': dict(zip(parties, columns['turnout_band_mean_votes'][i, b].tolist())),
+        }
+    return {'mean_turnout': float(columns['mean_turnout'][i]), 'bands': bands}
+
+
+def columns_to_predictions(columns: Dict[str, np.ndarray]) -> Dict:
+    """'predictions' aşamasının sütunlarından il sonuç sözlüklerini yeniden kurar"""
+    parties = [str(p) for p in columns['parties']]
+    results = {}
+
+    for i, city in enumerate(columns['provinces']):
+        city = str(city)
+        win_row = columns['win_probabilities'][i]
+        # value_counts sırası: yalnızca en az bir kez kazanan partiler, azalan olasılıkla
+        order = [j for j in np.argsort(-win_row, kind='stable') if win_row[j] > 0]
+        last_date = str(columns['last_poll_date'][i]) or None
+
+        results[city] = {
+            'city': city,
+            'simulations_count': int(columns['simulations_count'][i]),
+            'mean_votes': dict(zip(parties, columns['mean_votes'][i].tolist())),
+            'std_votes': dict(zip(parties, columns['std_votes'][i].tolist())),
+            'confidence_intervals': {
+                party: {
+                    level: columns['confidence_intervals'][i, j, k].tolist()
+                    for k, level in enumerate(CONFIDENCE_LEVELS)
+                }
+                for j, party in enumerate(parties)
+            },
+            'win_probabilities': {parties[j]: float(win_row[j]) for j in order},
+            'margin_analysis': {
+                party: {
+                    field: float(columns['margin_analysis'][i, j, k])
+                    for k, field in enumerate(MARGIN_FIELDS)
+                }
+                for j, party in enumerate(parties)
+            },
+            'poll_stats': {
+                'averages': dict(zip(parties, columns['poll_averages'][i].tolist())),
+                'std_deviations': dict(zip(parties, columns['poll_std_deviations'][i].tolist())),
+                'poll_count': int(columns['poll_count'][i]),
+                'last_poll_date': last_date,
+            },
+        }
+        turnout_analysis = _columns_to_turnout_analysis(columns, i, parties)
+        if turnout_analysis:
+            results[city]['turnout_analysis'] = turnout_analysis
+
+    return results
+
+
+def risk_table_to_columns(risk_table: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Risk tablosunu 'scenarios' aşamasının sütunlarına çevirir"""
+    numeric = risk_table.select_dtypes(include=[np.number])
+    return {
+        'provinces': np.array(risk_table.index.tolist(), dtype=str),
+        'risk_columns': np.array(numeric.columns.tolist(), dtype=str),
+        'risk_values': numeric.to_numpy(dtype=float),
+        'risk_levels': risk_table['risk_level'].to_numpy(dtype=str),
+        'critical_factors': risk_table['critical_factor'].to_numpy(dtype=str),
+    }
+
+
+def columns_to_risk_table(columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """'scenarios' aşamasından risk tablosunu yeniden kurar"""
+    table = pd.DataFrame(
+        columns['risk_values'],
+        index=[str(p) for p in columns['provinces']],
+        columns=[str(c) for c in columns['risk_columns']],
+    )
+    table['risk_level'] = columns['risk_levels'].astype(str)
+    table['critical_factor'] = columns['critical_factors'].astype(str)
+    return table
+
+
+class ResultsArtifact:
+    """Bir çalıştırmanın manifest ve aşama dosyalarını yöneten sınıf"""
+
+    def __init__(self, run_dir: Path, manifest: Dict):
+        self.run_dir = Path(run_dir)
+        self.manifest = manifest
+        self._stage_cache = {}
+
+    @property
+    def run_id(self) -> str:
+        return self.manifest['run_id']
+
+    @property
+    def stages(self) -> List[str]:
+        return list(self.manifest['stages'].keys())
+
+    @classmethod
+    def create(cls, runs_dir: str = DEFAULT_RUNS_DIR, config: Dict = None,
+               input_hash: str = None, run_id: str = None) -> 'ResultsArtifact':
+        """Yeni bir çalıştırma klasörü ve manifest oluşturur"""
+        runs_path = Path(runs_dir)
+        runs_path.mkdir(parents=True, exist_ok=True)
+
+        run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        candidate, suffix = run_id, 1
+        while (runs_path / candidate).exists():
+            suffix += 1
+            candidate = f"{run_id}_{suffix}"
+        run_dir = runs_path / candidate
+        run_dir.mkdir()
+
+        manifest = {
+            'format': ARTIFACT_FORMAT,
+            'version': ARTIFACT_VERSION,
+            'run_id': candidate,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'config': config or {},
+            'input_hash': input_hash,
+            'stages': {},
+        }
+        artifact = cls(run_dir, manifest)
+        artifact._write_manifest()
+        return artifact
+
+    @classmethod
+    def open(cls, run_id: str = None, runs_dir: str = DEFAULT_RUNS_DIR) -> 'ResultsArtifact':
+        """Belirtilen (veya LATEST ile işaretli) çalıştırmayı açar; sürümü doğrular"""
+        runs_path = Path(runs_dir)
+        if run_id is None:
+            latest = runs_path / 'LATEST'
+            if not latest.exists():
+                raise ArtifactError(f"Kayıtlı çalıştırma bulunamadı: {runs_path}")
+            run_id = latest.read_text(encoding='utf-8').strip()
+
+        manifest_path = runs_path / run_id / 'manifest.json'
+        if not manifest_path.exists():
+            raise ArtifactError(f"Çalıştırma bulunamadı: {run_id}")
+
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        if manifest.get('format') != ARTIFACT_FORMAT:
+            raise ArtifactError(f"Tanınmayan artefakt biçimi: {manifest.get('format')}")
+        if manifest.get('version') != ARTIFACT_VERSION:
+            raise ArtifactError(
+                f"Artefakt sürümü uyumsuz: {manifest.get('version')} (beklenen {ARTIFACT_VERSION})"
+            )
+        return cls(manifest_path.parent, manifest)
+
+    def _write_manifest(self):
+        _atomic_write_text(
+            self.run_dir / 'manifest.json',
+            json.dumps(self.manifest, ensure_ascii=False, indent=2)
+        )
+
+    def mark_latest(self):
+        """Bu çalıştırmayı LATEST olarak işaretler"""
+        _atomic_write_text(self.run_dir.parent / 'LATEST', self.run_id + '\n')
+
+    def write_stage(self, stage: str, columns: Dict[str, np.ndarray],
+                    producer: str, depends_on: Optional[str] = None, metadata: Dict = None):
+        """Bir aşamanın sütunlarını şemaya göre doğrulayıp .npz olarak yazar"""
+        _validate_columns(stage, columns)
+
+        file_name = f"{stage}.npz"
+        tmp_path = self.run_dir / f"{stage}.tmp.npz"
+        np.savez(tmp_path, **columns)
+        os.replace(tmp_path, self.run_dir / file_name)
+
+        self.manifest['stages'][stage] = {
+            'file': file_name,
+            'sha256': _file_sha256(self.run_dir / file_name),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'producer': producer,
+            'depends_on': depends_on,
+            'metadata': metadata or {},
+        }
+        self._write_manifest()
+        self._stage_cache.pop(stage, None)
+
+    def write_draws(self, provinces: List[str], parties: List[str], vote_shares: np.ndarray,
+                    turnout: np.ndarray, producer: str):
+        """
+        Simülasyon matrislerini 'draws' aşaması olarak yazar. Büyük diziler .npy
+        dosyalarına ayrı yazılır; sorgular yalnızca ihtiyaç duyduğu illeri bellek
+        eşlemeli okur.
+        """
+        arrays = {}
+        for name, array in (('vote_shares', vote_shares), ('turnout', turnout)):
+            file_name = f"draws.{name}.npy"
+            tmp_path = self.run_dir / f"draws.{name}.tmp.npy"
+            np.save(tmp_path, np.asarray(array, dtype=np.float16))
+            os.replace(tmp_path, self.run_dir / file_name)
+            arrays[name] = {
+                'file': file_name,
+                'sha256': _file_sha256(self.run_dir / file_name),
+                'shape': list(np.shape(array)),
+            }
+        self.write_stage(
+            'draws',
+            {'provinces': np.array(provinces, dtype=str), 'parties': np.array(parties, dtype=str)},
+            producer=producer,
+            depends_on='predictions',
+            metadata={'arrays': arrays},
+        )
+
+    def read_draws(self, mmap_mode: Optional[str] = 'r') -> Dict[str, np.ndarray]:
+        """'draws' aşamasının eksenleri ve (varsayılan olarak bellek eşlemeli) dizileri"""
+        columns = dict(self.read_stage('draws'))
+        for name, info in self.manifest['stages']['draws']['metadata']['arrays'].items():
+            columns[name] = np.load(self.run_dir / info['file'], mmap_mode=mmap_mode, allow_pickle=False)
+        return columns
+
+    def drop_draws(self) -> int:
+        """
+        'draws' aşamasını ve dizi dosyalarını siler; özet aşamaları kalır.
+        Manifest önce güncellenir. Boşalan bayt sayısını döndürür.
+        """
+        if not self.has_stage('draws'):
+            return 0
+        info = self.manifest['stages'].pop('draws')
+        self._write_manifest()
+        self._stage_cache.pop('draws', None)
+
+        freed = 0
+        for file_name in [info['file']] + [a['file'] for a in info['metadata'].get('arrays', {}).values()]:
+            path = self.run_dir / file_name
+            if path.exists():
+                freed += path.stat().st_size
+                path.unlink()
+        return freed
+
+    def has_stage(self, stage: str) -> bool:
+        return stage in self.manifest['stages']
+
+    def read_stage(self, stage: str) -> Dict[str, np.ndarray]:
+        """Aşama sütunlarını okur (ilk okumadan sonra bellekte tutulur)"""
+        if stage not in self._stage_cache:
+            if not self.has_stage(stage):
+                raise ArtifactError(f"'{self.run_id}' çalıştırmasında '{stage}' aşaması yok")
+            path = self.run_dir / self.manifest['stages'][stage]['file']
+            with np.load(path, allow_pickle=False) as data:
+                columns = {name: data[name] for name in data.files}
+            _validate_columns(stage, columns)
+            self._stage_cache[stage] = columns
+        return self._stage_cache[stage]
+
+    def verify(self) -> bool:
+        """Aşama dosyalarının (ve ayrı yazılan dizilerin) manifestteki özetlerle eşleştiğini kontrol eder"""
+        files = []
+        for info in self.manifest['stages'].values():
+            files.append(info)
+            files += info.get('metadata', {}).get('arrays', {}).values()
+        return all(_file_sha256(self.run_dir / info['file']) == info['sha256'] for info in files)
+
+
+def _validate_columns(stage: str, columns: Dict[str, np.ndarray]):
+    schema = STAGE_SCHEMAS.get(stage)
+    if schema is None:
+        return
+    missing = set(schema) - set(columns)
+    if missing:
+        raise ArtifactError(f"'{stage}' aşamasında eksik sütunlar: {sorted(missing)}")
+    for name, (kind, ndim) in schema.items():
+        array = np.asarray(columns[name])
+        if array.size and array.dtype.kind != kind:
+            raise ArtifactError(f"'{stage}.{name}' türü {array.dtype}, beklenen '{kind}'")
+        if array.ndim != ndim:
+            raise ArtifactError(f"'{stage}.{name}' boyutu {array.ndim}, beklenen {ndim}")
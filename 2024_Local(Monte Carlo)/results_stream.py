@@ -0,0 +1,135 @@
+"""
+Akışlı Sonuç Serileştirme (JSON Lines)
+2024 Türkiye Yerel Seçimleri için
+
+Detaylı il sonuçları satır başına bir il olacak şekilde JSON Lines olarak
+yazılır. İller tamamlandıkça satır eklenebilir; okurken yalnızca istenen
+iller ayrıştırılır ve istenen alanlar döndürülür. İnsanlar için girintili
+JSON dışa aktarımı seçenek olarak kalır.
+
+    {"city": "Adana", "simulations_count": 50000, "mean_votes": {...}, ...}
+    {"city": "Ankara", ...}
+"""
+
+import json
+import os
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+RECORD_PREFIX = '{"city": '
+
+
+def _json_default(value):
+    """numpy/pandas değerlerini sonucu kopyalamadan JSON'a çevirir"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.strftime('%Y-%m-%d')
+    if value is pd.NaT:
+        return None
+    raise TypeError(f"JSON'a çevrilemeyen değer: {type(value)}")
+
+
+def _clean_result(result: Dict) -> Dict:
+    """Eksik tarihleri (NaT) None yapar; diğer alanlar olduğu gibi kalır"""
+    stats = result.get('poll_stats')
+    if stats and 'last_poll_date' in stats and pd.isna(stats['last_poll_date']):
+        result = {**result, 'poll_stats': {**stats, 'last_poll_date': None}}
+    return result
+
+
+def encode_record(city: str, result: Dict) -> str:
+    """Bir il sonucunu tek satırlık JSON kaydına çevirir ('city' her zaman ilk anahtardır)"""
+    record = {'city': city}
+    record.update((key, value) for key, value in _clean_result(result).items() if key != 'city')
+    return json.dumps(record, ensure_ascii=False, default=_json_default)
+
+
+class ResultsStreamWriter:
+    """İller tamamlandıkça satır ekleyen yazıcı (context manager)"""
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+        self.count = 0
+
+    def write(self, city: str, result: Dict):
+        """Bir ili yazar ve diske aktarır (okuyucular yarım çalıştırmayı da görebilir)"""
+        self._file.write(encode_record(city, result) + '\n')
+        self._file.flush()
+        self.count += 1
+
+    def write_all(self, results: Dict):
+        for city, result in results.items():
+            self.write(city, result)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> 'ResultsStreamWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _record_city(line: str) -> Optional[str]:
+    """Satırı ayrıştırmadan il adını okur"""
+    if not line.startswith(RECORD_PREFIX):
+        return None
+    city, _ = json.JSONDecoder().raw_decode(line, len(RECORD_PREFIX))
+    return city
+
+
+def iter_results(path: str, cities: Iterable[str] = None,
+                 fields: Iterable[str] = None) -> Iterator[Tuple[str, Dict]]:
+    """
+    (il, sonuç) çiftlerini dosya sırasıyla üretir.
+
+    cities: yalnızca bu iller ayrıştırılır (diğer satırlar atlanır)
+    fields: yalnızca bu üst düzey alanlar döndürülür
+    """
+    wanted = set(cities) if cities is not None else None
+    fields = list(fields) if fields is not None else None
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            if wanted is not None:
+                if _record_city(line) not in wanted:
+                    continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Yazımı süren son satır
+            city = record.pop('city')
+            if fields is not None:
+                record = {field: record[field] for field in fields if field in record}
+            yield city, record
+
+
+def read_results(path: str, cities: Iterable[str] = None, fields: Iterable[str] = None) -> Dict:
+    """İl -> sonuç sözlüğü (seçili iller/alanlar)"""
+    return dict(iter_results(path, cities, fields))
+
+
+def read_province(path: str, city: str, fields: Iterable[str] = None) -> Optional[Dict]:
+    """Tek bir ilin sonucunu okur; il yoksa None"""
+    for _, record in iter_results(path, [city], fields):
+        return record
+    return None
+
+
+def export_pretty_json(path: str, output_file: str) -> str:
+    """JSON Lines dosyasını insanlar için girintili JSON'a dönüştürür"""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(read_results(path), f, ensure_ascii=False, indent=2)
+    return output_file
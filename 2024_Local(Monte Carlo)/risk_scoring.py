@@ -0,0 +1,97 @@
+"""
+Vektörel Risk Skorlama Modülü
+2024 Türkiye Yerel Seçimleri için
+
+İl x metrik tablosundan tüm iller için risk faktörlerini, genel risk skorunu
+ve risk seviyesini tek geçişte hesaplar. Senaryo raporu, risk grafikleri ve
+dashboard aynı tabloyu kullanır.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict
+from summary_table import SummaryTable
+
+RISK_FACTORS = ['volatility', 'competitiveness', 'polling_reliability', 'scenario_sensitivity']
+RISK_LEVELS = ['Yüksek', 'Orta', 'Düşük', 'Bilinmiyor']
+METRIC_COLUMNS = ['top_win_prob', 'second_win_prob', 'party_count', 'poll_count', 'scenario_winner_count']
+
+
+def build_risk_metrics(results: Dict, scenario_winners: pd.DataFrame = None,
+                       summary: SummaryTable = None) -> pd.DataFrame:
+    """
+    Risk skorlamasına girdi olan il x metrik tablosunu oluşturur.
+
+    results: il -> tahmin sonucu (win_probabilities, poll_stats)
+    scenario_winners: 'city' ve 'winning_party' sütunlu uzun tablo (opsiyonel)
+    summary: aynı sonuçlardan önceden oluşturulmuş özet tablosu (opsiyonel)
+    """
+    if not results:
+        return pd.DataFrame(columns=METRIC_COLUMNS)
+
+    if summary is None:
+        summary = SummaryTable(results)
+    metrics = summary.provinces[['top_win_prob', 'second_win_prob', 'party_count', 'poll_count']].copy()
+
+    if scenario_winners is not None and not scenario_winners.empty:
+        counts = scenario_winners.groupby('city')['winning_party'].nunique()
+        metrics['scenario_winner_count'] = counts.reindex(metrics.index).fillna(0)
+    else:
+        metrics['scenario_winner_count'] = 0
+
+    return metrics
+
+
+def score_risk(metrics: pd.DataFrame) -> pd.DataFrame:
+    """Tüm iller için risk faktörlerini, genel riski ve risk seviyesini hesaplar"""
+    table = metrics.copy()
+    top = table['top_win_prob'].fillna(0)
+    second = table['second_win_prob']
+    poll_count = table['poll_count']
+
+    # Volatility - En yüksek iki partinin farkı
+    margin = top - second
+    table['volatility'] = np.where(
+        table['party_count'] >= 2, np.maximum(0, 100 - margin) / 100, 0.0
+    )
+
+    # Competitiveness - Çekişme düzeyi
+    table['competitiveness'] = np.select([top < 60, top < 75], [1.0, 0.6], default=0.2)
+
+    # Polling reliability - Anket sayısı
+    table['polling_reliability'] = np.select([poll_count < 3, poll_count < 8], [1.0, 0.5], default=0.2)
+
+    # Scenario sensitivity - Farklı kazanan sayısı ne kadar fazlaysa o kadar riskli
+    table['scenario_sensitivity'] = np.minimum(1.0, table['scenario_winner_count'] / 4)
+
+    table['overall_risk'] = table[RISK_FACTORS].mean(axis=1)
+    table['risk_level'] = np.select(
+        [table['overall_risk'] < 0.3, table['overall_risk'] < 0.6],
+        ['Düşük', 'Orta'],
+        default='Yüksek'
+    )
+
+    # Temel tahmini olmayan iller skorlanmaz
+    unknown = metrics['top_win_prob'].isna()
+    table.loc[unknown, RISK_FACTORS + ['overall_risk']] = 0.0
+    table.loc[unknown, 'risk_level'] = 'Bilinmiyor'
+
+    # En kritik risk faktörü
+    table['critical_factor'] = table[RISK_FACTORS].idxmax(axis=1)
+    return table
+
+
+def risk_groups(table: pd.DataFrame) -> Dict[str, list]:
+    """Risk seviyesine göre il listeleri (tablo sırası korunur)"""
+    return {level: table.index[table['risk_level'] == level].tolist() for level in RISK_LEVELS}
+
+
+def risk_row_to_dict(table: pd.DataFrame, city: str) -> dict:
+    """Tek bir ilin risk satırını eski _assess_election_risk sözlük biçimine çevirir"""
+    row = table.loc[city]
+    if row['risk_level'] == 'Bilinmiyor':
+        return {factor: 0 for factor in RISK_FACTORS}
+    risk = {factor: float(row[factor]) for factor in RISK_FACTORS}
+    risk['overall_risk'] = float(row['overall_risk'])
+    risk['risk_level'] = row['risk_level']
+    return risk
@@ -0,0 +1,188 @@
+"""
+Çalıştırma Geçmişi ve Sapma (Drift) Takibi
+2024 Türkiye Yerel Seçimleri için
+
+Çıktı kataloğundan seçilen iki veya daha fazla çalıştırmanın 'predictions'
+sütunları (.npz) okunur, ortak il x parti eksenlerinde hizalanır ve il bazında
+kazanma olasılığı ile ortalama oy oranı farkları vektörel olarak hesaplanır.
+JSON sonuç dosyaları yeniden ayrıştırılmaz.
+
+    python run_history.py [RUN_ID ...] [--tag T] [--limit 10] [--top 15]
+"""
+
+import argparse
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from outputs_catalog import OutputsCatalog
+from results_artifact import ArtifactError, ResultsArtifact
+from summary_table import MAJORITY_THRESHOLD
+
+# Çalıştırmalar arasında karşılaştırılan il x parti sütunları
+COMPARED_METRICS = ('win_probabilities', 'mean_votes')
+DEFAULT_HISTORY_LIMIT = 10
+
+
+def _leaders(matrix: np.ndarray, parties: np.ndarray) -> np.ndarray:
+    """İl x parti matrisinde her ilin önde olan partisi (verisi olmayan ilde None)"""
+    filled = np.nan_to_num(matrix, nan=-np.inf)
+    leaders = parties[filled.argmax(axis=-1)]
+    leaders[np.isnan(matrix).all(axis=-1)] = None
+    return leaders
+
+
+class RunHistory:
+    """
+    Çalıştırmaları eskiden yeniye sıralı, hizalanmış sütunlar olarak tutar.
+
+    metrics[ad]: (çalıştırma, il, parti) dizisi; bir çalıştırmada bulunmayan
+    il veya parti NaN olarak kalır.
+    """
+
+    def __init__(self, runs: List[Dict], provinces: List[str], parties: List[str],
+                 metrics: Dict[str, np.ndarray]):
+        self.runs = runs
+        self.run_ids = [run['run_id'] for run in runs]
+        self.provinces = provinces
+        self.parties = parties
+        self.metrics = metrics
+
+    def __len__(self) -> int:
+        return len(self.runs)
+
+    @classmethod
+    def load(cls, run_ids: Optional[List[str]] = None, tag: str = None,
+             limit: int = DEFAULT_HISTORY_LIMIT, outputs_dir: str = "outputs/") -> 'RunHistory':
+        """
+        Çalıştırmaları katalogdan bulur ve sütunlarını hizalar.
+
+        run_ids: karşılaştırılacak çalıştırmalar (None ise etikete göre en yeni `limit` çalıştırma)
+        """
+        catalog = OutputsCatalog(os.path.join(outputs_dir, "catalog.sqlite"))
+        try:
+            if run_ids:
+                runs = []
+                for run_id in run_ids:
+                    run = catalog.get_run(run_id)
+                    if run is None:
+                        raise ArtifactError(f"Çalıştırma bulunamadı: {run_id}")
+                    runs.append(run)
+            else:
+                runs = catalog.find_runs(tag=tag, limit=limit, include_legacy=False)
+        finally:
+            catalog.close()
+
+        runs_dir = os.path.join(outputs_dir, "runs")
+        loaded = []
+        for run in sorted(runs, key=lambda r: (r['created_at'], r['run_id'])):
+            try:
+                artifact = ResultsArtifact.open(run['run_id'], runs_dir)
+                loaded.append((run, artifact.read_stage('predictions')))
+            except ArtifactError as e:
+                if run_ids:
+                    raise
+                print(f"⚠ {e} - çalıştırma karşılaştırmaya alınmadı")
+
+        return cls.from_columns(loaded)
+
+    @classmethod
+    def from_columns(cls, loaded: List) -> 'RunHistory':
+        """(çalıştırma, predictions sütunları) çiftlerini ortak eksenlere yerleştirir"""
+        # Eksen sırası en yeni çalıştırmadan gelir; eski çalıştırmalardaki fazlalar sona eklenir
+        provinces = list(dict.fromkeys(
+            str(p) for _, columns in reversed(loaded) for p in columns['provinces']))
+        parties = list(dict.fromkeys(
+            str(p) for _, columns in reversed(loaded) for p in columns['parties']))
+        province_index, party_index = pd.Index(provinces), pd.Index(parties)
+
+        shape = (len(loaded), len(provinces), len(parties))
+        metrics = {name: np.full(shape, np.nan) for name in COMPARED_METRICS}
+        for r, (_, columns) in enumerate(loaded):
+            rows = province_index.get_indexer(columns['provinces'].astype(str))
+            cols = party_index.get_indexer(columns['parties'].astype(str))
+            for name in COMPARED_METRICS:
+                metrics[name][r][np.ix_(rows, cols)] = columns[name]
+
+        return cls([run for run, _ in loaded], provinces, parties, metrics)
+
+    def province_deltas(self, metric: str = 'win_probabilities', baseline: int = 0,
+                        target: int = -1) -> pd.DataFrame:
+        """İl x parti farkı: target çalıştırma - baseline çalıştırma (puan)"""
+        values = self.metrics[metric]
+        return pd.DataFrame(values[target] - values[baseline], index=self.provinces, columns=self.parties)
+
+    def seat_projection(self, min_probability: float = MAJORITY_THRESHOLD) -> pd.DataFrame:
+        """Çalıştırma x parti: önde olunan ve olasılığı eşiği aşan il sayısı"""
+        win = self.metrics['win_probabilities']
+        leaders = _leaders(win, np.array(self.parties, dtype=object))
+        decided = np.nan_to_num(win, nan=-np.inf).max(axis=-1) > min_probability
+        counts = np.stack([((leaders == party) & decided).sum(axis=1) for party in self.parties], axis=1)
+        return pd.DataFrame(counts, index=self.run_ids, columns=self.parties)
+
+    def national_vote_share(self) -> pd.DataFrame:
+        """Çalıştırma x parti: illerin ortalama oy oranlarının ağırlıksız ortalaması"""
+        with np.errstate(invalid='ignore'):
+            share = np.nanmean(self.metrics['mean_votes'], axis=1)
+        return pd.DataFrame(share, index=self.run_ids, columns=self.parties)
+
+    def drift_table(self) -> pd.DataFrame:
+        """
+        İl bazında ilk ve son çalıştırma arasındaki sapma (en çok değişen il önce).
+        drift_party, kazanma olasılığı en çok değişen partidir.
+
+        Sütunlar: leader_first, leader_last, leader_changed, drift_party,
+        win_prob_change, vote_share_change, volatility
+        """
+        win, votes = self.metrics['win_probabilities'], self.metrics['mean_votes']
+        parties = np.array(self.parties, dtype=object)
+        rows = np.arange(len(self.provinces))
+
+        change = np.nan_to_num(win[-1] - win[0])
+        drift_idx = np.abs(change).argmax(axis=1)
+        steps = np.nan_to_num(np.abs(np.diff(win, axis=0)))
+
+        table = pd.DataFrame(index=pd.Index(self.provinces, name='province'))
+        table['leader_first'] = _leaders(win[0], parties)
+        table['leader_last'] = _leaders(win[-1], parties)
+        table['leader_changed'] = table['leader_first'] != table['leader_last']
+        table['drift_party'] = parties[drift_idx]
+        table['win_prob_change'] = change[rows, drift_idx]
+        table['vote_share_change'] = (votes[-1] - votes[0])[rows, drift_idx]
+        # Ardışık çalıştırmalar arasında en çok oynayan partinin ortalama adımı
+        table['volatility'] = steps.max(axis=2).mean(axis=0) if len(self) > 1 else 0.0
+
+        order = table['win_prob_change'].abs().sort_values(ascending=False, kind='stable').index
+        return table.loc[order]
+
+
+def main():
+    """Çalıştırma karşılaştırma komut satırı arayüzü"""
+    parser = argparse.ArgumentParser(description='Çalıştırmalar arası sapma takibi')
+    parser.add_argument('run_ids', nargs='*', help='Karşılaştırılacak çalıştırmalar (boşsa en yeniler)')
+    parser.add_argument('--tag')
+    parser.add_argument('--limit', type=int, default=DEFAULT_HISTORY_LIMIT)
+    parser.add_argument('--top', type=int, default=15, help='Listelenecek il sayısı')
+    parser.add_argument('--outputs-dir', default="outputs/")
+    args = parser.parse_args()
+
+    history = RunHistory.load(args.run_ids or None, args.tag, args.limit, args.outputs_dir)
+    if len(history) < 2:
+        print("ℹ️  Karşılaştırma için en az iki çalıştırma gerekli")
+        return
+
+    print(f"📈 {len(history)} çalıştırma karşılaştırılıyor: {history.run_ids[0]} → {history.run_ids[-1]}")
+    print("\n🏆 İl kazanım projeksiyonu (olasılık > %50)")
+    print(history.seat_projection().to_string())
+
+    print(f"\n🔀 En çok değişen {args.top} il")
+    for city, row in history.drift_table().head(args.top).iterrows():
+        leader = f"{row['leader_first']} → {row['leader_last']}" if row['leader_changed'] else row['leader_last']
+        print(f"  {city:<15} {leader:<15} {row['drift_party']:>8s}: "
+              f"{row['win_prob_change']:+6.1f} puan olasılık, {row['vote_share_change']:+5.1f} puan oy")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,59 +11,245 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
 import json
-import os
+import sys
+from pathlib import Path
 from advanced_election_predictor import AdvancedElectionPredictor
+from turnout_model import turnout_modifiers
+from tipping_point_solver import TippingPointSolver
+from risk_scoring import RISK_FACTORS, build_risk_metrics, score_risk, risk_groups, risk_row_to_dict
+from results_artifact import ArtifactError, risk_table_to_columns
+from chart_pipeline import ChartJob, ChartPipeline
+from outputs_catalog import OutputsCatalog
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # Depo kökü (election_common)
+from election_common.report_templates import Section, blank, heading, items, line, title, write_report
+from scenario_cache import ScenarioCache, scenario_key
+
+# Simülasyon yokken yeniden ağırlıklandırılan katılım oranları
+DEFAULT_TURNOUT_VARIATIONS = [0.6, 0.7, 0.8, 0.85]
+
+def _plot_risk_map(data: dict, path: str, dpi: int):
+    """İl bazında risk haritası"""
+    plt.figure(figsize=(16, 10))
+    
+    cities, risk_levels = data['cities'], data['risk_levels']
+    
+    # Renk kodlaması
+    color_map = {'Yüksek': 'red', 'Orta': 'orange', 'Düşük': 'green', 'Bilinmiyor': 'gray'}
+    colors = [color_map[level] for level in risk_levels]
+    
+    # Horizontal bar chart
+    y_pos = np.arange(len(cities))
+    plt.barh(y_pos, data['risk_scores'], color=colors, alpha=0.7)
+    plt.yticks(y_pos, cities)
+    plt.xlabel('Risk Skoru (0-1)')
+    plt.title('İl Bazında Seçim Risk Analizi')
+    plt.grid(axis='x', alpha=0.3)
+    
+    # Efsane
+    legend_elements = [plt.Rectangle((0,0),1,1, facecolor=color, alpha=0.7, label=level) 
+                      for level, color in color_map.items() if level in risk_levels]
+    plt.legend(handles=legend_elements, loc='lower right')
+    
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def _plot_risk_factors(data: dict, path: str, dpi: int):
+    """Risk faktörleri dağılımı (box plot)"""
+    plt.figure(figsize=(12, 8))
+    
+    plt.boxplot(list(data.values()), labels=list(data.keys()))
+    plt.ylabel('Risk Skoru')
+    plt.title('Risk Faktörleri Dağılımı')
+    plt.xticks(rotation=45)
+    plt.grid(axis='y', alpha=0.3)
+    
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def _scenario_report_record(city: str, analysis: dict, risk: pd.Series) -> dict:
+    """Rapor için il kaydı: risk skoru, katılım senaryoları ve parti bazında swing çeşitliliği"""
+    turnout = []
+    for scenario in (analysis['turnout_scenarios'] or {}).values():
+        winner = scenario['winning_party']
+        entry = {'turnout_rate': scenario['turnout_rate'], 'winner': winner,
+                 'percentage': scenario['winning_percentage']}
+        if 'band' in scenario:
+            entry.update(band=scenario['band'], band_probability=scenario['band_probability'],
+                         win_probability=scenario['win_probabilities'][winner])
+        turnout.append(entry)
+    
+    # Her swing partisi için farklı kazanan sayısı
+    swing_winners = {}
+    for scenario in (analysis['swing_scenarios'] or {}).values():
+        swing_winners.setdefault(scenario['party'], set()).add(scenario['winning_party'])
+    
+    return {
+        'city': city,
+        'risk_level': risk['risk_level'],
+        'overall_risk': risk['overall_risk'],
+        'critical_factor': risk['critical_factor'],
+        'critical_value': risk[risk['critical_factor']],
+        'turnout': turnout,
+        'swing': {party: len(winners) for party, winners in swing_winners.items()},
+    }
+
+
+def _scenario_report_blocks(record: dict) -> list:
+    """İl senaryo kaydını rapor bloklarına çevirir"""
+    blocks = [
+        heading(record['city'], 3),
+        line(f"Risk Seviyesi: {record['risk_level']} (Skor: {record['overall_risk']:.2f})"),
+        line(f"En Kritik Faktör: {record['critical_factor']} ({record['critical_value']:.2f})"),
+    ]
+    
+    # Katılım senaryoları
+    if record['turnout']:
+        lines = []
+        for scenario in record['turnout']:
+            turnout, winner, percentage = scenario['turnout_rate'], scenario['winner'], scenario['percentage']
+            if 'band' in scenario:
+                lines.append(f"Katılım {scenario['band']} (olasılık %{scenario['band_probability']:.1f}, "
+                             f"ort. %{turnout*100:.0f}): {winner} (%{percentage:.1f}, "
+                             f"kazanma %{scenario['win_probability']:.1f})")
+            else:
+                lines.append(f"Katılım %{turnout*100:.0f}: {winner} (%{percentage:.1f})")
+        blocks += [blank(), line("Katılım Senaryoları:"), items(lines)]
+    
+    # En volatil partiler
+    if record['swing']:
+        lines = []
+        for party, unique_winners in record['swing'].items():
+            if unique_winners > 3:
+                volatility = "Yüksek volatilite"
+            elif unique_winners > 1:
+                volatility = "Orta volatilite"
+            else:
+                volatility = "Düşük volatilite"
+            lines.append(f"{party}: {unique_winners} farklı sonuç - {volatility}")
+        blocks += [blank(), line("Swing Analizi:"), items(lines)]
+    
+    blocks.append(blank())
+    return blocks
+
 
 class ElectionScenarioAnalyzer:
     """Seçim senaryoları ve risk analizi"""
     
-    def __init__(self, predictor: AdvancedElectionPredictor):
+    def __init__(self, predictor: AdvancedElectionPredictor, cache: ScenarioCache = None):
         self.predictor = predictor
         self.scenarios = {}
+        self.risk_table = None
+        self.cache = cache if cache is not None else ScenarioCache()
+        self._base_stats = {}  # il -> (veri özeti, ağırlıklı ortalamalar)
+    
+    def _get_base_stats(self, city_name: str) -> dict:
+        """Ağırlıklı ortalamaları il verisi değişmediği sürece yeniden hesaplamaz"""
+        data_hash = self.predictor.poll_data_hash(city_name)
+        cached = self._base_stats.get(city_name)
+        if data_hash is not None and cached is not None and cached[0] == data_hash:
+            return cached[1]
+        base_stats = self.predictor.calculate_weighted_averages(city_name)
+        self._base_stats[city_name] = (data_hash, base_stats)
+        return base_stats
+    
+    def _cached_scenarios(self, kind: str, city_name: str, base_stats: dict, specs: dict, compute) -> dict:
+        """
+        Senaryo ailesini senaryo başına önbellekten toplar. Her senaryo (il verisi,
+        temel istatistikler, senaryo adı ve tanımı) anahtarıyla ayrı saklanır;
+        compute yalnızca önbellekte olmayan senaryolarla (ad -> tanım) çağrılır ve
+        ad -> {sonuç adı: sonuç} döndürür. Aile, senaryoların verilen sırasıyla birleşir.
+        """
+        data_hash = self._base_stats.get(city_name, (None,))[0]
+        keys = {name: scenario_key(kind, city_name, data_hash, base_stats, [name, spec])
+                for name, spec in specs.items()}
+        
+        parts = {name: self.cache.get(key) for name, key in keys.items()}
+        missing = {name: specs[name] for name, part in parts.items() if part is None}
+        if missing:
+            computed = compute(missing)
+            for name in missing:
+                self.cache.put(keys[name], computed[name])
+                parts[name] = computed[name]
         
-    def analyze_turnout_scenarios(self, city_name: str, turnout_variations: list = [0.6, 0.7, 0.8, 0.85]) -> dict:
-        """Farklı katılım oranları için senaryo analizi"""
+        scenario_results = {}
+        for name in specs:
+            scenario_results.update(parts[name])
+        return scenario_results
         
-        base_stats = self.predictor.calculate_weighted_averages(city_name)
+    def analyze_turnout_scenarios(self, city_name: str, turnout_variations: list = None) -> dict:
+        """
+        Katılım senaryoları. Temel tahminde katılım simülasyonla örneklendiyse
+        sonuçlar katılım bantlarına koşullu olarak aynı simülasyonlardan okunur:
+        turnout_variations verilmezse tahmindeki sabit bantlar, verilirse her orana
+        en yakın katılımlı simülasyonlar (simülasyonu düşmeyen oran atlanır).
+        Simülasyonlar bellekte yoksa (ör. artefakttan yüklenmiş sonuçlar) verilen
+        veya varsayılan oranlar için ortalamalar yeniden ağırlıklandırılır.
+        """
+        base_prediction = self.predictor.prediction_results.get(city_name, {})
+        turnout_analysis = base_prediction.get('turnout_analysis')
+        if turnout_analysis and turnout_variations is None:
+            return self._turnout_scenarios_from_bands(turnout_analysis)
+        if turnout_analysis:
+            rate_analysis = self.predictor.analyze_turnout_rates(city_name, turnout_variations)
+            if rate_analysis is not None:
+                return self._turnout_scenarios_from_bands(rate_analysis)
+        if turnout_variations is None:
+            turnout_variations = DEFAULT_TURNOUT_VARIATIONS
+        
+        base_stats = self._get_base_stats(city_name)
         if not base_stats:
             return {}
         
-        scenario_results = {}
+        specs = {f"turnout_{int(turnout*100)}": turnout for turnout in turnout_variations}
+        return self._cached_scenarios(
+            'turnout', city_name, base_stats, specs,
+            lambda missing: self._compute_turnout_scenarios(base_stats, missing)
+        )
+    
+    def _compute_turnout_scenarios(self, base_stats: dict, turnout_variations: dict) -> dict:
+        """Verilen katılım oranları (ad -> oran) için ortalamaları yeniden ağırlıklandırır"""
+        parties = list(base_stats['averages'].keys())
+        averages = np.array(list(base_stats['averages'].values()), dtype=float)
+        turnouts = np.asarray(list(turnout_variations.values()), dtype=float)
         
-        for turnout in turnout_variations:
-            # Düşük katılım genelde statükocu partileri avantajlı hale getirir
-            turnout_modifier = {
-                'AKP': 1.0 + (0.85 - turnout) * 0.3,  # Düşük katılımda avantajlı
-                'MHP': 1.0 + (0.85 - turnout) * 0.2,
-                'CHP': 1.0 - (0.85 - turnout) * 0.1,  # Yüksek katılımda avantajlı
-                'İYİ': 1.0 - (0.85 - turnout) * 0.15,
-                'HDP': 1.0 - (0.85 - turnout) * 0.2,
-                'DEM': 1.0 - (0.85 - turnout) * 0.2,
-                'YRP': 1.0,
-                'ZP': 1.0
-            }
-            
-            # Modifiye edilmiş ortalamalar
-            modified_averages = {}
-            for party, avg in base_stats['averages'].items():
-                modifier = turnout_modifier.get(party, 1.0)
-                modified_averages[party] = avg * modifier
-            
-            # Yeniden normalize et
-            total = sum(modified_averages.values())
-            if total > 0:
-                modified_averages = {party: (vote/total)*100 for party, vote in modified_averages.items()}
-            
-            # Monte Carlo simülasyonu çalıştır
-            scenario_results[f"turnout_{int(turnout*100)}"] = {
+        # Tüm katılım oranları için modifiye edilmiş ortalamalar tek seferde
+        modified = averages * turnout_modifiers(turnouts, parties)
+        totals = modified.sum(axis=1, keepdims=True)
+        modified = np.divide(modified * 100, totals, out=modified, where=totals > 0)
+        
+        scenario_results = {}
+        for (name, turnout), row in zip(turnout_variations.items(), modified):
+            modified_averages = dict(zip(parties, row.tolist()))
+            scenario_results[name] = {name: {
                 'turnout_rate': turnout,
                 'modified_averages': modified_averages,
                 'winning_party': max(modified_averages.items(), key=lambda x: x[1])[0],
                 'winning_percentage': max(modified_averages.values())
-            }
+            }}
         
         return scenario_results
     
+    def _turnout_scenarios_from_bands(self, turnout_analysis: dict) -> dict:
+        """Simülasyondaki katılım bantlarını senaryo sözlüğü biçimine çevirir"""
+        scenario_results = {}
+        for label, band in turnout_analysis['bands'].items():
+            win_probs = band['win_probabilities']
+            winner = max(win_probs.items(), key=lambda x: x[1])[0]
+            scenario_results[f"turnout_band_{label}"] = {
+                'turnout_rate': band['mean_turnout'],
+                'band': label,
+                'band_probability': band['probability'],
+                'modified_averages': band['mean_votes'],
+                'win_probabilities': win_probs,
+                'winning_party': winner,
+                'winning_percentage': band['mean_votes'][winner]
+            }
+        return scenario_results
+    
     def analyze_undecided_allocation(self, city_name: str, undecided_scenarios: dict = None) -> dict:
         """Kararsız seçmenlerin farklı dağılım senaryoları"""
         
@@ -75,10 +261,17 @@ class ElectionScenarioAnalyzer:
                 'fragmentation': {'AKP': 0.2, 'CHP': 0.2, 'İYİ': 0.2, 'MHP': 0.15, 'others': 0.25}
             }
         
-        base_stats = self.predictor.calculate_weighted_averages(city_name)
+        base_stats = self._get_base_stats(city_name)
         if not base_stats:
             return {}
         
+        return self._cached_scenarios(
+            'undecided', city_name, base_stats, undecided_scenarios,
+            lambda missing: self._compute_undecided_scenarios(base_stats, missing)
+        )
+    
+    def _compute_undecided_scenarios(self, base_stats: dict, undecided_scenarios: dict) -> dict:
+        """Kararsız seçmen dağılımlarını temel ortalamalara uygular"""
         # Kararsız seçmen oranını %15 olarak varsay
         undecided_rate = 15.0
         
@@ -94,75 +287,104 @@ class ElectionScenarioAnalyzer:
                 elif party in ['YRP', 'ZP', 'DEM', 'HDP'] and 'others' in allocation:
                     modified_averages[party] += undecided_rate * allocation['others'] / 4
             
-            scenario_results[scenario_name] = {
+            scenario_results[scenario_name] = {scenario_name: {
                 'allocation': allocation,
                 'modified_averages': modified_averages,
                 'winning_party': max(modified_averages.items(), key=lambda x: x[1])[0],
                 'winning_percentage': max(modified_averages.values())
-            }
+            }}
         
         return scenario_results
     
     def calculate_swing_scenarios(self, city_name: str, swing_percentages: list = [2, 5, 8]) -> dict:
         """Son dakika oy kaybı/kazancı senaryoları"""
         
-        base_stats = self.predictor.calculate_weighted_averages(city_name)
+        base_stats = self._get_base_stats(city_name)
         if not base_stats:
             return {}
         
+        # Her parti ve swing büyüklüğü (lehine/aleyhine çifti) ayrı bir senaryodur
+        specs = {f"{party}_{swing}": [party, swing]
+                 for party in ['AKP', 'CHP', 'İYİ', 'MHP'] if party in base_stats['averages']
+                 for swing in swing_percentages}
+        return self._cached_scenarios(
+            'swing', city_name, base_stats, specs,
+            lambda missing: self._compute_swing_scenarios(base_stats, missing)
+        )
+    
+    def _compute_swing_scenarios(self, base_stats: dict, swing_scenarios: dict) -> dict:
+        """Parti lehine/aleyhine orantılı swing senaryolarını (ad -> [parti, swing]) hesaplar"""
         scenario_results = {}
         
-        # Her parti için swing senaryoları
-        for party in ['AKP', 'CHP', 'İYİ', 'MHP']:
-            if party not in base_stats['averages']:
-                continue
-                
-            for swing in swing_percentages:
-                # Pozitif swing (parti lehine)
-                scenario_name = f"{party}_plus_{swing}"
+        for name, (party, swing) in swing_scenarios.items():
+            pair = scenario_results[name] = {}
+            
+            # Pozitif swing (parti lehine)
+            scenario_name = f"{party}_plus_{swing}"
+            modified_averages = base_stats['averages'].copy()
+            modified_averages[party] += swing
+            
+            # Diğer partilerden orantılı olarak düş
+            other_parties = [p for p in modified_averages.keys() if p != party and modified_averages[p] > 0]
+            if other_parties:
+                total_others = sum(modified_averages[p] for p in other_parties)
+                if total_others > 0:
+                    for other_party in other_parties:
+                        reduction = (modified_averages[other_party] / total_others) * swing
+                        modified_averages[other_party] = max(0, modified_averages[other_party] - reduction)
+            
+            pair[scenario_name] = {
+                'party': party,
+                'swing': f"+{swing}%",
+                'modified_averages': modified_averages,
+                'winning_party': max(modified_averages.items(), key=lambda x: x[1])[0],
+                'winning_percentage': max(modified_averages.values())
+            }
+            
+            # Negatif swing (parti aleyhine)
+            if base_stats['averages'][party] > swing:
+                scenario_name = f"{party}_minus_{swing}"
                 modified_averages = base_stats['averages'].copy()
-                modified_averages[party] += swing
+                modified_averages[party] -= swing
                 
-                # Diğer partilerden orantılı olarak düş
-                other_parties = [p for p in modified_averages.keys() if p != party and modified_averages[p] > 0]
+                # Diğer partilere orantılı olarak ekle
                 if other_parties:
-                    total_others = sum(modified_averages[p] for p in other_parties)
-                    if total_others > 0:
-                        for other_party in other_parties:
-                            reduction = (modified_averages[other_party] / total_others) * swing
-                            modified_averages[other_party] = max(0, modified_averages[other_party] - reduction)
+                    for other_party in other_parties:
+                        if total_others > 0:
+                            increase = (modified_averages[other_party] / total_others) * swing
+                            modified_averages[other_party] += increase
                 
-                scenario_results[scenario_name] = {
+                pair[scenario_name] = {
                     'party': party,
-                    'swing': f"+{swing}%",
+                    'swing': f"-{swing}%",
                     'modified_averages': modified_averages,
                     'winning_party': max(modified_averages.items(), key=lambda x: x[1])[0],
                     'winning_percentage': max(modified_averages.values())
                 }
-                
-                # Negatif swing (parti aleyhine)
-                if base_stats['averages'][party] > swing:
-                    scenario_name = f"{party}_minus_{swing}"
-                    modified_averages = base_stats['averages'].copy()
-                    modified_averages[party] -= swing
-                    
-                    # Diğer partilere orantılı olarak ekle
-                    if other_parties:
-                        for other_party in other_parties:
-                            if total_others > 0:
-                                increase = (modified_averages[other_party] / total_others) * swing
-                                modified_averages[other_party] += increase
-                    
-                    scenario_results[scenario_name] = {
-                        'party': party,
-                        'swing': f"-{swing}%",
-                        'modified_averages': modified_averages,
-                        'winning_party': max(modified_averages.items(), key=lambda x: x[1])[0],
-                        'winning_percentage': max(modified_averages.values())
-                    }
         
         return scenario_results
     
+    def find_tipping_points(self, parties: list = None, method: str = 'uniform', use_draws: bool = False) -> dict:
+        """Parti bazında lideri değiştiren minimum swing ve ulusal devrilme noktası ili"""
+        
+        solver = TippingPointSolver(self.predictor)
+        if parties is None:
+            parties = ['AKP', 'CHP', 'İYİ', 'MHP']
+        
+        tipping_points = {}
+        for party in parties:
+            order = solver.tipping_point_order(party, method=method, use_draws=use_draws)
+            if order.empty:
+                continue
+            city, swing = solver.tipping_point_from_order(order)
+            tipping_points[party] = {
+                'tipping_city': city,
+                'required_swing': swing,
+                'order': order
+            }
+        
+        return tipping_points
+    
     def comprehensive_city_analysis(self, city_name: str) -> dict:
         """Bir il için kapsamlı senaryo analizi"""
         
@@ -197,249 +419,115 @@ class ElectionScenarioAnalyzer:
         return analysis
     
     def _assess_election_risk(self, analysis: dict) -> dict:
-        """Seçim risk değerlendirmesi"""
+        """Seçim risk değerlendirmesi (tek il için risk tablosunun bir satırı)"""
         
-        risk_factors = {
-            'volatility': 0,  # Sonuç değişkenliği
-            'competitiveness': 0,  # Yarışın çekişmeli olması
-            'polling_reliability': 0,  # Anket güvenilirliği
-            'scenario_sensitivity': 0  # Senaryo değişikliklerine duyarlılık
+        table = self.build_risk_table({analysis['city']: analysis})
+        return risk_row_to_dict(table, analysis['city'])
+    
+    def _scenario_winners(self, city_analyses: dict) -> pd.DataFrame:
+        """Katılım, swing ve kararsız seçmen senaryolarının kazananlarını uzun tabloya döker"""
+        
+        records = [
+            (city, scenario['winning_party'])
+            for city, analysis in city_analyses.items()
+            for group in ('turnout_scenarios', 'swing_scenarios', 'undecided_scenarios')
+            for scenario in analysis[group].values()
+        ]
+        return pd.DataFrame.from_records(records, columns=['city', 'winning_party'])
+    
+    def build_risk_table(self, city_analyses: dict) -> pd.DataFrame:
+        """Tüm iller için il x risk metriği tablosu (rapor, grafik ve dashboard bu tabloyu kullanır)"""
+        
+        base_predictions = {
+            city: analysis['base_prediction']
+            for city, analysis in city_analyses.items()
+            if analysis['base_prediction']
         }
+        metrics = build_risk_metrics(base_predictions, self._scenario_winners(city_analyses))
+        metrics = metrics.reindex(list(city_analyses.keys()))
         
-        if not analysis['base_prediction']:
-            return risk_factors
-        
-        base_pred = analysis['base_prediction']
-        
-        # Volatility - En yüksek iki partinin farkı
-        win_probs = list(base_pred['win_probabilities'].values())
-        if len(win_probs) >= 2:
-            win_probs_sorted = sorted(win_probs, reverse=True)
-            margin = win_probs_sorted[0] - win_probs_sorted[1]
-            risk_factors['volatility'] = max(0, 100 - margin) / 100
-        
-        # Competitiveness - Çekişme düzeyi
-        max_win_prob = max(win_probs) if win_probs else 0
-        if max_win_prob < 60:
-            risk_factors['competitiveness'] = 1.0
-        elif max_win_prob < 75:
-            risk_factors['competitiveness'] = 0.6
-        else:
-            risk_factors['competitiveness'] = 0.2
-        
-        # Polling reliability - Anket sayısı
-        poll_count = base_pred['poll_stats']['poll_count']
-        if poll_count < 3:
-            risk_factors['polling_reliability'] = 1.0
-        elif poll_count < 8:
-            risk_factors['polling_reliability'] = 0.5
-        else:
-            risk_factors['polling_reliability'] = 0.2
-        
-        # Scenario sensitivity - Senaryolara duyarlılık
-        scenario_winners = set()
-        
-        # Turnout senaryolarından kazananlar
-        for scenario in analysis['turnout_scenarios'].values():
-            scenario_winners.add(scenario['winning_party'])
-        
-        # Swing senaryolarından kazananlar
-        for scenario in analysis['swing_scenarios'].values():
-            scenario_winners.add(scenario['winning_party'])
-        
-        # Kararsız seçmen senaryolarından kazananlar
-        for scenario in analysis['undecided_scenarios'].values():
-            scenario_winners.add(scenario['winning_party'])
-        
-        # Farklı kazanan sayısı ne kadar fazlaysa o kadar riskli
-        unique_winners = len(scenario_winners)
-        risk_factors['scenario_sensitivity'] = min(1.0, unique_winners / 4)
-        
-        # Genel risk skoru
-        overall_risk = np.mean(list(risk_factors.values()))
-        risk_factors['overall_risk'] = overall_risk
-        
-        # Risk seviyesi kategorisi
-        if overall_risk < 0.3:
-            risk_factors['risk_level'] = 'Düşük'
-        elif overall_risk < 0.6:
-            risk_factors['risk_level'] = 'Orta'
-        else:
-            risk_factors['risk_level'] = 'Yüksek'
-        
-        return risk_factors
-    
-    def generate_scenario_report(self, city_analyses: dict, output_dir: str = "outputs/") -> str:
-        """Senaryo analizi raporu oluşturur"""
+        self.risk_table = score_risk(metrics)
+        return self.risk_table
+    
+    def generate_scenario_report(self, city_analyses: dict, output_dir: str = "outputs/",
+                                 formats: list = ('txt',)) -> str:
+        """
+        Senaryo analizi raporu oluşturur. formats: 'txt', 'markdown', 'html'
+        (ilk biçimin dosya yolu döndürülür). Değişmeyen il bölümleri önbellekten gelir.
+        """
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_file = os.path.join(output_dir, f"senaryo_analizi_raporu_{timestamp}.txt")
-        
-        with open(report_file, 'w', encoding='utf-8') as f:
-            f.write("=" * 80 + "\n")
-            f.write("2024 YEREL SEÇİMLERİ SENARYO ANALİZİ RAPORU\n")
-            f.write("Gelişmiş Risk Değerlendirmesi ve Öngörü Analizi\n")
-            f.write("=" * 80 + "\n")
-            f.write(f"Oluşturulma Tarihi: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n\n")
-            
-            # Risk seviyelerine göre iller
-            high_risk_cities = []
-            medium_risk_cities = []
-            low_risk_cities = []
-            
-            for city, analysis in city_analyses.items():
-                risk_level = analysis['risk_assessment'].get('risk_level', 'Bilinmiyor')
-                if risk_level == 'Yüksek':
-                    high_risk_cities.append(city)
-                elif risk_level == 'Orta':
-                    medium_risk_cities.append(city)
-                else:
-                    low_risk_cities.append(city)
-            
-            f.write("RİSK DEĞERLENDİRMESİ ÖZETİ\n")
-            f.write("-" * 40 + "\n")
-            f.write(f"🔴 Yüksek Risk ({len(high_risk_cities)} il): {', '.join(high_risk_cities)}\n")
-            f.write(f"🟡 Orta Risk ({len(medium_risk_cities)} il): {', '.join(medium_risk_cities)}\n")
-            f.write(f"🟢 Düşük Risk ({len(low_risk_cities)} il): {', '.join(low_risk_cities)}\n\n")
-            
-            # Detaylı analizler
-            f.write("DETAYLI SENARYO ANALİZLERİ\n")
-            f.write("=" * 80 + "\n\n")
-            
-            for city, analysis in sorted(city_analyses.items()):
-                f.write(f"{city.upper()}\n")
-                f.write("-" * len(city) + "\n")
-                
-                risk = analysis['risk_assessment']
-                f.write(f"Risk Seviyesi: {risk.get('risk_level', 'Bilinmiyor')} ")
-                f.write(f"(Skor: {risk.get('overall_risk', 0):.2f})\n")
-                
-                # En kritik risk faktörü
-                risk_factors = {k: v for k, v in risk.items() 
-                               if k not in ['overall_risk', 'risk_level']}
-                if risk_factors:
-                    max_risk_factor = max(risk_factors.items(), key=lambda x: x[1])
-                    f.write(f"En Kritik Faktör: {max_risk_factor[0]} ({max_risk_factor[1]:.2f})\n")
-                
-                # Katılım senaryoları
-                if analysis['turnout_scenarios']:
-                    f.write("\nKatılım Senaryoları:\n")
-                    for scenario_name, scenario in analysis['turnout_scenarios'].items():
-                        turnout = scenario['turnout_rate']
-                        winner = scenario['winning_party']
-                        percentage = scenario['winning_percentage']
-                        f.write(f"  Katılım %{turnout*100:.0f}: {winner} (%{percentage:.1f})\n")
-                
-                # En volatil partiler
-                if analysis['swing_scenarios']:
-                    party_effects = {}
-                    for scenario_name, scenario in analysis['swing_scenarios'].items():
-                        party = scenario['party']
-                        if party not in party_effects:
-                            party_effects[party] = []
-                        party_effects[party].append(scenario['winning_party'])
-                    
-                    f.write("\nSwing Analizi:\n")
-                    for party, effects in party_effects.items():
-                        unique_winners = len(set(effects))
-                        f.write(f"  {party}: {unique_winners} farklı sonuç - ")
-                        if unique_winners > 3:
-                            f.write("Yüksek volatilite\n")
-                        elif unique_winners > 1:
-                            f.write("Orta volatilite\n")
-                        else:
-                            f.write("Düşük volatilite\n")
-                
-                f.write("\n")
         
-        print(f"📋 Senaryo analizi raporu oluşturuldu: {report_file}")
+        # Risk seviyelerine göre iller
+        risk_table = self.build_risk_table(city_analyses)
+        groups = risk_groups(risk_table)
+        high_risk_cities = groups['Yüksek']
+        medium_risk_cities = groups['Orta']
+        low_risk_cities = risk_table.index[~risk_table['risk_level'].isin(['Yüksek', 'Orta'])].tolist()
+        
+        parts = [
+            title(["2024 YEREL SEÇİMLERİ SENARYO ANALİZİ RAPORU", "Gelişmiş Risk Değerlendirmesi ve Öngörü Analizi"]),
+            line(f"Oluşturulma Tarihi: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}"),
+            blank(),
+            heading("RİSK DEĞERLENDİRMESİ ÖZETİ"),
+            line(f"🔴 Yüksek Risk ({len(high_risk_cities)} il): {', '.join(high_risk_cities)}"),
+            line(f"🟡 Orta Risk ({len(medium_risk_cities)} il): {', '.join(medium_risk_cities)}"),
+            line(f"🟢 Düşük Risk ({len(low_risk_cities)} il): {', '.join(low_risk_cities)}"),
+            blank(),
+            heading("DETAYLI SENARYO ANALİZLERİ", 1),
+        ]
+        parts += [
+            Section(_scenario_report_record(city, analysis, risk_table.loc[city]), _scenario_report_blocks)
+            for city, analysis in sorted(city_analyses.items())
+        ]
+        
+        report_files = write_report(parts, output_dir, f"senaryo_analizi_raporu_{timestamp}",
+                                    'senaryo_analizi_raporu', formats)
+        report_file = report_files[0]
+        print(f"📋 Senaryo analizi raporu oluşturuldu: {', '.join(report_files)}")
         return report_file
     
-    def create_scenario_visualizations(self, city_analyses: dict, output_dir: str = "outputs/graphs/"):
-        """Senaryo analizi görselleştirmeleri"""
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # 1. Risk haritası
-        plt.figure(figsize=(16, 10))
-        
-        cities = []
-        risk_scores = []
-        risk_levels = []
-        
-        for city, analysis in city_analyses.items():
-            cities.append(city)
-            risk_scores.append(analysis['risk_assessment'].get('overall_risk', 0))
-            risk_levels.append(analysis['risk_assessment'].get('risk_level', 'Bilinmiyor'))
-        
-        # Renk kodlaması
-        color_map = {'Yüksek': 'red', 'Orta': 'orange', 'Düşük': 'green', 'Bilinmiyor': 'gray'}
-        colors = [color_map[level] for level in risk_levels]
-        
-        # Horizontal bar chart
-        y_pos = np.arange(len(cities))
-        plt.barh(y_pos, risk_scores, color=colors, alpha=0.7)
-        plt.yticks(y_pos, cities)
-        plt.xlabel('Risk Skoru (0-1)')
-        plt.title('İl Bazında Seçim Risk Analizi')
-        plt.grid(axis='x', alpha=0.3)
-        
-        # Efsane
-        legend_elements = [plt.Rectangle((0,0),1,1, facecolor=color, alpha=0.7, label=level) 
-                          for level, color in color_map.items() if level in risk_levels]
-        plt.legend(handles=legend_elements, loc='lower right')
-        
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, f'risk_analizi_{timestamp}.png'), 
-                   dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        # 2. Risk faktörleri dağılımı
-        plt.figure(figsize=(12, 8))
-        
-        all_risk_factors = {
-            'volatility': [],
-            'competitiveness': [],
-            'polling_reliability': [],
-            'scenario_sensitivity': []
-        }
-        
-        for analysis in city_analyses.values():
-            risk = analysis['risk_assessment']
-            for factor in all_risk_factors.keys():
-                all_risk_factors[factor].append(risk.get(factor, 0))
-        
-        # Box plot
-        plt.boxplot(all_risk_factors.values(), labels=all_risk_factors.keys())
-        plt.ylabel('Risk Skoru')
-        plt.title('Risk Faktörleri Dağılımı')
-        plt.xticks(rotation=45)
-        plt.grid(axis='y', alpha=0.3)
-        
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, f'risk_faktorleri_{timestamp}.png'), 
-                   dpi=300, bbox_inches='tight')
-        plt.close()
+    def create_scenario_visualizations(self, city_analyses: dict, output_dir: str = "outputs/graphs/",
+                                       charts: list = None, profile: str = None) -> dict:
+        """Senaryo analizi görselleştirmeleri (charts: yalnızca istenen grafik adları, profile: çizim profili)"""
+        
+        risk_table = self.build_risk_table(city_analyses)
+        
+        jobs = [
+            ChartJob('risk_map', _plot_risk_map, {
+                'cities': risk_table.index.tolist(),
+                'risk_scores': risk_table['overall_risk'].tolist(),
+                'risk_levels': risk_table['risk_level'].tolist(),
+            }, 'risk_analizi'),
+            ChartJob('risk_factors', _plot_risk_factors, {
+                factor: risk_table[factor].tolist() for factor in RISK_FACTORS
+            }, 'risk_faktorleri'),
+        ]
+        paths = ChartPipeline(output_dir, profile=profile).run(jobs, only=charts)
         
         print(f"📊 Senaryo analizi görselleri oluşturuldu: {output_dir}")
+        return paths
 
 def main():
     """Ana çalıştırma fonksiyonu"""
     print("🎯 Gelişmiş Senaryo Analizi ve Risk Değerlendirmesi")
     print("=" * 60)
     
-    # Önceki tahmin sonuçlarını yükle
+    # Önceki tahmin sonuçlarını yükle (son çalıştırmanın artefaktı varsa yeniden hesaplanmaz)
     predictor = AdvancedElectionPredictor()
-    predictor.load_city_data()
-    
-    if not predictor.city_data:
-        print("❌ Veri yüklenemedi!")
-        return
-    
-    # Basit tahminleri çalıştır (sonuçlar zaten var ise atlayabilir)
-    if not predictor.prediction_results:
+    try:
+        artifact = predictor.load_results_artifact()
+    except ArtifactError as e:
+        print(f"⚠ {e}")
+        predictor.load_city_data()
+        
+        if not predictor.city_data:
+            print("❌ Veri yüklenemedi!")
+            return
+        
         print("📊 Temel tahminler hesaplanıyor...")
         predictor.predict_all_cities(n_simulations=10000)  # Hızlı analiz için az simülasyon
+        artifact = predictor.save_results_artifact()
     
     # Senaryo analizcisini başlat
     analyzer = ElectionScenarioAnalyzer(predictor)
@@ -448,7 +536,7 @@ def main():
     critical_cities = ['İstanbul', 'Ankara', 'İzmir', 'Antalya', 'Bursa', 'Adana', 'Konya', 'Gaziantep', 'Şanlıurfa', 'Hatay']
     
     # Mevcut illeri filtrele
-    available_critical_cities = [city for city in critical_cities if city in predictor.city_data]
+    available_critical_cities = [city for city in critical_cities if city in predictor.prediction_results]
     
     print(f"\n🔍 {len(available_critical_cities)} kritik il için detaylı senaryo analizi...")
     
@@ -457,12 +545,33 @@ def main():
         analysis = analyzer.comprehensive_city_analysis(city)
         city_analyses[city] = analysis
     
+    # Ulusal devrilme noktaları
+    print("\n🎯 Ulusal devrilme noktaları hesaplanıyor...")
+    for party, info in analyzer.find_tipping_points().items():
+        print(f"  {party}: {info['tipping_city']} (gereken swing: %{info['required_swing']:.2f})")
+    
     # Raporları oluştur
     print("\n📋 Senaryo raporları oluşturuluyor...")
-    analyzer.generate_scenario_report(city_analyses)
+    report_file = analyzer.generate_scenario_report(city_analyses)
     
     print("📊 Senaryo görselleştirmeleri oluşturuluyor...")
-    analyzer.create_scenario_visualizations(city_analyses)
+    chart_files = analyzer.create_scenario_visualizations(city_analyses)
+    
+    # Risk tablosunu aynı çalıştırmaya ekle (dashboard buradan okur)
+    artifact.write_stage(
+        'scenarios',
+        risk_table_to_columns(analyzer.risk_table),
+        producer='scenario_analyzer',
+        depends_on='predictions'
+    )
+    print(f"💾 Senaryo sonuçları artefakta eklendi: {artifact.run_id}")
+    
+    catalog = OutputsCatalog()
+    catalog.add_artifacts(artifact.run_id, {
+        'scenario_report': report_file,
+        **{f'chart:{name}': path for name, path in chart_files.items()}
+    })
+    catalog.close()
     
     print("\n✅ Senaryo analizi tamamlandı!")
 
@@ -0,0 +1,131 @@
+"""
+İçerik Adresli Senaryo Önbelleği
+2024 Türkiye Yerel Seçimleri için
+
+Her senaryo (il, veri özeti, temel istatistikler, senaryo adı ve tanımı)
+anahtarıyla ayrı saklanır; senaryo aileleri (katılım, kararsız, swing) bu
+kayıtlardan toplanır, böylece aileye eklenen veya değiştirilen bir senaryo
+için yalnızca o senaryo hesaplanır. Bellekte LRU katmanı, diskte kalıcı
+katman bulunur. Okunan değerler kopyadır; çağıranın yaptığı değişiklikler
+önbelleğe yansımaz.
+
+    outputs/cache/scenarios/<anahtarın ilk 2 karakteri>/<anahtar>.pkl
+"""
+
+import copy
+import hashlib
+import json
+import os
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Senaryo hesaplama mantığı değiştiğinde artırılır; eski disk kayıtları geçersiz olur
+SCENARIO_CACHE_VERSION = 2
+DEFAULT_CACHE_DIR = "outputs/cache/scenarios/"
+
+
+def _json_default(value):
+    """Anahtar normalizasyonu için numpy/pandas değerlerini JSON'a çevirir"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return str(value)
+    return str(value)
+
+
+def normalize_spec(spec: Any) -> str:
+    """Senaryo tanımını sıralı anahtarlı, kanonik JSON metnine çevirir"""
+    return json.dumps(spec, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=_json_default)
+
+
+def scenario_key(kind: str, city: str, data_hash: Optional[str], base_stats: Dict, spec: Any) -> str:
+    """(senaryo türü, il, veri özeti, temel istatistikler, senaryo tanımı) için içerik özeti"""
+    stats = {
+        'averages': base_stats.get('averages', {}),
+        'std_deviations': base_stats.get('std_deviations', {}),
+        'poll_count': base_stats.get('poll_count'),
+    }
+    payload = normalize_spec({
+        'version': SCENARIO_CACHE_VERSION,
+        'kind': kind,
+        'city': city,
+        'data_hash': data_hash,
+        'base_stats': stats,
+        'spec': spec,
+    })
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ScenarioCache:
+    """Bellekte LRU, diskte kalıcı iki katmanlı senaryo önbelleği"""
+
+    def __init__(self, max_entries: int = 512, cache_dir: Optional[str] = DEFAULT_CACHE_DIR):
+        self.max_entries = max_entries
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._memory = OrderedDict()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.pkl"
+
+    def _remember(self, key: str, value: Any):
+        self._memory[key] = copy.deepcopy(value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Önce bellekte, sonra diskte arar; değerin kopyasını, bulunamazsa None döndürür"""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.stats['memory_hits'] += 1
+            return copy.deepcopy(self._memory[key])
+
+        if self.cache_dir is not None:
+            path = self._disk_path(key)
+            try:
+                with open(path, 'rb') as f:
+                    value = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                value = None
+            if value is not None:
+                self.stats['disk_hits'] += 1
+                self._remember(key, value)
+                return value
+
+        self.stats['misses'] += 1
+        return None
+
+    def put(self, key: str, value: Any):
+        """Değerin kopyasını belleğe ve (varsa) diske atomik olarak yazar"""
+        self._remember(key, value)
+        if self.cache_dir is None:
+            return
+        path = self._disk_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Önbellekte yoksa hesaplar ve saklar; dönen değer çağırana aittir"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self, disk: bool = False):
+        """Bellek katmanını (istenirse disk katmanını da) temizler"""
+        self._memory.clear()
+        if disk and self.cache_dir is not None and self.cache_dir.exists():
+            for path in self.cache_dir.glob('*/*.pkl'):
+                path.unlink()
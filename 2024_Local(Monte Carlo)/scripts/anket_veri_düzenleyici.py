@@ -6,21 +6,64 @@ Bu script anket verilerini temizler, düzenler ve analiz eder.
 
 Özellikler:
 - Wikipedia'dan çekilen ham anket verilerini temizler
-- Parti sütunlarını otomatik tanımlar ve düzenler
+- Parti sütunlarını başlıklarından tanır ve kanonik şemaya çevirir
 - Gereksiz sütunları ve satırları kaldırır
 - İl bazında ayrı dosyalar oluşturur
+- Anketleri içerik özetli bir depoda tutar; yalnızca değişen kaynaklar işlenir
 - Kapsamlı analiz raporları üretir
 - Temiz bir klasör yapısı oluşturur
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 import os
 import re
-import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # Depo kökü (election_common)
+from election_common.poll_schema import PollSchema
+from election_common.poll_store import PollStore
+
+
+def veriyi_temizle(sema, df):
+    """
+    Ham il tablosunu temizler. Sütunlar başlıklarından kanonik şemaya
+    eşlenir (bkz. election_common.poll_schema); tanınmayan başlıklar
+    df.attrs['eslesmeyen_sutunlar'] içinde döner.
+    """
+    if df.empty:
+        return df
+    
+    temizlenmis_df = df.copy()
+    
+    # Gereksiz satırları kaldır
+    temizlenmis_df = temizlenmis_df[~temizlenmis_df.astype(str).eq('2024').any(axis=1)]
+    temizlenmis_df = temizlenmis_df.dropna(how='all')
+    
+    if temizlenmis_df.empty:
+        return temizlenmis_df
+    
+    # Başlıklardan türlü kanonik şema: metin meta sütunları, tam sayı Örneklem, yüzde cinsinden paylar
+    temizlenmis_df, eslesmeyen = sema.canonical_frame(temizlenmis_df)
+    temizlenmis_df.attrs['eslesmeyen_sutunlar'] = eslesmeyen
+    
+    return temizlenmis_df
+
+
+def dosyayi_temizle(sema, dosya_yolu):
+    """
+    Tek bir ham il dosyasını okuyup temizler. Süreç havuzunda çalıştığı için
+    yalnızca şemayı alır; temizleyici (açık depo bağlantısı) süreçlere taşınmaz.
+    """
+    df = pd.read_csv(dosya_yolu, encoding='utf-8-sig')
+    return veriyi_temizle(sema, df)
+
+
 class AnketVeriTemizleyici:
     """
     Anket verilerini temizleyen ve analiz eden ana sınıf
@@ -30,12 +73,13 @@ class AnketVeriTemizleyici:
         self.girdi_klasoru = Path(girdi_klasoru)
         self.cikti_klasoru = Path(cikti_klasoru)
         self.log_mesajlari = []
+        self.depo = None  # klasor_yapisini_olustur ile açılır
         
         # Parti isimleri ve alternatifleri
         self.parti_eslestirme = {
             'AKP': ['AKP', 'AK Parti', 'AK PARTİ'],
             'CHP': ['CHP'],
-            'İYİ': ['İYİ', 'IYI', 'İYİ PARTİ'],
+            'İYİ': ['İYİ', 'IYI', 'İYİP', 'İYİ PARTİ'],
             'MHP': ['MHP'],
             'HDP': ['HDP'],
             'DEM': ['DEM', 'DEMOKRASI'],
@@ -47,8 +91,11 @@ class AnketVeriTemizleyici:
             'DEVA': ['DEVA'],
             'GP': ['GP', 'GELECEK'],
             'DP': ['DP', 'DEMOKRAT'],
-            'DSP': ['DSP', 'DEMOKRATİK SOL']
+            'DSP': ['DSP', 'DEMOKRATİK SOL'],
+            'HÜDA': ['HÜDA', 'HÜDA PAR'],
+            'Bağımsız': ['Bağ.', 'Bağımsız']
         }
+        self.sema = PollSchema(self.parti_eslestirme)
     
     def log(self, mesaj):
         """Log mesajı ekler"""
@@ -70,180 +117,139 @@ class AnketVeriTemizleyici:
         for klasor in [self.iller_klasoru, self.raporlar_klasoru, self.birlesik_klasoru]:
             klasor.mkdir(parents=True, exist_ok=True)
         
-        self.log(f"✓ Klasör yapısı oluşturuldu: {self.cikti_klasoru}")
-    
-    def sutun_isimlerini_temizle(self, columns):
-        """Sütun isimlerini temizler ve düzenler"""
-        temizlenmis_sutunlar = []
-        
-        for sutun in columns:
-            sutun_str = str(sutun)
-            
-            # Tekrar eden kelimeleri kaldır
-            if ' ' in sutun_str:
-                kelimeler = sutun_str.split()
-                if len(kelimeler) >= 2 and kelimeler[0] == kelimeler[1]:
-                    temiz_isim = kelimeler[0]
-                else:
-                    temiz_isim = sutun_str
-            else:
-                temiz_isim = sutun_str
-            
-            # Özel durumlar için düzenleme
-            if 'Tarih' in temiz_isim:
-                temiz_isim = 'Tarih'
-            elif 'Anket' in temiz_isim and 'şirket' in temiz_isim:
-                temiz_isim = 'Anket_Şirketi'
-            elif 'Örneklem' in temiz_isim:
-                temiz_isim = 'Örneklem'
-            elif 'Diğerleri' in temiz_isim:
-                temiz_isim = 'Diğerleri'
-            elif 'Kararsız' in temiz_isim:
-                temiz_isim = 'Kararsız'
-            elif 'Fark' in temiz_isim:
-                temiz_isim = 'Fark'
-            elif 'KaynakURL' in temiz_isim:
-                temiz_isim = 'Kaynak_URL'
-            elif 'Bölüm' in temiz_isim:
-                temiz_isim = 'İl'
-            
-            temizlenmis_sutunlar.append(temiz_isim)
-        
-        return temizlenmis_sutunlar
-    
-    def parti_sutunlarini_tanimla(self, df, baslangic_sutun=5):
-        """Veri içeriğine bakarak parti sütunlarını tanımlar"""
-        parti_haritalama = {}
+        # Anket deposu: kaynak ve anket özetleri çalıştırmalar arasında saklanır
+        self.depo = PollStore(self.cikti_klasoru / "anket_deposu.sqlite", self.sema.columns, self.sema.dtypes)
         
-        if len(df.columns) > baslangic_sutun:
-            # İlk satırdaki sayısal değerleri kontrol et
-            ilk_satir = df.iloc[0, baslangic_sutun:]
-            
-            # Ana partiler (en yaygın olanlar)
-            ana_partiler = ['AKP', 'CHP', 'İYİ', 'MHP', 'HDP', 'DEM', 'YRP', 'ZP']
-            
-            # Sayısal sütunları parti olarak kabul et
-            sayisal_sutunlar = []
-            for i, hucre in enumerate(ilk_satir):
-                try:
-                    deger = pd.to_numeric(hucre, errors='coerce')
-                    if not pd.isna(deger) and deger > 0:
-                        sayisal_sutunlar.append(baslangic_sutun + i)
-                except:
-                    pass
-            
-            # Maksimum 8 parti sütunu (gerçekçi sınır)
-            if len(sayisal_sutunlar) > 8:
-                sayisal_sutunlar = sayisal_sutunlar[:8]
-            
-            # Parti isimlerini ata
-            for i, sutun_indeksi in enumerate(sayisal_sutunlar):
-                if i < len(ana_partiler):
-                    parti_haritalama[sutun_indeksi] = ana_partiler[i]
-                else:
-                    parti_haritalama[sutun_indeksi] = f'Parti_{i+1}'
-        
-        return parti_haritalama
+        self.log(f"✓ Klasör yapısı oluşturuldu: {self.cikti_klasoru}")
     
     def veriyi_temizle(self, df):
-        """Ana veri temizleme fonksiyonu"""
-        if df.empty:
-            return df
-        
-        temizlenmis_df = df.copy()
-        
-        # Gereksiz satırları kaldır
-        temizlenmis_df = temizlenmis_df[~temizlenmis_df.astype(str).eq('2024').any(axis=1)]
-        temizlenmis_df = temizlenmis_df.dropna(how='all')
-        
-        if temizlenmis_df.empty:
-            return temizlenmis_df
-        
-        # Sütun isimlerini temizle
-        yeni_sutunlar = self.sutun_isimlerini_temizle(temizlenmis_df.columns)
-        
-        # Parti sütunlarını tanımla
-        parti_haritalama = self.parti_sutunlarini_tanimla(temizlenmis_df)
-        
-        # Final sütun isimlerini oluştur
-        son_sutunlar = []
-        for i, sutun in enumerate(yeni_sutunlar):
-            if i in parti_haritalama:
-                son_sutunlar.append(parti_haritalama[i])
-            else:
-                son_sutunlar.append(sutun)
-        
-        temizlenmis_df.columns = son_sutunlar
-        
-        # Anlamlı sütunları tut
-        anlamli_sutunlar = []
-        for sutun in temizlenmis_df.columns:
-            if ('Unnamed' not in str(sutun) and 
-                str(sutun) != 'nan' and 
-                len(str(sutun).strip()) > 0):
-                anlamli_sutunlar.append(sutun)
-        
-        if anlamli_sutunlar:
-            temizlenmis_df = temizlenmis_df[anlamli_sutunlar]
-        
-        # Sayısal sütunları düzelt
-        parti_sutunlari = list(self.parti_eslestirme.keys())
-        sayisal_sutunlar = [sutun for sutun in temizlenmis_df.columns if sutun in parti_sutunlari]
-        sayisal_sutunlar.extend(['Örneklem', 'Diğerleri', 'Kararsız', 'Fark'])
-        
-        for sutun in sayisal_sutunlar:
-            if sutun in temizlenmis_df.columns:
-                temizlenmis_df[sutun] = pd.to_numeric(temizlenmis_df[sutun], errors='coerce')
-        
-        # Boş satırları tekrar kaldır
-        temizlenmis_df = temizlenmis_df.dropna(how='all')
-        
-        return temizlenmis_df
+        """Ana veri temizleme fonksiyonu (bkz. modül düzeyindeki veriyi_temizle)"""
+        return veriyi_temizle(self.sema, df)
+    
+    def dosyayi_temizle(self, dosya_yolu):
+        """Tek bir ham il dosyasını okuyup temizler"""
+        return dosyayi_temizle(self.sema, dosya_yolu)
     
-    def dosyalari_isle(self):
-        """Tüm dosyaları işler"""
+    def dosyalari_isle(self, is_sayisi=None, tam=False):
+        """
+        Dosyaları işler. İller is_sayisi süreçli bir havuzda temizlenir
+        (1: sıralı); temizlenmiş tablolar birleştirme için bellekte tutulur.
+        Depo açıksa son alımdan beri değişmeyen ham dosyalar okunmaz (tam=True
+        hepsini yeniden işler) ve yalnızca yeni/değişen anketler depoya yazılır;
+        kaynaklardan düşen veya ham klasörden silinen dosyalardaki anketler silinir.
+        """
         self.log("📊 Dosyalar işleniyor...")
         
         islenen_dosyalar = []
         hata_sayisi = 0
         
-        for dosya_yolu in self.girdi_klasoru.glob("*.csv"):
-            try:
-                self.log(f"İşleniyor: {dosya_yolu.name}")
-                
-                # CSV dosyasını oku
-                df = pd.read_csv(dosya_yolu, encoding='utf-8-sig')
-                
-                # Veriyi temizle
-                temizlenmis_df = self.veriyi_temizle(df)
-                
-                if not temizlenmis_df.empty:
-                    # İl adını tespit et
-                    il_adi = self.il_adini_cikart(dosya_yolu.name)
-                    
-                    # Temizlenmiş dosyayı kaydet
-                    cikti_dosyasi = self.iller_klasoru / f"{il_adi}.csv"
-                    temizlenmis_df.to_csv(cikti_dosyasi, index=False, encoding='utf-8-sig')
+        tum_dosyalar = sorted(self.girdi_klasoru.glob("*.csv"))
+        if self.depo is not None:
+            self.depo.begin_run()
+            for kaynak, eski_ozet in self.depo.remove_missing_sources(tum_dosyalar).items():
+                self.il_dosyasini_kaldir(eski_ozet)
+                self.log(f"🗑️ Kaynak kaldırıldı: {Path(kaynak).name}")
+        
+        dosyalar = []
+        for dosya_yolu in tum_dosyalar:
+            ozet = None if tam or self.depo is None or self.depo.source_changed(dosya_yolu) else \
+                self.depo.source_summary(dosya_yolu)
+            if ozet is None:
+                dosyalar.append(dosya_yolu)
+            elif ozet:
+                # Değişmeyen kaynak: il özeti depodan, tablo birleştirmede diskten gelir
+                islenen_dosyalar.append({**ozet, 'dosya': Path(ozet['dosya'])})
+        atlanan = len(islenen_dosyalar)
+        if atlanan:
+            self.log(f"= {atlanan} dosya son alımdan beri değişmedi, atlanıyor")
+        
+        is_sayisi = max(1, min(is_sayisi or os.cpu_count() or 1, len(dosyalar)))
+        havuz = ProcessPoolExecutor(max_workers=is_sayisi) if is_sayisi > 1 else None
+        
+        try:
+            # Sonuçlar dosya sırasıyla alınır; loglar ve çıktılar sıralı çalışmayla aynıdır
+            if havuz:
+                sonuclar = [havuz.submit(dosyayi_temizle, self.sema, dosya_yolu).result for dosya_yolu in dosyalar]
+            else:
+                sonuclar = [partial(dosyayi_temizle, self.sema, dosya_yolu) for dosya_yolu in dosyalar]
+            
+            for dosya_yolu, sonuc in zip(dosyalar, sonuclar):
+                try:
+                    self.log(f"İşleniyor: {dosya_yolu.name}")
                     
-                    islenen_dosyalar.append({
-                        'il': il_adi,
-                        'dosya': cikti_dosyasi,
-                        'anket_sayisi': len(temizlenmis_df),
-                        'sutun_sayisi': len(temizlenmis_df.columns),
-                        'partiler': [col for col in temizlenmis_df.columns if col in self.parti_eslestirme.keys()]
-                    })
+                    # Okunmuş ve temizlenmiş veri
+                    temizlenmis_df = sonuc()
                     
-                    self.log(f"✓ {il_adi}: {len(temizlenmis_df)} anket, {len(temizlenmis_df.columns)} sütun")
-                else:
-                    self.log(f"⚠ Boş veri: {dosya_yolu.name}")
+                    ozet = {}
+                    if not temizlenmis_df.empty:
+                        # İl adını tespit et
+                        il_adi = self.il_adini_cikart(dosya_yolu.name)
+                        
+                        # Temizlenmiş dosyayı kaydet
+                        cikti_dosyasi = self.iller_klasoru / f"{il_adi}.csv"
+                        temizlenmis_df.to_csv(cikti_dosyasi, index=False, encoding='utf-8-sig')
+                        
+                        ozet = {
+                            'il': il_adi,
+                            'dosya': str(cikti_dosyasi),
+                            'anket_sayisi': len(temizlenmis_df),
+                            'sutun_sayisi': len(temizlenmis_df.columns),
+                            'partiler': [col for col in temizlenmis_df.columns if col in self.parti_eslestirme.keys()]
+                        }
+                        islenen_dosyalar.append({**ozet, 'dosya': cikti_dosyasi, 'veri': temizlenmis_df})
+                        
+                        self.log(f"✓ {il_adi}: {len(temizlenmis_df)} anket, {len(temizlenmis_df.columns)} sütun")
+                        eslesmeyen = temizlenmis_df.attrs.get('eslesmeyen_sutunlar')
+                        if eslesmeyen:
+                            self.log(f"  ↳ Eşlenmeyen sütunlar: {', '.join(sorted(set(eslesmeyen)))}")
+                    else:
+                        self.log(f"⚠ Boş veri: {dosya_yolu.name}")
+                        if self.depo is not None:
+                            self.il_dosyasini_kaldir(self.depo.source_summary(dosya_yolu))
                     
-            except Exception as e:
-                hata_sayisi += 1
-                self.log(f"✗ Hata: {dosya_yolu.name} - {str(e)}")
-        
-        self.log(f"📈 İşlem tamamlandı: {len(islenen_dosyalar)} başarılı, {hata_sayisi} hatalı")
+                    # Depo yalnızca başarılı işlemede güncellenir; hatalı dosyalar sonraki alımda yeniden denenir.
+                    # Boş tablo da yazılır: kaynağın önceki anketleri düşer.
+                    if self.depo is not None:
+                        il_adi = self.il_adini_cikart(dosya_yolu.name)
+                        self.depo.upsert(temizlenmis_df, province=il_adi, source=str(dosya_yolu))
+                        self.depo.mark_source(dosya_yolu, province=ozet.get('il'), summary=ozet)
+                        
+                except Exception as e:
+                    hata_sayisi += 1
+                    self.log(f"✗ Hata: {dosya_yolu.name} - {str(e)}")
+        finally:
+            if havuz:
+                havuz.shutdown()
+        
+        self.log(f"📈 İşlem tamamlandı: {len(islenen_dosyalar)} başarılı ({atlanan} değişmedi), {hata_sayisi} hatalı")
+        if self.depo is not None:
+            self.degisiklikleri_kaydet()
         return islenen_dosyalar
     
+    def il_dosyasini_kaldir(self, ozet):
+        """Artık veri vermeyen kaynağın önceki alımda yazılmış il dosyasını siler"""
+        if ozet and ozet.get('dosya') and Path(ozet['dosya']).exists():
+            Path(ozet['dosya']).unlink()
+            self.log(f"🗑️ İl dosyası kaldırıldı: {Path(ozet['dosya']).name}")
+    
+    def degisiklikleri_kaydet(self):
+        """
+        Alımı kapatır ve eklenen/değişen/silinen anketleri raporlar/degisiklik_kaydi.csv
+        dosyasına ekler. Artımlı simülasyon bu kayıttan yalnızca değişen illeri yeniden hesaplar.
+        """
+        run_id = self.depo.run_id
+        sayilar = self.depo.finish_run()
+        self.log(f"🗃️ Depo: {sayilar['inserted']} yeni, {sayilar['updated']} değişen, "
+                 f"{sayilar['deleted']} silinen, {sayilar['unchanged']} aynı anket")
+        
+        degisiklikler = self.depo.changes(since_run=run_id)
+        if degisiklikler.empty:
+            return
+        kayit_dosyasi = self.raporlar_klasoru / "degisiklik_kaydi.csv"
+        degisiklikler.to_csv(kayit_dosyasi, mode='a', index=False, header=not kayit_dosyasi.exists(),
+                             encoding='utf-8')
+        self.log(f"✓ Değişen iller: {', '.join(self.depo.changed_provinces(run_id))}")
+    
     def il_adini_cikart(self, dosya_adi):
         """Dosya adından il adını çıkarır"""
         # Dosya uzantısını kaldır
@@ -261,14 +267,27 @@ class AnketVeriTemizleyici:
         return il_adi.title()
     
     def birlesik_dosya_olustur(self, islenen_dosyalar):
-        """Tüm illerin verilerini birleştiren dosya oluşturur"""
+        """
+        Tüm illerin verilerini birleştiren dosya oluşturur. Depo açıksa
+        birleşik tablo depodaki tekil anketlerdir (kaynaklar arası tekrarlar bir kez yer alır).
+        """
         self.log("📋 Birleşik dosya oluşturuluyor...")
         
+        if self.depo is not None:
+            birlesik_df = self.depo.polls_frame()
+            birlesik_dosya = self.birlesik_klasoru / "tum_iller_anket_verileri.csv"
+            birlesik_df.to_csv(birlesik_dosya, index=False, encoding='utf-8-sig')
+            self.log(f"✓ Birleşik dosya oluşturuldu: {len(birlesik_df)} tekil anket")
+            return birlesik_df
+        
         tum_veriler = []
         
         for dosya_bilgi in islenen_dosyalar:
             try:
-                df = pd.read_csv(dosya_bilgi['dosya'], encoding='utf-8-sig')
+                # dosyalari_isle tabloları bellekte verir; yalnızca eksikse diskten okunur
+                df = dosya_bilgi.get('veri')
+                if df is None:
+                    df = pd.read_csv(dosya_bilgi['dosya'], encoding='utf-8-sig')
                 tum_veriler.append(df)
             except Exception as e:
                 self.log(f"⚠ Birleştirme hatası: {dosya_bilgi['il']} - {str(e)}")
@@ -365,21 +384,11 @@ class AnketVeriTemizleyici:
         # Konsola da yazdır
         print("\n" + "\n".join(rapor_metni[:25]))  # İlk 25 satırı konsola yazdır
     
-    def eski_dosyalari_temizle(self):
-        """Eski temizlik dosyalarını kaldırır"""
-        silinecek_klasorler = ['temiz_provinces', 'super_temiz_provinces']
-        
-        for klasor_adi in silinecek_klasorler:
-            klasor_yolu = Path(klasor_adi)
-            if klasor_yolu.exists():
-                try:
-                    shutil.rmtree(klasor_yolu)
-                    self.log(f"🗑️ Eski klasör temizlendi: {klasor_adi}")
-                except Exception as e:
-                    self.log(f"⚠ Klasör silinemedi: {klasor_adi} - {str(e)}")
-    
-    def calistir(self):
-        """Ana çalıştırma fonksiyonu"""
+    def calistir(self, is_sayisi=None, tam=False):
+        """
+        Ana çalıştırma fonksiyonu (is_sayisi: il temizleme süreç sayısı,
+        tam: değişmeyen kaynaklar dahil tüm dosyaları yeniden işle)
+        """
         print("🚀 2024 Türkiye Yerel Seçimleri Anket Verisi Temizleyici")
         print("=" * 55)
         
@@ -388,14 +397,11 @@ class AnketVeriTemizleyici:
             self.log(f"❌ Girdi klasörü bulunamadı: {self.girdi_klasoru}")
             return
         
-        # Eski dosyaları temizle
-        self.eski_dosyalari_temizle()
-        
         # Klasör yapısını oluştur
         self.klasor_yapisini_olustur()
         
         # Dosyaları işle
-        islenen_dosyalar = self.dosyalari_isle()
+        islenen_dosyalar = self.dosyalari_isle(is_sayisi, tam)
         
         if not islenen_dosyalar:
             self.log("❌ Hiçbir dosya işlenemedi!")
@@ -417,13 +423,20 @@ class AnketVeriTemizleyici:
 
 def main():
     """Ana fonksiyon"""
+    ap = argparse.ArgumentParser(description="2024 yerel seçim anket verilerini temizle")
+    ap.add_argument("-j", "--is-sayisi", type=int, default=None,
+                    help="İlleri temizleyen süreç sayısı (varsayılan: işlemci sayısı, 1: sıralı)")
+    ap.add_argument("--tam", action="store_true",
+                    help="Değişmeyen kaynaklar dahil tüm dosyaları yeniden işle")
+    args = ap.parse_args()
+    
     # Temizleyici oluştur ve çalıştır
     temizleyici = AnketVeriTemizleyici(
         girdi_klasoru="provinces",
         cikti_klasoru="temiz_anket_verileri"
     )
     
-    temizleyici.calistir()
+    temizleyici.calistir(args.is_sayisi, args.tam)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,109 @@
+"""
+Sütun Bazlı Özet Tablosu
+2024 Türkiye Yerel Seçimleri için
+
+İl sonuçlarından il x parti kazanma olasılığı matrisi bir kez oluşturulur;
+önde olan parti, ilk iki olasılık, fark ve anket sayısı vektörel olarak
+hesaplanır. Yönetici özeti, raporlar, grafikler ve risk skorlaması bu
+tabloyu paylaşır.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+# Eşikler (kazanma olasılığı, %)
+SAFE_THRESHOLD = 60         # Güçlü favori
+COMPETITIVE_THRESHOLD = 40  # Çekişmeli yarışın alt sınırı
+MAJORITY_THRESHOLD = 50     # İl kazanımı sayılan olasılık
+LOW_POLL_THRESHOLD = 5      # Yetersiz anket verisi
+UNCERTAIN_THRESHOLD = 45    # Yüksek belirsizlik
+
+
+def win_probability_matrix(results: Dict) -> pd.DataFrame:
+    """İl sonuç sözlüklerinden il x parti kazanma olasılığı matrisi oluşturur"""
+    matrix = pd.DataFrame.from_dict(
+        {city: result['win_probabilities'] for city, result in results.items()},
+        orient='index'
+    )
+    # from_dict satırları anahtar kümesine göre gruplayabilir; il sırası korunur
+    return matrix.reindex(list(results)).astype(float)
+
+
+class SummaryTable:
+    """
+    İl x parti kazanma olasılığı matrisi ve il bazında türetilmiş sütunlar.
+
+    provinces sütunları: leading_party, top_win_prob, second_win_prob, margin,
+    party_count, poll_count
+    """
+
+    def __init__(self, results: Dict):
+        self.win_matrix = win_probability_matrix(results)
+        matrix = self.win_matrix.to_numpy()
+        parties = np.array(self.win_matrix.columns, dtype=object)
+
+        filled = np.nan_to_num(matrix, nan=-np.inf)
+        ranked = -np.sort(-filled, axis=1)
+        ranked[np.isinf(ranked)] = np.nan
+
+        table = pd.DataFrame(index=self.win_matrix.index)
+        if matrix.shape[1]:
+            table['leading_party'] = parties[filled.argmax(axis=1)]
+            table['top_win_prob'] = ranked[:, 0]
+        else:
+            table['leading_party'] = None
+            table['top_win_prob'] = np.nan
+        table['second_win_prob'] = ranked[:, 1] if matrix.shape[1] > 1 else np.nan
+        table['margin'] = table['top_win_prob'] - table['second_win_prob']
+        table['party_count'] = self.win_matrix.notna().sum(axis=1)
+        table['poll_count'] = pd.Series(
+            {city: result.get('poll_stats', {}).get('poll_count', 0) for city, result in results.items()}
+        )
+        self.provinces = table
+
+    def __len__(self) -> int:
+        return len(self.provinces)
+
+    def party_wins(self, min_probability: float = MAJORITY_THRESHOLD) -> Dict[str, int]:
+        """Önde olduğu ve olasılığı eşiği aşan il sayısı (ilk görülme sırasıyla)"""
+        leaders = self.provinces.loc[self.provinces['top_win_prob'] > min_probability, 'leading_party']
+        counts = leaders.value_counts()
+        return {party: int(counts[party]) for party in pd.unique(leaders)}
+
+    def safe_seats(self, min_probability: float = SAFE_THRESHOLD) -> List[Dict]:
+        """Güçlü favori olunan iller"""
+        safe = self.provinces[self.provinces['top_win_prob'] > min_probability]
+        return [
+            {'city': city, 'party': party, 'probability': probability}
+            for city, party, probability in zip(safe.index, safe['leading_party'], safe['top_win_prob'])
+        ]
+
+    def competitive_races(self, low: float = COMPETITIVE_THRESHOLD, high: float = SAFE_THRESHOLD,
+                          limit: int = None) -> List[Dict]:
+        """Çekişmeli iller (low < olasılık <= high), farka göre artan"""
+        top = self.provinces['top_win_prob']
+        races = self.provinces[(top > low) & (top <= high)]
+        return self._race_records(races, limit)
+
+    def closest_races(self, limit: int = 20) -> List[Dict]:
+        """En az iki partinin kazanabildiği iller arasında farkı en küçük olanlar"""
+        races = self.provinces[self.provinces['party_count'] >= 2]
+        return self._race_records(races, limit)
+
+    @staticmethod
+    def _race_records(races: pd.DataFrame, limit: int = None) -> List[Dict]:
+        races = races.sort_values('margin', kind='stable')
+        if limit is not None:
+            races = races.head(limit)
+        return [
+            {'city': city, 'leading_party': party, 'probability': probability, 'margin': margin}
+            for city, party, probability, margin in zip(
+                races.index, races['leading_party'], races['top_win_prob'], races['margin'])
+        ]
+
+    def low_poll_cities(self, threshold: int = LOW_POLL_THRESHOLD) -> List[str]:
+        return self.provinces.index[self.provinces['poll_count'] < threshold].tolist()
+
+    def uncertain_cities(self, threshold: float = UNCERTAIN_THRESHOLD) -> List[str]:
+        return self.provinces.index[self.provinces['top_win_prob'] < threshold].tolist()
@@ -0,0 +1,251 @@
+"""
+Devrilme Noktası (Tipping-Point) Çözücüsü
+2024 Türkiye Yerel Seçimleri için
+
+Her il ve parti çifti için lideri değiştiren en küçük oy kaymasını (swing)
+bulur. Hem ortalamalar hem simülasyon matrisi üzerinde kapalı form çözüm
+kullanılır; döngü yalnızca iller üzerindedir.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Tuple
+from advanced_election_predictor import AdvancedElectionPredictor
+
+SWING_METHODS = ('uniform', 'proportional')
+
+
+def uniform_flip_swing(shares: np.ndarray, from_idx: np.ndarray, to_idx: int) -> np.ndarray:
+    """
+    Tekdüze swing: `from_idx` partisinden `to_idx` partisine s puan geçer.
+    `to_idx` partisinin birinci olması için gereken en küçük s (satır bazında).
+    """
+    shares = np.asarray(shares, dtype=float)
+    rows = np.arange(shares.shape[0])
+    source = shares[rows, from_idx]
+    target = shares[:, to_idx]
+
+    # Kaynak ve hedef dışındaki en yüksek parti
+    others = shares.copy()
+    others[rows, from_idx] = -np.inf
+    others[:, to_idx] = -np.inf
+    max_other = others.max(axis=1)
+
+    required = np.maximum((source - target) / 2, max_other - target)
+    required = np.maximum(required, 0)
+    # Kaynak partinin oyundan fazlası aktarılamaz
+    required[required > source] = np.inf
+    # Kaynak ile hedef aynıysa kayma tanımsız
+    required[from_idx == to_idx] = np.nan
+    return required
+
+
+def proportional_flip_swing(shares: np.ndarray, to_idx: int) -> np.ndarray:
+    """
+    Orantılı swing: `to_idx` partisi s puan kazanır, diğer partiler oy
+    paylarıyla orantılı kaybeder (calculate_swing_scenarios ile aynı model).
+    """
+    shares = np.asarray(shares, dtype=float)
+    target = shares[:, to_idx]
+    pool = shares.sum(axis=1) - target  # Diğer partilerin toplamı
+
+    others = np.delete(shares, to_idx, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        thresholds = pool[:, None] * (others - target[:, None]) / (pool[:, None] + others)
+    required = np.maximum(np.nan_to_num(thresholds, nan=0.0).max(axis=1), 0)
+    required[required > pool] = np.inf
+    return required
+
+
+def _top_two(columns: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(parti x simülasyon) dizisinde her simülasyonun en yüksek iki değeri ve birincinin indeksi"""
+    first = np.full(columns.shape[1], -np.inf, dtype=columns.dtype)
+    second = np.full(columns.shape[1], -np.inf, dtype=columns.dtype)
+    first_idx = np.full(columns.shape[1], -1)
+    for j, col in enumerate(columns):
+        beats_first = col > first
+        second = np.where(beats_first, first, np.maximum(second, col))
+        first = np.where(beats_first, col, first)
+        first_idx = np.where(beats_first, j, first_idx)
+    return first, first_idx, second
+
+
+def draw_thresholds(draws: np.ndarray, leader_idx: int, method: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lider dışındaki her rakip için simülasyon bazında iki eşik döndürür:
+    flip (rakibin birinci olması için gereken kayma) ve hold (liderin birinci
+    kaldığı üst sınır). İkisi de (rakip x simülasyon) boyutundadır.
+    """
+    columns = np.ascontiguousarray(np.asarray(draws).T)
+    leader = columns[leader_idx]
+    challengers = [i for i in range(len(columns)) if i != leader_idx]
+
+    # Lider hariç en yüksek iki parti (rakibin kendisi çıkarılınca ikinci devreye girer)
+    rest = np.delete(columns, leader_idx, axis=0)
+    rest_first, rest_idx, rest_second = _top_two(rest)
+    if method == 'proportional':
+        # Tüm partiler içinde en yüksek iki değer
+        all_first, all_idx, all_second = _top_two(columns)
+        totals = columns.sum(axis=0)
+
+    flip = np.empty((len(challengers), columns.shape[1]), dtype=columns.dtype)
+    hold = np.empty_like(flip)
+
+    for k, c in enumerate(challengers):
+        target = columns[c]
+        max_other = np.where(rest_idx == k, rest_second, rest_first)
+        max_other = np.maximum(max_other, 0)
+
+        if method == 'uniform':
+            required = np.maximum(np.maximum((leader - target) / 2, max_other - target), 0)
+            required[required > leader] = np.inf
+            flip[k] = required
+            hold[k] = np.maximum(np.minimum((leader - target) / 2, leader - max_other), 0)
+        else:
+            # Diğer partiler aynı oranda erir; eşik en büyük rakipte belirlenir
+            pool = totals - target
+            strongest = np.where(all_idx == c, all_second, all_first)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                required = pool * (strongest - target) / (pool + strongest)
+                held = pool * (leader - target) / (pool + leader)
+            required = np.maximum(np.nan_to_num(required, nan=0.0), 0)
+            required[required > pool] = np.inf
+            flip[k] = required
+            held[leader <= max_other] = 0
+            hold[k] = np.maximum(np.nan_to_num(held, nan=0.0), 0)
+
+    return flip, hold
+
+
+class TippingPointSolver:
+    """İl ve parti çiftleri için lideri değiştiren minimum swing çözücüsü"""
+
+    def __init__(self, predictor: AdvancedElectionPredictor):
+        self.predictor = predictor
+        self._averages = None
+
+    def averages_matrix(self) -> pd.DataFrame:
+        """İl x parti ağırlıklı ortalama matrisini (bir kez) oluşturur"""
+        if self._averages is None:
+            rows = {}
+            cities = list(self.predictor.city_data) or list(self.predictor.prediction_results)
+            for city in cities:
+                stats = self.predictor.calculate_weighted_averages(city)
+                if stats:
+                    rows[city] = stats['averages']
+            self._averages = pd.DataFrame.from_dict(rows, orient='index').fillna(0.0)
+        return self._averages
+
+    def solve_averages(self, method: str = 'uniform') -> pd.DataFrame:
+        """
+        Ortalamalar üzerinde kapalı form çözüm.
+        Her il için lider ve her rakip parti çifti başına bir satır döndürür.
+        """
+        if method not in SWING_METHODS:
+            raise ValueError(f"Bilinmeyen swing yöntemi: {method}")
+
+        averages = self.averages_matrix()
+        shares = averages.to_numpy()
+        parties = list(averages.columns)
+        leader_idx = shares.argmax(axis=1)
+
+        frames = []
+        for to_idx, party in enumerate(parties):
+            if method == 'uniform':
+                required = uniform_flip_swing(shares, leader_idx, to_idx)
+            else:
+                required = proportional_flip_swing(shares, to_idx)
+
+            frames.append(pd.DataFrame({
+                'city': averages.index,
+                'leader': [parties[i] for i in leader_idx],
+                'challenger': party,
+                'leader_share': shares[np.arange(len(shares)), leader_idx],
+                'challenger_share': shares[:, to_idx],
+                'required_swing': required,
+            }))
+
+        result = pd.concat(frames, ignore_index=True)
+        result = result[result['leader'] != result['challenger']]
+        return result.sort_values(['city', 'required_swing']).reset_index(drop=True)
+
+    def solve_draws(self, method: str = 'uniform', cities: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Simülasyon matrisi üzerinde çözüm: rakibin kazanma olasılığının liderinkini
+        geçtiği en küçük swing.
+        
+        Rakip s'de kazanır ⇔ flip < s, lider kazanır ⇔ hold > s. İkisinin farkı s'de
+        monoton artar; birleşik eşik dizisinin n. sıra istatistiği aranan kaymadır
+        (ikiye bölmenin kapalı formu).
+        """
+        if method not in SWING_METHODS:
+            raise ValueError(f"Bilinmeyen swing yöntemi: {method}")
+
+        draws_by_city = self.predictor.simulation_draws
+        results = self.predictor.prediction_results
+        cities = [c for c in (cities or draws_by_city.keys()) if c in draws_by_city and c in results]
+
+        records = []
+        for city in cities:
+            draws = draws_by_city[city]
+            n = len(draws)
+            parties = list(results[city]['mean_votes'].keys())
+            win_probs = results[city]['win_probabilities']
+            leader = max(win_probs.items(), key=lambda x: x[1])[0]
+            leader_idx = parties.index(leader)
+
+            challengers = [i for i in range(len(parties)) if i != leader_idx]
+            flip, hold = draw_thresholds(draws, leader_idx, method)
+            combined = np.concatenate([flip, hold], axis=1)
+            required = np.partition(combined, n, axis=1)[:, n]
+
+            for k, i in enumerate(challengers):
+                records.append({
+                    'city': city,
+                    'leader': leader,
+                    'challenger': parties[i],
+                    'leader_win_prob': win_probs.get(leader, 0),
+                    'challenger_win_prob': win_probs.get(parties[i], 0),
+                    'required_swing': float(required[k]),
+                })
+
+        result = pd.DataFrame.from_records(records)
+        if result.empty:
+            return result
+        return result.sort_values(['city', 'required_swing']).reset_index(drop=True)
+
+    def tipping_point_order(self, party: str, method: str = 'uniform', use_draws: bool = False) -> pd.DataFrame:
+        """
+        Ulusal devrilme noktası sıralaması: `party` için iller gereken swing'e göre
+        sıralanır; partiyi illerin çoğunluğuna taşıyan il devrilme noktasıdır.
+        """
+        solved = self.solve_draws(method) if use_draws else self.solve_averages(method)
+        if solved.empty:
+            return solved
+
+        # Partinin zaten önde olduğu iller sıfır swing ile başlar
+        leading = solved.drop_duplicates('city')
+        leading = leading[leading['leader'] == party][['city', 'leader']].assign(required_swing=0.0)
+        needed = solved[solved['challenger'] == party][['city', 'leader', 'required_swing']]
+
+        order = pd.concat([leading, needed], ignore_index=True)
+        order = order.sort_values('required_swing', kind='stable').reset_index(drop=True)
+        order['cumulative_wins'] = np.arange(1, len(order) + 1)
+
+        majority = len(order) // 2 + 1
+        order['is_tipping_point'] = order['cumulative_wins'] == majority
+        return order
+
+    def tipping_point(self, party: str, method: str = 'uniform', use_draws: bool = False) -> Tuple[str, float]:
+        """Devrilme noktası ilini ve gereken swing'i döndürür"""
+        return self.tipping_point_from_order(self.tipping_point_order(party, method, use_draws))
+
+    @staticmethod
+    def tipping_point_from_order(order: pd.DataFrame) -> Tuple[str, float]:
+        """tipping_point_order çıktısındaki devrilme noktası ili ve swing'i (yeniden çözmeden)"""
+        if order.empty:
+            return None, np.inf
+        row = order[order['is_tipping_point']]
+        if row.empty:
+            return None, np.inf
+        return row['city'].iloc[0], float(row['required_swing'].iloc[0])
@@ -0,0 +1,34 @@
+"""
+Katılım Modeli
+2024 Türkiye Yerel Seçimleri için
+
+Katılım oranı her simülasyonda örneklenen gizli bir değişkendir; partilere
+esneklik katsayılarıyla yansır. Tahmin motoru, senaryo analizi ve artefakt
+aynı sabitleri kullanır.
+"""
+
+import numpy as np
+from typing import List
+
+# Katılım esnekliği: parti çarpanı = 1 + (NEUTRAL_TURNOUT - katılım) * esneklik
+# Düşük katılım genelde statükocu partileri avantajlı hale getirir
+NEUTRAL_TURNOUT = 0.85
+TURNOUT_ELASTICITIES = {
+    'AKP': 0.3,   # Düşük katılımda avantajlı
+    'MHP': 0.2,
+    'CHP': -0.1,  # Yüksek katılımda avantajlı
+    'İYİ': -0.15,
+    'HDP': -0.2,
+    'DEM': -0.2,
+    'YRP': 0.0,
+    'ZP': 0.0
+}
+# Katılım bantları (üst sınırlar) ve etiketleri
+TURNOUT_BAND_EDGES = [0.65, 0.75, 0.85]
+TURNOUT_BAND_LABELS = ['<%65', '%65-75', '%75-85', '≥%85']
+
+
+def turnout_modifiers(turnout, parties: List[str]) -> np.ndarray:
+    """Katılım oranı (skaler veya dizi) için parti çarpanları; son eksen partilerdir"""
+    elasticities = np.array([TURNOUT_ELASTICITIES.get(party, 0.0) for party in parties])
+    return 1.0 + (NEUTRAL_TURNOUT - np.asarray(turnout, dtype=float))[..., None] * elasticities
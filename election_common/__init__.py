@@ -0,0 +1,66 @@
+"""
+Seçim betiklerinin ortak yardımcıları (anket sayfası kazıma çekirdeği, HTTP önbelleği, il adı eşleştirici, sayı normalizasyonu, anket şeması, artımlı anket deposu, rapor şablonları).
+
+Dönem klasörlerindeki betikler depo kökünü sys.path'e ekleyerek içe aktarır.
+"""
+
+from election_common.http_cache import FetchResult, ResponseCache, SourceStamp
+from election_common.numeric import parse_count, parse_percent, parse_percent_frame
+from election_common.poll_schema import PollSchema, header_key
+from election_common.poll_store import PollStore
+from election_common.provinces import (
+    PROVINCES,
+    ProvinceMatcher,
+    classify_provinces,
+    find_province,
+    province_file_key,
+    turkish_lower,
+)
+from election_common.report_templates import ReportRenderer, Section, write_report
+from election_common.scraping import (
+    DEFAULT_HEADING_LEVELS,
+    AutoFetcher,
+    HttpFetcher,
+    LocalFileFetcher,
+    WikiPage,
+    default_fetcher,
+    fetch_page,
+    flatten_columns,
+    make_unique_columns,
+    parse_source,
+    read_table,
+    slugify,
+)
+
+__all__ = [
+    'DEFAULT_HEADING_LEVELS',
+    'PROVINCES',
+    'AutoFetcher',
+    'FetchResult',
+    'HttpFetcher',
+    'LocalFileFetcher',
+    'PollSchema',
+    'PollStore',
+    'ProvinceMatcher',
+    'ReportRenderer',
+    'ResponseCache',
+    'Section',
+    'SourceStamp',
+    'WikiPage',
+    'classify_provinces',
+    'default_fetcher',
+    'fetch_page',
+    'find_province',
+    'flatten_columns',
+    'header_key',
+    'make_unique_columns',
+    'parse_count',
+    'parse_percent',
+    'parse_percent_frame',
+    'parse_source',
+    'province_file_key',
+    'read_table',
+    'slugify',
+    'turkish_lower',
+    'write_report',
+]
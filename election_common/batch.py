@@ -0,0 +1,142 @@
+"""
+Eşzamanlı Çoklu Sayfa Kazıma
+Tüm seçim dönemlerinin betikleri için
+
+Birden çok anket sayfası sınırlı bir iş parçacığı havuzunda birlikte indirilip
+ayrıştırılır. İşler tek bir getiriciyi (bağlantı havuzu, disk önbelleği,
+sunucu başına hız sınırı ve yeniden deneme) paylaşır; her iş kendi çıktı
+klasörüne dosyaları atomik olarak yazar.
+
+    python -m election_common.batch                       # Tüm sayfalar (depo kökünden)
+    python -m election_common.batch 2019_yerel 2024_yerel --workers 2
+    python -m election_common.batch --list
+"""
+
+import argparse
+import importlib.util
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from election_common.scraping import add_fetch_arguments, fetcher_from_args
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_WORKERS = 4
+DEFAULT_BATCH_OUTDIR = "anket_cikti"
+
+
+class BatchJob:
+    """
+    Bir seçim sayfasının kazıma işi: betik dosyası, betikteki
+    `fonksiyon(url, outdir, fetcher, force)` ve URL sabiti (liste ise indeksi).
+    """
+
+    def __init__(self, name: str, script: str, function: str, url_attr: str, url_index: int = None):
+        self.name = name
+        self.script = script
+        self.function = function
+        self.url_attr = url_attr
+        self.url_index = url_index
+
+    def load(self) -> Tuple[Callable, str]:
+        """Betiği modül olarak yükler; (kazıma fonksiyonu, URL) döndürür"""
+        path = REPO_ROOT / self.script
+        spec = importlib.util.spec_from_file_location(f"_batch_{self.name}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        url = getattr(module, self.url_attr)
+        if self.url_index is not None:
+            url = url[self.url_index]
+        return getattr(module, self.function), url
+
+
+BATCH_JOBS = {
+    job.name: job for job in (
+        BatchJob('2019_yerel', '2019_Local(Prediction)/script.py', 'scrape_and_write', 'DEFAULT_URL'),
+        BatchJob('2023_cumhurbaskanligi', '2023TurkishGeneralElections(Script)/dual_anket_script.py',
+                 'scrape_page_to_csv', 'DEFAULT_URLS', 0),
+        BatchJob('2023_genel', '2023TurkishGeneralElections(Script)/dual_anket_script.py',
+                 'scrape_page_to_csv', 'DEFAULT_URLS', 1),
+        BatchJob('2024_yerel', '2024_Local(Monte Carlo)/scripts/wikipedia_anket_scriper.py',
+                 'scrape_and_write', 'WIKI_URL_DEFAULT'),
+    )
+}
+
+
+def run_parallel(tasks: Dict[str, Callable[[], object]], max_workers: int = DEFAULT_WORKERS) -> Dict[str, Dict]:
+    """
+    Görevleri en fazla max_workers iş parçacığında çalıştırır. Bir görevin
+    hatası diğerlerini durdurmaz.
+
+    Döndürülen sözlük (görev sırasıyla): ad -> {'result', 'error', 'seconds'}
+    """
+    outcomes = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {}
+        for name, task in tasks.items():
+            futures[pool.submit(_timed, task)] = name
+        for future in as_completed(futures):
+            outcomes[futures[future]] = future.result()
+    return {name: outcomes[name] for name in tasks}
+
+
+def _timed(task: Callable[[], object]) -> Dict:
+    start = time.perf_counter()
+    try:
+        return {'result': task(), 'error': None, 'seconds': time.perf_counter() - start}
+    except Exception as e:
+        return {'result': None, 'error': e, 'seconds': time.perf_counter() - start}
+
+
+def run_batch(names: List[str], outdir: Path, fetcher, max_workers: int = DEFAULT_WORKERS,
+              force: bool = False) -> Dict[str, Dict]:
+    """Seçilen işleri eşzamanlı çalıştırır; her iş `<outdir>/<iş adı>/` klasörüne yazar"""
+    # Betikler ana iş parçacığında yüklenir (içe aktarma eşzamanlı yapılmaz)
+    tasks = {}
+    for name in names:
+        scrape, url = BATCH_JOBS[name].load()
+        tasks[name] = (lambda scrape=scrape, url=url, name=name:
+                       scrape(url, outdir / name, fetcher, force))
+    return run_parallel(tasks, max_workers)
+
+
+def main():
+    """Toplu kazıma komut satırı arayüzü"""
+    ap = argparse.ArgumentParser(description="Seçim anket sayfalarını eşzamanlı kazı")
+    ap.add_argument("jobs", nargs="*", help=f"Çalıştırılacak işler (boşsa hepsi): {', '.join(BATCH_JOBS)}")
+    ap.add_argument("-o", "--outdir", default=DEFAULT_BATCH_OUTDIR, help="Çıktı kök klasörü")
+    ap.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Eşzamanlı iş sayısı")
+    ap.add_argument("--list", action="store_true", help="Tanımlı işleri listele")
+    add_fetch_arguments(ap)
+    args = ap.parse_args()
+
+    if args.list:
+        for job in BATCH_JOBS.values():
+            print(f"{job.name:<24} {job.script}")
+        return
+
+    unknown = [name for name in args.jobs if name not in BATCH_JOBS]
+    if unknown:
+        ap.error(f"Bilinmeyen iş: {', '.join(unknown)}")
+
+    names = args.jobs or list(BATCH_JOBS)
+    fetcher = fetcher_from_args(args)
+    start = time.perf_counter()
+    outcomes = run_batch(names, Path(args.outdir), fetcher, args.workers, args.force)
+
+    stats = getattr(fetcher.http, 'stats', None)
+    print(f"\n[i] {len(names)} iş {time.perf_counter() - start:.2f} sn'de tamamlandı ({args.workers} eşzamanlı)"
+          + (f", istekler: {stats}" if stats else ""))
+    for name, outcome in outcomes.items():
+        if outcome['error'] is not None:
+            print(f"[!] {name}: {outcome['error']}")
+        else:
+            print(f"[✓] {name}: {outcome['seconds']:.2f} sn")
+    if any(outcome['error'] is not None for outcome in outcomes.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Koşullu İstekli Disk Yanıt Önbelleği
+Tüm seçim dönemlerinin betikleri için
+
+Her URL'nin son başarılı yanıtı diske yazılır; sonraki isteklerde ETag
+(If-None-Match) ve Last-Modified (If-Modified-Since) ile yeniden doğrulanır.
+Sunucu 304 dönerse gövde önbellekten okunur. max_age süresi dolmamış kayıtlar
+için hiç istek yapılmaz.
+
+    .cache/http/<url özeti>.json   # url, etag, last_modified, kodlama, gövde özeti, zaman
+    .cache/http/<url özeti>.body   # ham yanıt gövdesi
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+DEFAULT_HTTP_CACHE_DIR = ".cache/http/"
+
+
+def url_key(url: str) -> str:
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]
+
+
+class FetchResult:
+    """
+    Getirilen sayfa. status: 'network' (200 ile indirildi), 'not_modified'
+    (304, önbellekten), 'fresh' (istek yapılmadan önbellekten) veya 'local'.
+    """
+
+    def __init__(self, url: str, text: str, status: str, digest: str = None):
+        self.url = url
+        self.text = text
+        self.status = status
+        self.digest = digest or hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _atomic_write(path: Path, data: bytes):
+    tmp_path = path.with_name(path.name + f'.{os.getpid()}.{threading.get_ident()}.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class ResponseCache:
+    """URL başına tek kayıt tutan disk önbelleği"""
+
+    def __init__(self, cache_dir: str = DEFAULT_HTTP_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+
+    def _paths(self, url: str):
+        key = url_key(url)
+        return self.cache_dir / f"{key}.json", self.cache_dir / f"{key}.body"
+
+    def load(self, url: str) -> Optional[Dict]:
+        """Önbellek kaydı (gövdesi eksik veya bozuksa None)"""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        if entry.get('url') != url or hashlib.sha256(body).hexdigest() != entry.get('sha256'):
+            return None
+        entry['body'] = body
+        return entry
+
+    def store(self, url: str, body: bytes, encoding: str, headers) -> Dict:
+        meta_path, body_path = self._paths(url)
+        entry = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'encoding': encoding or 'utf-8',
+            'sha256': hashlib.sha256(body).hexdigest(),
+            'fetched_at': time.time(),
+        }
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        _atomic_write(body_path, body)
+        _atomic_write(meta_path, json.dumps(entry).encode('utf-8'))
+        entry['body'] = body
+        return entry
+
+    def touch(self, url: str, entry: Dict):
+        """304 sonrası kaydın doğrulanma zamanını günceller"""
+        meta_path, _ = self._paths(url)
+        meta = {k: v for k, v in entry.items() if k != 'body'}
+        meta['fetched_at'] = time.time()
+        _atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict]) -> Dict[str, str]:
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    @staticmethod
+    def result(entry: Dict, status: str) -> FetchResult:
+        return FetchResult(entry['url'], entry['body'].decode(entry['encoding'], errors='replace'),
+                           status, entry['sha256'])
+
+
+class SourceStamp:
+    """
+    Çıktı klasöründe hangi kaynak sürümünden üretildiğini tutar; kaynak
+    değişmediyse tablolar yeniden ayrıştırılmadan çıkılabilir.
+
+        <çıktı klasörü>/.kaynaklar.json   # url -> gövde özeti
+    """
+
+    FILE_NAME = ".kaynaklar.json"
+    _lock = threading.Lock()  # Aynı klasöre yazan eşzamanlı işler kayıtları birleştirir
+
+    def __init__(self, outdir):
+        self.path = Path(outdir) / self.FILE_NAME
+        self.sources = self._read()
+
+    def _read(self) -> Dict[str, str]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def is_current(self, result: FetchResult) -> bool:
+        return self.sources.get(result.url) == result.digest
+
+    def update(self, result: FetchResult):
+        with self._lock:
+            self.sources = {**self._read(), result.url: result.digest}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            _atomic_write(self.path, json.dumps(self.sources, ensure_ascii=False, indent=2).encode('utf-8'))
@@ -0,0 +1,106 @@
+"""
+Vektörel Sayı Normalizasyonu
+Tüm seçim dönemlerinin betikleri için
+
+Anket tablolarındaki metin hücreleri tek bir düzenli ifadeyle (Series.str.extract)
+sayıya çevrilir; hücre başına Python fonksiyonu çağrılmaz.
+
+    "%34,5"  "34.5"  "34,5±2,1"  "34,5 (2)"  -> 34.5
+    "50-52"  "50–52"                          -> 51.0 (aralığın ortası)
+    "—"  "-"  "N/A"  ""                       -> NaN
+    parse_count: "2.464"  "2,464"  "25.000"   -> 2464, 2464, 25000
+
+Zaten sayısal olan sütunlar ve tamamı düz sayı olan metinler pd.to_numeric
+gibi çevrilir (tam sayılar int kalır).
+"""
+
+import numpy as np
+import pandas as pd
+
+# Boşluklar (bölünmez boşluk dahil), tırnaklar ve yüzde işareti atılır
+_NOISE = r"[\s\"'%]"
+# İşaret, sayı, isteğe bağlı aralık sonu; ±, parantez veya dipnotla başlayan ek yok sayılır
+_NUMBER = (r"^(?P<sign>[-+−]?)(?P<low>\d+(?:[.,]\d+)*)"
+           r"(?:[-–—](?P<high>\d+(?:[.,]\d+)*))?(?:[±(\[].*)?$")
+# Ondalık: son ayraç ondalıktır, öncekiler binlik ayraçtır ("1.234,5" -> 1234.5)
+_GROUPING_BEFORE_LAST = r"[.,](?=\d*[.,])"
+# Sayım: ardından tam üç hane gelen ayraçlar binlik ayraçtır ("2.464" -> 2464, "2,5" -> 2.5)
+_THOUSANDS = r"[.,](?=\d{3}(?:[.,]|$))"
+
+
+def _to_float(digits: pd.Series, thousands_pattern: str) -> pd.Series:
+    normalized = digits.str.replace(thousands_pattern, "", regex=True).str.replace(",", ".", regex=False)
+    return pd.to_numeric(normalized, errors="coerce")
+
+
+def _parse_uniques(uniques: pd.Series, thousands_pattern: str, plain_decimal: bool):
+    """
+    Farklı hücre değerlerini (factorize çıktısı) float'a çevirir. İkinci değer,
+    hangi değerlerin düz sayı olarak doğrudan çevrildiğini gösterir.
+    """
+    # Düz sayılar ("34.5") doğrudan çevrilir; düzenli ifade yalnızca kalan metinlere
+    # uygulanır. Sayımlarda "2.464" binlik ayraçlı olabileceğinden bu kısayol kullanılmaz.
+    if plain_decimal:
+        number = pd.to_numeric(uniques, errors="coerce").astype(float)
+    else:
+        number = pd.Series(float("nan"), index=uniques.index)
+    pending = number.isna()
+    if pending.any():
+        text = uniques[pending].astype(str).str.replace(_NOISE, "", regex=True)
+        parts = text.str.extract(_NUMBER)
+        parsed = _to_float(parts["low"], thousands_pattern)
+        is_range = parts["high"].notna()
+        if is_range.any():
+            parsed.loc[is_range] = (parsed[is_range] + _to_float(parts["high"][is_range], thousands_pattern)) / 2
+        negative = parts["sign"].isin(["-", "−"])
+        if negative.any():
+            parsed.loc[negative] = -parsed[negative]
+        number.loc[pending] = parsed.to_numpy(dtype=float)
+    return number.to_numpy(dtype=float), ~pending.to_numpy()
+
+
+def _parse(values: pd.Series, thousands_pattern: str, plain_decimal: bool) -> pd.Series:
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.copy()
+
+    # Anket hücreleri çok tekrar eder; her farklı değer bir kez çözülür
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques, dtype=object)
+    number, plain = _parse_uniques(uniques, thousands_pattern, plain_decimal)
+    if plain.all() and (codes >= 0).all():
+        # Tamamı düz sayıysa to_numeric gibi davranılır (tam sayılar int kalır)
+        return pd.Series(pd.to_numeric(uniques).to_numpy()[codes], index=values.index)
+    # factorize eksik değerlere -1 verir; sondaki NaN bu hücrelere düşer
+    return pd.Series(np.append(number, np.nan)[codes], index=values.index)
+
+
+def parse_percent(values: pd.Series) -> pd.Series:
+    """
+    Oran/yüzde hücrelerini sayıya çevirir. Türkçe ondalık virgül ve nokta
+    kabul edilir; %, ± ekleri, dipnotlar ve aralıklar (ortası alınır) işlenir,
+    tire ve boş yer tutucular NaN olur.
+    """
+    return _parse(values, _GROUPING_BEFORE_LAST, plain_decimal=True)
+
+
+def parse_count(values: pd.Series) -> pd.Series:
+    """Örneklem/katılımcı sayılarını float'a çevirir (nokta veya virgül binlik ayraç olabilir)"""
+    return _parse(values, _THOUSANDS, plain_decimal=False)
+
+
+def parse_percent_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tablodaki tüm hücrelere parse_percent uygular. Sütunlar tek bir dizide
+    birlikte çözülür; küçük tablolarda sütun başına ek yük oluşmaz.
+    """
+    codes, uniques = pd.factorize(df.to_numpy(dtype=object).ravel(order="F"))
+    number, plain = _parse_uniques(pd.Series(uniques, dtype=object), _GROUPING_BEFORE_LAST, plain_decimal=True)
+    cells = np.append(number, np.nan)[codes].reshape(df.shape, order="F")
+    plain_columns = np.append(plain, True)[codes].reshape(df.shape, order="F").all(axis=0)
+
+    result = pd.DataFrame(cells, index=df.index, columns=df.columns)
+    for position in np.flatnonzero(plain_columns):
+        # Düz sayı sütunları to_numeric ile aynı türü alır (tam sayılar int kalır)
+        result.isetitem(position, pd.to_numeric(df.iloc[:, position]))
+    return result
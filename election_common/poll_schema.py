@@ -0,0 +1,203 @@
+"""
+Başlık Tabanlı Anket Şeması Eşleştirme
+Tüm seçim dönemlerinin betikleri için
+
+Kazınan anket tablolarındaki sütunlar konumlarına göre değil başlıklarına
+göre tanınır. Düzleştirilmiş çok seviyeli başlıklardaki pandas dolguları
+atılır ("CHP Unnamed: 3_level_1" -> "CHP", "Tarih Tarih" -> "Tarih"), kalan
+ad Türkçe kurallarla katlanıp eşadlarla karşılaştırılır ("İYİP", "IYI" -> "İYİ").
+Birleştirilmiş alt tablolardan gelen aynı partiye ait sütunlar tek sütunda
+toplanır. Birimler tek geçişte, vektörel olarak belirlenir ve tablo türlü
+kanonik şemayla döner (paylar yüzde cinsinden float, Örneklem tam sayı):
+
+    - 0-1000 dışındaki pay hücreleri (tekrarlanan "2023" başlık satırları gibi) atılır
+    - Satır: parti payları toplamı 150'yi aşan satırlar binde birimindedir ("446" -> 44.6)
+    - Hücre: binde satırında ondalıklı yazılmış hücreler zaten yüzdedir ("35.3"),
+      başında sıfır olan hücreler her satırda bindedir ("04" -> 0.4)
+    - Sütun: Örneklem binlik ayraçlı veya bin cinsindendir ("1.830", 1.83 -> 1830)
+    - Anket şirketi yerine seçim adı taşıyan sonuç satırları ("Yerel seçimler",
+      "Yenilenen seçim") anket değildir ve atılır; Örneklem'leri oy sayısıdır
+    - Hiç parti payı olmayan satırlar atılır
+
+    schema = PollSchema({"AKP": ["AKP", "AK Parti"], "CHP": ["CHP"]})
+    canonical, unmatched = schema.canonical_frame(raw_df)
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from election_common.numeric import parse_count, parse_percent_frame
+from election_common.provinces import fold_text
+
+# Kanonik meta sütunlar ve başlık eşadları (başlık eşadla başlamalıdır)
+META_ALIASES = {
+    'İl': ['Bölüm', 'İl'],
+    'Kaynak_URL': ['KaynakURL', 'Kaynak URL'],
+    'Tarih': ['Tarih'],
+    'Anket_Şirketi': ['Anket şirketi', 'Anket firması', 'Anketör'],
+    'Örneklem': ['Örneklem'],
+}
+TEXT_COLUMNS = ('İl', 'Kaynak_URL', 'Tarih', 'Anket_Şirketi')
+
+# Parti dışı pay sütunları
+OTHER_SHARE_ALIASES = {
+    'Diğerleri': ['Diğerleri', 'Diğer'],
+    'Kararsız': ['Kararsız'],
+    'Fark': ['Fark'],
+}
+
+# Değer aralığı: yüzde veya binde; dışındaki hücreler pay sayılmaz
+SHARE_RANGE = (0, 1000)
+# Bir satırdaki parti payları toplamı bunu aşarsa satır binde birimindedir
+PER_MILLE_ROW_TOTAL = 150
+# Binde tablolarında 1'in altındaki paylar başında sıfırla yazılır ("04" = %0.4)
+_LEADING_ZERO = r"^\s*0\d"
+# Bundan küçük veya kesirli örneklemler bin cinsindendir (pandas "2.010"u 2.01 okur)
+SAMPLE_THOUSANDS_BELOW = 100
+
+# Anket tablolarına eklenen geçmiş seçim sonucu satırlarının "Anket şirketi" önekleri
+# (katlanmış); Örneklem sütunlarında oy sayısı taşırlar ("3.263.648")
+RESULT_ROW_PREFIXES = ('yerel secim', 'genel secim', 'yenilenen secim', 'secim sonuc')
+
+# pandas'ın çok seviyeli başlık dolguları: "Unnamed: 3_level_1", "Unnamed: 10_level_0"
+_PADDING = re.compile(r"Unnamed:\s*\d+_level_\d+")
+
+
+def header_key(column) -> str:
+    """Düzleştirilmiş başlıktan anlamlı ad ("Anket şirketi Anket şirketi" -> "Anket şirketi")"""
+    words = _PADDING.sub(" ", str(column)).split()
+    half = len(words) // 2
+    if words and len(words) % 2 == 0 and words[:half] == words[half:]:
+        words = words[:half]
+    return " ".join(words)
+
+
+def normalize_sample(values: pd.Series) -> pd.Series:
+    """
+    Örneklem sütununu tam sayıya çevirir. Metinlerde nokta/virgül binlik
+    ayraçtır ("3.016" -> 3016); sayısal okunmuş kesirli veya 100'ün altındaki
+    değerler bin cinsindendir (2.755 -> 2755, 25.0 -> 25000).
+    """
+    sample = parse_count(values).astype(float)
+    thousands = (sample < SAMPLE_THOUSANDS_BELOW) | (sample % 1 != 0)
+    sample = sample.mask(thousands, sample * 1000)
+    return sample.round().astype('Int64')
+
+
+def election_result_rows(pollsters: pd.Series) -> pd.Series:
+    """Anket şirketi yerine seçim adı taşıyan (sonuç) satırların maskesi"""
+    folded = pollsters.astype('string').fillna('').map(fold_text)
+    return folded.str.startswith(RESULT_ROW_PREFIXES).astype(bool)
+
+
+def shares_to_percent(raw: pd.DataFrame, parties: Iterable[str]) -> pd.DataFrame:
+    """
+    Pay hücrelerini yüzdeye çevirir. Birim satır bazında parti toplamından
+    belirlenir ve satırdaki tüm pay sütunlarına uygulanır; binde satırlarındaki
+    ondalıklı hücreler olduğu gibi kalır, başında sıfırlı hücreler her zaman bindedir.
+    """
+    values = parse_percent_frame(raw).astype(float)
+    low, high = SHARE_RANGE
+    values = values.where((values >= low) & (values <= high))
+
+    text = pd.Series(raw.to_numpy(dtype=object).ravel(order="F"), dtype="string")
+    leading_zero = text.str.match(_LEADING_ZERO).fillna(False).to_numpy(dtype=bool)
+    leading_zero = leading_zero.reshape(raw.shape, order="F")
+
+    parties = [name for name in parties if name in values.columns]
+    per_mille = (values[parties].sum(axis=1) > PER_MILLE_ROW_TOTAL).to_numpy()
+    whole = (values % 1 == 0).to_numpy()
+    return values.mask((per_mille[:, None] & whole) | leading_zero, values / 10)
+
+
+class PollSchema:
+    """
+    Anket tablolarını kanonik şemaya çeviren eşleştirici: meta sütunlar
+    (metin), Örneklem (sayı), parti payları ve Diğerleri/Kararsız/Fark (float).
+    """
+
+    def __init__(self, party_aliases: Dict[str, Iterable[str]],
+                 meta_aliases: Optional[Dict[str, Iterable[str]]] = None,
+                 share_aliases: Optional[Dict[str, Iterable[str]]] = None):
+        self.parties = list(party_aliases)
+        self.meta_aliases = {name: [fold_text(alias) for alias in [name, *aliases]]
+                             for name, aliases in (meta_aliases or META_ALIASES).items()}
+        # Parti ve pay adları tam eşleşir ("DP" "DEVA" içinde aranmaz)
+        self.share_lookup = {}
+        for name, aliases in {**(share_aliases or OTHER_SHARE_ALIASES), **party_aliases}.items():
+            for alias in [name, *aliases]:
+                self.share_lookup.setdefault(fold_text(alias), name)
+        self.other_shares = [name for name in (share_aliases or OTHER_SHARE_ALIASES) if name not in self.parties]
+
+    @property
+    def columns(self) -> List[str]:
+        """Kanonik sütun sırası"""
+        return [*self.meta_aliases, *self.parties, *self.other_shares]
+
+    @property
+    def dtypes(self) -> Dict[str, str]:
+        """Kanonik sütun türleri (metin, tam sayı örneklem, yüzde cinsinden float paylar)"""
+        return {name: 'string' if name in TEXT_COLUMNS else 'Int64' if name == 'Örneklem' else 'float64'
+                for name in self.columns}
+
+    def column_role(self, column) -> Optional[str]:
+        """Başlığın kanonik sütun adı (tanınmazsa None)"""
+        key = fold_text(header_key(column))
+        if not key:
+            return None
+        if key in self.share_lookup:
+            return self.share_lookup[key]
+        for name, aliases in self.meta_aliases.items():
+            if any(key.startswith(alias) for alias in aliases):
+                return name
+        return None
+
+    def map_columns(self, columns: Iterable) -> Tuple[Dict[str, List[int]], List[str]]:
+        """Kanonik ad -> kaynak sütun konumları ve tanınmayan başlık adları"""
+        mapping, unmatched = {}, []
+        for position, column in enumerate(columns):
+            role = self.column_role(column)
+            if role is None:
+                if header_key(column):
+                    unmatched.append(header_key(column))
+            else:
+                mapping.setdefault(role, []).append(position)
+        return mapping, unmatched
+
+    def canonical_frame(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
+        """
+        Tabloyu kanonik şemaya çevirir. Yalnızca bulunan sütunlar kanonik
+        sırayla döner; ikinci değer tanınmayan başlıklardır. Seçim sonucu
+        satırları anket olmadığından atılır.
+        """
+        mapping, unmatched = self.map_columns(df.columns)
+        out = pd.DataFrame(index=df.index)
+
+        # Alt tablolardan gelen aynı adlı sütunlar satır bazında ilk dolu değerle birleşir
+        for name in self.columns:
+            if name in mapping:
+                first, *rest = mapping[name]
+                column = df.iloc[:, first]
+                for position in rest:
+                    column = column.where(column.notna(), df.iloc[:, position])
+                out[name] = column
+
+        for name in TEXT_COLUMNS:
+            if name in out.columns:
+                out[name] = out[name].astype('string').str.strip()
+        if 'Anket_Şirketi' in out.columns:
+            out = out[~election_result_rows(out['Anket_Şirketi'])]
+        if 'Örneklem' in out.columns:
+            out['Örneklem'] = normalize_sample(out['Örneklem'])
+
+        parties = [name for name in self.parties if name in out.columns]
+        shares = parties + [name for name in self.other_shares if name in out.columns]
+        if shares:
+            out[shares] = shares_to_percent(out[shares], parties)
+
+        out = out[out[parties].notna().any(axis=1)] if parties else out.iloc[0:0]
+        # Hiç değeri olmayan pay sütunları (boş alt tablolardan) şemaya yazılmaz
+        empty = [name for name in shares if out[name].isna().all()]
+        return out.drop(columns=empty), unmatched
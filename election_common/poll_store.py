@@ -0,0 +1,384 @@
+"""
+Artımlı Anket Deposu
+Tüm seçim dönemlerinin betikleri için
+
+Kanonik şemaya çevrilmiş anketler SQLite veritabanında kararlı bir kimlikle
+tutulur: il, anket şirketi, saha tarihleri ve örneklem. Bir kimliğin ilk
+anketinin anahtarı kimlik özetidir; aynı kimliği paylaşan sonraki anketler
+(aynı şirketin aynı günlerde yaptığı ilçe anketleri) sıra ekiyle (-2, -3, ...)
+anahtarlanır. Anahtar bir kez verilince değişmez: yeni satırlar önce aynı
+kimlikli kayıtlı anketlerle içerikçe birebir, kalanlar en az hücresi farklı
+olanla eşlenir (güncelleme); yalnızca eşi kalmayan satırlar yeni anahtar alır.
+Böylece kardeş anket eklenmesi veya satır sırasının değişmesi diğer anketlerin
+anahtarını değiştirmez.
+
+Her anketin içerik özeti saklanır; yalnızca yeni veya değişen anketler yazılır.
+Her kaynağın hangi anketleri içerdiği tutulur: yeniden alınan bir kaynaktan
+düşen ve başka hiçbir kaynakta geçmeyen anketler silinmiş işaretlenir. Her
+alım için ekleme/güncelleme/silme kaydı tutulur. Ham kaynak dosyaların özeti de
+saklandığından değişmeyen dosyalar hiç okunmaz; alım süresi değişiklik
+miktarıyla orantılıdır.
+
+    depo = PollStore("data/processed_data/anket_deposu.sqlite", schema.columns, schema.dtypes)
+    run_id = depo.begin_run()
+    depo.remove_missing_sources(paths)          # ham klasörden silinen kaynaklar
+    if depo.source_changed(path):
+        depo.upsert(frame, province="Adana", source=str(path))
+        depo.mark_source(path, province="Adana", summary={...})
+    depo.finish_run()
+    depo.changes(since_run=run_id)   # tüketiciler için değişiklik kaydı
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+# Anket kimliği: il, anket şirketi, saha tarihleri, örneklem
+IDENTITY_COLUMNS = ('İl', 'Anket_Şirketi', 'Tarih', 'Örneklem')
+
+# Şema değişirse eski depo silinip yeniden kurulur (sonraki alım tüm kaynakları yeniden okur)
+STORE_VERSION = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingest_runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    inserted INTEGER DEFAULT 0,
+    updated INTEGER DEFAULT 0,
+    deleted INTEGER DEFAULT 0,
+    unchanged INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS polls (
+    poll_key TEXT PRIMARY KEY,
+    identity TEXT NOT NULL,
+    province TEXT NOT NULL,
+    pollster TEXT,
+    fieldwork TEXT,
+    sample REAL,
+    content_hash TEXT NOT NULL,
+    record TEXT NOT NULL,
+    source TEXT,
+    first_run INTEGER NOT NULL,
+    last_run INTEGER NOT NULL,
+    removed_run INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_polls_province ON polls (province);
+CREATE INDEX IF NOT EXISTS idx_polls_identity ON polls (identity);
+CREATE TABLE IF NOT EXISTS source_polls (
+    source TEXT NOT NULL,
+    poll_key TEXT NOT NULL,
+    PRIMARY KEY (source, poll_key)
+);
+CREATE INDEX IF NOT EXISTS idx_source_polls_key ON source_polls (poll_key);
+CREATE TABLE IF NOT EXISTS changes (
+    run_id INTEGER NOT NULL REFERENCES ingest_runs (run_id),
+    poll_key TEXT NOT NULL,
+    province TEXT NOT NULL,
+    change TEXT NOT NULL,
+    old_hash TEXT,
+    new_hash TEXT,
+    PRIMARY KEY (run_id, poll_key)
+);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    province TEXT,
+    summary TEXT,
+    run_id INTEGER
+);
+"""
+TABLES = ('ingest_runs', 'polls', 'source_polls', 'changes', 'sources')
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _sha1(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _clean_value(value):
+    """JSON kaydı için hücre değeri (NaN -> None, numpy sayıları -> Python)"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _cell_difference(left: Dict, right: Dict) -> int:
+    """İki kaydın farklı hücre sayısı"""
+    return sum(left.get(key) != right.get(key) for key in set(left) | set(right))
+
+
+class PollStore:
+    """Anket kimliği ve içerik özetiyle artımlı güncellenen SQLite deposu"""
+
+    def __init__(self, db_path, columns: Iterable[str], dtypes: Optional[Dict[str, str]] = None):
+        self.db_path = str(db_path)
+        self.columns = list(columns)  # Kayıtların ve dışa aktarımın sütun sırası
+        self.dtypes = dtypes or {}  # Dışa aktarımda sütun türleri (ör. PollSchema.dtypes)
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path)
+        if self._conn.execute('PRAGMA user_version').fetchone()[0] != STORE_VERSION:
+            for table in TABLES:
+                self._conn.execute(f'DROP TABLE IF EXISTS {table}')
+            self._conn.execute(f'PRAGMA user_version = {STORE_VERSION}')
+        self._conn.executescript(SCHEMA)
+        self.run_id = None
+        self._reset_run_state()
+
+    def _reset_run_state(self):
+        self._unchanged = 0
+        # Alımda yazılan anahtarlar: aynı anket birden fazla kaynakta geçse de bir kez yazılır
+        self._written = set()
+        # Bir kaynaktan düşen anahtarlar; alım sonunda hiçbir kaynakta kalmayanlar silinir
+        self._dropped = set()
+
+    def close(self):
+        self._conn.close()
+
+    # Kaynak dosyalar
+
+    def source_changed(self, path) -> bool:
+        """Kaynak dosya son alımdan beri değişti mi (hiç alınmadıysa True)"""
+        row = self._conn.execute('SELECT sha256 FROM sources WHERE path = ?', (str(path),)).fetchone()
+        return row is None or row[0] != file_sha256(path)
+
+    def mark_source(self, path, province: str, summary: Dict):
+        """Kaynak dosyanın özetini ve il özetini (anket/sütun sayısı vb.) kaydeder"""
+        self._conn.execute(
+            'INSERT OR REPLACE INTO sources (path, sha256, province, summary, run_id) VALUES (?, ?, ?, ?, ?)',
+            (str(path), file_sha256(path), province, json.dumps(summary, ensure_ascii=False), self.run_id)
+        )
+
+    def source_summary(self, path) -> Optional[Dict]:
+        """Değişmeyen kaynak için son alımdaki il özeti"""
+        row = self._conn.execute('SELECT summary FROM sources WHERE path = ?', (str(path),)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def remove_missing_sources(self, paths: Iterable) -> Dict[str, Optional[Dict]]:
+        """
+        Verilen yollar dışında kalan (ham klasörden silinmiş) kaynakları bırakır;
+        yalnızca onlarda geçen anketler alım sonunda silinir. Kaynak -> son il özeti döner.
+        """
+        present = {str(path) for path in paths}
+        missing = {path: json.loads(summary) if summary else None
+                   for path, summary in self._conn.execute('SELECT path, summary FROM sources').fetchall()
+                   if path not in present}
+        for path in missing:
+            self._replace_membership(path, set())
+            self._conn.execute('DELETE FROM sources WHERE path = ?', (path,))
+        return missing
+
+    def _replace_membership(self, source: str, keys: set):
+        previous = {row[0] for row in self._conn.execute(
+            'SELECT poll_key FROM source_polls WHERE source = ?', (source,)).fetchall()}
+        self._dropped |= previous - keys
+        self._conn.execute('DELETE FROM source_polls WHERE source = ?', (source,))
+        self._conn.executemany('INSERT INTO source_polls (source, poll_key) VALUES (?, ?)',
+                               [(source, key) for key in keys])
+
+    # Alım
+
+    def begin_run(self) -> int:
+        cursor = self._conn.execute('INSERT INTO ingest_runs (started_at) VALUES (?)',
+                                    (datetime.now().isoformat(timespec='seconds'),))
+        self.run_id = cursor.lastrowid
+        self._reset_run_state()
+        return self.run_id
+
+    def _remove_orphans(self):
+        """Kaynaklardan düşen ve artık hiçbir kaynakta geçmeyen anketleri silinmiş işaretler"""
+        for key in sorted(self._dropped):
+            if self._conn.execute('SELECT 1 FROM source_polls WHERE poll_key = ?', (key,)).fetchone():
+                continue
+            row = self._conn.execute('SELECT province, content_hash FROM polls WHERE poll_key = ? '
+                                     'AND removed_run IS NULL', (key,)).fetchone()
+            if row is None:
+                continue
+            self._conn.execute('UPDATE polls SET removed_run = ? WHERE poll_key = ?', (self.run_id, key))
+            self._conn.execute(
+                'INSERT OR REPLACE INTO changes (run_id, poll_key, province, change, old_hash, new_hash) '
+                'VALUES (?, ?, ?, ?, ?, NULL)', (self.run_id, key, row[0], 'delete', row[1])
+            )
+
+    def finish_run(self) -> Dict[str, int]:
+        """Kaynaklarda kalmayan anketleri siler, alımı kapatır ve sayıları döndürür"""
+        self._remove_orphans()
+        counts = dict(self._conn.execute(
+            'SELECT change, COUNT(*) FROM changes WHERE run_id = ? GROUP BY change', (self.run_id,)
+        ).fetchall())
+        result = {'inserted': counts.get('insert', 0), 'updated': counts.get('update', 0),
+                  'deleted': counts.get('delete', 0), 'unchanged': self._unchanged}
+        self._conn.execute(
+            'UPDATE ingest_runs SET finished_at = ?, inserted = ?, updated = ?, deleted = ?, unchanged = ? '
+            'WHERE run_id = ?',
+            (datetime.now().isoformat(timespec='seconds'), result['inserted'], result['updated'],
+             result['deleted'], result['unchanged'], self.run_id)
+        )
+        self._conn.commit()
+        return result
+
+    def _records(self, df: pd.DataFrame, province: str) -> List[Dict]:
+        """Kimlik özeti, içerik özeti ve JSON kaydı; tablo içindeki birebir tekrarlar bir kez döner"""
+        frame = df.reindex(columns=self.columns)
+        if 'İl' in frame.columns:
+            frame['İl'] = frame['İl'].fillna(province)
+        records = [{k: _clean_value(v) for k, v in row.items()}
+                   for row in frame.astype(object).to_dict('records')]
+
+        items, seen = [], set()
+        for record in records:
+            identity = [record.get(column) for column in IDENTITY_COLUMNS]
+            identity = [str(value).strip() if value is not None else '' for value in identity]
+            content = json.dumps(record, ensure_ascii=False, sort_keys=True)
+            identity_hash, content_hash = _sha1('\x1f'.join(identity))[:20], _sha1(content)
+            if (identity_hash, content_hash) in seen:
+                continue
+            seen.add((identity_hash, content_hash))
+            items.append({
+                'identity': identity_hash,
+                'province': identity[0] or province,
+                'pollster': identity[1] or None,
+                'fieldwork': identity[2] or None,
+                'sample': record.get('Örneklem'),
+                'content_hash': content_hash,
+                'record': content,
+            })
+        return items
+
+    def _stored_by_identity(self, identities: List[str]) -> Dict[str, List[Dict]]:
+        stored = {}
+        for start in range(0, len(identities), 500):
+            batch = identities[start:start + 500]
+            for key, identity, content_hash, record, removed_run in self._conn.execute(
+                    'SELECT poll_key, identity, content_hash, record, removed_run FROM polls '
+                    f"WHERE identity IN ({','.join('?' * len(batch))}) ORDER BY rowid", batch).fetchall():
+                stored.setdefault(identity, []).append({
+                    'poll_key': key, 'content_hash': content_hash, 'record': record, 'live': removed_run is None})
+        return stored
+
+    def _assign_keys(self, items: List[Dict]):
+        """
+        Satırları aynı kimlikli kayıtlı anketlerle eşleyip anahtar verir (item['stored']:
+        eşlenen kayıt veya None). Önce içeriği birebir aynı olanlar, sonra en az hücresi
+        farklı olanlar (canlı kayıtlar önce) eşlenir; eşi kalmayan satır yeni sıra eki alır.
+        """
+        groups = {}
+        for item in items:
+            groups.setdefault(item['identity'], []).append(item)
+        stored = self._stored_by_identity(list(groups))
+
+        for identity, group in groups.items():
+            candidates = stored.get(identity, [])
+            free = list(candidates)
+            pending = []
+            for item in group:
+                match = next((entry for entry in free if entry['content_hash'] == item['content_hash']), None)
+                if match is None:
+                    pending.append(item)
+                    continue
+                free.remove(match)
+                item['poll_key'], item['stored'] = match['poll_key'], match
+
+            taken = {entry['poll_key'] for entry in candidates}
+            for item in pending:
+                if free:
+                    record = json.loads(item['record'])
+                    match = min(free, key=lambda entry: (not entry['live'],
+                                                         _cell_difference(record, json.loads(entry['record']))))
+                    free.remove(match)
+                    item['poll_key'], item['stored'] = match['poll_key'], match
+                    continue
+                ordinal = 1
+                while (identity if ordinal == 1 else f"{identity}-{ordinal}") in taken:
+                    ordinal += 1
+                item['poll_key'] = identity if ordinal == 1 else f"{identity}-{ordinal}"
+                item['stored'] = None
+                taken.add(item['poll_key'])
+
+    def upsert(self, df: pd.DataFrame, province: str, source: str) -> Dict[str, int]:
+        """
+        Kaynağın güncel tablosunu depoya yazar: yeni anketler eklenir, içeriği
+        değişenler güncellenir, aynı kalanlara dokunulmaz. Kaynağın önceki
+        alımda içerip artık içermediği anketler alım sonunda silinebilir.
+        """
+        if self.run_id is None:
+            self.begin_run()
+        items = self._records(df, province)
+        self._assign_keys(items)
+        self._replace_membership(source, {item['poll_key'] for item in items})
+
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        for item in items:
+            # Aynı alımda başka bir kaynaktan yazılmış anket yeniden yazılmaz (ilk kaynak geçerlidir)
+            if item['poll_key'] in self._written:
+                continue
+            self._written.add(item['poll_key'])
+            stored = item['stored']
+            live = stored is not None and stored['live']
+            if live and stored['content_hash'] == item['content_hash']:
+                counts['unchanged'] += 1
+                continue
+            change = 'update' if live else 'insert'
+            counts['updated' if live else 'inserted'] += 1
+            self._conn.execute(
+                'INSERT INTO polls (poll_key, identity, province, pollster, fieldwork, sample, content_hash, record, '
+                'source, first_run, last_run) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (poll_key) DO UPDATE SET content_hash = excluded.content_hash, '
+                'record = excluded.record, source = excluded.source, last_run = excluded.last_run, '
+                'removed_run = NULL',
+                (item['poll_key'], item['identity'], item['province'], item['pollster'], item['fieldwork'],
+                 item['sample'], item['content_hash'], item['record'], source, self.run_id, self.run_id)
+            )
+            self._conn.execute(
+                'INSERT OR REPLACE INTO changes (run_id, poll_key, province, change, old_hash, new_hash) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (self.run_id, item['poll_key'], item['province'], change,
+                 stored['content_hash'] if live else None, item['content_hash'])
+            )
+        self._unchanged += counts['unchanged']
+        return counts
+
+    # Okuma
+
+    def changes(self, since_run: int = None) -> pd.DataFrame:
+        """Değişiklik kaydı (since_run verilirse o alımdan sonrakiler dahil)"""
+        query = 'SELECT run_id, poll_key, province, change, old_hash, new_hash FROM changes'
+        params = ()
+        if since_run is not None:
+            query += ' WHERE run_id >= ?'
+            params = (since_run,)
+        return pd.read_sql_query(query + ' ORDER BY run_id, rowid', self._conn, params=params)
+
+    def changed_provinces(self, since_run: int) -> List[str]:
+        """Verilen alımdan bu yana anketi değişen iller"""
+        rows = self._conn.execute('SELECT DISTINCT province FROM changes WHERE run_id >= ? ORDER BY province',
+                                  (since_run,)).fetchall()
+        return [row[0] for row in rows]
+
+    def polls_frame(self, province: str = None) -> pd.DataFrame:
+        """
+        Depodaki güncel (silinmemiş) tekil anketler kanonik sütun ve türlerle;
+        farklı anahtarlarla gelmiş birebir aynı kayıtlar bir kez yer alır.
+        """
+        query = ('SELECT record FROM polls WHERE rowid IN (SELECT MIN(rowid) FROM polls '
+                 'WHERE removed_run IS NULL GROUP BY content_hash)')
+        params = ()
+        if province is not None:
+            query += ' AND province = ?'
+            params = (province,)
+        rows = self._conn.execute(query + ' ORDER BY rowid', params).fetchall()
+        frame = pd.DataFrame([json.loads(row[0]) for row in rows], columns=self.columns)
+        frame = frame.dropna(axis=1, how='all')
+        return frame.astype({name: dtype for name, dtype in self.dtypes.items() if name in frame.columns})
@@ -0,0 +1,124 @@
+"""
+Önceden Derlenmiş İl Adı Eşleştirici
+Tüm seçim dönemlerinin betikleri için
+
+81 il adı (ve birkaç yaygın eski/kısa ad) tek bir düzenli ifadede toplanır.
+İfade, harf öneki ağacından (trie) üretildiği için her konumda yalnızca
+olası devam harfleri denenir. Metin ve adlar Türkçe kurallarla küçük harfe
+çevrilip ASCII'ye indirgenir ("İSTANBUL", "Istanbul", "istanbul" aynı
+anahtarı verir); eşleşmeler kelime sınırına bağlıdır ("Kars" "Karşıyaka"
+içinde bulunmaz).
+
+    find_province("İzmir Büyükşehir anketleri")   # -> "İzmir"
+    classify_provinces(df["Bölge"])                # -> satır başına il adı veya NaN
+"""
+
+import re
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+PROVINCES = (
+    "Adana", "Adıyaman", "Afyonkarahisar", "Ağrı", "Aksaray", "Amasya", "Ankara", "Antalya", "Ardahan", "Artvin",
+    "Aydın", "Balıkesir", "Bartın", "Batman", "Bayburt", "Bilecik", "Bingöl", "Bitlis", "Bolu", "Burdur", "Bursa",
+    "Çanakkale", "Çankırı", "Çorum", "Denizli", "Diyarbakır", "Düzce", "Edirne", "Elazığ", "Erzincan", "Erzurum",
+    "Eskişehir", "Gaziantep", "Giresun", "Gümüşhane", "Hakkâri", "Hatay", "Iğdır", "Isparta", "İstanbul", "İzmir",
+    "Kahramanmaraş", "Karabük", "Karaman", "Kars", "Kastamonu", "Kayseri", "Kırıkkale", "Kırklareli", "Kırşehir",
+    "Kilis", "Kocaeli", "Konya", "Kütahya", "Malatya", "Manisa", "Mardin", "Mersin", "Muğla", "Muş", "Nevşehir",
+    "Niğde", "Ordu", "Osmaniye", "Rize", "Sakarya", "Samsun", "Siirt", "Sinop", "Sivas", "Şanlıurfa", "Şırnak",
+    "Tekirdağ", "Tokat", "Trabzon", "Tunceli", "Uşak", "Van", "Yalova", "Yozgat", "Zonguldak",
+)
+
+# Başlıklarda geçebilen kısa/eski adlar -> resmi il adı
+PROVINCE_ALIASES = {
+    "Afyon": "Afyonkarahisar",
+    "İçel": "Mersin",
+}
+
+_TURKISH_UPPER = str.maketrans({'İ': 'i', 'I': 'ı', '\u0307': None})
+_ASCII_FOLD = str.maketrans('çğıöşüâîû', 'cgiosuaiu')
+_CIRCUMFLEX_FOLD = str.maketrans('âîûÂÎÛ', 'aiuAIU')
+
+
+def turkish_lower(text: str) -> str:
+    """Türkçe küçük harf ("İ" -> "i", "I" -> "ı"); str.lower()'ın bıraktığı birleşik nokta oluşmaz"""
+    return text.translate(_TURKISH_UPPER).lower()
+
+
+def fold_text(text: str) -> str:
+    """Eşleştirme anahtarı: Türkçe küçük harf + ASCII ("Şanlıurfa" -> "sanliurfa")"""
+    return turkish_lower(text).translate(_ASCII_FOLD)
+
+
+def province_file_key(name: str) -> str:
+    """
+    Çıktı dosya adlarındaki küçük harfli il adı; depodaki veri dosyalarıyla
+    uyumludur ("İstanbul" -> "istanbul", "Iğdır" -> "iğdır", "Hakkâri" -> "hakkari")
+    """
+    return name.translate(_CIRCUMFLEX_FOLD).replace('İ', 'i').lower()
+
+
+def _fold_series(values: pd.Series) -> pd.Series:
+    return values.str.translate(_TURKISH_UPPER).str.lower().str.translate(_ASCII_FOLD)
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Kelimelerden harf öneki ağacı biçiminde düzenli ifade (uzun eşleşme önce denenir)"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if '' in node else body
+
+    return build(trie)
+
+
+class ProvinceMatcher:
+    """İl adlarını tek bir derlenmiş ifadeyle bulan eşleştirici"""
+
+    def __init__(self, names: Iterable[str] = PROVINCES, aliases: Optional[Dict[str, str]] = None):
+        aliases = PROVINCE_ALIASES if aliases is None else aliases
+        self.canonical = {fold_text(name): name for name in names}
+        self.canonical.update({fold_text(alias): name for alias, name in aliases.items()})
+        self.regex = re.compile(rf"(?<!\w)({_trie_pattern(self.canonical)})(?!\w)")
+
+    def find(self, text: Optional[str]) -> Optional[str]:
+        """Metinde ilk geçen ilin resmi adı (yoksa None)"""
+        if not text:
+            return None
+        found = self.regex.search(fold_text(str(text)))
+        return self.canonical[found.group(1)] if found else None
+
+    def classify(self, values: pd.Series) -> pd.Series:
+        """
+        Sütundaki her hücre için ilk geçen ilin resmi adı (yoksa NaN). Her farklı
+        değer bir kez işlenir; tüm sütun tek bir vektörel str.extract çağrısıdır.
+        """
+        codes, uniques = pd.factorize(values)
+        folded = _fold_series(pd.Series(uniques, dtype=object).astype(str))
+        found = folded.str.extract(self.regex, expand=False).map(self.canonical)
+        # factorize eksik değerlere -1 verir; sondaki NaN bu satırlara düşer
+        lookup = np.append(found.to_numpy(dtype=object), np.nan)
+        return pd.Series(lookup[codes], index=values.index, dtype=object)
+
+
+_DEFAULT_MATCHER = ProvinceMatcher()
+
+
+def find_province(text: Optional[str]) -> Optional[str]:
+    """Metinde ilk geçen il (varsayılan eşleştirici)"""
+    return _DEFAULT_MATCHER.find(text)
+
+
+def classify_provinces(values: pd.Series) -> pd.Series:
+    """Sütun hücrelerini illere ayırır (varsayılan eşleştirici)"""
+    return _DEFAULT_MATCHER.classify(values)
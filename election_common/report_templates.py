@@ -0,0 +1,284 @@
+"""
+Şablon Tabanlı Rapor Katmanı
+Tüm seçim dönemlerinin betikleri için
+
+Raporlar önce bir veri modeline (başlık, bölümler, il kayıtları) çevrilir,
+sonra biçim şablonlarıyla metin, Markdown veya HTML olarak yazılır.
+Bölümler (ör. il bölümleri) kayıtlarının özetine göre önbelleğe alınır; tek
+bir il değiştiğinde yalnızca o ilin bölümü yeniden oluşturulur.
+
+Blok türleri:
+    title(satırlar)              rapor başlığı
+    heading(metin, düzey)        1: ana bölüm, 2: alt bölüm, 3: il başlığı
+    line(metin)                  tek satır
+    items(liste, işaret)         madde listesi (metinde işaretle girintili)
+    table(başlıklar, genişlikler, satırlar)
+    blank()                      metinde boş satır
+
+    outputs/cache/reports/<rapor>.<biçim>.json   # bölüm özeti -> oluşturulmuş metin
+"""
+
+import hashlib
+import html
+import json
+import os
+from pathlib import Path
+from string import Template
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Şablonlar veya bölüm oluşturucular değiştiğinde artırılır; önbellekteki bölümler geçersiz olur
+REPORT_TEMPLATE_VERSION = 1
+DEFAULT_REPORT_CACHE_DIR = "outputs/cache/reports/"
+REPORT_FORMATS = {'txt': 'txt', 'markdown': 'md', 'html': 'html'}
+
+TEMPLATES = {
+    'txt': {
+        'title': Template("$top\n$lines\n$bottom\n"),
+        'heading1': Template("$text\n" + "=" * 80 + "\n\n"),
+        'heading2': Template("$text\n" + "-" * 40 + "\n"),
+        'heading3': Template("$upper\n$underline\n"),
+        'line': Template("$text\n"),
+        'items_start': Template(""),
+        'item': Template("$marker$text\n"),
+        'items_end': Template(""),
+        'table_header': Template("$cells\n$rule\n"),
+        'table_row': Template("$cells\n"),
+        'table_end': Template(""),
+        'blank': Template("\n"),
+        'document': Template("$body"),
+    },
+    'markdown': {
+        'title': Template("# $first\n\n$rest"),
+        'heading1': Template("## $text\n\n"),
+        'heading2': Template("## $text\n\n"),
+        'heading3': Template("### $text\n\n"),
+        'line': Template("$text\n\n"),
+        'items_start': Template(""),
+        'item': Template("- $text\n"),
+        'items_end': Template("\n"),
+        'table_header': Template("| $cells |\n|$rule|\n"),
+        'table_row': Template("| $cells |\n"),
+        'table_end': Template("\n"),
+        'blank': Template(""),
+        'document': Template("$body"),
+    },
+    'html': {
+        'title': Template("<h1>$first</h1>\n$rest\n"),
+        'heading1': Template("<h2>$text</h2>\n"),
+        'heading2': Template("<h2>$text</h2>\n"),
+        'heading3': Template("<h3>$text</h3>\n"),
+        'line': Template("<p>$text</p>\n"),
+        'items_start': Template("<ul>\n"),
+        'item': Template("<li>$text</li>\n"),
+        'items_end': Template("</ul>\n"),
+        'table_header': Template("<table>\n<tr>$cells</tr>\n"),
+        'table_row': Template("<tr>$cells</tr>\n"),
+        'table_end': Template("</table>\n"),
+        'blank': Template(""),
+        'document': Template(
+            "<!DOCTYPE html>\n<html lang=\"tr\">\n<head>\n<meta charset=\"utf-8\">\n<title>$title</title>\n"
+            "<style>body{font-family:sans-serif;max-width:960px;margin:2em auto}"
+            "table{border-collapse:collapse}td,th{border:1px solid #ccc;padding:4px 8px}</style>\n"
+            "</head>\n<body>\n$body</body>\n</html>\n"
+        ),
+    },
+}
+
+
+# Blok oluşturucular
+
+def title(lines: List[str], top: str = "=" * 80, bottom: str = "=" * 80) -> tuple:
+    return ('title', list(lines), top, bottom)
+
+
+def heading(text: str, level: int = 2) -> tuple:
+    return ('heading', level, text)
+
+
+def line(text: str) -> tuple:
+    return ('line', text)
+
+
+def items(entries: Iterable[str], marker: str = "  ") -> tuple:
+    return ('items', list(entries), marker)
+
+
+def table(headers: List[str], widths: List[int], rows: List[List[str]]) -> tuple:
+    return ('table', list(headers), list(widths), [list(row) for row in rows])
+
+
+def blank() -> tuple:
+    return ('blank',)
+
+
+def _canonical_json(value) -> str:
+    """Bölüm kaydını sıralı anahtarlı JSON metnine çevirir (numpy sayıları dahil)"""
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'),
+                      default=lambda item: item.item() if hasattr(item, 'item') else str(item))
+
+
+class Section:
+    """
+    Önbelleğe alınabilen rapor bölümü.
+
+    record: bölümün tüm girdileri (JSON'a çevrilebilir); build: kaydı bloklara
+    çeviren modül düzeyinde fonksiyon. Önbellekte varsa build çağrılmaz.
+    """
+
+    def __init__(self, record: Dict, build: Callable[[Dict], List[tuple]]):
+        self.record = record
+        self.build = build
+
+    def key(self, fmt: str) -> str:
+        payload = _canonical_json({
+            'version': REPORT_TEMPLATE_VERSION,
+            'format': fmt,
+            'build': f"{self.build.__module__}.{self.build.__qualname__}",
+            'record': self.record,
+        })
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class SectionCache:
+    """Bir rapor ve biçim için bölüm özeti -> oluşturulmuş metin önbelleği (tek JSON dosyası)"""
+
+    def __init__(self, name: str, fmt: str, cache_dir: Optional[str] = DEFAULT_REPORT_CACHE_DIR):
+        self.path = Path(cache_dir) / f"{name}.{REPORT_FORMATS[fmt]}.json" if cache_dir else None
+        self._entries = {}
+        self._used = {}
+        self.stats = {'hits': 0, 'misses': 0}
+        if self.path is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+
+    def get_or_render(self, key: str, render: Callable[[], str]) -> str:
+        text = self._entries.get(key)
+        if text is None:
+            self.stats['misses'] += 1
+            text = render()
+        else:
+            self.stats['hits'] += 1
+        self._used[key] = text
+        return text
+
+    def save(self):
+        """Yalnızca bu raporda kullanılan bölümleri yazar (kaldırılan iller önbellekten düşer)"""
+        if self.path is None or (self._used == self._entries):
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._used, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+class ReportRenderer:
+    """Blokları seçilen biçimin şablonlarıyla metne çevirir"""
+
+    def __init__(self, fmt: str = 'txt'):
+        if fmt not in TEMPLATES:
+            raise ValueError(f"Bilinmeyen rapor biçimi: {fmt} (seçenekler: {', '.join(TEMPLATES)})")
+        self.fmt = fmt
+        self.templates = TEMPLATES[fmt]
+
+    def _escape(self, text) -> str:
+        text = str(text)
+        if self.fmt == 'html':
+            return html.escape(text)
+        return text
+
+    def _render_block(self, block: tuple) -> str:
+        kind, t = block[0], self.templates
+        if kind == 'title':
+            _, lines, top, bottom = block
+            if self.fmt == 'txt':
+                return t['title'].substitute(top=top, lines='\n'.join(lines), bottom=bottom)
+            rest = ''.join(t['line'].substitute(text=self._escape(text)) for text in lines[1:])
+            return t['title'].substitute(first=self._escape(lines[0]), rest=rest)
+        if kind == 'heading':
+            _, level, text = block
+            if level == 3:
+                return t['heading3'].substitute(text=self._escape(text), upper=text.upper(),
+                                                underline='-' * len(text))
+            return t[f'heading{level}'].substitute(text=self._escape(text))
+        if kind == 'line':
+            return t['line'].substitute(text=self._escape(block[1]))
+        if kind == 'items':
+            _, entries, marker = block
+            body = ''.join(t['item'].substitute(marker=marker, text=self._escape(text)) for text in entries)
+            return t['items_start'].substitute() + body + t['items_end'].substitute()
+        if kind == 'table':
+            return self._render_table(*block[1:])
+        if kind == 'blank':
+            return t['blank'].substitute()
+        raise ValueError(f"Bilinmeyen blok türü: {kind}")
+
+    def _render_table(self, headers: List[str], widths: List[int], rows: List[List[str]]) -> str:
+        t = self.templates
+        if self.fmt == 'txt':
+            def cells(values):
+                return ' '.join(f"{value:<{width}}" for value, width in zip(values, widths))
+            header = t['table_header'].substitute(cells=cells(headers), rule='-' * sum(widths))
+            body = ''.join(t['table_row'].substitute(cells=cells(row)) for row in rows)
+        elif self.fmt == 'markdown':
+            def cells(values):
+                return ' | '.join(str(value).replace('|', '\\|') for value in values)
+            header = t['table_header'].substitute(cells=cells(headers), rule='|'.join('---' for _ in headers))
+            body = ''.join(t['table_row'].substitute(cells=cells(row)) for row in rows)
+        else:
+            header = t['table_header'].substitute(
+                cells=''.join(f"<th>{self._escape(value)}</th>" for value in headers))
+            body = ''.join(t['table_row'].substitute(
+                cells=''.join(f"<td>{self._escape(value)}</td>" for value in row)) for row in rows)
+        return header + body + t['table_end'].substitute()
+
+    def render_blocks(self, blocks: Iterable[tuple]) -> str:
+        return ''.join(self._render_block(block) for block in blocks)
+
+    def render(self, parts: List, cache: Optional[SectionCache] = None) -> str:
+        """
+        parts: blok ve Section öğelerinden oluşan liste. Section'lar önbellekten
+        alınır veya oluşturulup önbelleğe eklenir.
+        """
+        chunks, doc_title = [], ''
+        for part in parts:
+            if isinstance(part, Section):
+                if cache is None:
+                    chunks.append(self.render_blocks(part.build(part.record)))
+                else:
+                    chunks.append(cache.get_or_render(
+                        part.key(self.fmt), lambda part=part: self.render_blocks(part.build(part.record))))
+            else:
+                if part[0] == 'title' and not doc_title:
+                    doc_title = part[1][0]
+                chunks.append(self._render_block(part))
+        return self.templates['document'].substitute(title=self._escape(doc_title), body=''.join(chunks))
+
+
+def write_report(parts: List, output_dir: str, filename: str, name: str,
+                 formats: Iterable[str] = ('txt',),
+                 cache_dir: Optional[str] = DEFAULT_REPORT_CACHE_DIR) -> List[str]:
+    """
+    Raporu istenen biçimlerde `<output_dir>/<filename>.<uzantı>` olarak yazar ve
+    dosya yollarını (formats sırasıyla) döndürür. name: bölüm önbelleği adı.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for fmt in formats:
+        renderer = ReportRenderer(fmt)
+        cache = SectionCache(name, fmt, cache_dir)
+        text = renderer.render(parts, cache)
+        cache.save()
+
+        path = os.path.join(output_dir, f"{filename}.{REPORT_FORMATS[fmt]}")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        paths.append(path)
+
+        if cache.stats['hits']:
+            total = cache.stats['hits'] + cache.stats['misses']
+            print(f"♻️  {cache.stats['hits']}/{total} rapor bölümü önbellekten alındı ({fmt})")
+    return paths
@@ -0,0 +1,468 @@
+"""
+Ortak Wikipedia Anket Kazıyıcı Çekirdeği
+Tüm seçim dönemlerinin betikleri için
+
+Sayfa lxml ile doğrudan ayrıştırılır; başlıklar (h2/h3/h4) ve `wikitable`
+tabloları tek bir XPath sorgusuyla belge sırasında bulunur, her tablo en
+yakın önceki başlıkla eşlenir. Tablolar aynı ağaçtan doğrudan DataFrame'e
+çevrilir (tablo başına metne çevirip pd.read_html ile yeniden ayrıştırma
+yapılmaz). Sayfanın indirilmesi değiştirilebilir bir getiriciye (fetcher)
+bırakılır: ağ için HttpFetcher (isteğe bağlı disk önbelleği ve koşullu
+isteklerle), testler ve sabit örnekler için yerel dosya okuyan
+LocalFileFetcher.
+
+    page = fetch_page(url)                    # yerel yol veya file:// ise dosyadan okunur
+    page = fetch_page(url, default_fetcher(cache_dir=".cache/http/"))
+    for heading, df in page.tables(levels=('h2', 'h3')):
+        ...
+"""
+
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+import lxml.html
+import pandas as pd
+import requests
+from pandas.io.parsers import TextParser
+
+from election_common.http_cache import DEFAULT_HTTP_CACHE_DIR, FetchResult, ResponseCache
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (compatible; AnketScraper/2.0; +https://example.com/)"
+DEFAULT_TIMEOUT = 30
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 8
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 1.0  # sn; her denemede iki katına çıkar
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_HEADING_LEVELS = ('h2', 'h3', 'h4')
+DEFAULT_HEADING = "Genel"
+
+_EDIT_LINK = re.compile(r"\s*\[.*?düzenle.*?\]\s*", flags=re.IGNORECASE)
+
+
+def slugify(text: str, max_length: int = 120, default: str = "cikti") -> str:
+    """Dosya adı için güvenli, kısa bir slug"""
+    text = re.sub(r"\s+", "_", (text or "").strip(), flags=re.UNICODE)
+    text = re.sub(r"[^\w\-.]+", "", text, flags=re.UNICODE)
+    return text[:max_length] or default
+
+
+def make_unique_columns(cols) -> List[str]:
+    """Tekrarlanan sütun adlarına .1, .2 ... ekler"""
+    seen, out = {}, []
+    for c in cols:
+        key = str(c)
+        if key in seen:
+            seen[key] += 1
+            out.append(f"{key}.{seen[key]}")
+        else:
+            seen[key] = 0
+            out.append(key)
+    return out
+
+
+def flatten_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Çok seviyeli sütunları düzleştirir, boşlukları sadeleştirir ve adları benzersizleştirir"""
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = [" ".join(str(x) for x in tpl if str(x) != "nan").strip() for tpl in df.columns.values]
+    df.columns = make_unique_columns(re.sub(r"\s+", " ", str(c)).strip() for c in df.columns)
+    return df
+
+
+# Getiriciler
+
+class HostRateLimiter:
+    """Aynı sunucuya yapılan istekler arasında en az min_interval saniye bırakır (iş parçacığı güvenli)"""
+
+    def __init__(self, min_interval: float = 0):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str):
+        if self.min_interval <= 0:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _retry_delay(response, attempt: int, backoff: float) -> float:
+    """Retry-After başlığı (saniye) varsa o, yoksa üstel bekleme"""
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    return backoff * (2 ** attempt)
+
+
+class HttpFetcher:
+    """
+    Sayfayı bağlantı havuzlu bir oturumla indirir; iş parçacıkları arasında paylaşılabilir.
+
+    cache: verilirse yanıtlar diske yazılır ve ETag/Last-Modified ile yeniden
+    doğrulanır; max_age saniyeden yeni kayıtlar için istek yapılmaz.
+    min_interval: aynı sunucuya gerçek ağ istekleri arasındaki en kısa süre (kibarlık).
+    retries: bağlantı hatası, zaman aşımı, 429 ve 5xx yanıtlarında üstel beklemeli yeniden deneme.
+    """
+
+    def __init__(self, user_agent: str = DEFAULT_USER_AGENT, timeout: float = DEFAULT_TIMEOUT,
+                 cache: Optional[ResponseCache] = None, max_age: float = 0, min_interval: float = 0,
+                 session: Optional[requests.Session] = None, retries: int = DEFAULT_RETRIES,
+                 backoff: float = DEFAULT_BACKOFF):
+        self.timeout = timeout
+        self.cache = cache
+        self.max_age = max_age
+        self.limiter = HostRateLimiter(min_interval)
+        self.retries = retries
+        self.backoff = backoff
+        self.session = session or requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+        adapter = requests.adapters.HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.stats = {'network': 0, 'not_modified': 0, 'fresh': 0, 'retries': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _request(self, url: str, headers: Dict[str, str]) -> requests.Response:
+        for attempt in range(self.retries + 1):
+            self.limiter.wait(url)
+            response = None
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+            if attempt == self.retries:
+                return response
+            self._count('retries')
+            time.sleep(_retry_delay(response, attempt, self.backoff))
+
+    def get(self, url: str) -> FetchResult:
+        entry = self.cache.load(url) if self.cache else None
+        if entry is not None and time.time() - entry['fetched_at'] < self.max_age:
+            self._count('fresh')
+            return ResponseCache.result(entry, 'fresh')
+
+        response = self._request(url, ResponseCache.conditional_headers(entry))
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(url, entry)
+            self._count('not_modified')
+            return ResponseCache.result(entry, 'not_modified')
+        response.raise_for_status()
+
+        self._count('network')
+        encoding = response.encoding or response.apparent_encoding
+        if self.cache is None:
+            return FetchResult(url, response.text, 'network')
+        return ResponseCache.result(self.cache.store(url, response.content, encoding, response.headers), 'network')
+
+    def fetch(self, url: str) -> str:
+        return self.get(url).text
+
+
+class LocalFileFetcher:
+    """
+    Sayfayı yerel dosyadan okur (testler, sabit örnekler, çevrimdışı çalışma).
+
+    URL doğrudan bir dosya yolu veya file:// adresiyse o dosya okunur; aksi
+    halde directory içinde sayfa adının slug'ı ile kayıtlı `<slug>.html` aranır.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory) if directory else None
+
+    def path_for(self, url: str) -> Path:
+        parsed = urlparse(url)
+        if parsed.scheme == 'file':
+            return Path(unquote(parsed.path))
+        if not parsed.scheme or Path(url).exists():
+            return Path(url)
+        if self.directory is None:
+            raise FileNotFoundError(f"Yerel kopya klasörü verilmedi: {url}")
+        page_name = unquote(parsed.path.rstrip('/').rsplit('/', 1)[-1])
+        return self.directory / f"{slugify(page_name)}.html"
+
+    def get(self, url: str) -> FetchResult:
+        return FetchResult(url, self.path_for(url).read_text(encoding='utf-8'), 'local')
+
+    def fetch(self, url: str) -> str:
+        return self.get(url).text
+
+
+def is_local_source(url: str) -> bool:
+    parsed = urlparse(url)
+    return parsed.scheme in ('', 'file') or Path(url).exists()
+
+
+class AutoFetcher:
+    """
+    Yerel yolları ve file:// adreslerini dosyadan, diğerlerini HTTP ile getirir.
+    http yerine LocalFileFetcher(klasör) verilirse tüm sayfalar yerel kopyalardan okunur.
+    """
+
+    def __init__(self, http=None, local: Optional[LocalFileFetcher] = None):
+        self.http = http or HttpFetcher()
+        self.local = local or LocalFileFetcher()
+
+    def get(self, url: str) -> FetchResult:
+        return (self.local if is_local_source(url) else self.http).get(url)
+
+    def fetch(self, url: str) -> str:
+        return self.get(url).text
+
+
+def default_fetcher(cache_dir: Optional[str] = None, max_age: float = 0, min_interval: float = 0,
+                    retries: int = DEFAULT_RETRIES) -> AutoFetcher:
+    """Varsayılan getirici; cache_dir verilirse HTTP yanıtları önbelleğe alınır"""
+    cache = ResponseCache(cache_dir) if cache_dir else None
+    return AutoFetcher(HttpFetcher(cache=cache, max_age=max_age, min_interval=min_interval, retries=retries))
+
+
+def write_csv_atomic(df: pd.DataFrame, path, **kwargs):
+    """CSV'yi geçici dosyaya yazıp yerine taşır; yarım kalmış dosya görünmez"""
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        df.to_csv(tmp_path, **kwargs)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def add_fetch_arguments(parser, sleep: float = 0.5):
+    """Betiklerin ortak getirme seçenekleri (önbellek, kibarlık gecikmesi)"""
+    parser.add_argument("--cache-dir", default=DEFAULT_HTTP_CACHE_DIR, help="HTTP yanıt önbelleği klasörü")
+    parser.add_argument("--no-cache", action="store_true", help="Önbelleği kullanma")
+    parser.add_argument("--max-age", type=float, default=0,
+                        help="Bu kadar saniyeden yeni önbellek kaydı için istek yapma (0: her seferinde doğrula)")
+    parser.add_argument("--sleep", type=float, default=sleep, help="Aynı sunucuya istekler arası kibar gecikme (sn)")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="Geçici hatalarda yeniden deneme sayısı")
+    parser.add_argument("--force", action="store_true", help="Kaynak değişmemiş olsa da tabloları yeniden işle")
+    parser.add_argument("--offline-dir", help="Sayfaları ağ yerine bu klasördeki <sayfa adı>.html kopyalarından oku")
+
+
+def fetcher_from_args(args) -> AutoFetcher:
+    if args.offline_dir:
+        return AutoFetcher(http=LocalFileFetcher(args.offline_dir))
+    return default_fetcher(cache_dir=None if args.no_cache else args.cache_dir,
+                           max_age=args.max_age, min_interval=args.sleep, retries=args.retries)
+
+
+# Sayfa ayrıştırma
+
+def element_text(element) -> str:
+    """Öğedeki görünür metin; parçalar tek boşlukla birleştirilir"""
+    return " ".join(part.strip() for part in element.itertext() if part.strip())
+
+
+def heading_text(element) -> str:
+    """Başlık metni ("[düzenle]" bağlantıları ayıklanmış)"""
+    return _EDIT_LINK.sub("", element_text(element))
+
+
+_HIDDEN_XPATH = ".//style | .//*[contains(translate(@style, ' ', ''), 'display:none')]"
+_TEXT_XPATH = "boolean(.//text()[translate(., '\n', '') != ''])"
+_CELL_TAGS = ('td', 'th')
+_WHITESPACE = re.compile(r"[\r\n]+|\s{2,}")
+
+
+def _span(cell, name: str) -> int:
+    """rowspan/colspan değeri; "2;" gibi bozuk değerlerde baştaki sayı alınır"""
+    value = cell.get(name)
+    if not value:
+        return 1
+    try:
+        return int(value)
+    except ValueError:
+        digits = re.match(r"\s*(\d+)", value)
+        return int(digits.group(1)) if digits else 1
+
+
+def _collect_text(element, hidden, parts: List[str]):
+    """text_content() gibi; gizli öğeler atlanır, <br> satır sonu sayılır"""
+    if element.text:
+        parts.append(element.text)
+    for child in element:
+        if isinstance(child.tag, str) and child not in hidden:
+            _collect_text(child, hidden, parts)
+        if child.tag == 'br':
+            parts.append("\n")
+        if child.tail:
+            parts.append(child.tail)
+
+
+def _cell_text(cell, hidden) -> str:
+    if len(cell) == 0:  # Alt öğesi olmayan hücre
+        return _WHITESPACE.sub(" ", (cell.text or "").strip())
+    parts = []
+    _collect_text(cell, hidden, parts)
+    return _WHITESPACE.sub(" ", "".join(parts).strip())
+
+
+def _is_visible(element, table, hidden) -> bool:
+    """Öğe ve tablo içindeki ataları gizli değilse True"""
+    while hidden and element is not None and element is not table:
+        if element in hidden:
+            return False
+        element = element.getparent()
+    return True
+
+
+def _cells(row, table, hidden) -> List:
+    return [cell for cell in row if cell.tag in _CELL_TAGS and _is_visible(cell, table, hidden)]
+
+
+def _table_sections(table, hidden) -> Tuple[List, List, List]:
+    """<thead>/<tbody>/<tfoot> satırları; thead yoksa baştaki yalnız <th> satırları başlık sayılır"""
+    def visible(elements):
+        return [el for el in elements if _is_visible(el, table, hidden)]
+
+    head = []
+    for thead in table.xpath(".//thead"):
+        head.extend(thead.xpath("./tr"))
+        if _cells(thead, table, hidden):  # <tr>'siz hatalı <thead>: kendisi satır sayılır
+            head.append(thead)
+    head = visible(head)
+    body = visible(table.xpath(".//tbody//tr") + table.xpath("./tr"))
+    foot = visible(table.xpath(".//tfoot//tr"))
+
+    if not head:
+        while body and all(cell.tag == 'th' for cell in _cells(body[0], table, hidden)):
+            head.append(body.pop(0))
+    return head, body, foot
+
+
+def _expand_spans(rows, table, hidden) -> List[List[str]]:
+    """colspan/rowspan hücrelerini kapladıkları her konuma kopyalar"""
+    all_texts, remainder = [], []  # remainder: (sütun, metin, kalan satır)
+    for tr in rows:
+        texts, next_remainder, index = [], [], 0
+        for cell in _cells(tr, table, hidden):
+            while remainder and remainder[0][0] <= index:
+                prev_index, prev_text, prev_rows = remainder.pop(0)
+                texts.append(prev_text)
+                if prev_rows > 1:
+                    next_remainder.append((prev_index, prev_text, prev_rows - 1))
+                index += 1
+            text = _cell_text(cell, hidden)
+            rowspan = _span(cell, "rowspan")
+            for _ in range(_span(cell, "colspan")):
+                texts.append(text)
+                if rowspan > 1:
+                    next_remainder.append((index, text, rowspan - 1))
+                index += 1
+        for prev_index, prev_text, prev_rows in remainder:
+            texts.append(prev_text)
+            if prev_rows > 1:
+                next_remainder.append((prev_index, prev_text, prev_rows - 1))
+        all_texts.append(texts)
+        remainder = next_remainder
+
+    while remainder:  # Yalnızca önceki satırların rowspan'i ile oluşan satırlar
+        all_texts.append([text for _, text, _ in remainder])
+        remainder = [(i, text, n - 1) for i, text, n in remainder if n > 1]
+    return all_texts
+
+
+def read_table(element) -> pd.DataFrame:
+    """
+    Tek bir tablo öğesini ayrıştırılmış ağaçtan doğrudan DataFrame'e çevirir
+    (sütunlar düzleştirilmiş). Öğe yeniden metne çevrilip ayrıştırılmaz; başlık
+    çıkarımı, colspan/rowspan, gizli öğeler ve tür dönüşümü pd.read_html(flavor="lxml")
+    ile aynıdır. Ağaç değiştirilmez.
+    """
+    style = (element.get("style") or "").replace(" ", "")
+    if "display:none" in style or not element.xpath(_TEXT_XPATH):
+        return pd.DataFrame()
+
+    hidden = set(element.xpath(_HIDDEN_XPATH))
+    head, body, foot = (_expand_spans(rows, element, hidden) for rows in _table_sections(element, hidden))
+
+    header = None
+    if head:
+        body = head + body
+        header = 0 if len(head) == 1 else [i for i, row in enumerate(head) if any(row)]
+    body += foot
+    if not body:
+        return pd.DataFrame()
+
+    width = max(len(row) for row in body)
+    body = [row + [""] * (width - len(row)) for row in body]
+    try:
+        with TextParser(body, header=header, skiprows=0, parse_dates=False, thousands=",",
+                        decimal=".", converters=None, na_values=None, keep_default_na=True) as parser:
+            df = parser.read()
+    except ValueError:  # Satırı olmayan veya yalnızca başlıktan oluşan tablo
+        return pd.DataFrame()
+    return flatten_columns(df)
+
+
+class WikiPage:
+    """lxml ile ayrıştırılmış Wikipedia sayfası"""
+
+    def __init__(self, html: str, url: str = None, source: Optional[FetchResult] = None):
+        self.url = url
+        self.source = source
+        self.root = lxml.html.fromstring(html)
+
+    @property
+    def title(self) -> Optional[str]:
+        found = self.root.xpath("//h1[@id='firstHeading']")
+        return element_text(found[0]) if found else None
+
+    def _content(self):
+        found = self.root.xpath("//div[@id='mw-content-text']")
+        return found[0] if found else None
+
+    def table_elements(self, levels: Tuple[str, ...] = DEFAULT_HEADING_LEVELS) -> List[Tuple[str, object]]:
+        """
+        İçerikteki wikitable öğelerini en yakın önceki başlıkla eşler:
+        [(başlık metni, tablo öğesi), ...]
+        """
+        content = self._content()
+        if content is None:
+            return []
+        heading_test = " or ".join(f"self::{level}" for level in levels)
+        wikitable = "self::table[contains(concat(' ', normalize-space(@class), ' '), ' wikitable ')]"
+        # Tek sorgu; XPath düğüm kümeleri belge sırasıyla döner
+        nodes = content.xpath(f".//*[{heading_test} or {wikitable}]")
+
+        pairs, last_heading = [], DEFAULT_HEADING
+        for node in nodes:
+            if node.tag == 'table':
+                pairs.append((last_heading, node))
+            else:
+                last_heading = heading_text(node) or last_heading
+        return pairs
+
+    def tables(self, levels: Tuple[str, ...] = DEFAULT_HEADING_LEVELS) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """(başlık, DataFrame) çiftleri; okunamayan veya boş tablolar atlanır"""
+        for heading, element in self.table_elements(levels):
+            df = read_table(element)
+            if not df.empty:
+                yield heading, df
+
+
+def fetch_page(url: str, fetcher=None) -> WikiPage:
+    """Sayfayı getirip ayrıştırır; getirici verilmezse kaynağa göre seçilir"""
+    return parse_source((fetcher or default_fetcher()).get(url))
+
+
+def parse_source(source: FetchResult) -> WikiPage:
+    return WikiPage(source.text, source.url, source)
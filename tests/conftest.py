@@ -0,0 +1,100 @@
+"""
+Ortak test donanımı: depo kökünü sys.path'e ekler ve 127.0.0.1 üzerinde
+senaryolu yanıtlar dönen yerel bir HTTP sunucusu sağlar.
+"""
+
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+sys.path.insert(0, str(REPO_ROOT))  # Depo kökü (election_common)
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+class StubServer:
+    """
+    Yol başına yanıt üreten yerel sunucu. Her yol için bir fonksiyon
+    (istek başlıkları -> (durum, başlıklar, gövde)) veya sırayla dönülecek
+    yanıt listesi tanımlanır; listenin son yanıtı tekrarlanır.
+    Gelen istekler (yol, başlıklar) olarak `requests` listesinde tutulur.
+    """
+
+    def __init__(self):
+        self.routes: Dict[str, Callable[[Dict[str, str]], Response]] = {}
+        self.requests: List[Tuple[str, Dict[str, str]]] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                headers = dict(self.headers.items())
+                with stub._lock:
+                    stub.requests.append((self.path, headers))
+                    route = stub.routes.get(self.path)
+                status, response_headers, body = route(headers) if route else (404, {}, b"")
+                self.send_response(status)
+                for name, value in response_headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def url(self, path: str) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def route(self, path: str, handler: Callable[[Dict[str, str]], Response]):
+        self.routes[path] = handler
+
+    def sequence(self, path: str, responses: List[Response]):
+        remaining = list(responses)
+
+        def handler(headers):
+            return remaining.pop(0) if len(remaining) > 1 else remaining[0]
+
+        self.route(path, handler)
+
+    def hits(self, path: str) -> List[Dict[str, str]]:
+        return [headers for request_path, headers in self.requests if request_path == path]
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    server = StubServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def offline_page(tmp_path):
+    """Wikipedia sayfasının yerel kopyası: (LocalFileFetcher klasörü, sayfa URL'si)"""
+    url = "https://tr.wikipedia.org/wiki/2024_Türkiye_yerel_seçimleri_için_yapılan_anketler"
+    directory = tmp_path / "sayfalar"
+    directory.mkdir()
+    html = (FIXTURES_DIR / "anket_sayfasi.html").read_text(encoding='utf-8')
+    (directory / "2024_Türkiye_yerel_seçimleri_için_yapılan_anketler.html").write_text(html, encoding='utf-8')
+    return directory, url
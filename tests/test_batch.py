@@ -0,0 +1,178 @@
+"""Eşzamanlı toplu kazıma: hata yalıtımı, sunucu başına hız sınırı, yeniden deneme"""
+
+import threading
+import time
+
+import pandas as pd
+import pytest
+import requests
+
+from conftest import FIXTURES_DIR
+from election_common import batch
+from election_common.batch import BatchJob, run_batch, run_parallel
+from election_common.scraping import HostRateLimiter, HttpFetcher
+
+PAGE = "/wiki/Anketler"
+SCRAPER_2024 = "2024_Local(Monte Carlo)/scripts/wikipedia_anket_scriper.py"
+
+
+class StubPageJob(BatchJob):
+    """2024 kazıyıcısını betikteki sabit yerine yerel sunucudaki bir URL ile çalıştıran iş"""
+
+    def __init__(self, name: str, url: str):
+        super().__init__(name, SCRAPER_2024, 'scrape_and_write', 'WIKI_URL_DEFAULT')
+        self.url = url
+
+    def load(self):
+        scrape, _ = super().load()
+        return scrape, self.url
+
+
+def _page(*provinces: str) -> bytes:
+    """Örnek anket sayfası; İstanbul/Hakkâri bölümleri verilen illerle değiştirilir"""
+    html = (FIXTURES_DIR / "anket_sayfasi.html").read_text(encoding="utf-8")
+    for old, new in zip(("İstanbul", "Hakkâri"), provinces):
+        html = html.replace(f"<h2>{old}</h2>", f"<h2>{new}</h2>")
+    return html.encode("utf-8")
+
+
+def test_run_parallel_isolates_errors_and_keeps_task_order():
+    def fail():
+        raise ValueError("bozuk sayfa")
+
+    outcomes = run_parallel({'a': lambda: 1, 'hatali': fail, 'b': lambda: 2}, max_workers=3)
+
+    assert list(outcomes) == ['a', 'hatali', 'b']
+    assert (outcomes['a']['result'], outcomes['b']['result']) == (1, 2)
+    assert outcomes['a']['error'] is None
+    assert isinstance(outcomes['hatali']['error'], ValueError)
+    assert outcomes['hatali']['result'] is None
+    assert all(outcome['seconds'] >= 0 for outcome in outcomes.values())
+
+
+def test_run_parallel_respects_max_workers():
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def task():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+
+    run_parallel({f"is{i}": task for i in range(6)}, max_workers=2)
+
+    assert peak[0] == 2
+
+
+def test_rate_limiter_spaces_requests_to_same_host():
+    limiter = HostRateLimiter(min_interval=0.2)
+    stamps = []
+
+    def request():
+        limiter.wait("https://tr.wikipedia.org/wiki/A")
+        stamps.append(time.monotonic())
+
+    threads = [threading.Thread(target=request) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stamps.sort()
+    gaps = [later - earlier for earlier, later in zip(stamps, stamps[1:])]
+    assert all(gap >= 0.18 for gap in gaps)
+
+
+def test_rate_limiter_does_not_delay_other_hosts():
+    limiter = HostRateLimiter(min_interval=1.0)
+    limiter.wait("https://tr.wikipedia.org/wiki/A")
+
+    start = time.monotonic()
+    limiter.wait("https://en.wikipedia.org/wiki/B")
+    HostRateLimiter(min_interval=0).wait("https://tr.wikipedia.org/wiki/A")
+
+    assert time.monotonic() - start < 0.1
+
+
+def test_request_retries_503_and_honours_retry_after(stub_server):
+    stub_server.sequence(PAGE, [(503, {'Retry-After': '1'}, b""), (200, {}, b"tamam")])
+    fetcher = HttpFetcher(retries=2, backoff=5.0)
+
+    start = time.monotonic()
+    response = fetcher._request(stub_server.url(PAGE), {})
+    elapsed = time.monotonic() - start
+
+    assert response.status_code == 200
+    assert response.text == "tamam"
+    assert len(stub_server.hits(PAGE)) == 2
+    assert fetcher.stats['retries'] == 1
+    assert 1.0 <= elapsed < 5.0
+
+
+def test_request_uses_exponential_backoff_without_retry_after(stub_server):
+    stub_server.sequence(PAGE, [(503, {}, b""), (502, {}, b""), (200, {}, b"tamam")])
+    fetcher = HttpFetcher(retries=3, backoff=0.1)
+
+    start = time.monotonic()
+    response = fetcher._request(stub_server.url(PAGE), {})
+
+    assert response.status_code == 200
+    assert fetcher.stats['retries'] == 2
+    assert time.monotonic() - start >= 0.1 + 0.2
+
+
+def test_request_returns_last_response_when_retries_run_out(stub_server):
+    stub_server.sequence(PAGE, [(503, {'Retry-After': '0'}, b"")])
+    fetcher = HttpFetcher(retries=2)
+
+    assert fetcher._request(stub_server.url(PAGE), {}).status_code == 503
+    assert len(stub_server.hits(PAGE)) == 3
+    with pytest.raises(requests.HTTPError):
+        fetcher.get(stub_server.url(PAGE))
+
+
+def test_request_does_not_retry_client_errors(stub_server):
+    stub_server.sequence(PAGE, [(404, {}, b"")])
+    fetcher = HttpFetcher(retries=3)
+
+    assert fetcher._request(stub_server.url(PAGE), {}).status_code == 404
+    assert len(stub_server.hits(PAGE)) == 1
+    assert fetcher.stats['retries'] == 0
+
+
+def test_run_batch_writes_each_job_and_isolates_failures(tmp_path, stub_server, monkeypatch):
+    html = {'Content-Type': 'text/html; charset=utf-8'}
+    stub_server.sequence("/wiki/A", [(200, html, _page("İstanbul", "Hakkâri"))])
+    stub_server.sequence("/wiki/B", [(200, html, _page("Ankara", "İzmir"))])
+    stub_server.sequence("/wiki/Gecici", [(503, {'Retry-After': '0'}, b""), (200, html, _page("Bursa"))])
+    stub_server.sequence("/wiki/Yok", [(404, {}, b"")])
+    jobs = {name: StubPageJob(name, stub_server.url(path))
+            for name, path in [('sayfa_a', "/wiki/A"), ('sayfa_b', "/wiki/B"),
+                               ('gecici_hata', "/wiki/Gecici"), ('bulunamadi', "/wiki/Yok")]}
+    monkeypatch.setattr(batch, 'BATCH_JOBS', jobs)
+    fetcher = HttpFetcher(retries=2, backoff=0.05)
+
+    outcomes = run_batch(list(jobs), tmp_path, fetcher, max_workers=3)
+
+    assert list(outcomes) == list(jobs)
+    assert {name: outcome['result'] for name, outcome in outcomes.items()} == {
+        'sayfa_a': 2, 'sayfa_b': 2, 'gecici_hata': 2, 'bulunamadi': None}
+    assert isinstance(outcomes['bulunamadi']['error'], requests.HTTPError)
+    assert len(stub_server.hits("/wiki/Gecici")) == 2
+    assert fetcher.stats['retries'] == 1
+
+    expected = {
+        'sayfa_a': ["hakkari_2024_anketler.csv", "istanbul_2024_anketler.csv"],
+        'sayfa_b': ["ankara_2024_anketler.csv", "izmir_2024_anketler.csv"],
+        'gecici_hata': ["bursa_2024_anketler.csv", "hakkari_2024_anketler.csv"],
+    }
+    for name, files in expected.items():
+        outdir = tmp_path / name
+        assert sorted(path.name for path in outdir.glob("*_2024_anketler.csv")) == files
+        assert not list(outdir.glob("*.tmp")) and not list(outdir.glob(".*.tmp"))
+        combined = pd.read_csv(outdir / "tum_anketler_birlesik.csv", encoding="utf-8-sig")
+        assert set(combined["KaynakURL"]) == {jobs[name].url}
+    assert not list((tmp_path / "bulunamadi").glob("*.csv"))
@@ -0,0 +1,157 @@
+"""HTTP yanıt önbelleği, koşullu istekler ve SourceStamp kısa devresi"""
+
+import importlib.util
+import json
+
+import pytest
+
+from conftest import REPO_ROOT
+from election_common.http_cache import ResponseCache, SourceStamp
+from election_common.scraping import AutoFetcher, HttpFetcher, LocalFileFetcher
+
+PAGE = "/wiki/Anketler"
+
+
+def _fetcher(tmp_path, **kwargs) -> HttpFetcher:
+    return HttpFetcher(cache=ResponseCache(str(tmp_path / "http")), retries=0, **kwargs)
+
+
+def _load_2024_scraper():
+    path = REPO_ROOT / "2024_Local(Monte Carlo)" / "scripts" / "wikipedia_anket_scriper.py"
+    spec = importlib.util.spec_from_file_location("_test_wikipedia_anket_scriper", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def versioned_page(stub_server):
+    """ETag'i `version['etag']` olan sayfa; eşleşen If-None-Match için 304 döner"""
+    version = {'etag': '"v1"', 'body': "ilk sürüm".encode('utf-8')}
+
+    def handler(headers):
+        if headers.get('If-None-Match') == version['etag']:
+            return 304, {'ETag': version['etag']}, b""
+        return 200, {'ETag': version['etag'], 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT',
+                     'Content-Type': 'text/html; charset=utf-8'}, version['body']
+
+    stub_server.route(PAGE, handler)
+    return version
+
+
+def test_200_then_304_revalidates_from_cache(tmp_path, stub_server, versioned_page):
+    fetcher = _fetcher(tmp_path)
+
+    first = fetcher.get(stub_server.url(PAGE))
+    second = fetcher.get(stub_server.url(PAGE))
+
+    assert first.status == 'network'
+    assert second.status == 'not_modified'
+    assert second.text == first.text == "ilk sürüm"
+    assert second.digest == first.digest
+    first_request, second_request = stub_server.hits(PAGE)
+    assert 'If-None-Match' not in first_request
+    assert second_request['If-None-Match'] == '"v1"'
+    assert second_request['If-Modified-Since'] == 'Mon, 01 Jan 2024 00:00:00 GMT'
+    assert fetcher.stats == {'network': 1, 'not_modified': 1, 'fresh': 0, 'retries': 0}
+
+
+def test_changed_page_replaces_cache_entry(tmp_path, stub_server, versioned_page):
+    fetcher = _fetcher(tmp_path)
+    url = stub_server.url(PAGE)
+    fetcher.get(url)
+
+    versioned_page.update(etag='"v2"', body="ikinci sürüm".encode('utf-8'))
+    changed = fetcher.get(url)
+
+    assert changed.status == 'network'
+    assert changed.text == "ikinci sürüm"
+    assert fetcher.cache.load(url)['etag'] == '"v2"'
+    assert fetcher.get(url).status == 'not_modified'
+
+
+def test_max_age_serves_fresh_entry_without_request(tmp_path, stub_server, versioned_page):
+    fetcher = _fetcher(tmp_path, max_age=3600)
+    url = stub_server.url(PAGE)
+
+    first = fetcher.get(url)
+    second = fetcher.get(url)
+
+    assert (first.status, second.status) == ('network', 'fresh')
+    assert second.text == first.text
+    assert len(stub_server.hits(PAGE)) == 1
+
+
+def test_expired_entry_is_revalidated(tmp_path, stub_server, versioned_page):
+    fetcher = _fetcher(tmp_path, max_age=3600)
+    url = stub_server.url(PAGE)
+    fetcher.get(url)
+
+    meta_path = fetcher.cache._paths(url)[0]
+    meta = json.loads(meta_path.read_text(encoding='utf-8'))
+    meta['fetched_at'] -= 7200
+    meta_path.write_text(json.dumps(meta), encoding='utf-8')
+
+    assert fetcher.get(url).status == 'not_modified'
+    assert fetcher.get(url).status == 'fresh'
+    assert len(stub_server.hits(PAGE)) == 2
+
+
+def test_corrupt_body_falls_back_to_unconditional_request(tmp_path, stub_server, versioned_page):
+    fetcher = _fetcher(tmp_path)
+    url = stub_server.url(PAGE)
+    fetcher.get(url)
+    fetcher.cache._paths(url)[1].write_bytes(b"bozuk")
+
+    result = fetcher.get(url)
+
+    assert result.status == 'network'
+    assert result.text == "ilk sürüm"
+    assert 'If-None-Match' not in stub_server.hits(PAGE)[-1]
+
+
+def test_local_file_fetcher_reads_offline_copy(offline_page):
+    directory, url = offline_page
+    fetcher = AutoFetcher(http=LocalFileFetcher(str(directory)))
+
+    result = fetcher.get(url)
+
+    assert result.status == 'local'
+    assert result.url == url
+    assert "wikitable" in result.text
+    assert LocalFileFetcher().get((directory / next(directory.iterdir()).name).as_uri()).text == result.text
+
+
+def test_source_stamp_tracks_digest_per_url(tmp_path, offline_page):
+    directory, url = offline_page
+    source = LocalFileFetcher(str(directory)).get(url)
+
+    stamp = SourceStamp(tmp_path / "cikti")
+    assert not stamp.is_current(source)
+    stamp.update(source)
+
+    assert SourceStamp(tmp_path / "cikti").is_current(source)
+
+
+def test_unchanged_source_short_circuits_scraper(tmp_path, offline_page, capsys):
+    directory, url = offline_page
+    scraper = _load_2024_scraper()
+    fetcher = AutoFetcher(http=LocalFileFetcher(str(directory)))
+    outdir = tmp_path / "cikti"
+
+    assert scraper.scrape_and_write(url, outdir, fetcher) == 2
+    assert sorted(path.name for path in outdir.glob("*_2024_anketler.csv")) == [
+        "hakkari_2024_anketler.csv", "istanbul_2024_anketler.csv"]
+    combined = outdir / "tum_anketler_birlesik.csv"
+    written_at = combined.stat().st_mtime_ns
+
+    assert scraper.scrape_and_write(url, outdir, fetcher) == -1
+    assert "Sayfa değişmedi" in capsys.readouterr().out
+    assert combined.stat().st_mtime_ns == written_at
+
+    assert scraper.scrape_and_write(url, outdir, fetcher, force=True) == 2
+
+    page = next(directory.iterdir())
+    page.write_text(page.read_text(encoding='utf-8').replace("20-24 Mart", "21-24 Mart"), encoding='utf-8')
+    assert scraper.scrape_and_write(url, outdir, fetcher) == 2
+    assert "21-24 Mart" in combined.read_text(encoding='utf-8-sig')
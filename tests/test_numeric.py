@@ -0,0 +1,87 @@
+"""Vektörel sayı normalizasyonu: yüzde ve sayım hücreleri"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from election_common.numeric import parse_count, parse_percent, parse_percent_frame
+
+
+def _cells(*values) -> pd.Series:
+    return pd.Series(list(values), dtype=object)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("%34,5", 34.5),
+    ("34.5", 34.5),
+    (" 34,5 ", 34.5),
+    ("34,5±2,1", 34.5),
+    ("34,5 (2)", 34.5),
+    ("34,5[a]", 34.5),
+    ("50-52", 51.0),
+    ("50–52", 51.0),
+    ("1.234,5", 1234.5),
+    ("1,234.5", 1234.5),
+    ("−3,2", -3.2),
+    ("+2", 2.0),
+])
+def test_parse_percent_cells(text, expected):
+    assert parse_percent(_cells(text)).iloc[0] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("placeholder", ["—", "–", "-", "N/A", "", None, np.nan])
+def test_parse_percent_placeholders_are_nan(placeholder):
+    assert parse_percent(_cells("34,5", placeholder)).isna().tolist() == [False, True]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2.464", 2464),
+    ("2,464", 2464),
+    ("25.000", 25000),
+    ("1.234.567", 1234567),
+    ("3 016", 3016),
+    ("2,5", 2.5),
+])
+def test_parse_count_thousands_separators(text, expected):
+    assert parse_count(_cells(text)).iloc[0] == expected
+
+
+def test_plain_integer_columns_keep_int_dtype():
+    assert parse_percent(_cells("34", "35")).dtype == np.int64
+    assert parse_percent(pd.Series([34, 35])).dtype == np.int64
+    assert parse_percent(_cells("34", "35.5")).dtype == np.float64
+    assert parse_percent(_cells("34", None)).dtype == np.float64
+
+
+def test_numeric_input_is_returned_as_copy():
+    values = pd.Series([1.5, 2.5])
+
+    parsed = parse_percent(values)
+    parsed.iloc[0] = 0
+
+    assert values.iloc[0] == 1.5
+
+
+def test_repeated_cells_keep_row_order_and_index():
+    values = pd.Series(["%30", "40,5", "%30", None, "40,5"], index=list("abcde"), dtype=object)
+
+    parsed = parse_percent(values)
+
+    assert parsed.index.tolist() == list("abcde")
+    assert parsed.tolist()[:3] == [30.0, 40.5, 30.0]
+    assert parsed.isna().tolist() == [False, False, False, True, False]
+
+
+def test_parse_percent_frame_matches_column_parser_and_dtypes():
+    frame = pd.DataFrame({
+        'duz': ['1', '2'],
+        'metin': ['%3', '4,5'],
+        'sayi': [1.5, 2.5],
+        'bos': ['-', ''],
+    })
+
+    parsed = parse_percent_frame(frame)
+
+    assert parsed.dtypes.tolist() == [np.int64, np.float64, np.float64, np.float64]
+    for column in frame.columns:
+        pd.testing.assert_series_equal(parsed[column], parse_percent(frame[column]), check_names=False)
@@ -0,0 +1,71 @@
+"""Kanonik anket şeması: birim sezgileri ve seçim sonucu satırları"""
+
+import pandas as pd
+
+from election_common.poll_schema import PollSchema, election_result_rows, normalize_sample, shares_to_percent
+
+PARTIES = ['AKP', 'CHP']
+
+
+def _shares(**columns) -> pd.DataFrame:
+    return shares_to_percent(pd.DataFrame(columns, dtype=object), PARTIES)
+
+
+def test_sample_thousands_separator_and_units():
+    sample = normalize_sample(pd.Series(["1.830", "3.016", 2.755, 25.0, 3016, "3.263.648", None], dtype=object))
+
+    assert sample.dtype == 'Int64'
+    assert sample.tolist()[:6] == [1830, 3016, 2755, 25000, 3016, 3263648]
+    assert sample.isna().tolist()[6]
+
+
+def test_per_mille_row_is_divided_by_ten():
+    shares = _shares(AKP=['446', '34,5'], CHP=['412', '30'], Diğerleri=['142', '5'])
+
+    assert shares.loc[0].tolist() == [44.6, 41.2, 14.2]
+    assert shares.loc[1].tolist() == [34.5, 30.0, 5.0]
+
+
+def test_decimal_cell_in_per_mille_row_is_already_percent():
+    shares = _shares(AKP=['446'], CHP=['35.3'])
+
+    assert shares.loc[0].tolist() == [44.6, 35.3]
+
+
+def test_leading_zero_cell_is_per_mille_in_any_row():
+    shares = _shares(AKP=['38.1', '421'], CHP=['04', '07'])
+
+    assert shares['CHP'].tolist() == [0.4, 0.7]
+    assert shares['AKP'].tolist() == [38.1, 42.1]
+
+
+def test_out_of_range_cells_are_dropped():
+    shares = _shares(AKP=['2023', '-', '36'], CHP=['2023', '%34,5', '1200'])
+
+    assert shares['AKP'].isna().tolist() == [True, True, False]
+    assert shares['CHP'].tolist()[1] == 34.5
+    assert shares['CHP'].isna().tolist() == [True, False, True]
+
+
+def test_election_result_rows_are_recognised():
+    pollsters = pd.Series(["Yerel seçimler", "YENİLENEN SEÇİM", "Genel seçimler (yurt içi)",
+                           "ORC", "Seçim Araştırma", None], dtype=object)
+
+    assert election_result_rows(pollsters).tolist() == [True, True, True, False, False, False]
+
+
+def test_canonical_frame_drops_election_result_rows():
+    raw = pd.DataFrame({
+        'Tarih': ["20-24 Mart", "31 Mart 2019"],
+        'Anket şirketi': ["ORC", "Yerel seçimler"],
+        'Örneklem': ["3.850", "3.263.648"],
+        'AK Parti': ["34,5", "47,1"],
+        'CHP': ["55,1", "50,9"],
+    })
+
+    canonical, unmatched = PollSchema({'AKP': ['AK Parti'], 'CHP': []}).canonical_frame(raw)
+
+    assert unmatched == []
+    assert canonical['Anket_Şirketi'].tolist() == ["ORC"]
+    assert canonical['Örneklem'].tolist() == [3850]
+    assert canonical[['AKP', 'CHP']].iloc[0].tolist() == [34.5, 55.1]
@@ -0,0 +1,165 @@
+"""Artımlı anket deposu: anahtar kararlılığı, üyelik, silme ve değişiklik kaydı"""
+
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from election_common import poll_store
+from election_common.poll_store import PollStore
+
+COLUMNS = ['İl', 'Anket_Şirketi', 'Tarih', 'Örneklem', 'AKP', 'CHP']
+IL_SOURCE = "raw/ankara_2024_anketler.csv"
+ALL_SOURCE = "raw/tum_anketler_birlesik.csv"
+
+
+def _frame(*rows) -> pd.DataFrame:
+    return pd.DataFrame(list(rows), columns=COLUMNS)
+
+
+ORC = ('Ankara', 'ORC', '20-24 Mart', 3850, 34.5, 55.1)
+SONAR = ('Ankara', 'SONAR', '15-18 Mart', 2755, 36.0, 52.0)
+OPTIMAR_A = ('Ankara', 'Optimar', '10-12 Mart', 1200, 30.0, 58.0)
+OPTIMAR_B = ('Ankara', 'Optimar', '10-12 Mart', 1200, 33.0, 54.0)
+OPTIMAR_C = ('Ankara', 'Optimar', '10-12 Mart', 1200, 40.0, 45.0)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PollStore(tmp_path / "anket_deposu.sqlite", COLUMNS)
+    yield store
+    store.close()
+
+
+def _ingest(store, sources) -> dict:
+    store.begin_run()
+    for source, frame in sources.items():
+        store.upsert(frame, province='Ankara', source=source)
+    return store.finish_run()
+
+
+def _keys(store) -> dict:
+    return {(pollster, sample, record): key for key, pollster, sample, record in store._conn.execute(
+        'SELECT poll_key, pollster, sample, record FROM polls WHERE removed_run IS NULL')}
+
+
+def _changes(store, run_id) -> list:
+    return [(row.change, row.poll_key) for row in store.changes(since_run=run_id).itertuples()]
+
+
+def test_unchanged_reingest_logs_no_changes(store):
+    first = _ingest(store, {IL_SOURCE: _frame(ORC, SONAR)})
+    second = _ingest(store, {IL_SOURCE: _frame(SONAR, ORC)})
+
+    assert first == {'inserted': 2, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+    assert second == {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 2}
+    assert _changes(store, store.run_id) == []
+
+
+def test_changed_cell_is_logged_as_update(store):
+    _ingest(store, {IL_SOURCE: _frame(ORC, SONAR)})
+    key = store._conn.execute("SELECT poll_key FROM polls WHERE pollster = 'ORC'").fetchone()[0]
+
+    counts = _ingest(store, {IL_SOURCE: _frame(ORC[:4] + (35.0, 54.6), SONAR)})
+
+    assert counts == {'inserted': 0, 'updated': 1, 'deleted': 0, 'unchanged': 1}
+    change = store.changes(since_run=store.run_id).iloc[0]
+    assert (change.change, change.poll_key) == ('update', key)
+    assert change.old_hash is not None and change.old_hash != change.new_hash
+    assert store.polls_frame().set_index('Anket_Şirketi').loc['ORC', 'AKP'] == 35.0
+
+
+def test_row_dropped_from_only_source_is_deleted(store):
+    _ingest(store, {IL_SOURCE: _frame(ORC, SONAR)})
+    key = store._conn.execute("SELECT poll_key FROM polls WHERE pollster = 'SONAR'").fetchone()[0]
+
+    counts = _ingest(store, {IL_SOURCE: _frame(ORC)})
+
+    assert counts['deleted'] == 1
+    assert _changes(store, store.run_id) == [('delete', key)]
+    assert store.polls_frame()['Anket_Şirketi'].tolist() == ['ORC']
+
+
+def test_row_kept_by_another_source_is_not_deleted(store):
+    _ingest(store, {IL_SOURCE: _frame(ORC, SONAR), ALL_SOURCE: _frame(ORC, SONAR)})
+
+    counts = _ingest(store, {IL_SOURCE: _frame(ORC)})
+
+    assert counts['deleted'] == 0
+    assert len(store.polls_frame()) == 2
+
+    assert _ingest(store, {ALL_SOURCE: _frame(ORC)})['deleted'] == 1
+    assert store.polls_frame()['Anket_Şirketi'].tolist() == ['ORC']
+
+
+def test_poll_in_two_sources_is_stored_once(store):
+    counts = _ingest(store, {IL_SOURCE: _frame(ORC, SONAR), ALL_SOURCE: _frame(SONAR, ORC)})
+
+    assert counts == {'inserted': 2, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+    assert store._conn.execute('SELECT COUNT(*) FROM polls').fetchone()[0] == 2
+    assert len(store.polls_frame()) == 2
+
+
+def test_same_identity_siblings_keep_their_keys(store):
+    _ingest(store, {IL_SOURCE: _frame(OPTIMAR_A)})
+    before = _keys(store)
+
+    counts = _ingest(store, {IL_SOURCE: _frame(OPTIMAR_B, OPTIMAR_A)})
+
+    assert counts == {'inserted': 1, 'updated': 0, 'deleted': 0, 'unchanged': 1}
+    after = _keys(store)
+    assert set(before.items()) <= set(after.items())
+    assert [change for change, _ in _changes(store, store.run_id)] == ['insert']
+
+    counts = _ingest(store, {IL_SOURCE: _frame(OPTIMAR_C, OPTIMAR_B, OPTIMAR_A)})
+    assert counts['inserted'] == 1 and counts['unchanged'] == 2
+    assert set(after.items()) <= set(_keys(store).items())
+    assert len(set(_keys(store).values())) == 3
+
+
+def test_edit_of_shared_identity_poll_is_an_update(store):
+    _ingest(store, {IL_SOURCE: _frame(OPTIMAR_A, OPTIMAR_B)})
+    key_b = store._conn.execute('SELECT poll_key FROM polls WHERE record LIKE ?', ('%"AKP": 33.0%',)).fetchone()[0]
+
+    counts = _ingest(store, {IL_SOURCE: _frame(OPTIMAR_B[:4] + (33.5, 54.0), OPTIMAR_A)})
+
+    assert counts == {'inserted': 0, 'updated': 1, 'deleted': 0, 'unchanged': 1}
+    assert _changes(store, store.run_id) == [('update', key_b)]
+
+
+def test_removed_poll_that_returns_is_reinserted(store):
+    _ingest(store, {IL_SOURCE: _frame(ORC, SONAR)})
+    _ingest(store, {IL_SOURCE: _frame(ORC)})
+
+    counts = _ingest(store, {IL_SOURCE: _frame(ORC, SONAR)})
+
+    assert counts == {'inserted': 1, 'updated': 0, 'deleted': 0, 'unchanged': 1}
+    assert len(store.polls_frame()) == 2
+
+
+def test_changed_provinces_and_change_log_span_runs(store):
+    first = store.begin_run()
+    store.upsert(_frame(ORC), province='Ankara', source=IL_SOURCE)
+    store.upsert(_frame(('İzmir', 'ORC', '20-24 Mart', 2000, 30.0, 60.0)), province='İzmir',
+                 source="raw/izmir_2024_anketler.csv")
+    store.finish_run()
+
+    assert store.changed_provinces(first) == ['Ankara', 'İzmir']
+    assert store.changes(since_run=first)['change'].tolist() == ['insert', 'insert']
+
+
+def test_store_version_mismatch_rebuilds_tables(tmp_path):
+    path = tmp_path / "anket_deposu.sqlite"
+    store = PollStore(path, COLUMNS)
+    _ingest(store, {IL_SOURCE: _frame(ORC)})
+    store.mark_source(__file__, province='Ankara', summary={})
+    store._conn.commit()
+    store.close()
+
+    with sqlite3.connect(path) as conn:
+        conn.execute(f'PRAGMA user_version = {poll_store.STORE_VERSION - 1}')
+
+    rebuilt = PollStore(path, COLUMNS)
+    assert rebuilt._conn.execute('SELECT COUNT(*) FROM polls').fetchone()[0] == 0
+    assert rebuilt.source_changed(__file__)
+    rebuilt.close()
@@ -0,0 +1,92 @@
+"""İl adı eşleştirici: Türkçe harf katlama, kelime sınırı ve sütun sınıflandırma"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from election_common.provinces import (
+    PROVINCES,
+    ProvinceMatcher,
+    classify_provinces,
+    find_province,
+    province_file_key,
+    turkish_lower,
+)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("İstanbul", "İstanbul"),
+    ("İZMİR", "İzmir"),
+    ("ISTANBUL", "İstanbul"),
+    ("istanbul anketleri", "İstanbul"),
+    ("HAKKÂRİ", "Hakkâri"),
+    ("Hakkari", "Hakkâri"),
+    ("IĞDIR", "Iğdır"),
+    ("sanliurfa", "Şanlıurfa"),
+    ("Siirt'te yapılan anket", "Siirt"),
+    ("Van Gölü", "Van"),
+    ("Afyon", "Afyonkarahisar"),
+    ("İçel 2019", "Mersin"),
+])
+def test_find_province_folds_turkish_case_and_aliases(text, expected):
+    assert find_province(text) == expected
+
+
+@pytest.mark.parametrize("text", ["Karşılaştırma", "Vanilya", "Muşkara", "Genel", "", None])
+def test_find_province_requires_word_boundaries(text):
+    assert find_province(text) is None
+
+
+def test_find_province_leftmost_wins():
+    assert find_province("Ankara ve İstanbul") == "Ankara"
+    assert find_province("Karşıyaka ve İzmir") == "İzmir"
+    assert find_province("Kars ile Karşılaştırma") == "Kars"
+
+
+def test_every_province_is_found_by_its_own_name():
+    assert [find_province(name) for name in PROVINCES] == list(PROVINCES)
+    assert [find_province(name.upper()) for name in PROVINCES] == list(PROVINCES)
+
+
+def test_classify_matches_find_and_keeps_index():
+    values = pd.Series(["İzmir", "Kars", np.nan, "İZMİR", "Karşılaştırma", None, "Ankara ve İstanbul"],
+                       index=[5, 6, 7, 8, 9, 10, 11], dtype=object)
+
+    classified = classify_provinces(values)
+
+    assert classified.index.tolist() == values.index.tolist()
+    assert classified.dtype == object
+    assert classified.tolist()[:2] == ["İzmir", "Kars"]
+    assert classified.isna().tolist() == [False, False, True, False, True, True, False]
+    assert classified.dropna().tolist() == [find_province(value) for value in values.dropna() if find_province(value)]
+
+
+def test_classify_all_missing_and_empty_input():
+    all_missing = classify_provinces(pd.Series([np.nan, None], dtype=object))
+    empty = classify_provinces(pd.Series([], dtype=object))
+
+    assert all_missing.isna().all() and len(all_missing) == 2
+    assert empty.empty and empty.dtype == object
+
+
+def test_custom_matcher_names_and_aliases():
+    matcher = ProvinceMatcher(names=["Kars", "Karşıyaka"], aliases={"KSK": "Karşıyaka"})
+
+    assert matcher.find("Karşıyaka") == "Karşıyaka"
+    assert matcher.find("ksk taraftarı") == "Karşıyaka"
+    assert matcher.find("İzmir") is None
+
+
+@pytest.mark.parametrize("name, key", [
+    ("Hakkâri", "hakkari"),
+    ("İstanbul", "istanbul"),
+    ("Iğdır", "iğdır"),
+    ("Şanlıurfa", "şanlıurfa"),
+])
+def test_province_file_key(name, key):
+    assert province_file_key(name) == key
+
+
+def test_turkish_lower_dotted_and_dotless_i():
+    assert turkish_lower("İIıi") == "iııi"
+    assert len(turkish_lower("İSTANBUL")) == len("istanbul")
@@ -0,0 +1,77 @@
+"""read_table: ağaçtan doğrudan okuma pd.read_html(flavor="lxml") ile aynı tabloyu vermeli"""
+
+from io import StringIO
+
+import lxml.html
+import pandas as pd
+import pytest
+
+from conftest import FIXTURES_DIR
+from election_common.scraping import WikiPage, flatten_columns, read_table
+
+TABLES = {
+    'cok_satirli_thead': """
+        <table class="wikitable"><thead>
+        <tr><th rowspan="2">Tarih</th><th rowspan="2">Anket şirketi</th><th colspan="2">Partiler</th></tr>
+        <tr><th>AKP</th><th>CHP</th></tr></thead><tbody>
+        <tr><td>20-24 Mart</td><td>ORC</td><td>34,5</td><td>55,1</td></tr>
+        <tr><td>15-18 Mart</td><td>SONAR</td><td>36,0</td><td>52,0</td></tr></tbody></table>""",
+    'rowspan_colspan': """
+        <table class="wikitable"><tr><th>Tarih</th><th>Anket şirketi</th><th>AKP</th><th>CHP</th></tr>
+        <tr><td rowspan="3">Mart</td><td>Optimar</td><td>30</td><td>58</td></tr>
+        <tr><td rowspan="2">HBS</td><td>33</td><td>54</td></tr>
+        <tr><td>40</td><td>45</td></tr>
+        <tr><td>Şubat</td><td colspan="2">Beraberlik</td><td>41</td></tr></table>""",
+    'gizli_siralama_anahtari': """
+        <table class="wikitable sortable"><tr><th>Tarih</th><th>Örneklem</th><th>AKP</th></tr>
+        <tr><td><span style="display:none">2024-03-20</span>20-24 Mart</td>
+            <td><span style="display: none;">3850</span>3.850</td><td>34,5<style>.x{}</style></td></tr>
+        <tr><td>15 Mart<br>2024</td><td>2,755</td><td>36</td></tr>
+        <tr style="display:none"><td>gizli</td><td>1</td><td>1</td></tr></table>""",
+    'tfoot': """
+        <table class="wikitable"><thead><tr><th>Anket şirketi</th><th>AKP</th></tr></thead>
+        <tbody><tr><td>ORC</td><td>34,5</td></tr></tbody>
+        <tfoot><tr><td>Ortalama</td><td>35</td></tr></tfoot></table>""",
+    'ic_ice_tablo': """
+        <table class="wikitable"><tr><th>Anket şirketi</th><th>Ayrıntı</th></tr>
+        <tr><td>ORC</td><td><table><tr><th>İlçe</th></tr><tr><td>Kadıköy</td></tr></table></td></tr>
+        <tr><td>SONAR</td><td>yok</td></tr></table>""",
+}
+
+
+def _read_html(markup: str) -> pd.DataFrame:
+    return flatten_columns(pd.read_html(StringIO(markup), flavor="lxml")[0])
+
+
+@pytest.mark.parametrize("name", list(TABLES))
+def test_read_table_matches_read_html(name):
+    markup = TABLES[name]
+
+    pd.testing.assert_frame_equal(read_table(lxml.html.fragment_fromstring(markup.strip())), _read_html(markup))
+
+
+@pytest.mark.parametrize("fixture", ["anket_sayfasi.html", "basliklar_sayfasi.html"])
+def test_read_table_matches_read_html_on_fixture_pages(fixture):
+    page = WikiPage((FIXTURES_DIR / fixture).read_text(encoding="utf-8"))
+
+    for _, element in page.table_elements():
+        ours = read_table(element)
+        if ours.empty:
+            continue
+        pd.testing.assert_frame_equal(ours, _read_html(lxml.html.tostring(element, encoding="unicode")))
+
+
+def test_read_table_does_not_modify_tree():
+    element = lxml.html.fragment_fromstring(TABLES['gizli_siralama_anahtari'].strip())
+    before = lxml.html.tostring(element)
+
+    read_table(element)
+
+    assert lxml.html.tostring(element) == before
+
+
+def test_hidden_and_empty_tables_read_as_empty():
+    assert read_table(lxml.html.fragment_fromstring(
+        '<table style="display: none"><tr><th>A</th></tr><tr><td>1</td></tr></table>')).empty
+    assert read_table(lxml.html.fragment_fromstring('<table><tr><th> </th></tr></table>')).empty
+    assert read_table(lxml.html.fragment_fromstring('<table><tr><th>Başlık</th></tr></table>')).empty
@@ -0,0 +1,76 @@
+"""Sayfa ayrıştırma: tabloların belge sırasıyla başlıklarla eşlenmesi"""
+
+import lxml.html
+import pytest
+
+from conftest import FIXTURES_DIR
+from election_common.scraping import DEFAULT_HEADING, WikiPage, element_text, heading_text
+
+
+@pytest.fixture(scope="module")
+def page() -> WikiPage:
+    return WikiPage((FIXTURES_DIR / "basliklar_sayfasi.html").read_text(encoding="utf-8"))
+
+
+def _first_header(table) -> str:
+    return element_text(table.xpath(".//th")[0])
+
+
+def test_tables_take_nearest_preceding_heading_in_document_order(page):
+    pairs = [(heading, _first_header(table)) for heading, table in page.table_elements()]
+
+    assert pairs == [
+        (DEFAULT_HEADING, "Özet"),
+        ("Marmara", "Bölge"),
+        ("İstanbul", "Anket şirketi"),
+        ("İstanbul", "İlçe"),
+        ("Kadıköy", "İlçe"),
+        ("Kadıköy", "Mahalle"),
+        ("Kadıköy", "Boş"),
+        ("Ege", "Bölge"),
+    ]
+
+
+def test_tables_outside_content_and_non_wikitables_are_ignored(page):
+    headers = [_first_header(table) for _, table in page.table_elements()]
+
+    assert "Dış" not in headers
+    assert all("wikitable" in table.get("class") for _, table in page.table_elements())
+
+
+def test_nested_table_follows_its_outer_table(page):
+    (_, outer), (_, nested) = page.table_elements()[2:4]
+
+    assert nested in outer.iterdescendants()
+
+
+def test_heading_levels_limit_which_headings_count(page):
+    headings = [heading for heading, _ in page.table_elements(levels=("h2",))]
+
+    assert headings == [DEFAULT_HEADING] + ["Marmara"] * 6 + ["Ege"]
+
+
+def test_tables_skips_tables_without_rows(page):
+    frames = list(page.tables())
+
+    assert [heading for heading, _ in frames] == [
+        DEFAULT_HEADING, "Marmara", "İstanbul", "İstanbul", "Kadıköy", "Kadıköy", "Ege"]
+    assert list(frames[2][1].columns) == ["Anket şirketi", "Ayrıntı"]
+
+
+@pytest.mark.parametrize("markup, expected", [
+    ('<h2>Ankara [düzenle]</h2>', "Ankara"),
+    ('<h2>Ankara<span class="mw-editsection">[<a>düzenle</a> | <a>kaynağı değiştir</a>]</span></h2>', "Ankara"),
+    ('<h3><span class="mw-headline">İzmir</span> [ Düzenle ]</h3>', "İzmir"),
+    ('<h2>Genel seçim [1]</h2>', "Genel seçim [1]"),
+])
+def test_heading_text_strips_edit_links(markup, expected):
+    assert heading_text(lxml.html.fragment_fromstring(markup)) == expected
+
+
+def test_page_title_and_missing_content():
+    page = WikiPage('<html><body><h1 id="firstHeading">Anketler</h1>'
+                    '<table class="wikitable"><tr><th>A</th></tr></table></body></html>')
+
+    assert page.title == "Anketler"
+    assert page.table_elements() == []